@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Ceph migrator agent, long-lived ceph RBD operation server speaking JSON lines over stdin/stdout
+
+ceph-agent.py [--cinder-pools <pool-name>[,<pool-name>...]]
+
+Agent keeps single rados cluster handle open per ceph client (client.cinder, client.migrator), client is selected
+by the agent the same way clib.get_ceph_client_name() does (client.cinder for --cinder-pools, client.migrator otherwise).
+
+Request:  {"id": 1, "method": "image_exists", "params": {"pool_name": "...", "rbd_image_name": "..."}}
+Progress: {"id": 1, "progress": "Image copy: 42% complete..."}
+Response: {"id": 1, "result": [...], "stderr": "", "ecode": 0}
+
+Metadata operations are served via librbd (python3-rados, python3-rbd), data operations (copy, diff-copy, du, migrate)
+execute ceph-rbd-image-*.sh scripts located next to the agent and stream their progress.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import os.path
+import re
+import subprocess
+import sys
+import threading
+
+import rados
+import rbd
+
+CEPH_CLIENT_DIR = "/root/migrator"
+CEPH_CONFIG = os.path.join(CEPH_CLIENT_DIR, "ceph.conf")
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENT_WORKERS = 16
+
+# scripts allowed to be executed via run_script method
+AGENT_SCRIPTS = ('ceph-rbd-image-copy.sh', 'ceph-rbd-image-deepcopy.sh', 'ceph-rbd-image-snapshot-copy.sh',
+                 'ceph-rbd-image-diff-copy.sh', 'ceph-rbd-image-du.sh', 'ceph-rbd-image-migrate.sh')
+
+
+class CephAgent:
+    """ ceph RBD operations server keeping per ceph client cluster handles """
+    def __init__(self, cinder_pools):
+        self.cinder_pools = cinder_pools
+        self.clusters = {}
+        self.clusters_lock = threading.Lock()
+        self.output_lock = threading.Lock()
+
+    def get_ceph_client_name(self, pool_name, dst_pool_name=None):
+        """ identify which ceph user to use for planned ceph operation """
+        return "client.cinder" if (dst_pool_name or pool_name) in self.cinder_pools else "client.migrator"
+
+    def get_cluster(self, ceph_client_name):
+        """ return connected rados cluster handle for ceph client (connected once) """
+        with self.clusters_lock:
+            if ceph_client_name not in self.clusters:
+                cluster = rados.Rados(conffile=CEPH_CONFIG, name=ceph_client_name,
+                                      conf={'keyring': os.path.join(CEPH_CLIENT_DIR, f"{ceph_client_name}.keyring")})
+                cluster.connect()
+                self.clusters[ceph_client_name] = cluster
+            return self.clusters[ceph_client_name]
+
+    def open_ioctx(self, pool_name, ceph_client_name=None):
+        """ open pool I/O context """
+        return self.get_cluster(ceph_client_name or self.get_ceph_client_name(pool_name)).open_ioctx(pool_name)
+
+    @staticmethod
+    def get_existing_images(ioctx, rbd_image_names):
+        """ return those of given RBD image names which exist, targeted lookups opening the images, no pool listing """
+        images = []
+        for i_name in rbd_image_names:
+            try:
+                with rbd.Image(ioctx, i_name, read_only=True):
+                    images.append(i_name)
+            except rbd.ImageNotFound:
+                pass
+        return images
+
+    def find_images(self, ioctx, rbd_image_name, disk_suffix=False):
+        """ find RBD images named <rbd_image_name>, volume-<rbd_image_name> (or <rbd_image_name>_disk) """
+        return self.get_existing_images(ioctx, [rbd_image_name, f"volume-{rbd_image_name}"] +
+                                        ([f"{rbd_image_name}_disk"] if disk_suffix else []))
+
+    def find_image(self, ioctx, rbd_image_name, disk_suffix=False):
+        """ find single RBD image, raise rbd.ImageNotFound otherwise """
+        images = self.find_images(ioctx, rbd_image_name, disk_suffix)
+        if len(images) != 1:
+            raise rbd.ImageNotFound(f"RBD image {rbd_image_name} not found (matches: {images})")
+        return images[0]
+
+    @staticmethod
+    def find_snapshot(image, rbd_image_snapshot_name):
+        """ find RBD image snapshot named (snapshot.)?<rbd_image_snapshot_name> (same as scripts) """
+        pattern = re.compile(f"(snapshot.)?{re.escape(rbd_image_snapshot_name)}")
+        for i_snapshot in image.list_snaps():
+            if pattern.fullmatch(i_snapshot['name']):
+                return i_snapshot['name']
+        return None
+
+    # agent methods, return (result, ecode), result is JSON serializable (list of lines where scripts print lines)
+    def ping(self):
+        return sorted(self.clusters), 0
+
+    def image_info(self, pool_name, rbd_image_name):
+        with self.open_ioctx(pool_name) as ioctx, rbd.Image(ioctx, rbd_image_name, read_only=True) as image:
+            stat = image.stat()
+            return {'name': rbd_image_name, 'size': stat['size'], 'objects': stat['num_objs'], 'order': stat['order'],
+                    'object_size': stat['obj_size'], 'block_name_prefix': stat['block_name_prefix'],
+                    'features': image.features()}, 0
+
+    def images_exist(self, pool_name, rbd_image_names):
+        with self.open_ioctx(pool_name) as ioctx:
+            return sorted(self.get_existing_images(ioctx, set(rbd_image_names))), 0
+
+    def image_exists(self, pool_name, rbd_image_name):
+        with self.open_ioctx(pool_name) as ioctx:
+            images = self.find_images(ioctx, rbd_image_name)
+            return images, 0 if images else 1
+
+    def image_delete(self, pool_name, rbd_image_name):
+        with self.open_ioctx(pool_name) as ioctx:
+            rbd.RBD().remove(ioctx, self.find_image(ioctx, rbd_image_name))
+            return [], 0
+
+    def image_flatten(self, pool_name, rbd_image_name):
+        with self.open_ioctx(pool_name) as ioctx, rbd.Image(ioctx, self.find_image(ioctx, rbd_image_name)) as image:
+            image.flatten()
+            return [], 0
+
+    def image_create(self, pool_name, rbd_image_name, rbd_image_size_mb):
+        with self.open_ioctx(pool_name) as ioctx:
+            rbd.RBD().create(ioctx, rbd_image_name, int(rbd_image_size_mb) * 1024 * 1024, old_format=False)
+            return [], 0
+
+    def image_clone(self, src_pool_name, src_rbd_image_name, src_rbd_image_snapshot_name, dst_pool_name, dst_rbd_image_name):
+        ceph_client_name = self.get_ceph_client_name(src_pool_name, dst_pool_name)
+        with self.open_ioctx(src_pool_name, ceph_client_name) as src_ioctx, \
+             self.open_ioctx(dst_pool_name, ceph_client_name) as dst_ioctx:
+            src_image_name = self.find_image(src_ioctx, src_rbd_image_name)
+            with rbd.Image(src_ioctx, src_image_name, read_only=True) as src_image:
+                src_snapshot_name = self.find_snapshot(src_image, src_rbd_image_snapshot_name)
+            if not src_snapshot_name:
+                return [], 1
+            rbd.RBD().clone(src_ioctx, src_image_name, src_snapshot_name, dst_ioctx, dst_rbd_image_name)
+            return [], 0
+
+    def snapshot_exists(self, pool_name, rbd_image_name, rbd_image_snapshot_name):
+        with self.open_ioctx(pool_name) as ioctx, \
+             rbd.Image(ioctx, self.find_image(ioctx, rbd_image_name), read_only=True) as image:
+            snapshot_name = self.find_snapshot(image, rbd_image_snapshot_name)
+            return [snapshot_name] if snapshot_name else [], 0 if snapshot_name else 1
+
+    def snapshot_create(self, pool_name, rbd_image_name, rbd_image_snapshot_name):
+        with self.open_ioctx(pool_name) as ioctx, \
+             rbd.Image(ioctx, self.find_image(ioctx, rbd_image_name, disk_suffix=True)) as image:
+            image.create_snap(rbd_image_snapshot_name)
+            image.protect_snap(rbd_image_snapshot_name)
+            return [], 0
+
+    def snapshot_delete(self, pool_name, rbd_image_name, rbd_image_snapshot_name):
+        with self.open_ioctx(pool_name) as ioctx, \
+             rbd.Image(ioctx, self.find_image(ioctx, rbd_image_name, disk_suffix=True)) as image:
+            try:
+                image.unprotect_snap(rbd_image_snapshot_name)
+            except rbd.Error:
+                pass
+            image.remove_snap(rbd_image_snapshot_name)
+            return [], 0
+
+    def run_script(self, request_id, script_name, script_args, pool_name, dst_pool_name=None):
+        """ execute data operation script, stderr lines are streamed as progress messages,
+            script accesses pools as CEPH_USER (or CEPH_SRC_USER / CEPH_DST_USER for source and destination pool) """
+        if script_name not in AGENT_SCRIPTS:
+            raise ValueError(f"Script {script_name} is not allowed")
+        env = os.environ | {'CEPH_USER': self.get_ceph_client_name(pool_name, dst_pool_name),
+                            'CEPH_SRC_USER': self.get_ceph_client_name(pool_name),
+                            'CEPH_DST_USER': self.get_ceph_client_name(pool_name, dst_pool_name)}
+        with subprocess.Popen([os.path.join(AGENT_DIR, script_name), *[str(i_arg) for i_arg in script_args]],
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env) as process:
+            output = []
+            stdout_reader = threading.Thread(target=lambda: output.append(process.stdout.read()), daemon=True)
+            stdout_reader.start()
+            error, error_line = b'', b''
+            while data := process.stderr.read1(4096):
+                error += data
+                *lines, error_line = re.split(rb'[\r\n]', error_line + data)
+                for i_line in lines:
+                    if i_line.strip():
+                        self.write({'id': request_id, 'progress': i_line.decode(errors='replace').strip()})
+            stdout_reader.join()
+            return output[0].decode().strip(), process.wait(), error.decode(errors='replace').strip()
+
+    def write(self, message):
+        """ write single JSON line message """
+        with self.output_lock:
+            sys.stdout.write(json.dumps(message) + "\n")
+            sys.stdout.flush()
+
+    def handle(self, request):
+        """ serve single request """
+        response = {'id': request.get('id'), 'result': [], 'stderr': '', 'ecode': 1}
+        try:
+            if request['method'] == 'run_script':
+                response['result'], response['ecode'], response['stderr'] = self.run_script(request['id'], **request['params'])
+            elif request['method'] in AGENT_METHODS:
+                response['result'], response['ecode'] = getattr(self, request['method'])(**request['params'])
+            else:
+                response['stderr'] = f"Unknown method {request['method']}"
+        except Exception as ex:
+            response['stderr'] = f"{type(ex).__name__}: {ex}"
+        self.write(response)
+
+    def serve(self):
+        """ serve requests from stdin until EOF """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=AGENT_WORKERS) as executor:
+            for i_line in sys.stdin:
+                if i_line.strip():
+                    executor.submit(self.handle, json.loads(i_line))
+        for i_cluster in self.clusters.values():
+            i_cluster.shutdown()
+
+
+AGENT_METHODS = ('ping', 'images_exist', 'image_info', 'image_exists', 'image_delete', 'image_flatten',
+                 'image_create', 'image_clone', 'snapshot_exists', 'snapshot_create', 'snapshot_delete')
+
+
+if __name__ == "__main__":
+    AP = argparse.ArgumentParser(epilog=globals().get('__doc__'),
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    AP.add_argument('--cinder-pools', default='',
+                    help='Comma separated list of pools accessed as client.cinder, other pools are accessed as client.migrator')
+    ARGS = AP.parse_args()
+    CephAgent([i_pool for i_pool in ARGS.cinder_pools.split(',') if i_pool]).serve()
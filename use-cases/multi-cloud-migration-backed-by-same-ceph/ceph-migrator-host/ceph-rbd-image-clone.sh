@@ -22,7 +22,10 @@ test -n "${OSTACK_SRC_SNAPSHOT_ID}"
 test -n "${CEPH_DST_POOL}"
 test -n "${CEPH_DST_RBD_IMAGE_NAME}"
 
-SRC_RBD_IMAGE="$(rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} ls ${CEPH_SRC_POOL} | grep -E "^(volume.)?${OSTACK_SRC_VOLUME_ID}$")"
+# shared functions (rbd_image_name)
+. "$(dirname "$0")/lib.sh"
+
+SRC_RBD_IMAGE="$(rbd_image_name "${CEPH_SRC_POOL}" "${OSTACK_SRC_VOLUME_ID}" "volume-${OSTACK_SRC_VOLUME_ID}")"
 SRC_SNAPSHOT_NAME="$(rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} snap ls ${CEPH_SRC_POOL}/${SRC_RBD_IMAGE} | grep -Eo "(snapshot.)?${OSTACK_SRC_SNAPSHOT_ID}")"
 
 rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} clone ${CEPH_SRC_POOL}/${SRC_RBD_IMAGE}@${SRC_SNAPSHOT_NAME} ${CEPH_DST_POOL}/${CEPH_DST_RBD_IMAGE_NAME}
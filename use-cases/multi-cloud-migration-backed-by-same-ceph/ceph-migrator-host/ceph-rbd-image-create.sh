@@ -0,0 +1,21 @@
+#!/usr/bin/env bash
+
+# ceph-rbd-image-create.sh <ceph-pool-name> <rbd-image-name> <rbd-image-size-mb>
+# returns 0 if (empty) RBD image is created
+
+set -eo pipefail
+
+CEPH_CLIENT_DIR="/root/migrator"
+CEPH_USER="${CEPH_USER:-"client.migrator"}"
+CEPH_KEYRING="${CEPH_CLIENT_DIR}/${CEPH_USER}.keyring"
+CEPH_CONFIG="${CEPH_CLIENT_DIR}/ceph.conf"
+
+CEPH_POOL="$1"
+RBD_IMAGE_NAME="$2"
+RBD_IMAGE_SIZE_MB="$3"
+
+test -n "${CEPH_POOL}"
+test -n "${RBD_IMAGE_NAME}"
+test -n "${RBD_IMAGE_SIZE_MB}"
+
+rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} create --size "${RBD_IMAGE_SIZE_MB}" "${CEPH_POOL}/${RBD_IMAGE_NAME}"
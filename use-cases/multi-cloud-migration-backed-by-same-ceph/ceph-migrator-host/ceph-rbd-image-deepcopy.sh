@@ -22,6 +22,9 @@ test -n "${CEPH_DST_RBD_IMAGE_NAME}"
 
 test "$#" == "4"
 
-SRC_RBD_IMAGE="$(rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} ls ${CEPH_SRC_POOL} | grep -E "^(volume.)?${OSTACK_SRC_VOLUME_ID}$")"
+# shared functions (rbd_image_name)
+. "$(dirname "$0")/lib.sh"
+
+SRC_RBD_IMAGE="$(rbd_image_name "${CEPH_SRC_POOL}" "${OSTACK_SRC_VOLUME_ID}" "volume-${OSTACK_SRC_VOLUME_ID}")"
 
 rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} deep cp ${CEPH_SRC_POOL}/${SRC_RBD_IMAGE} ${CEPH_DST_POOL}/${CEPH_DST_RBD_IMAGE_NAME}
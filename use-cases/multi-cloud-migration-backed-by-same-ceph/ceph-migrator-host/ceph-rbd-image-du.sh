@@ -0,0 +1,28 @@
+#!/usr/bin/env bash
+
+# ceph-rbd-image-du.sh <ceph-pool-name> <rbd-image-name|ostack-volume-id> [rbd-image-snapshot-name]
+# returns 0 and prints RBD image (snapshot) provisioned and allocated (used) size in JSON format
+
+set -eo pipefail
+
+CEPH_CLIENT_DIR="/root/migrator"
+CEPH_USER="${CEPH_USER:-"client.cinder"}"
+CEPH_KEYRING="${CEPH_CLIENT_DIR}/${CEPH_USER}.keyring"
+CEPH_CONFIG="${CEPH_CLIENT_DIR}/ceph.conf"
+
+CEPH_POOL="$1"
+RBD_IMAGE_NAME="$2"
+RBD_IMAGE_SNAPSHOT_NAME="$3"
+
+test -n "${CEPH_POOL}"
+test -n "${RBD_IMAGE_NAME}"
+
+# shared functions (rbd_image_name)
+. "$(dirname "$0")/lib.sh"
+
+RBD_IMAGE_SPEC="${CEPH_POOL}/$(rbd_image_name "${CEPH_POOL}" "${RBD_IMAGE_NAME}" "volume-${RBD_IMAGE_NAME}")"
+if [ -n "${RBD_IMAGE_SNAPSHOT_NAME}" ]; then
+    RBD_IMAGE_SPEC="${RBD_IMAGE_SPEC}@${RBD_IMAGE_SNAPSHOT_NAME}"
+fi
+
+rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} du ${RBD_IMAGE_SPEC} --format json
@@ -16,5 +16,8 @@ OSTACK_VOLUME_ID="$2"
 test -n "${CEPH_POOL}"
 test -n "${OSTACK_VOLUME_ID}"
 
-rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} ls ${CEPH_POOL} | grep -E "^(volume.)?${OSTACK_VOLUME_ID}$"
+# shared functions (rbd_image_name)
+. "$(dirname "$0")/lib.sh"
+
+rbd_image_name "${CEPH_POOL}" "${OSTACK_VOLUME_ID}" "volume-${OSTACK_VOLUME_ID}"
 
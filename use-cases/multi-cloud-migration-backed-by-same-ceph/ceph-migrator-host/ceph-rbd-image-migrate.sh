@@ -0,0 +1,93 @@
+#!/usr/bin/env bash
+
+# ceph-rbd-image-migrate.sh <copy-mode> <ceph-src-pool-name> <src-rbd-image-name> <src-snapshot-name> <ceph-dst-pool-name> <dst-ceph-rbd-image-name> [src-clone-rbd-image-name]
+# migrates snapshotted RBD image into destination pool and cleans up (steps G.06-G.17) in single execution
+#   destination RBD image is replaced, missing one (to be managed as volume once migrated) is created
+#   copy-mode: clone-flatten-copy, clone-flatten-deepcopy or snapshot-copy (no clone, steps G.08-G.10 and G.13-G.14 are skipped)
+# prints one JSON line per step on stdout ({"step": "G.06", "ok": true, "ecode": 0}), rbd output goes to stderr
+# returns 0 if all steps succeed, stops at first failed step
+
+set -o pipefail
+
+CEPH_CLIENT_DIR="/root/migrator"
+CEPH_SRC_USER="${CEPH_SRC_USER:-"client.cinder"}"
+CEPH_DST_USER="${CEPH_DST_USER:-"client.migrator"}"
+CEPH_CONFIG="${CEPH_CLIENT_DIR}/ceph.conf"
+
+COPY_MODE="$1"
+CEPH_SRC_POOL="$2"
+SRC_RBD_IMAGE="$3"
+SRC_SNAPSHOT_NAME="$4"
+CEPH_DST_POOL="$5"
+CEPH_DST_RBD_IMAGE_NAME="$6"
+SRC_CLONE_RBD_IMAGE="$7"
+
+set -e
+test -n "${COPY_MODE}"
+test -n "${CEPH_SRC_POOL}"
+test -n "${SRC_RBD_IMAGE}"
+test -n "${SRC_SNAPSHOT_NAME}"
+test -n "${CEPH_DST_POOL}"
+test -n "${CEPH_DST_RBD_IMAGE_NAME}"
+test "${COPY_MODE}" == "snapshot-copy" -o -n "${SRC_CLONE_RBD_IMAGE}"
+set +e
+
+# rbd_src / rbd_dst <rbd-args>: rbd as source / destination pool ceph user, output goes to stderr
+function rbd_src() {
+    rbd --conf="${CEPH_CONFIG}" --name "${CEPH_SRC_USER}" --keyring="${CEPH_CLIENT_DIR}/${CEPH_SRC_USER}.keyring" "$@" 1>&2
+}
+function rbd_dst() {
+    rbd --conf="${CEPH_CONFIG}" --name "${CEPH_DST_USER}" --keyring="${CEPH_CLIENT_DIR}/${CEPH_DST_USER}.keyring" "$@" 1>&2
+}
+function rbd_dst_rm_if_exists() {
+    if rbd_dst info "$1"; then
+        rbd_dst rm "$1"
+    fi
+}
+function rbd_src_snap_rm() {
+    rbd_src snap unprotect "$1" || true
+    rbd_src snap rm "$1"
+}
+
+# step <step-code> <expect-success|expect-failure> <command> [args]: execute step, report it and stop at failure
+function step() {
+    local step_code="$1" expectation="$2" ecode ok="false"
+    shift 2
+    "$@"
+    ecode=$?
+    if [ "${expectation}" == "expect-success" -a "${ecode}" == "0" ] || [ "${expectation}" == "expect-failure" -a "${ecode}" != "0" ]; then
+        ok="true"
+    fi
+    echo "{\"step\": \"${step_code}\", \"ok\": ${ok}, \"ecode\": ${ecode}}"
+    if [ "${ok}" != "true" ]; then
+        exit 1
+    fi
+}
+
+SRC_SNAPSHOT="${CEPH_SRC_POOL}/${SRC_RBD_IMAGE}@${SRC_SNAPSHOT_NAME}"
+SRC_CLONE="${CEPH_SRC_POOL}/${SRC_CLONE_RBD_IMAGE}"
+DST_IMAGE="${CEPH_DST_POOL}/${CEPH_DST_RBD_IMAGE_NAME}"
+
+step G.06 expect-success rbd_dst_rm_if_exists "${DST_IMAGE}"
+step G.07 expect-failure rbd_dst info "${DST_IMAGE}"
+
+if [ "${COPY_MODE}" == "snapshot-copy" ]; then
+    step G.11 expect-success rbd_dst cp "${SRC_SNAPSHOT}" "${DST_IMAGE}"
+    step G.12 expect-success rbd_dst info "${DST_IMAGE}"
+else
+    step G.08 expect-success rbd_src clone "${SRC_SNAPSHOT}" "${SRC_CLONE}"
+    step G.09 expect-success rbd_src info "${SRC_CLONE}"
+    step G.10 expect-success rbd_src flatten "${SRC_CLONE}"
+    if [ "${COPY_MODE}" == "clone-flatten-deepcopy" ]; then
+        step G.11 expect-success rbd_dst deep cp "${SRC_CLONE}" "${DST_IMAGE}"
+    else
+        step G.11 expect-success rbd_dst cp "${SRC_CLONE}" "${DST_IMAGE}"
+    fi
+    step G.12 expect-success rbd_dst info "${DST_IMAGE}"
+    step G.13 expect-success rbd_src rm "${SRC_CLONE}"
+    step G.14 expect-failure rbd_src info "${SRC_CLONE}"
+fi
+
+step G.15 expect-success rbd_src info "${SRC_SNAPSHOT}"
+step G.16 expect-success rbd_src_snap_rm "${SRC_SNAPSHOT}"
+step G.17 expect-failure rbd_src info "${SRC_SNAPSHOT}"
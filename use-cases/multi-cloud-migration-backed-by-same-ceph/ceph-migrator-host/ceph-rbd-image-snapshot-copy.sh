@@ -0,0 +1,32 @@
+#!/usr/bin/env bash
+
+# ceph-rbd-image-snapshot-copy.sh <ceph-src-pool-name> <ostack-src-volume-id> <src-snapshot-name> <ceph-dst-pool-name> <dst-ceph-rbd-image-name>
+# returns 0 if RBD image snapshot copy (flattened, without clone) suceeds
+
+set -eo pipefail
+
+CEPH_CLIENT_DIR="/root/migrator"
+CEPH_USER="${CEPH_USER:-"client.cinder"}"
+CEPH_KEYRING="${CEPH_CLIENT_DIR}/${CEPH_USER}.keyring"
+CEPH_CONFIG="${CEPH_CLIENT_DIR}/ceph.conf"
+
+CEPH_SRC_POOL="$1"
+OSTACK_SRC_VOLUME_ID="$2"
+SRC_SNAPSHOT_NAME="$3"
+CEPH_DST_POOL="$4"
+CEPH_DST_RBD_IMAGE_NAME="$5"
+
+test -n "${CEPH_SRC_POOL}"
+test -n "${OSTACK_SRC_VOLUME_ID}"
+test -n "${SRC_SNAPSHOT_NAME}"
+test -n "${CEPH_DST_POOL}"
+test -n "${CEPH_DST_RBD_IMAGE_NAME}"
+
+test "$#" == "5"
+
+# shared functions (rbd_image_name)
+. "$(dirname "$0")/lib.sh"
+
+SRC_RBD_IMAGE="$(rbd_image_name "${CEPH_SRC_POOL}" "${OSTACK_SRC_VOLUME_ID}" "volume-${OSTACK_SRC_VOLUME_ID}" "${OSTACK_SRC_VOLUME_ID}_disk")"
+
+rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} cp ${CEPH_SRC_POOL}/${SRC_RBD_IMAGE}@${SRC_SNAPSHOT_NAME} ${CEPH_DST_POOL}/${CEPH_DST_RBD_IMAGE_NAME}
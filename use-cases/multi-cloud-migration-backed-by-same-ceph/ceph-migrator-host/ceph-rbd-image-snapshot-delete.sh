@@ -18,7 +18,10 @@ test -n "${CEPH_POOL}"
 test -n "${OSTACK_VOLUME_ID}"
 test -n "${OSTACK_SNAPSHOT_NAME}"
 
-RBD_IMAGE="$(rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} ls ${CEPH_POOL} | grep -E "^(volume.)?${OSTACK_VOLUME_ID}(_disk)?$")"
+# shared functions (rbd_image_name)
+. "$(dirname "$0")/lib.sh"
+
+RBD_IMAGE="$(rbd_image_name "${CEPH_POOL}" "${OSTACK_VOLUME_ID}" "volume-${OSTACK_VOLUME_ID}" "${OSTACK_VOLUME_ID}_disk")"
 
 rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} snap unprotect ${CEPH_POOL}/${RBD_IMAGE}@${OSTACK_SNAPSHOT_NAME} || true
 rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} snap rm ${CEPH_POOL}/${RBD_IMAGE}@${OSTACK_SNAPSHOT_NAME}
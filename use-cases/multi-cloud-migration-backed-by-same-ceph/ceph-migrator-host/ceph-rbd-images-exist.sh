@@ -0,0 +1,29 @@
+#!/usr/bin/env bash
+
+# ceph-rbd-images-exist.sh <ceph-pool-name> <rbd-image-name> [rbd-image-name...]
+# prints those of given RBD image names which exist in a pool and returns 0 if lookup succeedes
+# (targeted rbd info per RBD image name, no pool listing, missing RBD image is not a failure)
+
+set -eo pipefail
+
+CEPH_CLIENT_DIR="/root/migrator"
+CEPH_USER="${CEPH_USER:-"client.migrator"}"
+CEPH_KEYRING="${CEPH_CLIENT_DIR}/${CEPH_USER}.keyring"
+CEPH_CONFIG="${CEPH_CLIENT_DIR}/ceph.conf"
+
+CEPH_POOL="$1"
+shift
+
+test -n "${CEPH_POOL}"
+test -n "$1"
+
+for i_name in "$@"; do
+    ecode=0
+    rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} info "${CEPH_POOL}/${i_name}" &>/dev/null || ecode=$?
+    if [ "${ecode}" == "0" ]; then
+        echo "${i_name}"
+    elif [ "${ecode}" != "2" ]; then
+        # other than ENOENT (missing RBD image) failure
+        exit ${ecode}
+    fi
+done
@@ -0,0 +1,15 @@
+# ceph migrator host shell library, sourced by ceph-*.sh scripts
+# functions expect CEPH_CONFIG, CEPH_USER and CEPH_KEYRING variables set by the sourcing script
+
+# rbd_image_name <ceph-pool-name> <rbd-image-name-candidate>...: print first existing RBD image (targeted rbd info, no pool listing)
+function rbd_image_name() {
+    local pool="$1" i_name
+    shift
+    for i_name in "$@"; do
+        if rbd --conf="${CEPH_CONFIG}" --name "${CEPH_USER}" --keyring=${CEPH_KEYRING} info "${pool}/${i_name}" &>/dev/null; then
+            echo "${i_name}"
+            return 0
+        fi
+    done
+    return 1
+}
@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+OpenStack migrator benchmark - fake ceph migrator host
+
+Local stand-in of ceph migrator host (--ceph-migrator-host) for the offline benchmark:
+ * FakeCephHost replaces pooled SSH client, commands (ceph-migrator-host/*.sh scripts) are executed locally in bash
+ * fake rbd / ceph commands (this file executed as "fakeceph.py rbd ..." / "fakeceph.py ceph ...") operate
+   on RBD images backed by sparse files
+
+Fake ceph state directory layout:
+  <state-dir>/<pool>/<image>/data              RBD image data (sparse file)
+  <state-dir>/<pool>/<image>/snap.<snapshot>   RBD image snapshot data (sparse file)
+  <state-dir>/<pool>/<image>/meta.json         {"size": <bytes>, "parent": <pool/image@snapshot>|null,
+                                                "snapshots": {<snapshot>: {"id": <n>, "protected": <bool>}}}
+
+Module is imported by the benchmark and executed per rbd command, it relies on python standard library only.
+"""
+
+import collections
+import json
+import os
+import os.path
+import shlex
+import struct
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+# environment of fake rbd / ceph commands
+STATE_DIR_ENV = 'FAKE_CEPH_STATE_DIR'
+RBD_THROUGHPUT_ENV = 'FAKE_CEPH_RBD_THROUGHPUT_MIBS'
+
+COPY_BLOCK_SIZE = 4 * 1024 * 1024
+DIFF_BLOCK_SIZE = 64 * 1024
+DIFF_HEADER = b"fake-rbd-diff v1\n"
+RBD_OBJECT_ORDER = 22
+FAKE_COMMAND_NAMES = ('rbd', 'ceph')
+
+
+# fake ceph migrator host (SSH client replacement)
+# -------------------------------------------------------------------------------------------------
+class FakeChannel:
+    """ paramiko channel stand-in over locally executed process, stdout and stderr are buffered by reader threads """
+    def __init__(self, process):
+        self.process = process
+        self.condition = threading.Condition()
+        self.buffers = {'stdout': bytearray(), 'stderr': bytearray()}
+        self.closed = {'stdout': False, 'stderr': False}
+        self.readers = [threading.Thread(target=self.read_stream, args=(i_name, i_stream), daemon=True)
+                        for i_name, i_stream in (('stdout', process.stdout), ('stderr', process.stderr))]
+        for i_reader in self.readers:
+            i_reader.start()
+
+    def read_stream(self, name, stream):
+        """ move process output into the channel buffer """
+        while data := stream.read1(COPY_BLOCK_SIZE):
+            with self.condition:
+                self.buffers[name] += data
+                self.condition.notify_all()
+        with self.condition:
+            self.closed[name] = True
+            self.condition.notify_all()
+
+    def eof(self, name=None):
+        """ True when all process output (of stream name) is buffered """
+        return self.closed[name] if name else all(self.closed.values())
+
+    def read(self, name, size=None):
+        """ read (up to size bytes) from the buffer, block until data or EOF """
+        with self.condition:
+            if size is None:
+                self.condition.wait_for(lambda: self.eof(name))
+                size = len(self.buffers[name])
+            else:
+                self.condition.wait_for(lambda: self.buffers[name] or self.eof(name))
+            data = bytes(self.buffers[name][:size])
+            del self.buffers[name][:size]
+            return data
+
+    def recv(self, size):
+        return self.read('stdout', size)
+
+    def recv_stderr(self, size):
+        return self.read('stderr', size)
+
+    def recv_ready(self):
+        with self.condition:
+            return bool(self.buffers['stdout'])
+
+    def recv_stderr_ready(self):
+        with self.condition:
+            return bool(self.buffers['stderr'])
+
+    def exit_status_ready(self):
+        with self.condition:
+            return self.eof()
+
+    def recv_exit_status(self):
+        for i_reader in self.readers:
+            i_reader.join()
+        return self.process.wait()
+
+    def close(self):
+        self.recv_exit_status()
+
+
+class FakeChannelFile:
+    """ paramiko ChannelFile stand-in """
+    def __init__(self, channel, name):
+        self.channel = channel
+        self.name = name
+
+    def read(self, size=None):
+        return self.channel.read(self.name, size)
+
+
+class FakeTransport:
+    """ paramiko Transport stand-in (always active) """
+    def is_active(self):
+        return True
+
+
+class FakeCephHost:
+    """ ceph migrator host stand-in, replaces pooled SSH client (lib.get_ssh_client())
+        commands are executed locally, migrator host base directory is mapped to ceph-migrator-host/ scripts,
+        rbd / ceph commands are served by fake ones operating on sparse files """
+    def __init__(self, state_dir, scripts_dir, base_dir='/root/migrator', ssh_latency=0.0, rbd_throughput=0.0):
+        self.state_dir = state_dir
+        self.scripts_dir = scripts_dir
+        self.base_dir = base_dir
+        self.ssh_latency = ssh_latency
+        self.lock = threading.Lock()
+        self.commands = collections.Counter()
+        self.bin_dir = os.path.join(state_dir, '.bin')
+        os.makedirs(self.bin_dir, exist_ok=True)
+        for i_command_name in FAKE_COMMAND_NAMES:
+            i_command_path = os.path.join(self.bin_dir, i_command_name)
+            with open(i_command_path, "w", encoding="utf-8") as file:
+                file.write(f"#!/bin/sh\nexec {shlex.quote(sys.executable)} -S {shlex.quote(os.path.abspath(__file__))} "
+                           f"{i_command_name} \"$@\"\n")
+            os.chmod(i_command_path, 0o755)
+        self.env = os.environ | {'PATH': f"{self.bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+                                 STATE_DIR_ENV: state_dir,
+                                 RBD_THROUGHPUT_ENV: str(rbd_throughput)}
+
+    def get_round_trips(self):
+        """ return number of executed commands (SSH round-trips) """
+        with self.lock:
+            return sum(self.commands.values())
+
+    def exec_command(self, command):
+        """ execute command locally, returns stdin, stdout and stderr like paramiko.SSHClient.exec_command() """
+        command_name = os.path.basename(next((i_token for i_token in shlex.split(command) if '=' not in i_token), ''))
+        with self.lock:
+            self.commands[command_name] += 1
+        if self.ssh_latency:
+            time.sleep(self.ssh_latency)
+        process = subprocess.Popen(['bash', '-c', command.replace(f"{self.base_dir}/", f"{self.scripts_dir}/")],
+                                   stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   env=self.env)
+        channel = FakeChannel(process)
+        return None, FakeChannelFile(channel, 'stdout'), FakeChannelFile(channel, 'stderr')
+
+    def get_transport(self):
+        return FakeTransport()
+
+    def close(self):
+        pass
+
+
+# fake RBD images on sparse files
+# -------------------------------------------------------------------------------------------------
+class RbdError(Exception):
+    """ fake rbd command failure (message, errno used as exit-code) """
+    def __init__(self, message, errno=2):
+        super().__init__(message)
+        self.errno = errno
+
+
+def parse_spec(spec):
+    """ parse <pool>/<image>[@<snapshot>], returns (pool, image, snapshot) """
+    pool_image, _, snapshot = spec.partition('@')
+    pool, _, image = pool_image.partition('/')
+    if not pool or not image:
+        raise RbdError(f"rbd: invalid image spec {spec}", 22)
+    return pool, image, snapshot or None
+
+
+def get_image_dir(state_dir, pool, image):
+    """ return RBD image directory """
+    return os.path.join(state_dir, pool, image)
+
+
+def load_meta(state_dir, pool, image):
+    """ load RBD image metadata, RbdError when image does not exist """
+    try:
+        with open(os.path.join(get_image_dir(state_dir, pool, image), 'meta.json'), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        raise RbdError(f"rbd: error opening image {image}: (2) No such file or directory", 2) from None
+
+
+def save_meta(state_dir, pool, image, meta):
+    """ save RBD image metadata atomically """
+    meta_file = os.path.join(get_image_dir(state_dir, pool, image), 'meta.json')
+    with open(f"{meta_file}.tmp", "w", encoding="utf-8") as file:
+        json.dump(meta, file)
+    os.replace(f"{meta_file}.tmp", meta_file)
+
+
+def get_data_file(state_dir, pool, image, snapshot=None, meta=None):
+    """ return data file of RBD image (snapshot), not flattened clone reads parent snapshot data """
+    meta = meta or load_meta(state_dir, pool, image)
+    if snapshot:
+        if snapshot not in meta['snapshots']:
+            raise RbdError("rbd: error setting snapshot context: (2) No such file or directory", 2)
+        return os.path.join(get_image_dir(state_dir, pool, image), f"snap.{snapshot}")
+    if meta['parent']:
+        return get_data_file(state_dir, *parse_spec(meta['parent']))
+    return os.path.join(get_image_dir(state_dir, pool, image), 'data')
+
+
+def create_image(state_dir, pool, image, size, parent=None):
+    """ create RBD image backed by sparse file """
+    image_dir = get_image_dir(state_dir, pool, image)
+    try:
+        os.makedirs(image_dir)
+    except FileExistsError:
+        raise RbdError("rbd: create error: (17) File exists", 17) from None
+    with open(os.path.join(image_dir, 'data'), "wb") as file:
+        file.truncate(size)
+    save_meta(state_dir, pool, image, {'size': size, 'parent': parent, 'snapshots': {}})
+
+
+def get_data_extents(file_name):
+    """ generate allocated (data) extents (offset, length) of sparse file """
+    with open(file_name, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        offset = 0
+        while offset < size:
+            try:
+                data_offset = os.lseek(file.fileno(), offset, os.SEEK_DATA)
+            except OSError:
+                return
+            hole_offset = os.lseek(file.fileno(), data_offset, os.SEEK_HOLE)
+            yield data_offset, hole_offset - data_offset
+            offset = hole_offset
+
+
+def get_allocated_size(file_name):
+    """ return allocated (used) bytes of sparse file """
+    return sum(i_length for _, i_length in get_data_extents(file_name))
+
+
+def report_progress(operation, percent):
+    """ print rbd progress message on stderr """
+    sys.stderr.write(f"{operation}: {percent}% complete...\r")
+    sys.stderr.flush()
+
+
+def throttle(start, processed_size):
+    """ slow down data operation to configured throughput """
+    throughput = float(os.environ.get(RBD_THROUGHPUT_ENV) or 0)
+    if throughput > 0:
+        time.sleep(max(0.0, start + processed_size / throughput / 1024 / 1024 - time.monotonic()))
+
+
+def copy_sparse_file(src_file_name, dst_file_name, size, operation):
+    """ copy allocated extents of sparse file, holes are kept """
+    start, extents = time.monotonic(), list(get_data_extents(src_file_name))
+    total_size, processed_size = sum(i_length for _, i_length in extents) or 1, 0
+    report_progress(operation, 0)
+    with open(src_file_name, "rb") as src_file, open(dst_file_name, "r+b" if os.path.exists(dst_file_name) else "wb") as dst_file:
+        dst_file.truncate(0)
+        dst_file.truncate(size)
+        for i_offset, i_length in extents:
+            for j_offset in range(i_offset, i_offset + i_length, COPY_BLOCK_SIZE):
+                j_length = min(COPY_BLOCK_SIZE, i_offset + i_length - j_offset)
+                os.pwrite(dst_file.fileno(), os.pread(src_file.fileno(), j_length, j_offset), j_offset)
+                processed_size += j_length
+                throttle(start, processed_size)
+                report_progress(operation, processed_size * 100 // total_size)
+    report_progress(operation, 100)
+    sys.stderr.write(f"{operation}: 100% complete...done.\n")
+
+
+def rbd_ls(state_dir, pool):
+    pool_dir = os.path.join(state_dir, pool)
+    for i_image in sorted(os.listdir(pool_dir) if os.path.isdir(pool_dir) else []):
+        print(i_image)
+
+
+def rbd_info(state_dir, spec, output_format=None):
+    pool, image, snapshot = parse_spec(spec)
+    meta = load_meta(state_dir, pool, image)
+    get_data_file(state_dir, pool, image, snapshot, meta)
+    info = {'name': image, 'id': uuid.uuid5(uuid.NAMESPACE_OID, f"{pool}/{image}").hex[:12],
+            'size': meta['size'], 'objects': -(-meta['size'] >> RBD_OBJECT_ORDER), 'order': RBD_OBJECT_ORDER,
+            'object_size': 1 << RBD_OBJECT_ORDER, 'snapshot_count': len(meta['snapshots']),
+            'block_name_prefix': f"rbd_data.{uuid.uuid5(uuid.NAMESPACE_OID, f'{pool}/{image}').hex[:12]}",
+            'format': 2, 'features': ['layering', 'exclusive-lock', 'object-map', 'fast-diff', 'deep-flatten']}
+    if snapshot:
+        info['protected'] = str(meta['snapshots'][snapshot]['protected']).lower()
+    if meta['parent']:
+        parent_pool, parent_image, parent_snapshot = parse_spec(meta['parent'])
+        info['parent'] = {'pool': parent_pool, 'image': parent_image, 'snapshot': parent_snapshot}
+    if output_format == 'json':
+        print(json.dumps(info))
+    else:
+        print(f"rbd image '{image}':\n\tsize {meta['size']} B in {info['objects']} objects\n\torder {RBD_OBJECT_ORDER}\n"
+              f"\tsnapshot_count: {info['snapshot_count']}\n\tformat: 2")
+
+
+def rbd_create(state_dir, spec, size_mb):
+    pool, image, _ = parse_spec(spec)
+    create_image(state_dir, pool, image, int(size_mb) * 1024 * 1024)
+
+
+def rbd_rm(state_dir, spec):
+    pool, image, _ = parse_spec(spec)
+    meta = load_meta(state_dir, pool, image)
+    if meta['snapshots']:
+        raise RbdError("rbd: image has snapshots - these must be deleted with 'rbd snap purge' before the image can be removed.", 39)
+    image_dir = get_image_dir(state_dir, pool, image)
+    for i_file_name in os.listdir(image_dir):
+        os.unlink(os.path.join(image_dir, i_file_name))
+    os.rmdir(image_dir)
+    sys.stderr.write("Removing image: 100% complete...done.\n")
+
+
+def rbd_clone(state_dir, src_spec, dst_spec):
+    src_pool, src_image, src_snapshot = parse_spec(src_spec)
+    src_meta = load_meta(state_dir, src_pool, src_image)
+    if not src_snapshot or not src_meta['snapshots'].get(src_snapshot, {}).get('protected'):
+        raise RbdError("rbd: clone error: (22) Invalid argument (parent snapshot must be protected)", 22)
+    dst_pool, dst_image, _ = parse_spec(dst_spec)
+    create_image(state_dir, dst_pool, dst_image, src_meta['size'], parent=src_spec)
+
+
+def rbd_flatten(state_dir, spec):
+    pool, image, _ = parse_spec(spec)
+    meta = load_meta(state_dir, pool, image)
+    if meta['parent']:
+        copy_sparse_file(get_data_file(state_dir, pool, image, meta=meta),
+                         os.path.join(get_image_dir(state_dir, pool, image), 'data'), meta['size'], "Image flatten")
+        meta['parent'] = None
+        save_meta(state_dir, pool, image, meta)
+
+
+def rbd_cp(state_dir, src_spec, dst_spec, deep=False):
+    src_pool, src_image, src_snapshot = parse_spec(src_spec)
+    src_meta = load_meta(state_dir, src_pool, src_image)
+    src_data_file = get_data_file(state_dir, src_pool, src_image, src_snapshot, src_meta)
+    dst_pool, dst_image, _ = parse_spec(dst_spec)
+    create_image(state_dir, dst_pool, dst_image, src_meta['size'])
+    if deep and not src_snapshot:
+        # deep copy transfers snapshots too
+        dst_meta = load_meta(state_dir, dst_pool, dst_image)
+        for i_snapshot, i_snapshot_meta in sorted(src_meta['snapshots'].items(), key=lambda i_item: i_item[1]['id']):
+            copy_sparse_file(get_data_file(state_dir, src_pool, src_image, i_snapshot, src_meta),
+                             os.path.join(get_image_dir(state_dir, dst_pool, dst_image), f"snap.{i_snapshot}"),
+                             src_meta['size'], "Image deep copy")
+            dst_meta['snapshots'][i_snapshot] = {'id': i_snapshot_meta['id'], 'protected': False}
+        save_meta(state_dir, dst_pool, dst_image, dst_meta)
+    copy_sparse_file(src_data_file, os.path.join(get_image_dir(state_dir, dst_pool, dst_image), 'data'),
+                     src_meta['size'], "Image deep copy" if deep else "Image copy")
+
+
+def rbd_du(state_dir, spec, output_format=None):
+    pool, image, snapshot = parse_spec(spec)
+    meta = load_meta(state_dir, pool, image)
+    used_size = get_allocated_size(get_data_file(state_dir, pool, image, snapshot, meta))
+    du_image = {'name': image, 'id': meta['snapshots'][snapshot]['id'] if snapshot else None,
+                'provisioned_size': meta['size'], 'used_size': used_size}
+    if snapshot:
+        du_image['snapshot'] = snapshot
+    if output_format == 'json':
+        print(json.dumps({'images': [du_image], 'total_provisioned_size': meta['size'], 'total_used_size': used_size}))
+    else:
+        print(f"NAME  PROVISIONED  USED\n{image}{'@' + snapshot if snapshot else ''}  {meta['size']}  {used_size}")
+
+
+def rbd_snap(state_dir, operation, spec):
+    pool, image, snapshot = parse_spec(spec)
+    meta = load_meta(state_dir, pool, image)
+    if operation == 'ls':
+        print("SNAPID  NAME  SIZE  PROTECTED")
+        for i_snapshot, i_snapshot_meta in sorted(meta['snapshots'].items(), key=lambda i_item: i_item[1]['id']):
+            print(f"{i_snapshot_meta['id']}  {i_snapshot}  {meta['size']} B  {str(i_snapshot_meta['protected']).lower()}")
+        return
+    if not snapshot:
+        raise RbdError("rbd: snapshot name was not specified", 22)
+    snapshot_file = os.path.join(get_image_dir(state_dir, pool, image), f"snap.{snapshot}")
+    if operation == 'create':
+        if snapshot in meta['snapshots']:
+            raise RbdError("rbd: failed to create snapshot: (17) File exists", 17)
+        copy_sparse_file(get_data_file(state_dir, pool, image, meta=meta), snapshot_file, meta['size'], "Creating snap")
+        meta['snapshots'][snapshot] = {'id': max([i_snap['id'] for i_snap in meta['snapshots'].values()] + [0]) + 1,
+                                       'protected': False}
+    elif snapshot not in meta['snapshots']:
+        raise RbdError(f"rbd: failed to {operation} snapshot: (2) No such file or directory", 2)
+    elif operation in ('protect', 'unprotect'):
+        if meta['snapshots'][snapshot]['protected'] == (operation == 'protect'):
+            raise RbdError(f"rbd: {operation}ing snap failed: (16) Device or resource busy", 16)
+        meta['snapshots'][snapshot]['protected'] = operation == 'protect'
+    elif operation == 'rm':
+        if meta['snapshots'][snapshot]['protected']:
+            raise RbdError("rbd: snapshot is protected from removal.", 16)
+        del meta['snapshots'][snapshot]
+        os.unlink(snapshot_file)
+    else:
+        raise RbdError(f"rbd: unknown snap operation {operation}", 22)
+    save_meta(state_dir, pool, image, meta)
+
+
+def rbd_export_diff(state_dir, spec, from_snapshot=None):
+    """ export changed blocks between from_snapshot (or empty image) and snapshot in fake diff format
+        (header, JSON line with image size and snapshot names, records <offset, length, data-flag>[data]) """
+    pool, image, snapshot = parse_spec(spec)
+    meta = load_meta(state_dir, pool, image)
+    data_file_name = get_data_file(state_dir, pool, image, snapshot, meta)
+    from_file_name = get_data_file(state_dir, pool, image, from_snapshot, meta) if from_snapshot else None
+    blocks = {i_offset // DIFF_BLOCK_SIZE
+              for i_file_name in filter(None, (data_file_name, from_file_name))
+              for i_extent_offset, i_extent_length in get_data_extents(i_file_name)
+              for i_offset in range(i_extent_offset - i_extent_offset % DIFF_BLOCK_SIZE, i_extent_offset + i_extent_length, DIFF_BLOCK_SIZE)}
+    start, out = time.monotonic(), sys.stdout.buffer
+    out.write(DIFF_HEADER + json.dumps({'size': meta['size'], 'from_snap': from_snapshot, 'to_snap': snapshot}).encode() + b"\n")
+    with open(data_file_name, "rb") as data_file, open(from_file_name or os.devnull, "rb") as from_file:
+        for i_index, i_block in enumerate(sorted(blocks)):
+            i_offset = i_block * DIFF_BLOCK_SIZE
+            i_data = os.pread(data_file.fileno(), DIFF_BLOCK_SIZE, i_offset)
+            if from_file_name and i_data == os.pread(from_file.fileno(), DIFF_BLOCK_SIZE, i_offset):
+                continue
+            if i_data.count(0) == len(i_data):
+                out.write(struct.pack('>QQB', i_offset, len(i_data), 0))
+            else:
+                out.write(struct.pack('>QQB', i_offset, len(i_data), 1) + i_data)
+            throttle(start, (i_index + 1) * DIFF_BLOCK_SIZE)
+            report_progress("Exporting image", (i_index + 1) * 100 // len(blocks))
+    report_progress("Exporting image", 100)
+    sys.stderr.write("Exporting image: 100% complete...done.\n")
+    out.flush()
+
+
+def rbd_import_diff(state_dir, spec):
+    """ apply fake diff read from stdin on RBD image, diff start snapshot has to exist, end snapshot gets created """
+    pool, image, _ = parse_spec(spec)
+    meta = load_meta(state_dir, pool, image)
+    data_file_name = os.path.join(get_image_dir(state_dir, pool, image), 'data')
+    diff = sys.stdin.buffer
+    if diff.read(len(DIFF_HEADER)) != DIFF_HEADER:
+        raise RbdError("rbd: import-diff failed: (22) Invalid argument (invalid diff header)", 22)
+    diff_meta = json.loads(diff.readline())
+    if diff_meta['from_snap'] and diff_meta['from_snap'] not in meta['snapshots']:
+        raise RbdError(f"rbd: import-diff failed: start snapshot '{diff_meta['from_snap']}' does not exist in the image", 2)
+    with open(data_file_name, "r+b") as data_file:
+        if diff_meta['size'] > meta['size']:
+            data_file.truncate(diff_meta['size'])
+            meta['size'] = diff_meta['size']
+            save_meta(state_dir, pool, image, meta)
+        while record := diff.read(17):
+            i_offset, i_length, i_has_data = struct.unpack('>QQB', record)
+            os.pwrite(data_file.fileno(), diff.read(i_length) if i_has_data else bytes(i_length), i_offset)
+    if diff_meta['to_snap']:
+        rbd_snap(state_dir, 'create', f"{pool}/{image}@{diff_meta['to_snap']}")
+    sys.stderr.write("Importing image diff: 100% complete...done.\n")
+
+
+def rbd_main(argv, state_dir):
+    """ fake rbd command line, global options (--conf, --name, --keyring) are accepted and ignored """
+    options, positional = {}, []
+    argv_iter = iter(argv)
+    for i_arg in argv_iter:
+        if i_arg.startswith('--'):
+            i_name, has_value, i_value = i_arg[2:].partition('=')
+            options[i_name] = i_value if has_value else next(argv_iter, None)
+        elif i_arg == '-':
+            positional.append(i_arg)
+        elif i_arg.startswith('-') and len(i_arg) == 2:
+            options[i_arg[1:]] = next(argv_iter, None)
+        else:
+            positional.append(i_arg)
+    output_format = options.get('format')
+    match positional:
+        case ['ls' | 'list', pool]:
+            rbd_ls(state_dir, pool)
+        case ['info', spec]:
+            rbd_info(state_dir, spec, output_format)
+        case ['create', spec]:
+            rbd_create(state_dir, spec, options.get('size') or options.get('s'))
+        case ['rm' | 'remove', spec]:
+            rbd_rm(state_dir, spec)
+        case ['clone', src_spec, dst_spec]:
+            rbd_clone(state_dir, src_spec, dst_spec)
+        case ['flatten', spec]:
+            rbd_flatten(state_dir, spec)
+        case ['cp' | 'copy', src_spec, dst_spec]:
+            rbd_cp(state_dir, src_spec, dst_spec)
+        case ['deep', 'cp' | 'copy', src_spec, dst_spec]:
+            rbd_cp(state_dir, src_spec, dst_spec, deep=True)
+        case ['du' | 'disk-usage', spec]:
+            rbd_du(state_dir, spec, output_format)
+        case ['snap', operation, spec]:
+            rbd_snap(state_dir, operation, spec)
+        case ['export-diff', spec, '-']:
+            rbd_export_diff(state_dir, spec, options.get('from-snap'))
+        case ['import-diff', '-', spec]:
+            rbd_import_diff(state_dir, spec)
+        case _:
+            raise RbdError(f"rbd: unsupported fake rbd command {positional}", 22)
+
+
+def main(argv):
+    """ fake rbd / ceph command entry point, returns exit-code """
+    state_dir = os.environ[STATE_DIR_ENV]
+    command_name, command_argv = argv[0], argv[1:]
+    try:
+        if command_name == 'rbd':
+            rbd_main(command_argv, state_dir)
+        elif 'status' in command_argv:
+            print("  cluster:\n    health: HEALTH_OK")
+        else:
+            raise RbdError(f"{command_name}: unsupported fake command {command_argv}", 22)
+    except RbdError as ex:
+        sys.stderr.write(f"{ex}\n")
+        return ex.errno
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,567 @@
+""" OpenStack migrator benchmark - fake OpenStack cloud
+
+In-process stand-in of openstacksdk connection covering the API subset used by the migrator
+(identity, compute, block storage, image, network, object store proxies and cloud layer calls).
+Every API call is counted and delayed by configurable latency, resources change state immediately.
+Cinder volumes are backed by fake ceph RBD images (sparse files) as in clouds sharing the same ceph.
+Objstore objects are kept in memory, static large object (SLO) manifests are resolved at creation,
+dynamic large object (DLO) manifests are resolved when read.
+"""
+
+import collections
+import contextlib
+import datetime
+import hashlib
+import io
+import itertools
+import json
+import math
+import os
+import os.path
+import threading
+import time
+import urllib.parse
+import uuid
+
+import openstack.exceptions
+
+import fakeceph
+
+
+def get_security_group_rule_key(rule):
+    """ return security group rule identity as compared by neutron duplicate rule detection """
+    return tuple(rule.get(i_field) for i_field in ('security_group_id', 'direction', 'ethertype', 'protocol', 'port_range_min',
+                                                   'port_range_max', 'remote_ip_prefix', 'remote_group_id'))
+
+
+class FakeResource:
+    """ openstacksdk resource stand-in, attribute and item access """
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.__dict__.get('id')}, name={self.__dict__.get('name')})"
+
+
+def resource_matches(resource, filters):
+    """ return True if resource matches list query filters (attribute equality, fixed_ips=["ip_address=<ip>"]) """
+    for i_key, i_value in filters.items():
+        if i_value is None:
+            continue
+        if i_key == 'fixed_ips':
+            resource_ip_addresses = {f"ip_address={i_fixed_ip.get('ip_address')}" for i_fixed_ip in resource.fixed_ips}
+            if not set(i_value) <= resource_ip_addresses:
+                return False
+        elif getattr(resource, i_key, None) != i_value:
+            return False
+    return True
+
+
+class FakeCloud:
+    """ fake OpenStack cloud state, API call statistics and latency """
+    RESOURCE_TYPES = ('projects', 'users', 'servers', 'volumes', 'snapshots', 'volume_attachments', 'images', 'flavors', 'keypairs',
+                      'networks', 'subnets', 'routers', 'ports', 'security_groups', 'floating_ips', 'containers', 'objects')
+
+    def __init__(self, name, api_latency=0.0, ceph_state_dir=None, cinder_pool_name=None):
+        self.name = name
+        self.api_latency = api_latency
+        self.ceph_state_dir = ceph_state_dir
+        self.cinder_pool_name = cinder_pool_name
+        self.lock = threading.RLock()
+        self.api_calls = collections.Counter()
+        self.resources = {i_resource_type: {} for i_resource_type in self.RESOURCE_TYPES}
+        self.mac_addresses = itertools.count(1)
+        self.admin_project = self.add('projects', name='admin', is_enabled=True, domain_id='default')
+
+    def api_call(self, call_name):
+        """ count API call and apply API latency """
+        with self.lock:
+            self.api_calls[call_name] += 1
+        if self.api_latency:
+            time.sleep(self.api_latency)
+
+    def get_api_calls_count(self):
+        """ return number of executed API calls """
+        with self.lock:
+            return sum(self.api_calls.values())
+
+    def add(self, resource_type, **attrs):
+        """ add resource into the cloud, returns the resource """
+        resource = FakeResource(**({'id': str(uuid.uuid4()), 'name': '', 'description': ''} | attrs))
+        with self.lock:
+            self.resources[resource_type][resource.id] = resource
+        return resource
+
+    def list(self, resource_type, **filters):
+        """ return resources matching filters """
+        with self.lock:
+            return [i_resource for i_resource in self.resources[resource_type].values() if resource_matches(i_resource, filters)]
+
+    def find(self, resource_type, name_or_id, **filters):
+        """ find resource by id or unambiguous name, None when missing """
+        with self.lock:
+            if (resource := self.resources[resource_type].get(name_or_id)) and resource_matches(resource, filters):
+                return resource
+            resources = [i_resource for i_resource in self.resources[resource_type].values()
+                         if i_resource.name == name_or_id and resource_matches(i_resource, filters)]
+        if len(resources) > 1:
+            raise openstack.exceptions.DuplicateResource(f"More than one {resource_type} exists with the name '{name_or_id}'.")
+        return resources[0] if resources else None
+
+    def get_mac_address(self):
+        """ return new unique MAC address """
+        with self.lock:
+            mac_address_index = next(self.mac_addresses)
+        return "fa:16:3e:" + ":".join(f"{(mac_address_index >> i_shift) & 0xff:02x}" for i_shift in (16, 8, 0))
+
+    def add_volume(self, project, size, **attrs):
+        """ add cinder volume backed by RBD image volume-<id> (sparse file) in cloud cinder pool """
+        volume = self.add('volumes', **({'project_id': project.id, 'size': size, 'status': 'available', 'is_bootable': False} | attrs))
+        fakeceph.create_image(self.ceph_state_dir, self.cinder_pool_name, f"volume-{volume.id}", size * 1024 * 1024 * 1024)
+        return volume
+
+    def manage_volume(self, project, rbd_image_name, **attrs):
+        """ add cinder volume managing existing RBD image in cloud cinder pool (renamed to volume-<id>) """
+        rbd_image_meta = fakeceph.load_meta(self.ceph_state_dir, self.cinder_pool_name, rbd_image_name)
+        volume = self.add('volumes', **({'project_id': project.id, 'size': math.ceil(rbd_image_meta['size'] / 1024 / 1024 / 1024),
+                                         'status': 'available', 'is_bootable': False} | attrs))
+        os.rename(fakeceph.get_image_dir(self.ceph_state_dir, self.cinder_pool_name, rbd_image_name),
+                  fakeceph.get_image_dir(self.ceph_state_dir, self.cinder_pool_name, f"volume-{volume.id}"))
+        return volume
+
+    def add_volume_snapshot(self, volume, **attrs):
+        """ add cinder volume snapshot backed by RBD image snapshot snapshot-<id> of volume RBD image """
+        volume_snapshot = self.add('snapshots', **({'project_id': volume.project_id, 'volume_id': volume.id, 'size': volume.size,
+                                                    'status': 'available',
+                                                    'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat()} | attrs))
+        with contextlib.redirect_stderr(io.StringIO()):
+            fakeceph.rbd_snap(self.ceph_state_dir, 'create', f"{self.cinder_pool_name}/volume-{volume.id}@snapshot-{volume_snapshot.id}")
+        return volume_snapshot
+
+    def manage_volume_snapshot(self, volume, rbd_snapshot_name, **attrs):
+        """ add cinder volume snapshot managing existing volume RBD image snapshot (renamed to snapshot-<id>) """
+        rbd_image_name = f"volume-{volume.id}"
+        rbd_image_meta = fakeceph.load_meta(self.ceph_state_dir, self.cinder_pool_name, rbd_image_name)
+        volume_snapshot = self.add('snapshots', **({'project_id': volume.project_id, 'volume_id': volume.id, 'size': volume.size,
+                                                    'status': 'available',
+                                                    'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat()} | attrs))
+        rbd_image_meta['snapshots'][f"snapshot-{volume_snapshot.id}"] = rbd_image_meta['snapshots'].pop(rbd_snapshot_name)
+        rbd_image_dir = fakeceph.get_image_dir(self.ceph_state_dir, self.cinder_pool_name, rbd_image_name)
+        os.rename(os.path.join(rbd_image_dir, f"snap.{rbd_snapshot_name}"), os.path.join(rbd_image_dir, f"snap.snapshot-{volume_snapshot.id}"))
+        fakeceph.save_meta(self.ceph_state_dir, self.cinder_pool_name, rbd_image_name, rbd_image_meta)
+        return volume_snapshot
+
+    def add_container(self, project, name):
+        """ add objstore container, returns existing one of the same name """
+        return self.find('containers', name, project_id=project.id) or self.add('containers', name=name, project_id=project.id)
+
+    def add_object(self, project, container_name, name, data, content_type='application/octet-stream', etag=None, metadata=None,
+                   **attrs):
+        """ add (replace) objstore object with data (bytes) in existing container,
+            attrs are large object manifest ones (is_static_large_object and manifest, object_manifest) """
+        container = self.find('containers', container_name, project_id=project.id)
+        if not container:
+            raise openstack.exceptions.NotFoundException(f"Container {container_name} not found.")
+        with self.lock:
+            for i_object in self.list('objects', project_id=project.id, container=container_name, name=name):
+                del self.resources['objects'][i_object.id]
+            return self.add('objects', **({'name': name, 'project_id': project.id, 'container': container_name, 'data': data,
+                                           'content_length': len(data), 'etag': etag or hashlib.md5(data).hexdigest(),
+                                           'content_type': content_type, 'metadata': metadata or {},
+                                           'is_static_large_object': False, 'manifest': None, 'object_manifest': None} | attrs))
+
+    def get_object(self, project, container_name, name):
+        """ return objstore object, raises NotFoundException when missing """
+        objects = self.list('objects', project_id=project.id, container=container_name, name=name)
+        if not objects:
+            raise openstack.exceptions.NotFoundException(f"Object {container_name}/{name} not found.")
+        return objects[0]
+
+    def get_object_data(self, project, container_name, name):
+        """ return objstore object data, DLO manifest data are concatenated segments (<container>/<prefix> objects) """
+        obj = self.get_object(project, container_name, name)
+        if not obj.object_manifest:
+            return obj.data
+        segments_container_name, segments_prefix = obj.object_manifest.split('/', 1)
+        return b''.join(i_segment.data for i_segment in sorted(self.list('objects', project_id=project.id, container=segments_container_name),
+                                                                key=lambda i_segment: i_segment.name)
+                        if i_segment.name.startswith(segments_prefix))
+
+    def add_port(self, network, ip_address, **attrs):
+        """ add network port with fixed IP in network first subnet """
+        return self.add('ports', **({'project_id': network.project_id, 'network_id': network.id,
+                                     'mac_address': self.get_mac_address(),
+                                     'fixed_ips': [{'subnet_id': network.subnet_ids[0], 'ip_address': ip_address}],
+                                     'device_id': '', 'device_owner': ''} | attrs))
+
+    def add_security_group(self, project_id, **attrs):
+        """ add security group with default egress rules """
+        security_group = self.add('security_groups', project_id=project_id, security_group_rules=[], **attrs)
+        for i_ethertype in ('IPv4', 'IPv6'):
+            self.add_security_group_rule({'security_group_id': security_group.id, 'project_id': project_id,
+                                          'direction': 'egress', 'ethertype': i_ethertype})
+        return security_group
+
+    def add_security_group_rule(self, rule):
+        """ add security group rule (dict) into its security group """
+        return self.add_security_group_rules([rule])[0]
+
+    def add_security_group_rules(self, rules):
+        """ add security group rules (dicts) into their security groups, none is added when any of them exists already
+            (neutron rejects whole bulk request with conflict) """
+        security_group_rules = [{'id': str(uuid.uuid4()), 'protocol': None, 'port_range_min': None, 'port_range_max': None,
+                                 'remote_ip_prefix': None, 'remote_group_id': None, 'description': ''} | i_rule
+                                for i_rule in rules]
+        with self.lock:
+            for i_rule in security_group_rules:
+                if any(get_security_group_rule_key(i_rule) == get_security_group_rule_key(j_rule)
+                       for j_rule in self.resources['security_groups'][i_rule['security_group_id']].security_group_rules):
+                    raise openstack.exceptions.ConflictException(f"Security group rule already exists. Rule id is {i_rule['id']}.")
+            for i_rule in security_group_rules:
+                self.resources['security_groups'][i_rule['security_group_id']].security_group_rules.append(i_rule)
+        return security_group_rules
+
+    def connect(self, project_name=None):
+        """ return connection scoped to the project (migrator admin project by default) """
+        project = self.find('projects', project_name) if project_name else self.admin_project
+        return FakeConnection(self, project)
+
+
+class FakeProxy:
+    """ openstacksdk service proxy stand-in """
+    def __init__(self, connection):
+        self.connection = connection
+        self.cloud = connection.cloud
+        self.project = connection.project
+
+    def api_call(self, call_name):
+        self.cloud.api_call(f"{type(self).__name__.removeprefix('Fake').removesuffix('Proxy').lower()}.{call_name}")
+
+
+class FakeIdentityProxy(FakeProxy):
+    def projects(self, **filters):
+        self.api_call('projects')
+        return self.cloud.list('projects', **filters)
+
+    def users(self, **filters):
+        self.api_call('users')
+        return self.cloud.list('users', **filters)
+
+
+class FakeComputeProxy(FakeProxy):
+    def servers(self, **filters):
+        self.api_call('servers')
+        return self.cloud.list('servers', project_id=self.project.id, **filters)
+
+    def find_server(self, name_or_id, ignore_missing=True):
+        self.api_call('find_server')
+        return self.cloud.find('servers', name_or_id, project_id=self.project.id)
+
+    def stop_server(self, server):
+        self.api_call('stop_server')
+        self.cloud.find('servers', server.id).status = 'SHUTOFF'
+
+    def start_server(self, server):
+        self.api_call('start_server')
+        self.cloud.find('servers', server.id).status = 'ACTIVE'
+
+    def volume_attachments(self, server_id):
+        self.api_call('volume_attachments')
+        return self.cloud.list('volume_attachments', server_id=server_id)
+
+    def create_server(self, name, flavorRef, networks, block_device_mapping_v2, boot_volume=None, key_name=None):  # pylint: disable=invalid-name
+        self.api_call('create_server')
+        server = self.cloud.add('servers', name=name, project_id=self.project.id, status='ACTIVE',
+                                flavor=FakeResource(name=self.cloud.find('flavors', flavorRef).name),
+                                key_name=key_name, user_id=None, security_groups=[{'name': 'default'}],
+                                root_device_name='/dev/vda', addresses={})
+        for i_block_device in block_device_mapping_v2:
+            self.cloud.add('volume_attachments', server_id=server.id, volume_id=i_block_device['uuid'],
+                           device=f"/dev/{i_block_device['device_name']}")
+            self.cloud.find('volumes', i_block_device['uuid']).status = 'in-use'
+        for i_network in networks:
+            port = self.cloud.find('ports', i_network['port']) if 'port' in i_network else \
+                self.cloud.add_port(self.cloud.find('networks', i_network['uuid']), None)
+            port.device_id, port.device_owner = server.id, 'compute:nova'
+            server.addresses.setdefault(self.cloud.find('networks', port.network_id).name, []).append(
+                {'addr': port.fixed_ips[0]['ip_address'], 'version': 4, 'OS-EXT-IPS:type': 'fixed',
+                 'OS-EXT-IPS-MAC:mac_addr': port.mac_address})
+        return server
+
+    def wait_for_server(self, server):
+        self.api_call('wait_for_server')
+        return self.cloud.find('servers', server.id)
+
+    def flavors(self, **filters):
+        self.api_call('flavors')
+        return self.cloud.list('flavors', **filters)
+
+    def find_flavor(self, name_or_id, ignore_missing=True):
+        self.api_call('find_flavor')
+        return self.cloud.find('flavors', name_or_id)
+
+    def keypairs(self, **filters):
+        self.api_call('keypairs')
+        return self.cloud.list('keypairs', **filters)
+
+    def find_keypair(self, name_or_id, ignore_missing=True):
+        self.api_call('find_keypair')
+        return self.cloud.find('keypairs', name_or_id)
+
+    def create_keypair(self, name, public_key, type=None):  # pylint: disable=redefined-builtin
+        self.api_call('create_keypair')
+        return self.cloud.add('keypairs', id=name, name=name, public_key=public_key, type=type)
+
+
+class FakeBlockStorageProxy(FakeProxy):
+    def volumes(self, details=True, **filters):
+        self.api_call('volumes')
+        return self.cloud.list('volumes', project_id=self.project.id, **filters)
+
+    def find_volume(self, name_or_id, ignore_missing=True):
+        self.api_call('find_volume')
+        return self.cloud.find('volumes', name_or_id, project_id=self.project.id)
+
+    def create_volume(self, name, size, description='', imageRef=None):  # pylint: disable=invalid-name
+        self.api_call('create_volume')
+        return self.cloud.add_volume(self.project, size, name=name, description=description, is_bootable=bool(imageRef))
+
+    def snapshots(self, details=True, **filters):
+        self.api_call('snapshots')
+        return self.cloud.list('snapshots', project_id=self.project.id, **filters)
+
+    def find_snapshot(self, name_or_id, ignore_missing=True):
+        self.api_call('find_snapshot')
+        return self.cloud.find('snapshots', name_or_id, project_id=self.project.id)
+
+    def manage_snapshot(self, volume_id, ref, name=None, description=None, metadata=None):
+        self.api_call('manage_snapshot')
+        return self.cloud.manage_volume_snapshot(self.cloud.find('volumes', volume_id), ref['source-name'],
+                                                 name=name, description=description)
+
+    def manage_volume(self, host, ref, name=None, description=None, volume_type=None, bootable=False):
+        self.api_call('manage_volume')
+        return self.cloud.manage_volume(self.project, ref['source-name'], name=name, description=description,
+                                        is_bootable=bootable, host=host)
+
+
+class FakeImageProxy(FakeProxy):
+    def find_image(self, name_or_id, ignore_missing=True):
+        self.api_call('find_image')
+        return self.cloud.find('images', name_or_id)
+
+
+class FakeObjectStoreProxy(FakeProxy):
+    def containers(self):
+        self.api_call('containers')
+        return self.cloud.list('containers', project_id=self.project.id)
+
+    def create_container(self, name):
+        self.api_call('create_container')
+        return self.cloud.add_container(self.project, name)
+
+    def objects(self, container):
+        self.api_call('objects')
+        return self.cloud.list('objects', project_id=self.project.id, container=container)
+
+    def get_object_metadata(self, obj, container=None):
+        self.api_call('get_object_metadata')
+        return self.cloud.get_object(self.project, container, obj)
+
+    def stream_object(self, obj, container=None, chunk_size=1024, **attrs):
+        self.api_call('stream_object')
+        data = self.cloud.get_object_data(self.project, container, obj)
+        if attrs.get('range'):
+            first_byte, last_byte = attrs['range'].removeprefix('bytes=').split('-')
+            data = data[int(first_byte):int(last_byte) + 1]
+        return (data[i_offset:i_offset + chunk_size] for i_offset in range(0, len(data), chunk_size))
+
+    def upload_object(self, container, name, data=None, generate_checksums=None, content_type='application/octet-stream',
+                      metadata=None, **headers):  # pylint: disable=unused-argument
+        self.api_call('upload_object')
+        return self.cloud.add_object(self.project, container, name, data if isinstance(data, bytes) else b''.join(data),
+                                     content_type=content_type, metadata=metadata)
+
+    def put(self, url, params=None, headers=None, data=None):
+        """ raw object PUT, only static large object manifest (multipart-manifest=put) and dynamic large object manifest
+            (X-Object-Manifest header) are supported """
+        self.api_call('put')
+        container_name, name = (urllib.parse.unquote(i_part) for i_part in url.split('/', 1))
+        headers = headers or {}
+        metadata = {i_header.removeprefix('X-Object-Meta-').lower(): i_value for i_header, i_value in headers.items()
+                    if i_header.startswith('X-Object-Meta-')}
+        if 'X-Object-Manifest' in headers:
+            return self.cloud.add_object(self.project, container_name, name, b'', content_type=headers.get('Content-Type'),
+                                         metadata=metadata, object_manifest=headers['X-Object-Manifest'])
+        assert (params or {}).get('multipart-manifest') == 'put', "Only SLO and DLO manifest PUT is supported"
+        manifest = json.loads(data)
+        segments = [self.cloud.get_object(self.project, *i_segment['path'].lstrip('/').split('/', 1)) for i_segment in manifest]
+        return self.cloud.add_object(self.project, container_name, name, b''.join(i_segment.data for i_segment in segments),
+                                     content_type=headers.get('Content-Type'), metadata=metadata,
+                                     etag=hashlib.md5(''.join(i_segment.etag for i_segment in segments).encode()).hexdigest(),
+                                     is_static_large_object=True,
+                                     manifest=[{'name': i_segment_item['path'], 'bytes': i_segment.content_length,
+                                                'hash': i_segment.etag, 'content_type': i_segment.content_type}
+                                               for i_segment_item, i_segment in zip(manifest, segments)])
+
+    def get(self, url, params=None):
+        """ raw object GET, only static large object manifest (multipart-manifest=get) is supported """
+        self.api_call('get')
+        assert (params or {}).get('multipart-manifest') == 'get', "Only SLO manifest GET is supported"
+        container_name, name = (urllib.parse.unquote(i_part) for i_part in url.split('/', 1))
+        obj = self.cloud.get_object(self.project, container_name, name)
+        data = json.dumps(obj.manifest).encode() if obj.is_static_large_object else obj.data
+        return FakeResource(status_code=200, content=data, json=lambda: json.loads(data))
+
+
+class FakeNetworkProxy(FakeProxy):
+    def networks(self, **filters):
+        self.api_call('networks')
+        return self.cloud.list('networks', **filters)
+
+    def subnets(self, **filters):
+        self.api_call('subnets')
+        return self.cloud.list('subnets', **filters)
+
+    def routers(self, **filters):
+        self.api_call('routers')
+        return self.cloud.list('routers', **filters)
+
+    def ports(self, **filters):
+        self.api_call('ports')
+        return self.cloud.list('ports', **filters)
+
+    def security_groups(self, **filters):
+        self.api_call('security_groups')
+        return self.cloud.list('security_groups', **filters)
+
+    def find_network(self, name_or_id, ignore_missing=True, **filters):
+        self.api_call('find_network')
+        return self.cloud.find('networks', name_or_id, **filters)
+
+    def find_subnet(self, name_or_id, ignore_missing=True, **filters):
+        self.api_call('find_subnet')
+        return self.cloud.find('subnets', name_or_id, **filters)
+
+    def find_router(self, name_or_id, ignore_missing=True, **filters):
+        self.api_call('find_router')
+        return self.cloud.find('routers', name_or_id, **filters)
+
+    def find_port(self, name_or_id, ignore_missing=True, **filters):
+        self.api_call('find_port')
+        return self.cloud.find('ports', name_or_id, **filters)
+
+    def find_security_group(self, name_or_id, ignore_missing=True, **filters):
+        self.api_call('find_security_group')
+        return self.cloud.find('security_groups', name_or_id, **filters)
+
+    def create_network(self, name, project_id, mtu=None, description='', port_security_enabled=True):
+        self.api_call('create_network')
+        return self.cloud.add('networks', name=name, project_id=project_id, mtu=mtu, description=description,
+                              is_port_security_enabled=port_security_enabled, subnet_ids=[])
+
+    def create_subnet(self, network_id, name, cidr, ip_version, project_id, description='', **attrs):
+        self.api_call('create_subnet')
+        subnet = self.cloud.add('subnets', network_id=network_id, name=name, cidr=cidr, ip_version=ip_version,
+                                project_id=project_id, description=description,
+                                **{i_key.replace('enable_dhcp', 'is_dhcp_enabled'): i_value for i_key, i_value in attrs.items()})
+        self.cloud.find('networks', network_id).subnet_ids.append(subnet.id)
+        return subnet
+
+    def create_router(self, name, project_id, description='', external_gateway_info=None):
+        self.api_call('create_router')
+        return self.cloud.add('routers', name=name, project_id=project_id, description=description,
+                              external_gateway_info=external_gateway_info)
+
+    def create_port(self, network_id, fixed_ips, name='', description='', mac_address=None):
+        self.api_call('create_port')
+        network = self.cloud.find('networks', network_id)
+        return self.cloud.add_port(network, fixed_ips[0].get('ip_address'), name=name, description=description,
+                                   mac_address=mac_address or self.cloud.get_mac_address(),
+                                   fixed_ips=[{'subnet_id': i_fixed_ip['subnet_id'], 'ip_address': i_fixed_ip.get('ip_address')}
+                                              for i_fixed_ip in fixed_ips])
+
+    def create_ports(self, data):
+        self.api_call('create_ports')
+        return [self.cloud.add_port(self.cloud.find('networks', i_port['network_id']), i_port['fixed_ips'][0].get('ip_address'),
+                                    name=i_port.get('name', ''), description=i_port.get('description', ''),
+                                    mac_address=i_port.get('mac_address') or self.cloud.get_mac_address(),
+                                    fixed_ips=[{'subnet_id': i_fixed_ip['subnet_id'], 'ip_address': i_fixed_ip.get('ip_address')}
+                                               for i_fixed_ip in i_port['fixed_ips']])
+                for i_port in data]
+
+    def create_security_group(self, name, project_id, description=''):
+        self.api_call('create_security_group')
+        return self.cloud.add_security_group(project_id, name=name, description=description)
+
+    def create_security_group_rules(self, data):
+        self.api_call('create_security_group_rules')
+        return self.cloud.add_security_group_rules(data)
+
+    def create_security_group_rule(self, **attrs):
+        self.api_call('create_security_group_rule')
+        return self.cloud.add_security_group_rule(attrs)
+
+    def create_ip(self, floating_network_id):
+        self.api_call('create_ip')
+        return self.cloud.add('floating_ips', project_id=self.project.id, floating_network_id=floating_network_id,
+                              floating_ip_address=f"192.0.2.{len(self.cloud.resources['floating_ips']) % 250 + 1}", port_id=None)
+
+    def add_ip_to_port(self, port, floating_ip):
+        self.api_call('add_ip_to_port')
+        floating_ip.port_id = port.id
+        return floating_ip
+
+
+class FakeConnection:
+    """ openstack.connection.Connection stand-in scoped to single project """
+    def __init__(self, cloud, project):
+        self.cloud = cloud
+        self.project = project
+        self.identity = FakeIdentityProxy(self)
+        self.compute = FakeComputeProxy(self)
+        self.block_storage = FakeBlockStorageProxy(self)
+        self.image = FakeImageProxy(self)
+        self.object_store = FakeObjectStoreProxy(self)
+        self.network = FakeNetworkProxy(self)
+
+    def get_volume_quotas(self, project_id):
+        self.cloud.api_call('cloud.get_volume_quotas')
+        return {'backup_gigabytes': 1000, 'backups': 10, 'gigabytes': -1, 'groups': 10, 'per_volume_gigabytes': -1,
+                'snapshots': 100, 'volumes': -1}
+
+    def get_network_quotas(self, project_id):
+        self.cloud.api_call('cloud.get_network_quotas')
+        return {'floating_ips': 50, 'networks': 10, 'ports': -1, 'rbac_policies': 10, 'routers': 10,
+                'security_group_rules': -1, 'security_groups': 100, 'subnet_pools': -1, 'subnets': 10}
+
+    def list_ports(self, filters=None):
+        self.cloud.api_call('cloud.list_ports')
+        return self.cloud.list('ports', **(filters or {}))
+
+    def add_router_interface(self, router, subnet_id):
+        self.cloud.api_call('cloud.add_router_interface')
+        subnet = self.cloud.find('subnets', subnet_id)
+        return self.cloud.add_port(self.cloud.find('networks', subnet.network_id), subnet.gateway_ip,
+                                   device_id=router.id, device_owner='network:router_interface')
+
+    def add_server_security_groups(self, server, security_groups):
+        self.cloud.api_call('cloud.add_server_security_groups')
+        server = self.cloud.find('servers', getattr(server, 'id', server))
+        security_group = self.cloud.find('security_groups', getattr(security_groups, 'id', security_groups))
+        server.security_groups.append({'name': security_group.name})
+        return True
+
+
+def get_volume_rbd_image_file(cloud, volume):
+    """ return sparse file backing volume RBD image """
+    return os.path.join(cloud.ceph_state_dir, cloud.cinder_pool_name, f"volume-{volume.id}", 'data')
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+OpenStack project multi-cloud migrator benchmark
+
+Benchmark runs project-migrator.py main() offline against synthetic projects:
+ * source and destination clouds are in-process fake openstacksdk connections (fakeostack.py)
+   with configurable per API call latency
+ * ceph migrator host is local stand-in (fakeceph.py) executing ceph-migrator-host/*.sh scripts
+   with fake rbd / ceph commands operating on sparse files, with configurable SSH round-trip latency
+   and rbd data throughput
+
+Every synthetic project has servers on single (group project) network with two security groups,
+every other server boots from ephemeral RBD image, others from cinder volume, every fourth has data volume.
+Wall time, API call counts and SSH round-trips (ceph migrator host commands) are reported per project size,
+comparison with baseline report detects performance regressions of lib/olib/clib changes.
+
+Unknown options are passed to project-migrator.py (--ceph-migrator-agent is not supported by the fake host).
+
+Usage example:
+ * Benchmark migration of projects with 10, 100 and 1000 servers, 5ms per API call, 20ms per SSH round-trip,
+   migrate eight servers concurrently
+ $ ./benchmark/project-migrator-benchmark.py --servers 10,100,1000 --api-latency 0.005 --ssh-latency 0.02
+   --server-parallelism 8
+ * Benchmark campaign of four 100 server projects and compare results with previous report
+ $ ./benchmark/project-migrator-benchmark.py --servers 100 --projects 4 --campaign-parallelism 2
+   --baseline-report-file project-migrator-benchmark.baseline.json
+"""
+
+import argparse
+import collections
+import importlib.util
+import ipaddress
+import json
+import logging
+import os
+import os.path
+import shutil
+import sys
+import tempfile
+import time
+import unittest.mock
+import uuid
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATOR_DIR = os.path.dirname(BENCHMARK_DIR)
+SCRIPTS_DIR = os.path.join(os.path.dirname(MIGRATOR_DIR), 'ceph-migrator-host')
+sys.path.insert(0, MIGRATOR_DIR)
+
+import fakeceph  # pylint: disable=wrong-import-position
+import fakeostack  # pylint: disable=wrong-import-position
+import lib  # pylint: disable=wrong-import-position
+import olib  # pylint: disable=wrong-import-position
+
+SOURCE_FLAVOR_NAME = 'hdn.cerit.large-ssd-ephem'
+SOURCE_NETWORK_NAME = 'group-project-network'
+SOURCE_USER_ID = 'benchmark-user'
+OBJSTORE_CONTAINER_NAME = 'benchmark-container'
+KEYPAIR_NAMES_COUNT = 10
+REPORTED_TOP_COUNT = 5
+
+
+def load_project_migrator():
+    """ load project-migrator.py as module (main() and get_args() are benchmarked) """
+    spec = importlib.util.spec_from_file_location('project_migrator', os.path.join(MIGRATOR_DIR, 'project-migrator.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_server_id(project_name, server_index):
+    """ return deterministic synthetic server ID (known before the project is created) """
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, f"{project_name}/{server_index}"))
+
+
+def allocate_rbd_image_data(args, file_name, size):
+    """ write image data (--image-allocated-kib) into sparse file in four extents spread across the image """
+    extent_size = args.image_allocated_kib * 1024 // 4
+    with open(file_name, "r+b") as file:
+        for i_extent in range(4):
+            os.pwrite(file.fileno(), os.urandom(extent_size), i_extent * (size // 4))
+
+
+def create_destination_cloud_resources(dst_cloud, migrator_args):
+    """ create destination cloud shared resources (external network, flavor, image) """
+    dst_ext_network = dst_cloud.add('networks', name=migrator_args.destination_ipv4_external_network,
+                                    project_id=dst_cloud.admin_project.id, subnet_ids=[], is_router_external=True)
+    dst_ext_subnet = dst_cloud.add('subnets', name=f"{dst_ext_network.name}-subnet", network_id=dst_ext_network.id,
+                                   project_id=dst_cloud.admin_project.id, cidr='192.0.2.0/24', ip_version=4)
+    dst_ext_network.subnet_ids.append(dst_ext_subnet.id)
+    dst_cloud.add('flavors', name=olib.get_destination_flavor(SOURCE_FLAVOR_NAME))
+    dst_cloud.add('images', name=migrator_args.destination_bootable_volume_image_name)
+
+
+def create_source_project(args, migrator_args, src_cloud, dst_cloud, project_name, servers_count):
+    """ create synthetic source project (network, router, security groups, servers with RBD images / volumes)
+        and empty destination project of the same name """
+    src_project = src_cloud.add('projects', name=project_name, is_enabled=True, domain_id='default')
+    dst_cloud.add('projects', name=project_name, is_enabled=True, domain_id='default')
+
+    # networking
+    src_network = src_cloud.add('networks', name=SOURCE_NETWORK_NAME, project_id=src_project.id, mtu=1442,
+                                is_port_security_enabled=True, subnet_ids=[])
+    src_subnet = src_cloud.add('subnets', name=f"{SOURCE_NETWORK_NAME}-subnet", network_id=src_network.id,
+                               project_id=src_project.id, cidr='10.0.0.0/16', ip_version=4, is_dhcp_enabled=True,
+                               allocation_pools=[{'start': '10.0.0.2', 'end': '10.0.255.254'}], gateway_ip='10.0.0.1',
+                               host_routes=[], dns_nameservers=[])
+    src_network.subnet_ids.append(src_subnet.id)
+    src_router = src_cloud.add('routers', name='group-project-router', project_id=src_project.id)
+    src_cloud.add_port(src_network, src_subnet.gateway_ip, device_id=src_router.id, device_owner='network:router_interface')
+
+    # security groups, ssh one references default one
+    src_default_security_group = src_cloud.add_security_group(src_project.id, name='default')
+    src_ssh_security_group = src_cloud.add_security_group(src_project.id, name='ssh')
+    for i_security_group_rule in ({'security_group_id': src_default_security_group.id, 'direction': 'ingress',
+                                   'ethertype': 'IPv4', 'remote_group_id': src_default_security_group.id},
+                                  {'security_group_id': src_ssh_security_group.id, 'direction': 'ingress',
+                                   'ethertype': 'IPv4', 'protocol': 'tcp', 'port_range_min': 22, 'port_range_max': 22,
+                                   'remote_ip_prefix': '0.0.0.0/0'},
+                                  {'security_group_id': src_ssh_security_group.id, 'direction': 'ingress',
+                                   'ethertype': 'IPv4', 'protocol': 'icmp', 'remote_group_id': src_default_security_group.id}):
+        src_cloud.add_security_group_rule(i_security_group_rule | {'project_id': src_project.id})
+
+    # servers
+    volume_size_bytes = args.volume_size_gb * 1024 * 1024 * 1024
+    for i_server_index in range(servers_count):
+        i_server_id = get_server_id(project_name, i_server_index)
+        i_server_name = f"{project_name}-server-{i_server_index:04d}"
+        i_port = src_cloud.add_port(src_network, str(ipaddress.ip_address('10.0.1.0') + i_server_index),
+                                    device_id=i_server_id, device_owner='compute:nova')
+        i_volumes = []
+        if i_server_index % 2:
+            i_volumes.append(('/dev/vda', src_cloud.add_volume(src_project, args.volume_size_gb, name=f"{i_server_name}-root",
+                                                               is_bootable=True, status='in-use')))
+        else:
+            fakeceph.create_image(src_cloud.ceph_state_dir, migrator_args.source_ceph_ephemeral_pool_name,
+                                  f"{i_server_id}_disk", volume_size_bytes)
+            allocate_rbd_image_data(args, os.path.join(src_cloud.ceph_state_dir, migrator_args.source_ceph_ephemeral_pool_name,
+                                                       f"{i_server_id}_disk", 'data'), volume_size_bytes)
+        if i_server_index % 4 == 3:
+            i_volumes.append(('/dev/vdb', src_cloud.add_volume(src_project, args.volume_size_gb, name=f"{i_server_name}-data",
+                                                               status='in-use')))
+        for j_device, j_volume in i_volumes:
+            src_cloud.add('volume_attachments', server_id=i_server_id, volume_id=j_volume.id, device=j_device)
+            create_source_volume_snapshots(args, src_cloud, j_volume)
+
+        src_cloud.add('servers', id=i_server_id, name=i_server_name, project_id=src_project.id, status='ACTIVE',
+                      flavor=fakeostack.FakeResource(name=SOURCE_FLAVOR_NAME),
+                      key_name=f"benchmark-key-{i_server_index % KEYPAIR_NAMES_COUNT}", user_id=SOURCE_USER_ID,
+                      security_groups=[{'name': src_default_security_group.name}, {'name': src_ssh_security_group.name}],
+                      root_device_name='/dev/vda', block_device_mapping=None,
+                      attached_volumes=[{'id': j_volume.id} for _, j_volume in i_volumes],
+                      addresses={SOURCE_NETWORK_NAME: [{'addr': i_port.fixed_ips[0]['ip_address'], 'version': 4,
+                                                        'OS-EXT-IPS:type': 'fixed',
+                                                        'OS-EXT-IPS-MAC:mac_addr': i_port.mac_address}]})
+
+    # explicit (not attached) volumes
+    for i_volume_name in get_explicit_volume_names(args):
+        create_source_volume_snapshots(args, src_cloud, src_cloud.add_volume(src_project, args.volume_size_gb, name=i_volume_name))
+
+    # objstore container with objects of random data
+    if args.objstore_objects:
+        src_cloud.add_container(src_project, OBJSTORE_CONTAINER_NAME)
+        for i_object_index in range(args.objstore_objects):
+            src_cloud.add_object(src_project, OBJSTORE_CONTAINER_NAME, f"objects/object-{i_object_index:06d}",
+                                 os.urandom(args.objstore_object_size_kib * 1024))
+
+
+def create_source_volume_snapshots(args, src_cloud, volume):
+    """ create source volume snapshots, volume data are rewritten before every volume snapshot and after the last one """
+    volume_size_bytes = args.volume_size_gb * 1024 * 1024 * 1024
+    for i_volume_snapshot_index in range(args.volume_snapshots):
+        allocate_rbd_image_data(args, fakeostack.get_volume_rbd_image_file(src_cloud, volume), volume_size_bytes)
+        src_cloud.add_volume_snapshot(volume, name=f"{volume.name}-snapshot-{i_volume_snapshot_index}")
+    allocate_rbd_image_data(args, fakeostack.get_volume_rbd_image_file(src_cloud, volume), volume_size_bytes)
+
+
+def get_explicit_volume_names(args):
+    """ return names of synthetic explicit volumes (same in every project) """
+    return [f"explicit-volume-{i_volume_index:04d}" for i_volume_index in range(args.explicit_volumes)]
+
+
+def write_source_keypairs_dump(file_name, rows_count):
+    """ write source keypairs (nova_api.key_pairs) mysqldump XML with rows_count keypairs (benchmark keypairs included) """
+    with open(file_name, "w", encoding="utf-8") as file:
+        file.write('<?xml version="1.0"?>\n<mysqldump xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n'
+                   '<database name="nova_api">\n<table_data name="key_pairs">\n')
+        for i_row in range(max(rows_count, KEYPAIR_NAMES_COUNT)):
+            i_name, i_user_id = (f"benchmark-key-{i_row}", SOURCE_USER_ID) if i_row < KEYPAIR_NAMES_COUNT else \
+                (f"key-{i_row}", f"user-{i_row}")
+            file.write(f'\t<row>\n\t\t<field name="id">{i_row + 1}</field>\n\t\t<field name="name">{i_name}</field>\n'
+                       f'\t\t<field name="user_id">{i_user_id}</field>\n\t\t<field name="fingerprint">00:{i_row:x}</field>\n'
+                       f'\t\t<field name="public_key">ssh-rsa AAAAB3NzaC1yc2E{i_row:08d} {i_name}</field>\n'
+                       '\t\t<field name="type">ssh</field>\n\t</row>\n')
+        file.write('</table_data>\n</database>\n</mysqldump>\n')
+
+
+def write_openrc(file_name, cloud_name):
+    """ write fake cloud migrator OpenRC file (OS_AUTH_URL selects fake cloud) """
+    with open(file_name, "w", encoding="utf-8") as file:
+        file.write(f"export OS_AUTH_URL=fake://{cloud_name}\nexport OS_USERNAME=migrator\nexport OS_PASSWORD=migrator\n"
+                   "export OS_PROJECT_NAME=admin\nexport OS_USER_DOMAIN_NAME=Default\nexport OS_PROJECT_DOMAIN_NAME=Default\n")
+
+
+def run_benchmark(args, project_migrator, servers_count):
+    """ migrate synthetic project(s) with servers_count servers, returns benchmark result """
+    work_dir = tempfile.mkdtemp(prefix=f"project-migrator-benchmark-{servers_count}-", dir=args.work_dir)
+    ceph_state_dir = os.path.join(work_dir, 'ceph')
+    project_names = [f"benchmark-{servers_count}-{i_project}" for i_project in range(args.projects)]
+    for i_cloud_name in ('source', 'destination'):
+        write_openrc(os.path.join(work_dir, f"{i_cloud_name}.openrc"), i_cloud_name)
+    with open(os.path.join(work_dir, 'sshkey'), "w", encoding="utf-8") as file:
+        file.write("fake ssh key\n")
+    keypairs_dump_file = os.path.join(work_dir, 'nova_api_key_pairs.dump.xml')
+    write_source_keypairs_dump(keypairs_dump_file, args.keypair_dump_rows)
+
+    migrator_argv = ['--source-openrc', os.path.join(work_dir, 'source.openrc'),
+                     '--destination-openrc', os.path.join(work_dir, 'destination.openrc'),
+                     '--ceph-migrator-host', 'fake-ceph-migrator-host',
+                     '--ceph-migrator-sshkeyfile', os.path.join(work_dir, 'sshkey'),
+                     '--source-keypair-xml-dump-file', keypairs_dump_file,
+                     '--source-keypair-cache-file', '',
+                     '--migration-journal-file', os.path.join(work_dir, 'project-migrator.journal.jsonl'),
+                     '--exception-trace-file', os.path.join(work_dir, 'project-migrator.dump'),
+                     '--dry-run-plan-file', os.path.join(work_dir, 'project-migrator.plan.json'),
+                     '--timing-report-file', '']
+    if args.explicit_volumes:
+        migrator_argv += ['--explicit-volume-names', ','.join(get_explicit_volume_names(args))]
+    if args.projects > 1:
+        with open(os.path.join(work_dir, 'campaign.txt'), "w", encoding="utf-8") as file:
+            file.writelines(f"{i_project_name} {get_server_id(i_project_name, 0)}\n" for i_project_name in project_names)
+        migrator_argv += ['--campaign-file', os.path.join(work_dir, 'campaign.txt'),
+                          '--campaign-results-file', os.path.join(work_dir, 'project-migrator.campaign.jsonl')]
+    else:
+        migrator_argv += ['--project-name', project_names[0],
+                          '--validation-a-source-server-id', get_server_id(project_names[0], 0)]
+    migrator_args = project_migrator.get_args(migrator_argv + args.migrator_argv)
+    assert not migrator_args.ceph_migrator_agent, "Ceph agent is not supported by fake ceph migrator host"
+
+    # fake clouds sharing fake ceph, fake ceph migrator host
+    ceph_host = fakeceph.FakeCephHost(ceph_state_dir, SCRIPTS_DIR, base_dir=migrator_args.ceph_migrator_host_base_dir,
+                                      ssh_latency=args.ssh_latency, rbd_throughput=args.rbd_throughput)
+    clouds = {'fake://source': fakeostack.FakeCloud('source', args.api_latency, ceph_state_dir,
+                                                    migrator_args.source_ceph_cinder_pool_name),
+              'fake://destination': fakeostack.FakeCloud('destination', args.api_latency, ceph_state_dir,
+                                                         migrator_args.destination_ceph_cinder_pool_name)}
+    src_cloud, dst_cloud = clouds['fake://source'], clouds['fake://destination']
+    create_destination_cloud_resources(dst_cloud, migrator_args)
+    for i_project_name in project_names:
+        create_source_project(args, migrator_args, src_cloud, dst_cloud, i_project_name, servers_count)
+    args.logger.info(f"Synthetic project(s) {project_names} with {servers_count} servers created ({work_dir})")
+
+    # benchmarked migration, step timing is recorded from migrator log
+    step_timing_recorder = lib.StepTimingRecorder()
+    migrator_args.logger.setLevel(logging.INFO)
+    migrator_args.logger.addHandler(step_timing_recorder)
+    result = {'servers': servers_count, 'projects': args.projects, 'ecode': None, 'error': None, 'phases_wall_seconds': {}}
+    migration_phases = [project_migrator.MIGRATION_PHASE_PREPARE, project_migrator.MIGRATION_PHASE_CUTOVER] if args.two_phase else \
+        [migrator_args.migration_phase]
+    start = time.monotonic()
+    try:
+        with unittest.mock.patch.object(lib, 'get_ostack_connection',
+                                        lambda openrc_vars: clouds[openrc_vars['OS_AUTH_URL']].connect(openrc_vars.get('OS_PROJECT_NAME'))), \
+                unittest.mock.patch.object(lib, 'get_ssh_client', lambda hostname, username, key_filename: ceph_host), \
+                unittest.mock.patch.dict(lib.WAIT_BACKOFF, {'initial_interval': migrator_args.wait_initial_interval,
+                                                            'max_interval': migrator_args.wait_max_interval,
+                                                            'factor': migrator_args.wait_backoff_factor,
+                                                            'jitter': migrator_args.wait_jitter}):
+            for i_migration_phase in migration_phases:
+                i_phase_start = time.monotonic()
+                i_migrator_args = project_migrator.get_args(migrator_argv + args.migrator_argv + ['--migration-phase', i_migration_phase])
+                result['ecode'] = project_migrator.main(i_migrator_args) or 0
+                result['phases_wall_seconds'][i_migration_phase] = time.monotonic() - i_phase_start
+                if result['ecode']:
+                    break
+    except Exception as ex:
+        args.logger.exception(f"Benchmark migration of {servers_count} server project(s) failed")
+        result |= {'ecode': 1, 'error': f"{type(ex).__name__}: {ex}"}
+    finally:
+        result['wall_seconds'] = time.monotonic() - start
+        migrator_args.logger.removeHandler(step_timing_recorder)
+
+    result |= {'migrated_servers': len(dst_cloud.list('servers')),
+               'migrated_explicit_volumes': sum(1 for i_volume in dst_cloud.list('volumes')
+                                                if i_volume.name in {lib.get_dst_resource_name(migrator_args, j_volume_name)
+                                                                     for j_volume_name in get_explicit_volume_names(args)}),
+               'migrated_objstore_objects': sum(1 for i_object in src_cloud.list('objects')
+                                                if any(j_object.data == i_object.data for j_object in
+                                                       dst_cloud.list('objects', container=i_object.container, name=i_object.name))),
+               'api_calls': src_cloud.get_api_calls_count() + dst_cloud.get_api_calls_count(),
+               'api_calls_per_method': {i_cloud.name: dict(i_cloud.api_calls.most_common()) for i_cloud in clouds.values()},
+               'ssh_round_trips': ceph_host.get_round_trips(),
+               'ssh_round_trips_per_command': dict(ceph_host.commands.most_common()),
+               'steps': step_timing_recorder.get_step_statistics()}
+    if args.keep_work_dir:
+        result['work_dir'] = work_dir
+    else:
+        shutil.rmtree(work_dir)
+    return result
+
+
+def get_regressions(args, results):
+    """ compare results with baseline report, returns list of regression descriptions """
+    with open(args.baseline_report_file, "r", encoding="utf-8") as file:
+        baseline_results = {(i_result['servers'], i_result['projects']): i_result for i_result in json.load(file)['results']}
+    regressions = []
+    for i_result in results:
+        if not (i_baseline_result := baseline_results.get((i_result['servers'], i_result['projects']))):
+            continue
+        for j_metric, j_tolerance in (('wall_seconds', args.wall_time_tolerance),
+                                      ('api_calls', args.count_tolerance),
+                                      ('ssh_round_trips', args.count_tolerance)):
+            if i_result[j_metric] > i_baseline_result[j_metric] * (1 + j_tolerance):
+                regressions.append(f"{i_result['servers']} servers x {i_result['projects']} projects: {j_metric} "
+                                   f"{i_result[j_metric]:.1f} > baseline {i_baseline_result[j_metric]:.1f} "
+                                   f"(tolerance {j_tolerance:.0%})")
+    return regressions
+
+
+def get_results_table(results):
+    """ return benchmark results as table lines """
+    lines = [f"{'servers':>8} {'projects':>8} {'migrated':>8} {'wall[s]':>9} {'api-calls':>10} {'ssh-round-trips':>16} {'ecode':>5}"]
+    for i_result in results:
+        lines.append(f"{i_result['servers']:>8} {i_result['projects']:>8} {i_result['migrated_servers']:>8} "
+                     f"{i_result['wall_seconds']:>9.1f} {i_result['api_calls']:>10} {i_result['ssh_round_trips']:>16} "
+                     f"{i_result['ecode']:>5}")
+    return lines
+
+
+def main(args):
+    """ benchmark migration of synthetic projects of requested sizes """
+    project_migrator = load_project_migrator()
+    results = []
+    for i_servers_count in args.servers:
+        i_result = run_benchmark(args, project_migrator, i_servers_count)
+        args.logger.info(f"{i_servers_count} server project(s) migrated in {i_result['wall_seconds']:.1f}s "
+                         f"(ecode: {i_result['ecode']}), {i_result['api_calls']} API calls, "
+                         f"{i_result['ssh_round_trips']} SSH round-trips")
+        if len(i_result['phases_wall_seconds']) > 1:
+            args.logger.info(f"  migration phases wall time: "
+                             f"{ {i_phase: round(i_seconds, 1) for i_phase, i_seconds in i_result['phases_wall_seconds'].items()} }")
+        for i_cloud_name, i_api_calls in i_result['api_calls_per_method'].items():
+            args.logger.info(f"  {i_cloud_name} cloud top API calls: "
+                             f"{dict(collections.Counter(i_api_calls).most_common(REPORTED_TOP_COUNT))}")
+        args.logger.info(f"  top ceph migrator host commands: "
+                         f"{dict(collections.Counter(i_result['ssh_round_trips_per_command']).most_common(REPORTED_TOP_COUNT))}")
+        results.append(i_result)
+
+    for i_line in get_results_table(results):
+        args.logger.info(f"Benchmark: {i_line}")
+    if args.report_file:
+        with open(args.report_file, "w", encoding="utf-8") as file:
+            json.dump({'api_latency': args.api_latency, 'ssh_latency': args.ssh_latency,
+                       'rbd_throughput': args.rbd_throughput, 'migrator_argv': args.migrator_argv,
+                       'results': results}, file, indent=2)
+        args.logger.info(f"Benchmark report written ({args.report_file})")
+
+    ecode = 1 if any(i_result['ecode'] for i_result in results) else 0
+    if args.baseline_report_file:
+        for i_regression in (regressions := get_regressions(args, results)):
+            args.logger.error(f"Performance regression: {i_regression}")
+        if regressions:
+            ecode = 1
+        else:
+            args.logger.info(f"No performance regression detected (baseline: {args.baseline_report_file})")
+    return ecode
+
+
+# main() call (argument parsing)
+# -------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    AP = argparse.ArgumentParser(epilog=globals().get('__doc__'),
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    AP.add_argument('--servers', default="10,100,1000",
+                    help='Comma separated synthetic project sizes (number of servers per project), one benchmark run per size')
+    AP.add_argument('--projects', default=1, type=int,
+                    help='(Optional) Number of synthetic projects per benchmark run, more than one project is migrated as campaign')
+    AP.add_argument('--api-latency', default=0.0, type=float,
+                    help='(Optional) Latency [s] of every fake OpenStack API call')
+    AP.add_argument('--ssh-latency', default=0.0, type=float,
+                    help='(Optional) Latency [s] of every ceph migrator host command (SSH round-trip)')
+    AP.add_argument('--rbd-throughput', default=0.0, type=float,
+                    help='(Optional) Fake rbd data throughput [MiB/s] of allocated data, 0 means unlimited')
+    AP.add_argument('--volume-size-gb', default=10, type=int,
+                    help='(Optional) Provisioned size [GiB] of synthetic RBD images / volumes (sparse files)')
+    AP.add_argument('--image-allocated-kib', default=256, type=int,
+                    help='(Optional) Allocated (written) data [KiB] of every synthetic RBD image / volume')
+    AP.add_argument('--volume-snapshots', default=0, type=int,
+                    help='(Optional) Number of snapshots of every synthetic volume (volume data rewritten before every snapshot), '
+                         'use with --migrate-volume-snapshots=true')
+    AP.add_argument('--explicit-volumes', default=0, type=int,
+                    help='(Optional) Number of synthetic not attached volumes per project migrated as explicit volumes '
+                         '(--explicit-volume-names), snapshotted as attached volumes (--volume-snapshots)')
+    AP.add_argument('--objstore-objects', default=0, type=int,
+                    help='(Optional) Number of objects in synthetic source objstore container, '
+                         'use with --migrate-objstore-containers=true')
+    AP.add_argument('--objstore-object-size-kib', default=64, type=int,
+                    help='(Optional) Size [KiB] of every synthetic objstore object (random data)')
+    AP.add_argument('--keypair-dump-rows', default=10000, type=int,
+                    help='(Optional) Number of keypairs in synthetic source keypairs XML dump')
+    AP.add_argument('--two-phase', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
+                    help='(Optional) Migrate in two phases (--migration-phase prepare and then cutover), wall time of every phase is reported')
+    AP.add_argument('--work-dir', default=None,
+                    help='(Optional) Directory for benchmark run files and fake ceph sparse files (system temp by default)')
+    AP.add_argument('--keep-work-dir', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
+                    help='(Optional) Keep benchmark run files (migration journal, fake ceph state) for inspection')
+    AP.add_argument('--report-file', default="project-migrator-benchmark.json",
+                    help='(Optional) Benchmark report file (JSON), empty string disables the report')
+    AP.add_argument('--baseline-report-file', default=None,
+                    help='(Optional) Previous benchmark report, regressions of wall time, API calls and SSH round-trips '
+                         'fail the benchmark')
+    AP.add_argument('--wall-time-tolerance', default=0.5, type=float,
+                    help='(Optional) Relative wall time increase tolerated when comparing with baseline report')
+    AP.add_argument('--count-tolerance', default=0.05, type=float,
+                    help='(Optional) Relative API call and SSH round-trip count increase tolerated when comparing with baseline report')
+    AP.add_argument('--log-level', default="INFO", required=False,
+                    choices=[i_lvl for i_lvl in dir(logging) if i_lvl.isupper() and i_lvl.isalpha()],
+                    help='Benchmark log level (python logging)')
+    AP.add_argument('--migrator-log-level', default="WARNING", required=False,
+                    choices=[i_lvl for i_lvl in dir(logging) if i_lvl.isupper() and i_lvl.isalpha()],
+                    help='Benchmarked project-migrator.py log level (python logging)')
+
+    ARGS, MIGRATOR_ARGV = AP.parse_known_args()
+    ARGS.servers = [int(i_servers_count) for i_servers_count in ARGS.servers.split(',')]
+    ARGS.keep_work_dir = str(ARGS.keep_work_dir).lower() == "true"
+    ARGS.two_phase = str(ARGS.two_phase).lower() == "true"
+    ARGS.migrator_argv = [i_arg for i_arg in MIGRATOR_ARGV if i_arg != '--']
+
+    # benchmarked migrator logs on INFO level (step timing), console shows --migrator-log-level messages only
+    LOG_HANDLER = logging.StreamHandler()
+    LOG_HANDLER.setFormatter(logging.Formatter('%(asctime)s %(name)s %(levelname)s %(message)s'))
+    LOG_HANDLER.addFilter(lambda record: record.name != "project-migrator" or
+                          record.levelno >= getattr(logging, ARGS.migrator_log_level))
+    logging.basicConfig(level=logging.WARNING, handlers=[LOG_HANDLER])
+    ARGS.logger = logging.getLogger("project-migrator-benchmark")
+    ARGS.logger.setLevel(getattr(logging, ARGS.log_level))
+
+    sys.exit(main(ARGS))
@@ -1,89 +1,247 @@
 """ OpenStack migrator - ceph library """
 
+import concurrent.futures
+import functools
+import itertools
 import json
 import os.path
+import re
+import threading
+import time
 
-from lib import remote_cmd_exec, log_or_assert
+from lib import remote_cmd_exec, get_ssh_client, get_prefixed_args, log_or_assert, get_migration_journal_entity, journal_record, journal_get
+
+# minimal interval [s] between two logged RBD copy progress messages
+RBD_PROGRESS_LOG_INTERVAL = 30
+
+# running ceph agents keyed by (hostname, username, key_filename), see ceph-migrator-host/ceph-agent.py
+CEPH_AGENTS = {}
+CEPH_AGENTS_LOCK = threading.Lock()
+
+
+class CephAgentClient:
+    """ client of long-lived ceph agent running on ceph migrator host, JSON lines over SSH channel stdio,
+        requests from multiple threads are multiplexed by request id """
+    def __init__(self, args):
+        ssh_client = get_ssh_client(args.ceph_migrator_host, args.ceph_migrator_user, args.ceph_migrator_sshkeyfile.name)
+        cinder_pools = ",".join([args.source_ceph_cinder_pool_name, args.source_ceph_ephemeral_pool_name])
+        self.stdin, self.stdout, _ = ssh_client.exec_command(
+            f"python3 {os.path.join(args.ceph_migrator_host_base_dir, 'ceph-agent.py')} --cinder-pools {cinder_pools}")
+        self.lock = threading.Lock()
+        self.request_ids = itertools.count(1)
+        self.requests = {}
+        self.closed = False
+        self.reader = threading.Thread(target=self.read_responses, daemon=True)
+        self.reader.start()
+
+    def read_responses(self):
+        """ dispatch agent responses and progress messages to waiting requests """
+        try:
+            for i_line in self.stdout:
+                message = json.loads(i_line)
+                with self.lock:
+                    request = self.requests.get(message.get('id'))
+                if not request:
+                    continue
+                if 'progress' in message:
+                    if request['progress_callback']:
+                        request['progress_callback'](message['progress'])
+                else:
+                    request['response'] = message
+                    request['event'].set()
+        finally:
+            # agent terminated, pending requests fail
+            with self.lock:
+                self.closed = True
+                for i_request in self.requests.values():
+                    i_request['event'].set()
+
+    def call(self, method, progress_callback=None, **params):
+        """ execute agent method, returns result, stderr and exit-code """
+        request = {'event': threading.Event(), 'response': None, 'progress_callback': progress_callback}
+        with self.lock:
+            if self.closed:
+                return [], "Ceph agent is not running", 1
+            request_id = next(self.request_ids)
+            self.requests[request_id] = request
+            try:
+                self.stdin.write(json.dumps({'id': request_id, 'method': method, 'params': params}) + "\n")
+                self.stdin.flush()
+            except Exception as ex:
+                del self.requests[request_id]
+                return [], f"Ceph agent request failed: {ex}", 1
+        request['event'].wait()
+        with self.lock:
+            del self.requests[request_id]
+        response = request['response'] or {'result': [], 'stderr': "Ceph agent terminated", 'ecode': 1}
+        return response['result'], response['stderr'], response['ecode']
+
+    def run_script(self, script_name, script_args, pool_name, dst_pool_name=None, progress_callback=None):
+        """ execute ceph migrator host data operation script via agent, returns stdout, stderr and exit-code """
+        stdout, stderr, ecode = self.call('run_script', progress_callback, script_name=script_name, script_args=script_args,
+                                          pool_name=pool_name, dst_pool_name=dst_pool_name)
+        return stdout if isinstance(stdout, str) else "", stderr, ecode
+
+    def close(self):
+        """ terminate agent (EOF on its stdin) """
+        self.stdin.channel.shutdown_write()
+        self.reader.join(timeout=10)
+        self.stdout.channel.close()
+
+
+def get_ceph_agent(args):
+    """ return ceph agent client (started on first use) when --ceph-migrator-agent is enabled, None otherwise """
+    if not args.ceph_migrator_agent:
+        return None
+    ceph_agent_key = (args.ceph_migrator_host, args.ceph_migrator_user, args.ceph_migrator_sshkeyfile.name)
+    with CEPH_AGENTS_LOCK:
+        if ceph_agent_key not in CEPH_AGENTS or CEPH_AGENTS[ceph_agent_key].closed:
+            CEPH_AGENTS[ceph_agent_key] = CephAgentClient(args)
+        return CEPH_AGENTS[ceph_agent_key]
+
+
+def close_ceph_agents():
+    """ terminate all running ceph agents """
+    with CEPH_AGENTS_LOCK:
+        for i_ceph_agent in CEPH_AGENTS.values():
+            i_ceph_agent.close()
+        CEPH_AGENTS.clear()
+
+
+def ceph_agent_ping(args):
+    """ check ceph agent is running and responding """
+    return get_ceph_agent(args).call('ping')
 
 
 def get_ceph_client_name(args, ceph_src_pool_name, ceph_dst_pool_name=None):
-    """ identify which ceph user to use for planned ceph operation """
+    """ identify which ceph user to use for planned ceph operation (ceph agent selects ceph user on its own) """
     int_pool_name = ceph_dst_pool_name if ceph_dst_pool_name else ceph_src_pool_name
 
     return "client.cinder" if int_pool_name in (args.source_ceph_cinder_pool_name, args.source_ceph_ephemeral_pool_name,) else "client.migrator"
 
 
-def ceph_rbd_images_list(args, pool_name):
-    """ list ceph RBD images in pool named pool_name """
-    script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-images-list.sh')
+def ceph_rbd_images_exist(args, pool_name, rbd_image_names):
+    """ return set of given RBD image names existing in pool named pool_name (single batched lookup, no pool listing) """
+    if not rbd_image_names:
+        return set()
+    if ceph_agent := get_ceph_agent(args):
+        rbd_images, _, ecode = ceph_agent.call('images_exist', pool_name=pool_name,
+                                               rbd_image_names=list(rbd_image_names))
+        assert ecode == 0, f"RBD pool ({pool_name}) images looked up successfully (ecode)"
+        return set(rbd_images)
+    ceph_client_name = get_ceph_client_name(args, pool_name)
+    script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-images-exist.sh')
     stdout, _, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                        args.ceph_migrator_user,
                                        args.ceph_migrator_sshkeyfile.name,
-                                       f"{script_path} {pool_name}")
-    assert stdout, f"RBD pool ({pool_name}) images received successfully (non-empty RBD list)"
-    assert ecode == 0, f"RBD pool ({pool_name}) images received successfully (ecode)"
-    return stdout.splitlines()
+                                       f"CEPH_USER={ceph_client_name} {script_path} {pool_name} " +
+                                       " ".join(sorted(rbd_image_names)),
+                                       logger=args.logger)
+    assert ecode == 0, f"RBD pool ({pool_name}) images looked up successfully (ecode)"
+    return set(stdout.splitlines())
 
 
 def ceph_rbd_image_info(args, pool_name, rbd_image_name):
     """ get ceph RBD image information """
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('image_info', pool_name=pool_name, rbd_image_name=rbd_image_name)
     ceph_client_name = get_ceph_client_name(args, pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-info.sh')
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}")
+                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}",
+                                            logger=args.logger)
     return json.loads(stdout), stderr, ecode
 
 
+def ceph_rbd_image_du(args, pool_name, rbd_image_name, rbd_image_snapshot_name=None):
+    """ get ceph RBD image (snapshot) provisioned and allocated (used) size """
+    if ceph_agent := get_ceph_agent(args):
+        stdout, stderr, ecode = ceph_agent.run_script('ceph-rbd-image-du.sh',
+                                                      [pool_name, rbd_image_name] + ([rbd_image_snapshot_name] if rbd_image_snapshot_name else []),
+                                                      pool_name)
+        return json.loads(stdout) if ecode == 0 else None, stderr, ecode
+    ceph_client_name = get_ceph_client_name(args, pool_name)
+    script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-du.sh')
+    cmd = f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}"
+    if rbd_image_snapshot_name:
+        cmd += f" {rbd_image_snapshot_name}"
+    stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
+                                            args.ceph_migrator_user,
+                                            args.ceph_migrator_sshkeyfile.name,
+                                            cmd,
+                                            logger=args.logger)
+    return json.loads(stdout) if ecode == 0 else None, stderr, ecode
+
+
 def ceph_rbd_image_exists(args, pool_name, rbd_image_name):
     """ detect whether RBD image {pool_name}/{rbd_image_name} exists """
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('image_exists', pool_name=pool_name, rbd_image_name=rbd_image_name)
     ceph_client_name = get_ceph_client_name(args, pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-exists.sh')
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}")
+                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}",
+                                            logger=args.logger)
     return stdout.splitlines(), stderr, ecode
 
 
 def ceph_rbd_image_delete(args, pool_name, rbd_image_name):
     """ delete RBD image {pool_name}/{rbd_image_name} """
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('image_delete', pool_name=pool_name, rbd_image_name=rbd_image_name)
     ceph_client_name = get_ceph_client_name(args, pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-delete.sh')
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}")
+                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}",
+                                            logger=args.logger)
     return stdout.splitlines(), stderr, ecode
 
 
 def ceph_rbd_image_flatten(args, pool_name, rbd_image_name):
     """ flatten RBD image {pool_name}/{rbd_image_name} """
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('image_flatten', pool_name=pool_name, rbd_image_name=rbd_image_name)
     ceph_client_name = get_ceph_client_name(args, pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-flatten.sh')
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}")
+                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name}",
+                                            logger=args.logger)
     return stdout.splitlines(), stderr, ecode
 
 
 def ceph_rbd_image_clone(args, src_pool_name, src_rbd_image_name, src_rbd_image_snapshot_name,
                          dst_pool_name, dst_rbd_image_name):
     """ clone RBD image {src_pool_name}/{src_rbd_image_name}@{src_rbd_image_snapshot_name} -> {dst_pool_name}/{dst_rbd_image_name}"""
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('image_clone', src_pool_name=src_pool_name, src_rbd_image_name=src_rbd_image_name,
+                               src_rbd_image_snapshot_name=src_rbd_image_snapshot_name,
+                               dst_pool_name=dst_pool_name, dst_rbd_image_name=dst_rbd_image_name)
     ceph_client_name = get_ceph_client_name(args, src_pool_name, dst_pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-clone.sh')
     cmd = f"CEPH_USER={ceph_client_name} {script_path} {src_pool_name} {src_rbd_image_name} {src_rbd_image_snapshot_name} {dst_pool_name} {dst_rbd_image_name}"
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            cmd)
+                                            cmd,
+                                            logger=args.logger)
     return stdout.splitlines(), stderr, ecode
 
 
-def ceph_rbd_image_copy(args, src_pool_name, src_rbd_image_name, dst_pool_name, dst_rbd_image_name):
+def ceph_rbd_image_copy(args, src_pool_name, src_rbd_image_name, dst_pool_name, dst_rbd_image_name, progress_callback=None):
     """ copy RBD image {src_pool_name}/{src_rbd_image_name} -> {dst_pool_name}/{dst_rbd_image_name}"""
+    if ceph_agent := get_ceph_agent(args):
+        stdout, stderr, ecode = ceph_agent.run_script('ceph-rbd-image-deepcopy.sh' if args.migrate_volume_snapshots else 'ceph-rbd-image-copy.sh',
+                                                      [src_pool_name, src_rbd_image_name, dst_pool_name, dst_rbd_image_name],
+                                                      src_pool_name, dst_pool_name, progress_callback)
+        return stdout.splitlines(), stderr, ecode
     ceph_client_name = get_ceph_client_name(args, src_pool_name, dst_pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir,
                                'ceph-rbd-image-deepcopy.sh' if args.migrate_volume_snapshots else 'ceph-rbd-image-copy.sh')
@@ -91,43 +249,218 @@ def ceph_rbd_image_copy(args, src_pool_name, src_rbd_image_name, dst_pool_name,
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            cmd)
+                                            cmd,
+                                            stderr_callback=progress_callback,
+                                            logger=args.logger)
+    return stdout.splitlines(), stderr, ecode
+
+
+def ceph_rbd_image_create(args, pool_name, rbd_image_name, rbd_image_size_mb):
+    """ create empty RBD image {pool_name}/{rbd_image_name} of size {rbd_image_size_mb} MiB """
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('image_create', pool_name=pool_name, rbd_image_name=rbd_image_name,
+                               rbd_image_size_mb=rbd_image_size_mb)
+    ceph_client_name = get_ceph_client_name(args, pool_name)
+    script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-create.sh')
+    stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
+                                            args.ceph_migrator_user,
+                                            args.ceph_migrator_sshkeyfile.name,
+                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name} {rbd_image_size_mb}",
+                                            logger=args.logger)
+    return stdout.splitlines(), stderr, ecode
+
+
+def ceph_rbd_image_diff_copy(args, src_pool_name, src_rbd_image_name, src_rbd_image_snapshot_name,
+                             dst_pool_name, dst_rbd_image_name, from_rbd_image_snapshot_name=None, progress_callback=None):
+    """ transfer RBD image snapshot difference {src_pool_name}/{src_rbd_image_name}@{src_rbd_image_snapshot_name} (since {from_rbd_image_snapshot_name})
+        -> {dst_pool_name}/{dst_rbd_image_name} (rbd export-diff | rbd import-diff) """
+    if ceph_agent := get_ceph_agent(args):
+        stdout, stderr, ecode = ceph_agent.run_script('ceph-rbd-image-diff-copy.sh',
+                                                      [src_pool_name, src_rbd_image_name, src_rbd_image_snapshot_name,
+                                                       dst_pool_name, dst_rbd_image_name] +
+                                                      ([from_rbd_image_snapshot_name] if from_rbd_image_snapshot_name else []),
+                                                      src_pool_name, dst_pool_name, progress_callback)
+        return stdout.splitlines(), stderr, ecode
+    ceph_client_name = get_ceph_client_name(args, src_pool_name, dst_pool_name)
+    script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-diff-copy.sh')
+    cmd = f"CEPH_USER={ceph_client_name} {script_path} {src_pool_name} {src_rbd_image_name} {src_rbd_image_snapshot_name} {dst_pool_name} {dst_rbd_image_name}"
+    if from_rbd_image_snapshot_name:
+        cmd += f" {from_rbd_image_snapshot_name}"
+    stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
+                                            args.ceph_migrator_user,
+                                            args.ceph_migrator_sshkeyfile.name,
+                                            cmd,
+                                            stderr_callback=progress_callback,
+                                            logger=args.logger)
+    return stdout.splitlines(), stderr, ecode
+
+
+def ceph_rbd_image_snapshot_copy(args, src_pool_name, src_rbd_image_name, src_rbd_image_snapshot_name,
+                                dst_pool_name, dst_rbd_image_name, progress_callback=None):
+    """ copy RBD image snapshot {src_pool_name}/{src_rbd_image_name}@{src_rbd_image_snapshot_name} -> {dst_pool_name}/{dst_rbd_image_name}"""
+    if ceph_agent := get_ceph_agent(args):
+        stdout, stderr, ecode = ceph_agent.run_script('ceph-rbd-image-snapshot-copy.sh',
+                                                      [src_pool_name, src_rbd_image_name, src_rbd_image_snapshot_name,
+                                                       dst_pool_name, dst_rbd_image_name],
+                                                      src_pool_name, dst_pool_name, progress_callback)
+        return stdout.splitlines(), stderr, ecode
+    ceph_client_name = get_ceph_client_name(args, src_pool_name, dst_pool_name)
+    script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-snapshot-copy.sh')
+    cmd = f"CEPH_USER={ceph_client_name} {script_path} {src_pool_name} {src_rbd_image_name} {src_rbd_image_snapshot_name} {dst_pool_name} {dst_rbd_image_name}"
+    stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
+                                            args.ceph_migrator_user,
+                                            args.ceph_migrator_sshkeyfile.name,
+                                            cmd,
+                                            stderr_callback=progress_callback,
+                                            logger=args.logger)
+    return stdout.splitlines(), stderr, ecode
+
+
+def ceph_rbd_image_migrate(args, copy_mode, src_pool_name, src_rbd_image_name, src_rbd_image_snapshot_name,
+                           dst_pool_name, dst_rbd_image_name, src_rbd_cloned_image_name=None,
+                           step_callback=None, progress_callback=None):
+    """ migrate snapshotted RBD image {src_pool_name}/{src_rbd_image_name}@{src_rbd_image_snapshot_name} -> {dst_pool_name}/{dst_rbd_image_name}
+        and clean up in single execution, step_callback receives JSON step report lines """
+    script_args = [copy_mode, src_pool_name, src_rbd_image_name, src_rbd_image_snapshot_name, dst_pool_name, dst_rbd_image_name] + \
+        ([src_rbd_cloned_image_name] if src_rbd_cloned_image_name else [])
+    if ceph_agent := get_ceph_agent(args):
+        # agent returns step report lines once the script finishes
+        stdout, stderr, ecode = ceph_agent.run_script('ceph-rbd-image-migrate.sh', script_args, src_pool_name, dst_pool_name,
+                                                      progress_callback)
+        if step_callback:
+            for i_line in stdout.splitlines():
+                step_callback(i_line)
+        return stdout.splitlines(), stderr, ecode
+    ceph_src_client_name = get_ceph_client_name(args, src_pool_name)
+    ceph_dst_client_name = get_ceph_client_name(args, src_pool_name, dst_pool_name)
+    script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-migrate.sh')
+    cmd = f"CEPH_SRC_USER={ceph_src_client_name} CEPH_DST_USER={ceph_dst_client_name} {script_path} {' '.join(script_args)}"
+    stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
+                                            args.ceph_migrator_user,
+                                            args.ceph_migrator_sshkeyfile.name,
+                                            cmd,
+                                            stderr_callback=progress_callback,
+                                            stdout_callback=step_callback,
+                                            logger=args.logger)
     return stdout.splitlines(), stderr, ecode
 
 
 def ceph_rbd_image_snapshot_exists(args, pool_name, rbd_image_name, rbd_image_snapshot_name):
     """ detect whether RBD image snapshot {pool_name}/{rbd_image_name}@{rbd_image_snapshot_name} exists """
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('snapshot_exists', pool_name=pool_name, rbd_image_name=rbd_image_name,
+                               rbd_image_snapshot_name=rbd_image_snapshot_name)
     ceph_client_name = get_ceph_client_name(args, pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-snapshot-exists.sh')
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name} {rbd_image_snapshot_name}")
+                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name} {rbd_image_snapshot_name}",
+                                            logger=args.logger)
     return stdout.splitlines(), stderr, ecode
 
 
 def ceph_rbd_image_snapshot_create(args, pool_name, rbd_image_name, rbd_image_snapshot_name):
     """ create RBD image snapshot {pool_name}/{rbd_image_name}@{rbd_image_snapshot_name} """
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('snapshot_create', pool_name=pool_name, rbd_image_name=rbd_image_name,
+                               rbd_image_snapshot_name=rbd_image_snapshot_name)
     ceph_client_name = get_ceph_client_name(args, pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-snapshot-create.sh')
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name} {rbd_image_snapshot_name}")
+                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name} {rbd_image_snapshot_name}",
+                                            logger=args.logger)
     return stdout.splitlines(), stderr, ecode
 
 
 def ceph_rbd_image_snapshot_delete(args, pool_name, rbd_image_name, rbd_image_snapshot_name):
     """ delete RBD image snapshot {pool_name}/{rbd_image_name}@{rbd_image_snapshot_name} """
+    if ceph_agent := get_ceph_agent(args):
+        return ceph_agent.call('snapshot_delete', pool_name=pool_name, rbd_image_name=rbd_image_name,
+                               rbd_image_snapshot_name=rbd_image_snapshot_name)
     ceph_client_name = get_ceph_client_name(args, pool_name)
     script_path = os.path.join(args.ceph_migrator_host_base_dir, 'ceph-rbd-image-snapshot-delete.sh')
     stdout, stderr, ecode = remote_cmd_exec(args.ceph_migrator_host,
                                             args.ceph_migrator_user,
                                             args.ceph_migrator_sshkeyfile.name,
-                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name} {rbd_image_snapshot_name}")
+                                            f"CEPH_USER={ceph_client_name} {script_path} {pool_name} {rbd_image_name} {rbd_image_snapshot_name}",
+                                            logger=args.logger)
     return stdout.splitlines(), stderr, ecode
 
 
+def format_size(size):
+    """ format size in bytes as GiB """
+    return f"{size / 1024 / 1024 / 1024:.1f} GiB"
+
+
+def get_rbd_progress_logger(args, log_prefix, rbd_image_size=None, journal_entity=None):
+    """ returns callback logging rbd command progress output ("Image copy: 42% complete...") with throughput and ETA,
+        rbd_image_size is RBD image (snapshot) size dictionary as returned by get_source_rbd_image_snapshot_size(),
+        completed transfer throughput is recorded into migration journal entity (G.19, migration duration estimate) """
+    progress = {'start': time.monotonic(), 'logged': 0.0, 'percent': None}
+
+    def log_progress(line):
+        match = re.search(r'^(.*?):?\s*(\d+)% complete', line)
+        if not match:
+            return
+        now, percent = time.monotonic(), int(match.group(2))
+        if percent == progress['percent'] or (now - progress['logged'] < RBD_PROGRESS_LOG_INTERVAL and percent < 100):
+            return
+        progress.update(percent=percent, logged=now)
+        elapsed = now - progress['start']
+        msg = f"{log_prefix} {match.group(1) or 'rbd'} progress {percent}% (elapsed: {elapsed:.0f}s"
+        if percent:
+            msg += f", ETA: {elapsed * (100 - percent) / percent:.0f}s"
+        if rbd_image_size:
+            processed_size = rbd_image_size['provisioned_size'] * percent // 100
+            msg += f", {format_size(processed_size)} of {format_size(rbd_image_size['provisioned_size'])}" \
+                   f" ({format_size(rbd_image_size['used_size'])} allocated)"
+            if elapsed:
+                msg += f", {processed_size / 1024 / 1024 / elapsed:.1f} MiB/s"
+        args.logger.info(f"{msg})")
+        if percent == 100 and rbd_image_size and journal_entity and elapsed:
+            journal_record(args, journal_entity, "G.19", rbd_image_size | {'seconds': elapsed})
+            args.logger.info(f"G.19 Source OpenStack VM RBD image transfer throughput measured ({journal_entity}, "
+                             f"{rbd_image_size['used_size'] / 1024 / 1024 / elapsed:.1f} MiB/s allocated)")
+    return log_progress
+
+
+def get_source_rbd_image_snapshot_size(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name):
+    """ receive source RBD image snapshot provisioned and allocated (used) size (rbd du),
+        returns {'provisioned_size': <bytes>, 'used_size': <bytes>} or None when unknown """
+    source_ceph_pool_name = server_block_device_mapping['source']['ceph_pool_name']
+    rbd_image_du_data, _, ecode = ceph_rbd_image_du(args, source_ceph_pool_name, source_server_rbd_image, source_rbd_image_snapshot_name)
+    if ecode != 0 or not rbd_image_du_data or 'total_provisioned_size' not in rbd_image_du_data:
+        args.logger.warning(f"G.18 Source OpenStack VM RBD image snapshot size unknown "
+                            f"({source_ceph_pool_name}/{source_server_rbd_image}@{source_rbd_image_snapshot_name})")
+        return None
+    rbd_image_size = {'provisioned_size': rbd_image_du_data['total_provisioned_size'],
+                      'used_size': rbd_image_du_data['total_used_size']}
+    args.logger.info(f"G.18 Source OpenStack VM RBD image snapshot size received "
+                     f"({source_ceph_pool_name}/{source_server_rbd_image}@{source_rbd_image_snapshot_name}, "
+                     f"provisioned: {format_size(rbd_image_size['provisioned_size'])}, allocated: {format_size(rbd_image_size['used_size'])})")
+    return rbd_image_size
+
+
+def get_source_rbd_image_size(args, server_block_device_mapping):
+    """ receive source RBD image provisioned and allocated (used) size (rbd du, image snapshots excluded),
+        returns {'provisioned_size': <bytes>, 'used_size': <bytes>} or None when unknown """
+    source_ceph_pool_name = server_block_device_mapping['source']['ceph_pool_name']
+    source_server_rbd_image = server_block_device_mapping['source']['ceph_rbd_image_name']
+    rbd_image_du_data, _, ecode = ceph_rbd_image_du(args, source_ceph_pool_name, source_server_rbd_image)
+    rbd_image_du_head = next((i_image for i_image in (rbd_image_du_data or {}).get('images', []) if not i_image.get('snapshot')), None)
+    if ecode != 0 or not rbd_image_du_head:
+        args.logger.warning(f"G.18 Source OpenStack VM RBD image size unknown ({source_ceph_pool_name}/{source_server_rbd_image})")
+        return None
+    rbd_image_size = {'provisioned_size': rbd_image_du_head['provisioned_size'],
+                      'used_size': rbd_image_du_head['used_size']}
+    args.logger.info(f"G.18 Source OpenStack VM RBD image size received ({source_ceph_pool_name}/{source_server_rbd_image}, "
+                     f"provisioned: {format_size(rbd_image_size['provisioned_size'])}, allocated: {format_size(rbd_image_size['used_size'])})")
+    return rbd_image_size
+
+
 def get_ceph_rbd_image(args, pool_name, rbd_image_name, log_prefix):
     """ CEPH_USER=client.cinder ~/migrator/ceph-rbd-image-exists.sh <pool_name> <rbd_image_name> """
     source_server_rbd_images, _, ecode = ceph_rbd_image_exists(args, pool_name, rbd_image_name)
@@ -137,12 +470,23 @@ def get_ceph_rbd_image(args, pool_name, rbd_image_name, log_prefix):
     return source_server_rbd_images[0]
 
 
-def create_source_rbd_image_snapshot(args, server_block_device_mapping, source_server_rbd_image):
+def get_destination_rbd_image(args, server_block_device_mapping):
+    """ return destination (G2) RBD image name, RBD image of destination volume is detected (G.02),
+        RBD image managed as destination volume after migration does not exist yet """
+    if not server_block_device_mapping['destination']['volume_id']:
+        return server_block_device_mapping['destination']['ceph_rbd_image_name']
+    return get_ceph_rbd_image(args,
+                              server_block_device_mapping['destination']['ceph_pool_name'],
+                              server_block_device_mapping['destination']['volume_id'],
+                              "G.02 Destination")
+
+
+def create_source_rbd_image_snapshot(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name=None):
     ## G1: create RBD image protected snapshot
     # CEPH_USER=client.cinder ~/migrator/ceph-rbd-image-snapshot-exists.sh prod-ephemeral-vms 006e230e-df45-4f33-879b-19eada244489_disk migration-snap2 # 1
     # CEPH_USER=client.cinder ~/migrator/ceph-rbd-image-snapshot-create.sh prod-ephemeral-vms 006e230e-df45-4f33-879b-19eada244489_disk migration-snap2 # 0
     # CEPH_USER=client.cinder ~/migrator/ceph-rbd-image-snapshot-exists.sh prod-ephemeral-vms 006e230e-df45-4f33-879b-19eada244489_disk migration-snap2 # 0
-    source_rbd_image_snapshot_name = f"g1-g2-migration-{source_server_rbd_image}"
+    source_rbd_image_snapshot_name = source_rbd_image_snapshot_name or f"g1-g2-migration-{source_server_rbd_image}"
     _, _, ecode = ceph_rbd_image_snapshot_exists(args,
                                                  server_block_device_mapping['source']['ceph_pool_name'],
                                                  source_server_rbd_image,
@@ -191,6 +535,20 @@ def delete_destination_rbd_image(args, server_block_device_mapping, destination_
                   ecode != 0, locals())
 
 
+def delete_destination_rbd_image_or_leftover(args, server_block_device_mapping, destination_server_rbd_image):
+    """ delete destination (G2) RBD image of destination volume (G.06-G.07), RBD image to be managed as destination volume
+        does not exist unless left behind by interrupted migration (resume, no assertions) """
+    if server_block_device_mapping['destination']['volume_id']:
+        delete_destination_rbd_image(args, server_block_device_mapping, destination_server_rbd_image)
+    elif args.resume:
+        _, _, ecode = ceph_rbd_image_delete(args,
+                                            server_block_device_mapping['destination']['ceph_pool_name'],
+                                            destination_server_rbd_image)
+        if ecode == 0:
+            args.logger.info(f"G.06 Destination OpenStack VM RBD image left behind by interrupted migration deleted "
+                             f"({server_block_device_mapping['destination']['ceph_pool_name']}/{destination_server_rbd_image})")
+
+
 def clone_source_rbd_image_snapshot(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name):
     ## G1: clone from snapshot
     # CEPH_USER=client.cinder ~/migrator/ceph-rbd-image-clone.sh prod-ephemeral-vms 006e230e-df45-4f33-879b-19eada244489_disk migration-snap2 prod-ephemeral-vms migrated-006e230e-df45-4f33-879b-19eada244489_disk
@@ -227,7 +585,8 @@ def flatten_source_rbd_image_snapshot_clone(args, server_block_device_mapping, s
                   ecode == 0, locals())
 
 
-def copy_source_rbd_image_snapshot_clone_to_destination_pool(args, server_block_device_mapping, source_rbd_cloned_image_name, destination_server_rbd_image):
+def copy_source_rbd_image_snapshot_clone_to_destination_pool(args, server_block_device_mapping, source_rbd_cloned_image_name, destination_server_rbd_image,
+                                                             rbd_image_size=None):
     ## G1->G2: copy RBD image to target pool
     # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-copy.sh prod-ephemeral-vms migrated-006e230e-df45-4f33-879b-19eada244489_disk cloud-cinder-volumes-prod-brno <g2-rbd-image-name>
     # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-exists.sh cloud-cinder-volumes-prod-brno <g2-rbd-image-name> # 0
@@ -235,7 +594,10 @@ def copy_source_rbd_image_snapshot_clone_to_destination_pool(args, server_block_
                                       server_block_device_mapping['source']['ceph_pool_name'],
                                       source_rbd_cloned_image_name,
                                       server_block_device_mapping['destination']['ceph_pool_name'],
-                                      destination_server_rbd_image)
+                                      destination_server_rbd_image,
+                                      get_rbd_progress_logger(args, f"G.11 Source OpenStack VM RBD image copy ({source_rbd_cloned_image_name})",
+                                                              rbd_image_size,
+                                                              get_migration_journal_entity(server_block_device_mapping)))
     log_or_assert(args,
                   "G.11 Source OpenStack VM RBD image copied G1 -> G2 succesfully"
                   f"{server_block_device_mapping['source']['ceph_pool_name']}/{source_rbd_cloned_image_name} -> "
@@ -249,6 +611,34 @@ def copy_source_rbd_image_snapshot_clone_to_destination_pool(args, server_block_
                   ecode == 0, locals())
 
 
+def copy_source_rbd_image_snapshot_to_destination_pool(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name,
+                                                       destination_server_rbd_image, rbd_image_size=None):
+    ## G1->G2: copy RBD image snapshot to target pool (no clone, no flatten)
+    # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-snapshot-copy.sh prod-ephemeral-vms 006e230e-df45-4f33-879b-19eada244489_disk migration-snap2 cloud-cinder-volumes-prod-brno <g2-rbd-image-name>
+    # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-exists.sh cloud-cinder-volumes-prod-brno <g2-rbd-image-name> # 0
+    _, _, ecode = ceph_rbd_image_snapshot_copy(args,
+                                               server_block_device_mapping['source']['ceph_pool_name'],
+                                               source_server_rbd_image,
+                                               source_rbd_image_snapshot_name,
+                                               server_block_device_mapping['destination']['ceph_pool_name'],
+                                               destination_server_rbd_image,
+                                               get_rbd_progress_logger(args,
+                                                                       f"G.11 Source OpenStack VM RBD image snapshot copy ({source_server_rbd_image}@{source_rbd_image_snapshot_name})",
+                                                                       rbd_image_size,
+                                                                       get_migration_journal_entity(server_block_device_mapping)))
+    log_or_assert(args,
+                  "G.11 Source OpenStack VM RBD image snapshot copied G1 -> G2 succesfully "
+                  f"{server_block_device_mapping['source']['ceph_pool_name']}/{source_server_rbd_image}@{source_rbd_image_snapshot_name} -> "
+                  f"{server_block_device_mapping['destination']['ceph_pool_name']}/{destination_server_rbd_image}",
+                  ecode == 0, locals())
+    _, _, ecode = ceph_rbd_image_exists(args,
+                                        server_block_device_mapping['destination']['ceph_pool_name'],
+                                        destination_server_rbd_image)
+    log_or_assert(args,
+                  f"G.12 Destination OpenStack VM RBD image exists ({server_block_device_mapping['destination']['ceph_pool_name']}/{destination_server_rbd_image})",
+                  ecode == 0, locals())
+
+
 def delete_source_rbd_image_snapshot_clone(args, server_block_device_mapping, source_rbd_cloned_image_name):
     ## G1: delete cloned RBD image
     # CEPH_USER=client.cinder ~/migrator/ceph-rbd-image-delete.sh prod-ephemeral-vms migrated-006e230e-df45-4f33-879b-19eada244489_disk
@@ -297,26 +687,274 @@ def delete_source_rbd_image_snapshot(args, server_block_device_mapping, source_s
                   ecode != 0, locals())
 
 
-def migrate_rbd_images(args, server_block_device_mappings, post_rbd_snap_callback = None):
-    """ migrate source (G1) ceph RBD images to destination (G2) ceph """
+def cleanup_source_rbd_image_snapshot_clone(args, server_block_device_mapping, source_rbd_cloned_image_name):
+    """ delete source RBD image snapshot clone left behind by failed migration (no assertions) """
+    _, _, ecode = ceph_rbd_image_delete(args,
+                                        server_block_device_mapping['source']['ceph_pool_name'],
+                                        source_rbd_cloned_image_name)
+    if ecode == 0:
+        args.logger.info(f"G.13 Source OpenStack VM RBD cloned image deleted after failure ({server_block_device_mapping['source']['ceph_pool_name']}/{source_rbd_cloned_image_name})")
+        journal_entity = get_migration_journal_entity(server_block_device_mapping)
+        journal_record(args, journal_entity, "G.09", None)
+        journal_record(args, journal_entity, "G.10", None)
+    else:
+        args.logger.error(f"G.13 Source OpenStack VM RBD cloned image deletion after failure failed ({server_block_device_mapping['source']['ceph_pool_name']}/{source_rbd_cloned_image_name}). "
+                          "Manual cleanup is required.")
+
+
+def discard_source_rbd_image_snapshot(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name):
+    """ delete stale source RBD image snapshot (and its clone) recorded in migration journal (no assertions),
+        journal records of RBD image migration steps based on the snapshot are invalidated """
+    journal_entity = get_migration_journal_entity(server_block_device_mapping)
+    if source_rbd_cloned_image_name := journal_get(args, journal_entity, "G.09"):
+        cleanup_source_rbd_image_snapshot_clone(args, server_block_device_mapping, source_rbd_cloned_image_name)
+    _, _, ecode = ceph_rbd_image_snapshot_delete(args,
+                                                 server_block_device_mapping['source']['ceph_pool_name'],
+                                                 source_server_rbd_image,
+                                                 source_rbd_image_snapshot_name)
+    if ecode != 0:
+        args.logger.warning("G.16 Source OpenStack VM RBD image stale snapshot deletion failed "
+                            f"({server_block_device_mapping['source']['ceph_pool_name']}/{source_server_rbd_image}@{source_rbd_image_snapshot_name})")
+    for i_step in ("G.05", "G.07", "G.10", "G.12"):
+        if journal_get(args, journal_entity, i_step):
+            journal_record(args, journal_entity, i_step, None)
+
+
+def migrate_rbd_image(args, block_device_migration_mapping, direct_copy=False):
+    """ migrate single snapshotted source (G1) ceph RBD image to destination (G2) ceph (steps G.06-G.17)
+        direct_copy copies the snapshot itself, clone and flatten steps (G.08-G.10, G.13-G.14) are skipped
+        steps recorded in migration journal are skipped """
+    server_block_device_mapping = block_device_migration_mapping['server_block_device_mapping']
+    source_server_rbd_image = block_device_migration_mapping['source_server_rbd_image']
+    destination_server_rbd_image = block_device_migration_mapping['destination_server_rbd_image']
+    source_rbd_image_snapshot_name = block_device_migration_mapping['source_rbd_image_snapshot_name']
+    source_rbd_image_size = block_device_migration_mapping.get('source_rbd_image_size')
+    journal_entity = get_migration_journal_entity(server_block_device_mapping)
+
+    if not journal_get(args, journal_entity, "G.12"):
+        if not journal_get(args, journal_entity, "G.07"):
+            delete_destination_rbd_image_or_leftover(args,
+                                                     server_block_device_mapping,
+                                                     destination_server_rbd_image)
+            journal_record(args, journal_entity, "G.07")
+
+        if direct_copy:
+            source_rbd_cloned_image_name = None
+        elif not (source_rbd_cloned_image_name := journal_get(args, journal_entity, "G.09")):
+            source_rbd_cloned_image_name = clone_source_rbd_image_snapshot(args,
+                                                                           server_block_device_mapping,
+                                                                           source_server_rbd_image,
+                                                                           source_rbd_image_snapshot_name)
+            journal_record(args, journal_entity, "G.09", source_rbd_cloned_image_name)
+
+        try:
+            if direct_copy:
+                copy_source_rbd_image_snapshot_to_destination_pool(args,
+                                                                   server_block_device_mapping,
+                                                                   source_server_rbd_image,
+                                                                   source_rbd_image_snapshot_name,
+                                                                   destination_server_rbd_image,
+                                                                   source_rbd_image_size)
+            else:
+                if not journal_get(args, journal_entity, "G.10"):
+                    flatten_source_rbd_image_snapshot_clone(args,
+                                                            server_block_device_mapping,
+                                                            source_rbd_cloned_image_name)
+                    journal_record(args, journal_entity, "G.10")
+
+                copy_source_rbd_image_snapshot_clone_to_destination_pool(args,
+                                                                         server_block_device_mapping,
+                                                                         source_rbd_cloned_image_name,
+                                                                         destination_server_rbd_image,
+                                                                         source_rbd_image_size)
+            journal_record(args, journal_entity, "G.12")
+        except Exception:
+            # do not leave orphaned clone nor partially copied destination RBD image behind
+            if source_rbd_cloned_image_name:
+                cleanup_source_rbd_image_snapshot_clone(args, server_block_device_mapping, source_rbd_cloned_image_name)
+            ceph_rbd_image_delete(args,
+                                  server_block_device_mapping['destination']['ceph_pool_name'],
+                                  destination_server_rbd_image)
+            raise
+
+    if source_rbd_cloned_image_name := journal_get(args, journal_entity, "G.09"):
+        delete_source_rbd_image_snapshot_clone(args,
+                                               server_block_device_mapping,
+                                               source_rbd_cloned_image_name)
+        journal_record(args, journal_entity, "G.09", None)
+
+    delete_source_rbd_image_snapshot(args,
+                                     server_block_device_mapping,
+                                     source_server_rbd_image,
+                                     source_rbd_image_snapshot_name)
+    journal_record(args, journal_entity, "G.05", None)
+    journal_record(args, journal_entity, "G.17")
+
+
+def get_rbd_image_migration_step_messages(server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name,
+                                           destination_server_rbd_image, source_rbd_cloned_image_name=None):
+    """ return ordered G.06-G.17 step log messages of single RBD image migration (no clone when source_rbd_cloned_image_name is None) """
+    src_pool_name = server_block_device_mapping['source']['ceph_pool_name']
+    dst_pool_name = server_block_device_mapping['destination']['ceph_pool_name']
+    step_messages = {
+        "G.06": f"G.06 Destination OpenStack VM RBD image deletion succeeded ({dst_pool_name}/{destination_server_rbd_image})",
+        "G.07": f"G.07 Destination OpenStack VM RBD image does not exist ({dst_pool_name}/{destination_server_rbd_image})",
+    }
+    if source_rbd_cloned_image_name:
+        step_messages |= {
+            "G.08": "G.08 Source OpenStack VM RBD image cloned succesfully "
+                    f"({src_pool_name}/{source_server_rbd_image}@{source_rbd_image_snapshot_name} -> {src_pool_name}/{source_rbd_cloned_image_name})",
+            "G.09": f"G.09 Source OpenStack VM cloned RBD image exists ({src_pool_name}/{source_rbd_cloned_image_name})",
+            "G.10": f"G.10 Source OpenStack VM cloned RBD image flatten successfully ({src_pool_name}/{source_rbd_cloned_image_name})",
+            "G.11": "G.11 Source OpenStack VM RBD image copied G1 -> G2 succesfully"
+                    f"{src_pool_name}/{source_rbd_cloned_image_name} -> {dst_pool_name}/{destination_server_rbd_image}",
+        }
+    else:
+        step_messages["G.11"] = "G.11 Source OpenStack VM RBD image snapshot copied G1 -> G2 succesfully " \
+                                f"{src_pool_name}/{source_server_rbd_image}@{source_rbd_image_snapshot_name} -> {dst_pool_name}/{destination_server_rbd_image}"
+    step_messages["G.12"] = f"G.12 Destination OpenStack VM RBD image exists ({dst_pool_name}/{destination_server_rbd_image})"
+    if source_rbd_cloned_image_name:
+        step_messages |= {
+            "G.13": f"G.13 Source OpenStack VM RBD cloned image deletion succeeded ({src_pool_name}/{source_rbd_cloned_image_name})",
+            "G.14": f"G.14 Source OpenStack VM cloned RBD image does not exist anymore ({src_pool_name}/{source_rbd_cloned_image_name})",
+        }
+    step_messages |= {
+        "G.15": f"G.15 Source OpenStack VM RBD image snapshot still exists {src_pool_name}/{source_server_rbd_image}@{source_rbd_image_snapshot_name}",
+        "G.16": f"G.16 Source OpenStack VM RBD image snapshot deletion succeeeded {src_pool_name}/{source_server_rbd_image}@{source_rbd_image_snapshot_name}",
+        "G.17": f"G.17 Source OpenStack VM RBD image snapshot does not exist anymore {src_pool_name}/{source_server_rbd_image}@{source_rbd_image_snapshot_name}",
+    }
+    return step_messages
+
+
+def journal_rbd_image_migration_step(args, journal_entity, step, source_rbd_cloned_image_name=None):
+    """ record completed single RBD image migration step into migration journal (same records as migrate_rbd_image()) """
+    if step in ("G.07", "G.10", "G.12"):
+        journal_record(args, journal_entity, step)
+    elif step == "G.09":
+        journal_record(args, journal_entity, "G.09", source_rbd_cloned_image_name)
+    elif step == "G.14":
+        journal_record(args, journal_entity, "G.09", None)
+    elif step == "G.17":
+        journal_record(args, journal_entity, "G.05", None)
+        journal_record(args, journal_entity, "G.17")
+
+
+def migrate_rbd_image_composite(args, block_device_migration_mapping, direct_copy=False):
+    """ migrate single snapshotted source (G1) ceph RBD image to destination (G2) ceph with single ceph migrator host
+        command (steps G.06-G.17 reported as JSON lines), partially migrated images (resume) are migrated by migrate_rbd_image() """
+    server_block_device_mapping = block_device_migration_mapping['server_block_device_mapping']
+    source_server_rbd_image = block_device_migration_mapping['source_server_rbd_image']
+    destination_server_rbd_image = block_device_migration_mapping['destination_server_rbd_image']
+    source_rbd_image_snapshot_name = block_device_migration_mapping['source_rbd_image_snapshot_name']
+    journal_entity = get_migration_journal_entity(server_block_device_mapping)
+
+    if any(journal_get(args, journal_entity, i_step) for i_step in ("G.07", "G.09", "G.10", "G.12")):
+        return migrate_rbd_image(args, block_device_migration_mapping, direct_copy)
+
+    source_rbd_cloned_image_name = None if direct_copy else f"g1-g2-migration-{source_server_rbd_image}"
+    copy_mode = "snapshot-copy" if direct_copy else "clone-flatten-deepcopy" if args.migrate_volume_snapshots else "clone-flatten-copy"
+    step_messages = get_rbd_image_migration_step_messages(server_block_device_mapping,
+                                                          source_server_rbd_image,
+                                                          source_rbd_image_snapshot_name,
+                                                          destination_server_rbd_image,
+                                                          source_rbd_cloned_image_name)
+    completed_steps = set()
+
+    def log_step(line):
+        if not line.startswith('{'):
+            return
+        step_report = json.loads(line)
+        if step_report['ok'] and step_report['step'] in step_messages:
+            completed_steps.add(step_report['step'])
+            args.logger.info(step_messages[step_report['step']])
+            journal_rbd_image_migration_step(args, journal_entity, step_report['step'], source_rbd_cloned_image_name)
+
+    _, _, ecode = ceph_rbd_image_migrate(args, copy_mode,
+                                         server_block_device_mapping['source']['ceph_pool_name'],
+                                         source_server_rbd_image,
+                                         source_rbd_image_snapshot_name,
+                                         server_block_device_mapping['destination']['ceph_pool_name'],
+                                         destination_server_rbd_image,
+                                         source_rbd_cloned_image_name,
+                                         step_callback=log_step,
+                                         progress_callback=get_rbd_progress_logger(args,
+                                                                                   f"G.11 Source OpenStack VM RBD image migration ({source_server_rbd_image})",
+                                                                                   block_device_migration_mapping.get('source_rbd_image_size'),
+                                                                                   journal_entity))
+    if ecode == 0 and completed_steps == set(step_messages):
+        return
+
+    failed_step = next(i_step for i_step in step_messages if i_step not in completed_steps)
+    if "G.07" in completed_steps and "G.12" not in completed_steps:
+        # do not leave orphaned clone nor partially copied destination RBD image behind
+        if "G.09" in completed_steps:
+            cleanup_source_rbd_image_snapshot_clone(args, server_block_device_mapping, source_rbd_cloned_image_name)
+        ceph_rbd_image_delete(args,
+                              server_block_device_mapping['destination']['ceph_pool_name'],
+                              destination_server_rbd_image)
+    log_or_assert(args, step_messages[failed_step], False, locals())
+
+
+def get_block_device_migration_mapping_size(args, block_device_migration_mapping):
+    """ receive source RBD image snapshot size (G.18) of block device migration mapping """
+    return get_source_rbd_image_snapshot_size(args,
+                                              block_device_migration_mapping['server_block_device_mapping'],
+                                              block_device_migration_mapping['source_server_rbd_image'],
+                                              block_device_migration_mapping['source_rbd_image_snapshot_name'])
+
+
+def sort_block_device_migration_mappings(args, block_device_migration_mappings):
+    """ receive source RBD image snapshot sizes (G.18) and sort block device migration mappings by allocated size (largest first),
+        sizes are received concurrently in RBD image migration worker pool as source servers may be stopped meanwhile """
+    for i_block_device_migration_mapping, i_source_rbd_image_size in \
+            zip(block_device_migration_mappings,
+                run_rbd_image_migrations(args, get_block_device_migration_mapping_size, block_device_migration_mappings)):
+        i_block_device_migration_mapping['source_rbd_image_size'] = i_source_rbd_image_size
+    block_device_migration_mappings.sort(key=lambda i_mapping: (i_mapping['source_rbd_image_size'] or {}).get('used_size', 0),
+                                         reverse=True)
+    if block_device_migration_mappings:
+        total_used_size = sum((i_mapping['source_rbd_image_size'] or {}).get('used_size', 0) for i_mapping in block_device_migration_mappings)
+        args.logger.info(f"G.18 Source OpenStack VM RBD images scheduled largest first (count: {len(block_device_migration_mappings)}, "
+                         f"allocated in total: {format_size(total_used_size)})")
+
+
+def migrate_rbd_images(args, server_block_device_mappings, post_rbd_snap_callback = None, direct_copy=False,
+                       reuse_source_rbd_image_snapshots=True):
+    """ migrate source (G1) ceph RBD images to destination (G2) ceph,
+        direct_copy copies RBD image snapshots directly (without clone and flatten),
+        source RBD image snapshots recorded in migration journal are re-created unless reuse_source_rbd_image_snapshots
+        (source server was running since they were taken) """
 
     block_device_migration_mappings = []
     for server_block_device_mapping in server_block_device_mappings:
+        journal_entity = get_migration_journal_entity(server_block_device_mapping)
+        if journal_get(args, journal_entity, "G.17"):
+            args.logger.info(f"G.17 Source OpenStack VM RBD image already migrated according to migration journal ({journal_entity})")
+            continue
+
         ## G1: detect existing RBD image
         source_server_rbd_image = get_ceph_rbd_image(args,
                                                      server_block_device_mapping['source']['ceph_pool_name'],
                                                      server_block_device_mapping['source']['ceph_rbd_image_name'],
                                                      "G.01 Source")
 
-        ## G2: detect existing RBD image
-        destination_server_rbd_image = get_ceph_rbd_image(args,
-                                                          server_block_device_mapping['destination']['ceph_pool_name'],
-                                                          server_block_device_mapping['destination']['volume_id'],
-                                                          "G.02 Destination")
+        ## G2: detect existing RBD image (may be deleted already when resuming)
+        if not (destination_server_rbd_image := journal_get(args, journal_entity, "G.02")):
+            destination_server_rbd_image = get_destination_rbd_image(args, server_block_device_mapping)
+            journal_record(args, journal_entity, "G.02", destination_server_rbd_image)
 
-        source_rbd_image_snapshot_name = create_source_rbd_image_snapshot(args,
-                                                                          server_block_device_mapping,
-                                                                          source_server_rbd_image)
+        if (source_rbd_image_snapshot_name := journal_get(args, journal_entity, "G.05")) and not reuse_source_rbd_image_snapshots:
+            args.logger.warning("G.05 Source OpenStack VM RBD image snapshot from migration journal is stale (source server was running "
+                                f"since), it is re-created ({journal_entity}@{source_rbd_image_snapshot_name})")
+            discard_source_rbd_image_snapshot(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name)
+            source_rbd_image_snapshot_name = None
+        if not source_rbd_image_snapshot_name:
+            source_rbd_image_snapshot_name = create_source_rbd_image_snapshot(args,
+                                                                              server_block_device_mapping,
+                                                                              source_server_rbd_image)
+            journal_record(args, journal_entity, "G.05", source_rbd_image_snapshot_name)
+        else:
+            args.logger.info(f"G.05 Source OpenStack VM RBD image snapshot reused from migration journal ({journal_entity}@{source_rbd_image_snapshot_name})")
 
         block_device_migration_mappings.append({
             'server_block_device_mapping': server_block_device_mapping,
@@ -324,40 +962,352 @@ def migrate_rbd_images(args, server_block_device_mappings, post_rbd_snap_callbac
             'destination_server_rbd_image': destination_server_rbd_image,
             'source_rbd_image_snapshot_name': source_rbd_image_snapshot_name
         })
-
     # if defined, execute the callback
     if post_rbd_snap_callback:
         post_rbd_snap_callback['func'](**post_rbd_snap_callback['args'])
 
-    for block_device_migration_mapping in block_device_migration_mappings:
-        server_block_device_mapping = block_device_migration_mapping['server_block_device_mapping']
-        source_server_rbd_image = block_device_migration_mapping['source_server_rbd_image']
-        destination_server_rbd_image = block_device_migration_mapping['destination_server_rbd_image']
-        source_rbd_image_snapshot_name = block_device_migration_mapping['source_rbd_image_snapshot_name']
+    # images with most allocated data are migrated first to shorten the overall wall time
+    sort_block_device_migration_mappings(args, block_device_migration_mappings)
 
-        delete_destination_rbd_image(args,
-                                     server_block_device_mapping,
-                                     destination_server_rbd_image)
+    # post-snapshot stages run in bounded worker pool (--rbd-parallelism)
+    run_rbd_image_migrations(args,
+                             functools.partial(migrate_rbd_image_or_volume_snapshots,
+                                               migrate_rbd_image_func=functools.partial(migrate_rbd_image_composite
+                                                                                        if args.rbd_image_migration_composite else migrate_rbd_image,
+                                                                                        direct_copy=direct_copy)),
+                             block_device_migration_mappings)
+
+
+def recreate_destination_rbd_image(args, server_block_device_mapping, destination_server_rbd_image):
+    """ replace destination (G2) RBD image by empty one of the same size, ready for rbd import-diff """
+    ## G2: receive RBD image size, delete it and create empty one
+    # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-info.sh cloud-cinder-volumes-prod-brno <g2-rbd-image-name>
+    # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-create.sh cloud-cinder-volumes-prod-brno <g2-rbd-image-name> <size-mb>
+    destination_ceph_pool_name = server_block_device_mapping['destination']['ceph_pool_name']
+    destination_server_rbd_image_data, _, ecode = ceph_rbd_image_info(args, destination_ceph_pool_name, destination_server_rbd_image)
+    log_or_assert(args,
+                  f"G.20 Destination OpenStack VM RBD image size received ({destination_ceph_pool_name}/{destination_server_rbd_image})",
+                  ecode == 0 and destination_server_rbd_image_data and 'size' in destination_server_rbd_image_data, locals())
+    destination_server_rbd_image_size_mb = destination_server_rbd_image_data['size'] // 1024 // 1024
+
+    delete_destination_rbd_image(args, server_block_device_mapping, destination_server_rbd_image)
 
-        source_rbd_cloned_image_name = clone_source_rbd_image_snapshot(args,
-                                                                       server_block_device_mapping,
-                                                                       source_server_rbd_image,
-                                                                       source_rbd_image_snapshot_name)
+    create_destination_rbd_image(args, server_block_device_mapping, destination_server_rbd_image, destination_server_rbd_image_size_mb)
 
-        flatten_source_rbd_image_snapshot_clone(args,
+
+def create_destination_rbd_image(args, server_block_device_mapping, destination_server_rbd_image, destination_server_rbd_image_size_mb):
+    """ create empty destination (G2) RBD image, ready for rbd import-diff """
+    ## G2: create empty RBD image
+    # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-create.sh cloud-cinder-volumes-prod-brno <g2-rbd-image-name> <size-mb>
+    destination_ceph_pool_name = server_block_device_mapping['destination']['ceph_pool_name']
+    _, _, ecode = ceph_rbd_image_create(args, destination_ceph_pool_name, destination_server_rbd_image,
+                                        destination_server_rbd_image_size_mb)
+    log_or_assert(args,
+                  f"G.21 Destination OpenStack VM empty RBD image created ({destination_ceph_pool_name}/{destination_server_rbd_image}, "
+                  f"size: {destination_server_rbd_image_size_mb} MiB)",
+                  ecode == 0, locals())
+
+
+def transfer_source_rbd_image_snapshot_diff(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name,
+                                            destination_server_rbd_image, source_rbd_image_from_snapshot_name=None, rbd_image_size=None):
+    """ transfer source (G1) RBD image snapshot (difference since source_rbd_image_from_snapshot_name) into destination (G2) RBD image """
+    ## G1->G2: transfer RBD image snapshot (difference)
+    # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-diff-copy.sh prod-ephemeral-vms 006e230e-df45-4f33-879b-19eada244489_disk migration-snap2 cloud-cinder-volumes-prod-brno <g2-rbd-image-name> [migration-snap1]
+    # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-snapshot-exists.sh cloud-cinder-volumes-prod-brno <g2-rbd-image-name> migration-snap2 # 0
+    log_step, log_transfer = ("G.23", "snapshot difference") if source_rbd_image_from_snapshot_name else ("G.22", "base snapshot")
+    _, _, ecode = ceph_rbd_image_diff_copy(args,
+                                           server_block_device_mapping['source']['ceph_pool_name'],
+                                           source_server_rbd_image,
+                                           source_rbd_image_snapshot_name,
+                                           server_block_device_mapping['destination']['ceph_pool_name'],
+                                           destination_server_rbd_image,
+                                           source_rbd_image_from_snapshot_name,
+                                           get_rbd_progress_logger(args,
+                                                                   f"{log_step} Source OpenStack VM RBD image {log_transfer} transfer "
+                                                                   f"({source_server_rbd_image}@{source_rbd_image_snapshot_name})",
+                                                                   rbd_image_size,
+                                                                   # snapshot difference is not whole allocated size transfer
+                                                                   None if source_rbd_image_from_snapshot_name else
+                                                                   get_migration_journal_entity(server_block_device_mapping)))
+    log_or_assert(args,
+                  f"{log_step} Source OpenStack VM RBD image {log_transfer} transferred G1 -> G2 succesfully "
+                  f"({server_block_device_mapping['source']['ceph_pool_name']}/{source_server_rbd_image}@{source_rbd_image_snapshot_name} -> "
+                  f"{server_block_device_mapping['destination']['ceph_pool_name']}/{destination_server_rbd_image})",
+                  ecode == 0, locals())
+    _, _, ecode = ceph_rbd_image_snapshot_exists(args,
+                                                 server_block_device_mapping['destination']['ceph_pool_name'],
+                                                 destination_server_rbd_image,
+                                                 source_rbd_image_snapshot_name)
+    log_or_assert(args,
+                  f"{log_step} Destination OpenStack VM RBD image snapshot exists "
+                  f"({server_block_device_mapping['destination']['ceph_pool_name']}/{destination_server_rbd_image}@{source_rbd_image_snapshot_name})",
+                  ecode == 0, locals())
+
+
+def transfer_source_rbd_image_snapshots(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_names,
+                                        destination_server_rbd_image, rbd_image_size=None):
+    """ transfer chain of source (G1) RBD image snapshots (oldest first) into destination (G2) RBD image, the first snapshot
+        whole and every next one as difference since the previous one, transferred snapshots are kept in destination RBD image """
+    source_rbd_image_from_snapshot_name = None
+    for i_source_rbd_image_snapshot_name in source_rbd_image_snapshot_names:
+        transfer_source_rbd_image_snapshot_diff(args,
                                                 server_block_device_mapping,
-                                                source_rbd_cloned_image_name)
+                                                source_server_rbd_image,
+                                                i_source_rbd_image_snapshot_name,
+                                                destination_server_rbd_image,
+                                                source_rbd_image_from_snapshot_name,
+                                                # rbd_image_size is allocated size of the last (whole) snapshot
+                                                rbd_image_size if len(source_rbd_image_snapshot_names) == 1 else None)
+        source_rbd_image_from_snapshot_name = i_source_rbd_image_snapshot_name
 
-        copy_source_rbd_image_snapshot_clone_to_destination_pool(args,
-                                                                 server_block_device_mapping,
-                                                                 source_rbd_cloned_image_name,
-                                                                 destination_server_rbd_image)
 
-        delete_source_rbd_image_snapshot_clone(args,
-                                               server_block_device_mapping,
-                                               source_rbd_cloned_image_name)
+def delete_destination_rbd_image_snapshot(args, server_block_device_mapping, destination_server_rbd_image, rbd_image_snapshot_name):
+    """ delete destination (G2) RBD image snapshot created by rbd import-diff """
+    ## G2: remove transferred snapshot
+    # CEPH_USER=client.migrator ~/migrator/ceph-rbd-image-snapshot-delete.sh cloud-cinder-volumes-prod-brno <g2-rbd-image-name> migration-snap2
+    _, _, ecode = ceph_rbd_image_snapshot_delete(args,
+                                                 server_block_device_mapping['destination']['ceph_pool_name'],
+                                                 destination_server_rbd_image,
+                                                 rbd_image_snapshot_name)
+    log_or_assert(args,
+                  "G.24 Destination OpenStack VM RBD image snapshot deletion succeeded "
+                  f"({server_block_device_mapping['destination']['ceph_pool_name']}/{destination_server_rbd_image}@{rbd_image_snapshot_name})",
+                  ecode == 0, locals())
+
+
+def migrate_rbd_image_volume_snapshots(args, block_device_migration_mapping):
+    """ migrate single snapshotted source (G1) ceph RBD image together with its volume snapshots to destination (G2) ceph
+        as chain of snapshot differences (oldest first, steps G.06-G.07, G.21-G.24, G.15-G.17),
+        transferred data are proportional to unique data, volume snapshots are kept in destination RBD image """
+    server_block_device_mapping = block_device_migration_mapping['server_block_device_mapping']
+    source_server_rbd_image = block_device_migration_mapping['source_server_rbd_image']
+    destination_server_rbd_image = block_device_migration_mapping['destination_server_rbd_image']
+    source_rbd_image_snapshot_name = block_device_migration_mapping['source_rbd_image_snapshot_name']
+    journal_entity = get_migration_journal_entity(server_block_device_mapping)
+
+    if not journal_get(args, journal_entity, "G.07"):
+        delete_destination_rbd_image_or_leftover(args, server_block_device_mapping, destination_server_rbd_image)
+        journal_record(args, journal_entity, "G.07")
+    else:
+        # destination RBD image partially transferred by interrupted migration (no assertions)
+        ceph_rbd_image_delete(args, server_block_device_mapping['destination']['ceph_pool_name'], destination_server_rbd_image)
+
+    try:
+        create_destination_rbd_image(args, server_block_device_mapping, destination_server_rbd_image,
+                                     server_block_device_mapping['destination']['volume_size'] * 1024)
+        transfer_source_rbd_image_snapshots(args,
+                                            server_block_device_mapping,
+                                            source_server_rbd_image,
+                                            [i_volume_snapshot['rbd_snapshot_name']
+                                             for i_volume_snapshot in server_block_device_mapping['source']['volume_snapshots']] +
+                                            [source_rbd_image_snapshot_name],
+                                            destination_server_rbd_image,
+                                            block_device_migration_mapping.get('source_rbd_image_size'))
+    except Exception:
+        # do not leave partially transferred destination RBD image behind
+        ceph_rbd_image_delete(args, server_block_device_mapping['destination']['ceph_pool_name'], destination_server_rbd_image)
+        raise
+
+    delete_destination_rbd_image_snapshot(args, server_block_device_mapping, destination_server_rbd_image, source_rbd_image_snapshot_name)
+    delete_source_rbd_image_snapshot(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name)
+    journal_record(args, journal_entity, "G.05", None)
+    journal_record(args, journal_entity, "G.17")
+
+
+def migrate_rbd_image_or_volume_snapshots(args, block_device_migration_mapping, migrate_rbd_image_func):
+    """ migrate RBD image with volume snapshots (--migrate-volume-snapshots) by migrate_rbd_image_volume_snapshots(),
+        other RBD images by migrate_rbd_image_func """
+    if block_device_migration_mapping['server_block_device_mapping']['source'].get('volume_snapshots'):
+        return migrate_rbd_image_volume_snapshots(args, block_device_migration_mapping)
+    return migrate_rbd_image_func(args, block_device_migration_mapping)
+
+
+def discard_rbd_image_snapshot_difference(args, server_block_device_mapping, source_server_rbd_image, destination_server_rbd_image,
+                                          source_rbd_image_snapshot_name):
+    """ delete stale source (G1) RBD image snapshot and its (partially) imported destination (G2) snapshot (no assertions),
+        partially imported difference is overwritten by difference since base snapshot of resumed migration
+        (every extent written since base snapshot is part of later snapshot difference too) """
+    ceph_rbd_image_snapshot_delete(args,
+                                   server_block_device_mapping['destination']['ceph_pool_name'],
+                                   destination_server_rbd_image,
+                                   source_rbd_image_snapshot_name)
+    discard_source_rbd_image_snapshot(args, server_block_device_mapping, source_server_rbd_image, source_rbd_image_snapshot_name)
+
+
+def migrate_rbd_image_base(args, server_block_device_mapping, reuse_source_rbd_image_snapshots=True):
+    """ transfer base snapshot of running server source (G1) ceph RBD image to destination (G2) ceph (steps G.01-G.07, G.20-G.22),
+        volume snapshots (--migrate-volume-snapshots) are transferred as chain of snapshot differences before base snapshot,
+        steps recorded in migration journal are skipped (base snapshot G.04, its transfer G.22),
+        returns block device migration mapping for migrate_rbd_image_incremental() """
+    journal_entity = get_migration_journal_entity(server_block_device_mapping)
+    ## G1: detect existing RBD image
+    source_server_rbd_image = get_ceph_rbd_image(args,
+                                                 server_block_device_mapping['source']['ceph_pool_name'],
+                                                 server_block_device_mapping['source']['ceph_rbd_image_name'],
+                                                 "G.01 Source")
+    ## G2: detect existing RBD image (may be deleted already when resuming)
+    if not (destination_server_rbd_image := journal_get(args, journal_entity, "G.02")):
+        destination_server_rbd_image = get_destination_rbd_image(args, server_block_device_mapping)
+        journal_record(args, journal_entity, "G.02", destination_server_rbd_image)
+
+    block_device_migration_mapping = {
+        'server_block_device_mapping': server_block_device_mapping,
+        'source_server_rbd_image': source_server_rbd_image,
+        'destination_server_rbd_image': destination_server_rbd_image,
+        'source_rbd_image_base_snapshot_name': journal_get(args, journal_entity, "G.04"),
+        'source_rbd_image_size': None
+    }
+    if journal_get(args, journal_entity, "G.23"):
+        args.logger.info(f"G.23 Source OpenStack VM RBD image snapshot difference transferred already according to migration journal ({journal_entity})")
+        return block_device_migration_mapping
 
+    if (source_rbd_image_snapshot_name := journal_get(args, journal_entity, "G.05")) and not reuse_source_rbd_image_snapshots:
+        args.logger.warning("G.05 Source OpenStack VM RBD image snapshot from migration journal is stale (source server was running "
+                            f"since), it is re-created ({journal_entity}@{source_rbd_image_snapshot_name})")
+        discard_rbd_image_snapshot_difference(args, server_block_device_mapping, source_server_rbd_image,
+                                              destination_server_rbd_image, source_rbd_image_snapshot_name)
+
+    if not (source_rbd_image_base_snapshot_name := block_device_migration_mapping['source_rbd_image_base_snapshot_name']):
+        source_rbd_image_base_snapshot_name = create_source_rbd_image_snapshot(args,
+                                                                               server_block_device_mapping,
+                                                                               source_server_rbd_image,
+                                                                               f"g1-g2-migration-base-{source_server_rbd_image}")
+        journal_record(args, journal_entity, "G.04", source_rbd_image_base_snapshot_name)
+    else:
+        args.logger.info(f"G.04 Source OpenStack VM RBD image base snapshot reused from migration journal ({journal_entity}@{source_rbd_image_base_snapshot_name})")
+    source_rbd_image_size = get_source_rbd_image_snapshot_size(args,
+                                                               server_block_device_mapping,
+                                                               source_server_rbd_image,
+                                                               source_rbd_image_base_snapshot_name)
+    block_device_migration_mapping |= {'source_rbd_image_base_snapshot_name': source_rbd_image_base_snapshot_name,
+                                       'source_rbd_image_size': source_rbd_image_size}
+    if journal_get(args, journal_entity, "G.22"):
+        args.logger.info(f"G.22 Source OpenStack VM RBD image base snapshot transferred already according to migration journal ({journal_entity})")
+        return block_device_migration_mapping
+
+    try:
+        if server_block_device_mapping['destination']['volume_id']:
+            recreate_destination_rbd_image(args, server_block_device_mapping, destination_server_rbd_image)
+        else:
+            delete_destination_rbd_image_or_leftover(args, server_block_device_mapping, destination_server_rbd_image)
+            create_destination_rbd_image(args, server_block_device_mapping, destination_server_rbd_image,
+                                         server_block_device_mapping['destination']['volume_size'] * 1024)
+        transfer_source_rbd_image_snapshots(args,
+                                            server_block_device_mapping,
+                                            source_server_rbd_image,
+                                            [i_volume_snapshot['rbd_snapshot_name']
+                                             for i_volume_snapshot in server_block_device_mapping['source'].get('volume_snapshots', [])] +
+                                            [source_rbd_image_base_snapshot_name],
+                                            destination_server_rbd_image,
+                                            source_rbd_image_size)
+        journal_record(args, journal_entity, "G.22")
+    except Exception:
+        # do not leave source base snapshot behind
+        ceph_rbd_image_snapshot_delete(args,
+                                       server_block_device_mapping['source']['ceph_pool_name'],
+                                       source_server_rbd_image,
+                                       source_rbd_image_base_snapshot_name)
+        journal_record(args, journal_entity, "G.04", None)
+        raise
+
+    return block_device_migration_mapping
+
+
+def migrate_rbd_image_incremental(args, block_device_migration_mapping):
+    """ transfer source (G1) ceph RBD image snapshot difference since base snapshot to destination (G2) ceph and clean up
+        all migration snapshots (steps G.23-G.24, G.15-G.17), steps recorded in migration journal are skipped """
+    server_block_device_mapping = block_device_migration_mapping['server_block_device_mapping']
+    source_server_rbd_image = block_device_migration_mapping['source_server_rbd_image']
+    destination_server_rbd_image = block_device_migration_mapping['destination_server_rbd_image']
+    source_rbd_image_base_snapshot_name = block_device_migration_mapping['source_rbd_image_base_snapshot_name']
+    source_rbd_image_snapshot_name = block_device_migration_mapping['source_rbd_image_snapshot_name']
+    journal_entity = get_migration_journal_entity(server_block_device_mapping)
+
+    if not journal_get(args, journal_entity, "G.23"):
+        try:
+            transfer_source_rbd_image_snapshot_diff(args,
+                                                    server_block_device_mapping,
+                                                    source_server_rbd_image,
+                                                    source_rbd_image_snapshot_name,
+                                                    destination_server_rbd_image,
+                                                    source_rbd_image_base_snapshot_name,
+                                                    block_device_migration_mapping['source_rbd_image_size'])
+        except Exception:
+            # source server is running again, the snapshot is stale
+            discard_rbd_image_snapshot_difference(args, server_block_device_mapping, source_server_rbd_image,
+                                                  destination_server_rbd_image, source_rbd_image_snapshot_name)
+            raise
+        journal_record(args, journal_entity, "G.23")
+
+    # snapshots deleted by interrupted migration are no longer recorded in migration journal
+    for i_journal_step, i_rbd_image_snapshot_name in (("G.04", source_rbd_image_base_snapshot_name),
+                                                      ("G.05", source_rbd_image_snapshot_name)):
+        if not (i_rbd_image_snapshot_name and journal_get(args, journal_entity, i_journal_step)):
+            continue
+        delete_destination_rbd_image_snapshot(args,
+                                              server_block_device_mapping,
+                                              destination_server_rbd_image,
+                                              i_rbd_image_snapshot_name)
         delete_source_rbd_image_snapshot(args,
                                          server_block_device_mapping,
                                          source_server_rbd_image,
-                                         source_rbd_image_snapshot_name)
+                                         i_rbd_image_snapshot_name)
+        journal_record(args, journal_entity, i_journal_step, None)
+    journal_record(args, journal_entity, "G.17")
+
+
+def run_rbd_image_migrations(args, func, block_device_migration_mappings):
+    """ execute func(args, block_device_migration_mapping) in bounded worker pool (--rbd-parallelism), first failure is raised """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.rbd_parallelism)) as executor:
+        futures = []
+        for i_block_device_migration_mapping in block_device_migration_mappings:
+            # every RBD image migration logs with own prefix (step timing span scope)
+            i_journal_entity = get_migration_journal_entity(i_block_device_migration_mapping.get('server_block_device_mapping',
+                                                                                                 i_block_device_migration_mapping))
+            futures.append(executor.submit(func, get_prefixed_args(args, f"[{i_journal_entity}]"), i_block_device_migration_mapping))
+        for i_future in concurrent.futures.as_completed(futures):
+            if i_future.exception():
+                # report the first failure, not started migrations are cancelled,
+                # running ones are let finish (and clean up) when leaving the executor context
+                for j_future in futures:
+                    j_future.cancel()
+                raise i_future.exception()
+        return [i_future.result() for i_future in futures]
+
+
+def migrate_rbd_images_base(args, server_block_device_mappings, reuse_source_rbd_image_snapshots=True):
+    """ transfer base snapshots of running server source (G1) ceph RBD images to destination (G2) ceph,
+        first stage of incremental migration, returns block device migration mappings for migrate_rbd_images_incremental(),
+        source RBD image snapshots recorded in migration journal are re-created unless reuse_source_rbd_image_snapshots """
+    pending_server_block_device_mappings = []
+    for server_block_device_mapping in server_block_device_mappings:
+        journal_entity = get_migration_journal_entity(server_block_device_mapping)
+        if journal_get(args, journal_entity, "G.17"):
+            args.logger.info(f"G.17 Source OpenStack VM RBD image already migrated according to migration journal ({journal_entity})")
+            continue
+        pending_server_block_device_mappings.append(server_block_device_mapping)
+
+    return run_rbd_image_migrations(args,
+                                    functools.partial(migrate_rbd_image_base,
+                                                      reuse_source_rbd_image_snapshots=reuse_source_rbd_image_snapshots),
+                                    pending_server_block_device_mappings)
+
+
+def migrate_rbd_images_incremental(args, block_device_migration_mappings, post_rbd_snap_callback = None):
+    """ transfer source (G1) ceph RBD images differences since base snapshots to destination (G2) ceph,
+        second stage of incremental migration (expected to be called once source server is stopped) """
+    for block_device_migration_mapping in block_device_migration_mappings:
+        journal_entity = get_migration_journal_entity(block_device_migration_mapping['server_block_device_mapping'])
+        if (source_rbd_image_snapshot_name := journal_get(args, journal_entity, "G.05")) or journal_get(args, journal_entity, "G.23"):
+            args.logger.info(f"G.05 Source OpenStack VM RBD image snapshot reused from migration journal ({journal_entity}@{source_rbd_image_snapshot_name})")
+        else:
+            source_rbd_image_snapshot_name = create_source_rbd_image_snapshot(args,
+                                                                              block_device_migration_mapping['server_block_device_mapping'],
+                                                                              block_device_migration_mapping['source_server_rbd_image'])
+            journal_record(args, journal_entity, "G.05", source_rbd_image_snapshot_name)
+        block_device_migration_mapping['source_rbd_image_snapshot_name'] = source_rbd_image_snapshot_name
+    # if defined, execute the callback
+    if post_rbd_snap_callback:
+        post_rbd_snap_callback['func'](**post_rbd_snap_callback['args'])
+
+    run_rbd_image_migrations(args, migrate_rbd_image_incremental, block_device_migration_mappings)
@@ -1,9 +1,15 @@
 """ OpenStack project migrator library """
 
+import copy
+import heapq
+import json
+import logging
 import os
 import os.path
 import pprint
+import random
 import re
+import threading
 import time
 
 import openstack
@@ -13,6 +19,38 @@ from keystoneauth1.identity import v3
 
 BOOLEAN_CHOICES = ["True", "true", "False", "false"]
 
+SSH_KEEPALIVE_INTERVAL = 30
+REMOTE_CMD_RECV_SIZE = 32768
+REMOTE_CMD_POLL_INTERVAL = 0.2
+# exit-code of remote command which could not be executed (as ssh client does on connection errors)
+REMOTE_CMD_FAILURE_ECODE = 255
+
+# pooled SSH clients keyed by (hostname, username, key_filename)
+SSH_CLIENTS = {}
+SSH_CLIENTS_LOCK = threading.Lock()
+
+# authenticated keystone sessions keyed by openrc variables except OS_PROJECT_NAME (reused by project connections)
+OSTACK_SESSIONS = {}
+OSTACK_SESSIONS_LOCK = threading.Lock()
+
+# wait_for_ostack_*_status() polling exponential backoff, updated from command-line arguments
+WAIT_BACKOFF = {'initial_interval': 1, 'max_interval': 10, 'factor': 2, 'jitter': 0.2}
+# number of pending resources from which statuses are polled with single list call instead of find_* calls
+WAIT_BATCH_THRESHOLD = 2
+
+SERVER_ERROR_STATUSES = ('ERROR',)
+VOLUME_ERROR_STATUSES = ('error', 'error_deleting', 'error_restoring', 'error_extending', 'error_managing')
+VOLUME_SNAPSHOT_ERROR_STATUSES = ('error', 'error_deleting')
+
+MIGRATION_JOURNAL_LOCK = threading.Lock()
+
+# RBD image copy throughput [MiB/s] assumed by migration duration estimate when neither configured nor measured
+DEFAULT_COPY_THROUGHPUT = 100.0
+
+# locks guarding get-or-create of shared destination resources keyed by (resource_type, resource_name)
+RESOURCE_LOCKS = {}
+RESOURCE_LOCKS_LOCK = threading.Lock()
+
 
 def wait_for_keypress():
     """ wait for enter keypress """
@@ -37,6 +75,210 @@ def trim_dict(dict_data, allowed_keys=None, denied_keys=None):
     return dict_data
 
 
+def load_migration_journal(journal_file_name):
+    """ replay append-only (JSONL) migration journal, returns {entity: {step: data}}, undone steps have data None """
+    journal = {}
+    if os.path.exists(journal_file_name):
+        with open(journal_file_name, "r", encoding="utf-8") as file:
+            for i_line in file:
+                if i_line.strip():
+                    i_record = json.loads(i_line)
+                    journal.setdefault(i_record['entity'], {})[i_record['step']] = i_record['data']
+    return journal
+
+
+def open_migration_journal(args):
+    """ load migration journal when resuming (--resume) otherwise start new one """
+    if args.resume:
+        args.migration_journal = load_migration_journal(args.migration_journal_file)
+    else:
+        args.migration_journal = {}
+        # dry-run keeps journal of previous migration (measured copy throughput)
+        if not args.dry_run:
+            with open(args.migration_journal_file, "w", encoding="utf-8"):
+                pass
+    return args.migration_journal
+
+
+def get_migration_journal_entity(block_device_mapping):
+    """ migration journal entity of block device mapping (source RBD image) """
+    return f"{block_device_mapping['source']['ceph_pool_name']}/{block_device_mapping['source']['ceph_rbd_image_name']}"
+
+
+def get_server_migration_journal_entity(server):
+    """ migration journal entity of source server """
+    return f"server/{server.id}"
+
+
+def get_source_server_status(args, source_server_detail):
+    """ source server status before migration, status recorded in migration journal (F.01) takes precedence
+        as resumed migration may find source server stopped by the failed one """
+    return journal_get(args, get_server_migration_journal_entity(source_server_detail), "F.01") or source_server_detail.status
+
+
+def journal_record_source_server_status(args, source_server_detail, source_server_status):
+    """ record source server status before migration (F.01) unless recorded already """
+    if not journal_get(args, get_server_migration_journal_entity(source_server_detail), "F.01"):
+        journal_record(args, get_server_migration_journal_entity(source_server_detail), "F.01", source_server_status)
+
+
+def get_volume_snapshot_migration_journal_entity(volume_snapshot):
+    """ migration journal entity of source volume snapshot """
+    return f"snapshot/{volume_snapshot['id']}"
+
+
+def journal_record(args, entity, step, data=True):
+    """ durably record completed migration step (data None marks step undone) """
+    with MIGRATION_JOURNAL_LOCK:
+        with open(args.migration_journal_file, "a", encoding="utf-8") as file:
+            file.write(json.dumps({'timestamp': time.time(), 'entity': entity, 'step': step, 'data': data}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        args.migration_journal.setdefault(entity, {})[step] = data
+
+
+def journal_record_destination_volume(args, entity, step, volume_id):
+    """ record created destination volume, it invalidates recorded destination RBD image migration steps """
+    for i_step in ("G.02", "G.07", "G.12", "G.17", "G.22", "G.23"):
+        if journal_get(args, entity, i_step):
+            journal_record(args, entity, i_step, None)
+    journal_record(args, entity, step, volume_id)
+
+
+def journal_get(args, entity, step):
+    """ return data of completed migration step recorded in the journal or None """
+    return args.migration_journal.get(entity, {}).get(step)
+
+
+def get_measured_copy_throughput(journal_file_names):
+    """ RBD image copy throughput [MiB/s] measured by previous migrations (G.19 journal records), None when not measured """
+    used_size, seconds = 0, 0.0
+    for i_journal_file_name in journal_file_names:
+        for i_steps in load_migration_journal(i_journal_file_name).values():
+            if isinstance(i_copy_throughput := i_steps.get("G.19"), dict):
+                used_size += i_copy_throughput['used_size']
+                seconds += i_copy_throughput['seconds']
+    return used_size / 1024 / 1024 / seconds if used_size and seconds else None
+
+
+def get_copy_throughput(args):
+    """ return RBD image copy throughput [MiB/s] and its origin (configured, measured or default) """
+    if args.copy_throughput:
+        return args.copy_throughput, 'configured'
+    if measured_copy_throughput := get_measured_copy_throughput(args.copy_throughput_journal_files or [args.migration_journal_file]):
+        return measured_copy_throughput, 'measured'
+    return DEFAULT_COPY_THROUGHPUT, 'default'
+
+
+def get_parallel_duration(durations, parallelism):
+    """ estimate duration of tasks started in order by pool of parallelism workers (greedy list scheduling) """
+    workers = [0.0] * max(1, min(parallelism, len(durations)))
+    for i_duration in durations:
+        heapq.heapreplace(workers, workers[0] + i_duration)
+    return max(workers)
+
+
+def get_resource_lock(resource_type, resource_name):
+    """ return lock guarding get-or-create of single (shared) resource """
+    with RESOURCE_LOCKS_LOCK:
+        return RESOURCE_LOCKS.setdefault((resource_type, resource_name), threading.Lock())
+
+
+class PrefixLoggerAdapter(logging.LoggerAdapter):
+    """ logger adapter prefixing all messages with extra['prefix'] """
+    def process(self, msg, kwargs):
+        return f"{self.extra['prefix']} {msg}", kwargs
+
+
+def get_prefixed_args(args, prefix):
+    """ return shallow copy of arguments where logger prefixes all messages """
+    int_args = copy.copy(args)
+    int_args.logger = PrefixLoggerAdapter(args.logger, {'prefix': prefix})
+    return int_args
+
+
+class StepTimingRecorder(logging.Handler):
+    """ logging handler recording timing spans of migration steps from step coded log messages ([prefix] ... G.11 ...)
+
+        span scope is the message prefix (project, server, RBD image), step span is closed by the step message
+        and opened by the previous step message of the same scope (or of the closest parent scope),
+        step messages of nested scopes advance parent scopes as well (time is not attributed twice),
+        consecutive messages of the same step (progress) form single span """
+    STEP_MESSAGE_REGEX = re.compile(r'^((?:\[[^\]]*\] )*)([A-Z]\.\d+) ')
+
+    def __init__(self):
+        super().__init__()
+        self.started = time.time()
+        self.scope_last_times = {}
+        self.scope_last_spans = {}
+        self.spans = []
+
+    def emit(self, record):
+        if not (match := self.STEP_MESSAGE_REGEX.match(record.getMessage())):
+            return
+        scope, step = match.group(1).strip(), match.group(2)
+        parent_scopes = [scope]
+        while parent_scopes[-1]:
+            parent_scopes.append(parent_scopes[-1].rpartition('[')[0].strip())
+        span_start = next((self.scope_last_times[i_scope] for i_scope in parent_scopes if i_scope in self.scope_last_times),
+                          self.started)
+        if (last_span := self.scope_last_spans.get(scope)) and last_span['step'] == step and last_span['end'] == span_start:
+            # repeated messages of the same step (progress) extend its span
+            last_span['end'] = record.created
+            last_span['duration'] = max(0.0, last_span['end'] - last_span['start'])
+        else:
+            self.scope_last_spans[scope] = {'scope': scope, 'step': step, 'start': span_start, 'end': record.created,
+                                            'duration': max(0.0, record.created - span_start)}
+            self.spans.append(self.scope_last_spans[scope])
+        for i_scope in parent_scopes:
+            self.scope_last_times[i_scope] = record.created
+
+    def get_step_statistics(self):
+        """ aggregate span durations per step code, {step: {'count', 'total_seconds', 'max_seconds'}} """
+        step_statistics = {}
+        with self.lock:
+            for i_span in self.spans:
+                i_statistics = step_statistics.setdefault(i_span['step'], {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+                i_statistics['count'] += 1
+                i_statistics['total_seconds'] += i_span['duration']
+                i_statistics['max_seconds'] = max(i_statistics['max_seconds'], i_span['duration'])
+        return dict(sorted(step_statistics.items()))
+
+    def get_step_statistics_table(self):
+        """ return aggregated time per step code as table lines, steps taking the most time first """
+        step_statistics = self.get_step_statistics()
+        total_seconds = sum(i_statistics['total_seconds'] for i_statistics in step_statistics.values()) or 1.0
+        lines = [f"{'step':<6} {'count':>6} {'total[s]':>10} {'max[s]':>10} {'share':>6}"]
+        for i_step, i_statistics in sorted(step_statistics.items(), key=lambda i_item: -i_item[1]['total_seconds']):
+            lines.append(f"{i_step:<6} {i_statistics['count']:>6} {i_statistics['total_seconds']:>10.1f} "
+                         f"{i_statistics['max_seconds']:>10.1f} {100 * i_statistics['total_seconds'] / total_seconds:>5.1f}%")
+        return lines
+
+    def write_report(self, json_file_name=None, prometheus_file_name=None):
+        """ write timing report as JSON (spans and step statistics) and / or Prometheus textfile (step statistics) """
+        step_statistics = self.get_step_statistics()
+        if json_file_name:
+            with self.lock:
+                spans = list(self.spans)
+            with open(json_file_name, "w", encoding="utf-8") as file:
+                json.dump({'started': self.started, 'finished': time.time(), 'steps': step_statistics, 'spans': spans}, file, indent=1)
+        if prometheus_file_name:
+            metric_name = "project_migrator_step_duration_seconds"
+            lines = [f"# HELP {metric_name} Time spent in project migrator steps (by step code)",
+                     f"# TYPE {metric_name} summary"]
+            for i_step, i_statistics in step_statistics.items():
+                lines += [f'{metric_name}_sum{{step="{i_step}"}} {i_statistics["total_seconds"]:.3f}',
+                          f'{metric_name}_count{{step="{i_step}"}} {i_statistics["count"]}']
+            lines += [f"# HELP {metric_name}_max Longest single project migrator step (by step code)",
+                      f"# TYPE {metric_name}_max gauge"]
+            lines += [f'{metric_name}_max{{step="{i_step}"}} {i_statistics["max_seconds"]:.3f}'
+                      for i_step, i_statistics in step_statistics.items()]
+            # textfile collectors may read the file anytime, replace it atomically
+            with open(f"{prometheus_file_name}.tmp", "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+            os.replace(f"{prometheus_file_name}.tmp", prometheus_file_name)
+
+
 def executed_as_admin_user_in_ci():
     """ identity the script user within CI pipeline """
     return os.environ.get('GITLAB_USER_LOGIN') in ('246254', '252651', 'Jan.Krystof', 'moravcova', '469240', 'Josef.Nemec', '247801', '253466', '252985')
@@ -55,6 +297,19 @@ def get_ostack_project_names(project_name):
     return project_name, project_name
 
 
+def get_campaign_projects(campaign_file_name):
+    """ load migration campaign projects, one per line: <project-name>[-><destination-project-name>] [validation-server-id]
+        (empty lines and # comments are ignored) """
+    campaign_projects = []
+    with open(campaign_file_name, "r", encoding="utf-8") as file:
+        for i_line in file:
+            i_fields = i_line.split('#', 1)[0].split()
+            if i_fields:
+                campaign_projects.append({'project_name': i_fields[0],
+                                          'validation_a_source_server_id': i_fields[1] if len(i_fields) > 1 else None})
+    return campaign_projects
+
+
 def get_destination_subnet(source_subnet):
     """ LUT for networks """
     subnet_mapping = {
@@ -81,24 +336,6 @@ def get_destination_router(source_router):
     return None
 
 
-def normalize_table_data_field(data_field):
-    """ normalize single data field (single data insert) """
-    int_dict = {}
-    i_name_key = '@name'
-    for i_data_field_item in data_field:
-        i_value_key = [i_k for i_k in i_data_field_item.keys() if i_k != i_name_key][0]
-        int_dict[i_data_field_item[i_name_key]] = i_data_field_item[i_value_key]
-    return int_dict
-
-
-def normalize_table_data(data):
-    """ normalize whole table data """
-    int_list = []
-    for i_data_field in data:
-        int_list.append(normalize_table_data_field(i_data_field['field']))
-    return int_list
-
-
 def get_dst_secgroup_name(args, name=""):
     """ translate original secgroup name to destination one """
     return f"{args.destination_secgroup_name_prefix}{name}"
@@ -127,8 +364,21 @@ def get_openrc(file_handle):
     return openrc_vars
 
 
+class ProjectRescopedToken(v3.Token):
+    """ keystone auth plugin rescoping (current) token of authenticated base session to another project,
+        base session re-authenticates on token expiration, no password authentication per project connection """
+    def __init__(self, base_session, **kwargs):
+        super().__init__(token=base_session.get_token(), **kwargs)
+        self.base_session = base_session
+
+    def get_auth_ref(self, session, **kwargs):
+        self.auth_methods[0].token = self.base_session.get_token()
+        return super().get_auth_ref(session, **kwargs)
+
+
 def get_ostack_connection(openrc_vars):
-    """ create a connection to a cloud and return the Connection object """
+    """ create a connection to a cloud and return the Connection object,
+        session (and token) authenticated with the same openrc credentials is reused when only OS_PROJECT_NAME differs """
     auth_args = {
         'auth_url': openrc_vars.get('OS_AUTH_URL'),
         'username': openrc_vars.get('OS_USERNAME'),
@@ -144,24 +394,34 @@ def get_ostack_connection(openrc_vars):
         'identity_api_version': openrc_vars.get('OS_IDENTITY_API_VERSION'),
         'volume_api_version': openrc_vars.get('OS_VOLUME_API_VERSION')
     }
-    auth = v3.Password(**auth_args)
-    ostack_sess = session.Session(auth=auth)
+    session_key = tuple(sorted((i_key, i_value) for i_key, i_value in openrc_vars.items() if i_key != 'OS_PROJECT_NAME'))
+    with OSTACK_SESSIONS_LOCK:
+        if base_sess := OSTACK_SESSIONS.get(session_key):
+            auth = ProjectRescopedToken(base_sess,
+                                        auth_url=auth_args['auth_url'],
+                                        project_name=auth_args['project_name'],
+                                        project_domain_name=auth_args['project_domain_name'],
+                                        project_domain_id=auth_args['project_domain_id'])
+            ostack_sess = session.Session(auth=auth, session=base_sess.session)
+        else:
+            auth = v3.Password(**auth_args)
+            ostack_sess = OSTACK_SESSIONS[session_key] = session.Session(auth=auth)
     ostack_conn = openstack.connection.Connection(session=ostack_sess, **connection_args)
     return ostack_conn
 
 
-def get_ostack_project(ostack_connection, project_name):
-    """ return a project by name """
+def get_ostack_project(ostack_connection, project_name, domain_id=None):
+    """ return a project by name (keystone name filtered query, optionally scoped to domain) """
     project = None
-    for i_project in ostack_connection.list_projects():
-        if i_project.name == project_name:
-            project = i_project
+    for i_project in ostack_connection.identity.projects(name=project_name,
+                                                         **({'domain_id': domain_id} if domain_id else {})):
+        project = i_project
     return project
 
 
-def get_ostack_project_type(ostack_connection, project):
+def get_ostack_project_type(ostack_connection, project, domain_id=None):
     """ detect project type, return 'group' / 'personal' / 'other' """
-    if project.name in [i_user.name for i_user in ostack_connection.list_users()]:
+    for _ in ostack_connection.identity.users(name=project.name, **({'domain_id': domain_id} if domain_id else {})):
         return "personal"
     return "group"
 
@@ -171,30 +431,131 @@ def get_ostack_project_servers(ostack_connection):
     return tuple(ostack_connection.compute.servers())
 
 
-def remote_cmd_exec(hostname, username, key_filename, command):
-    """ executes remote command, returs stdout, stderr and exit-code or Exception """
-    # Create SSH client
-    ssh_client = paramiko.SSHClient()
-    # Automatically add untrusted hosts
-    ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-    try:
+def get_ssh_client(hostname, username, key_filename):
+    """ return pooled SSH client connected to the remote host, (re)connect when its transport is not active """
+    pool_key = (hostname, username, key_filename)
+    with SSH_CLIENTS_LOCK:
+        ssh_client = SSH_CLIENTS.get(pool_key)
+        ssh_transport = ssh_client.get_transport() if ssh_client else None
+        if ssh_transport and ssh_transport.is_active():
+            return ssh_client
+        if ssh_client:
+            ssh_client.close()
+
+        # Create SSH client
+        ssh_client = paramiko.SSHClient()
+        # Automatically add untrusted hosts
+        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         # Connect to the remote host
         pkey = paramiko.RSAKey.from_private_key_file(key_filename)
         ssh_client.connect(hostname, username=username, pkey=pkey, look_for_keys=False)
+        ssh_client.get_transport().set_keepalive(SSH_KEEPALIVE_INTERVAL)
+        SSH_CLIENTS[pool_key] = ssh_client
+        return ssh_client
+
+
+def close_ssh_client(hostname, username, key_filename):
+    """ close and forget single pooled SSH client """
+    with SSH_CLIENTS_LOCK:
+        ssh_client = SSH_CLIENTS.pop((hostname, username, key_filename), None)
+        if ssh_client:
+            ssh_client.close()
+
+
+def close_ssh_clients():
+    """ close all pooled SSH clients """
+    with SSH_CLIENTS_LOCK:
+        for i_ssh_client in SSH_CLIENTS.values():
+            i_ssh_client.close()
+        SSH_CLIENTS.clear()
+
+
+def split_remote_cmd_output_lines(pending, data, line_callback):
+    """ pass complete lines (terminated by CR or LF) of pending + data to line_callback, return incomplete rest """
+    *lines, pending = re.split(rb'[\r\n]', pending + data)
+    for i_line in lines:
+        if i_line.strip():
+            line_callback(i_line.decode(errors='replace').strip())
+    return pending
+
+
+def read_remote_cmd_output(channel, stdout_callback=None, stderr_callback=None):
+    """ read remote command stdout and stderr while passing every line to stdout_callback / stderr_callback """
+    output, error, output_line, error_line = b'', b'', b'', b''
+    while not channel.exit_status_ready() or channel.recv_ready() or channel.recv_stderr_ready():
+        if channel.recv_stderr_ready():
+            data = channel.recv_stderr(REMOTE_CMD_RECV_SIZE)
+            error += data
+            if stderr_callback:
+                error_line = split_remote_cmd_output_lines(error_line, data, stderr_callback)
+        elif channel.recv_ready():
+            data = channel.recv(REMOTE_CMD_RECV_SIZE)
+            output += data
+            if stdout_callback:
+                output_line = split_remote_cmd_output_lines(output_line, data, stdout_callback)
+        else:
+            time.sleep(REMOTE_CMD_POLL_INTERVAL)
+    if stdout_callback and output_line.strip():
+        stdout_callback(output_line.decode(errors='replace').strip())
+    if stderr_callback and error_line.strip():
+        stderr_callback(error_line.decode(errors='replace').strip())
+    return output, error
+
+
+def remote_cmd_exec(hostname, username, key_filename, command, stderr_callback=None, stdout_callback=None, logger=None):
+    """ executes remote command over pooled SSH connection, returs stdout, stderr and exit-code
+        (REMOTE_CMD_FAILURE_ECODE when command could not be executed, logged with logger)
+        stderr_callback / stdout_callback (if defined) receive output lines as they arrive (progress reporting) """
+    try:
+        # every command runs in its own channel multiplexed over the pooled transport
+        try:
+            _, stdout, stderr = get_ssh_client(hostname, username, key_filename).exec_command(command)
+        except paramiko.SSHException:
+            # pooled transport died in the meantime, reconnect once
+            close_ssh_client(hostname, username, key_filename)
+            _, stdout, stderr = get_ssh_client(hostname, username, key_filename).exec_command(command)
+
+        # read the output and exit-code, channel gets closed
+        if stderr_callback or stdout_callback:
+            output, error = read_remote_cmd_output(stdout.channel, stdout_callback, stderr_callback)
+            output = (output + stdout.read()).decode().strip()
+            error = (error + stderr.read()).decode().strip()
+        else:
+            output = stdout.read().decode().strip()
+            error = stderr.read().decode().strip()
+        ecode = stdout.channel.recv_exit_status()
+        stdout.channel.close()
+
+        return output, error, ecode
+
+    except Exception as e:
+        (logger or logging.getLogger(__name__)).error(f"Remote command failed ({command}): {e}")
+        return "", str(e), REMOTE_CMD_FAILURE_ECODE
 
-        # Execute the command, read the output and close
-        _, stdout, stderr = ssh_client.exec_command(command)
-        output = stdout.read().decode().strip()
+
+def remote_cmd_exec_stream(hostname, username, key_filename, command, stdout_chunk_callback, logger=None):
+    """ executes remote command over pooled SSH connection, stdout is not kept but passed in chunks
+        to stdout_chunk_callback as it arrives (large outputs), returns stderr and exit-code
+        (REMOTE_CMD_FAILURE_ECODE when command could not be executed, logged with logger) """
+    try:
+        try:
+            _, stdout, stderr = get_ssh_client(hostname, username, key_filename).exec_command(command)
+        except paramiko.SSHException:
+            # pooled transport died in the meantime, reconnect once
+            close_ssh_client(hostname, username, key_filename)
+            _, stdout, stderr = get_ssh_client(hostname, username, key_filename).exec_command(command)
+
+        while data := stdout.read(REMOTE_CMD_RECV_SIZE):
+            stdout_chunk_callback(data)
         error = stderr.read().decode().strip()
         ecode = stdout.channel.recv_exit_status()
-        ssh_client.close()
+        stdout.channel.close()
 
-        return output, error, ecode
+        return error, ecode
 
     except Exception as e:
-        print("Error:", e)
-        return None, None, e
+        (logger or logging.getLogger(__name__)).error(f"Remote command failed ({command}): {e}")
+        return str(e), REMOTE_CMD_FAILURE_ECODE
 
 
 def assert_entity_ownership(entities, project):
@@ -212,33 +573,101 @@ def log_or_assert(args, msg, condition, trace_details=None, msg_guidance=''):
     args.logger.info(msg)
 
 
-def wait_for_ostack_server_status(ostack_connection, server_name_or_id, server_status, timeout=600):
-    """ wait for VM server getting expected state """
+def get_wait_intervals(backoff=None):
+    """ generate polling sleep intervals (exponential backoff with jitter) """
+    int_backoff = WAIT_BACKOFF | (backoff or {})
+    int_interval = int_backoff['initial_interval']
+    while True:
+        int_jitter = random.uniform(-int_backoff['jitter'], int_backoff['jitter'])
+        yield min(int_interval, int_backoff['max_interval']) * (1 + int_jitter)
+        int_interval *= int_backoff['factor']
+
+
+def wait_for_ostack_resources_status(get_statuses, resource_ids, resource_status, error_statuses, timeout, backoff=None):
+    """ wait for resources getting expected state, stop early when resource gets to an error state
+        get_statuses(ids) returns {id: status} of requested resources, returns {id: last-seen-status} """
     int_start_timestamp = time.time()
-    int_server = ostack_connection.compute.find_server(server_name_or_id)
-    int_server_status = None
+    int_statuses = dict.fromkeys(resource_ids)
+    int_wait_intervals = get_wait_intervals(backoff)
     while True:
-        if time.time() > (int_start_timestamp + timeout):
+        int_pending_ids = [i_id for i_id, i_status in int_statuses.items()
+                           if i_status != resource_status and i_status not in error_statuses]
+        if not int_pending_ids:
             break
-        int_server_status = ostack_connection.compute.find_server(int_server.id).status
-        if int_server_status == server_status:
+        int_statuses |= get_statuses(int_pending_ids)
+        if all(i_status == resource_status or i_status in error_statuses for i_status in int_statuses.values()):
+            break
+        if time.time() > (int_start_timestamp + timeout):
             break
-        time.sleep(10)
+        time.sleep(next(int_wait_intervals))
+
+    return int_statuses
+
+
+def get_ostack_servers_statuses(ostack_connection, server_ids):
+    """ return {id: status} of servers, many servers are polled with single list call """
+    if len(server_ids) >= WAIT_BATCH_THRESHOLD:
+        int_statuses = {i_server.id: i_server.status for i_server in ostack_connection.compute.servers()
+                        if i_server.id in server_ids}
+    else:
+        int_statuses = {}
+    for i_server_id in set(server_ids) - set(int_statuses):
+        int_server = ostack_connection.compute.find_server(i_server_id)
+        int_statuses[i_server_id] = int_server.status if int_server else None
+    return int_statuses
+
 
-    return int_server_status
+def get_ostack_volumes_statuses(ostack_connection, volume_ids):
+    """ return {id: status} of volumes, many volumes are polled with single list call """
+    if len(volume_ids) >= WAIT_BATCH_THRESHOLD:
+        int_statuses = {i_volume.id: i_volume.status for i_volume in ostack_connection.block_storage.volumes(details=True)
+                        if i_volume.id in volume_ids}
+    else:
+        int_statuses = {}
+    for i_volume_id in set(volume_ids) - set(int_statuses):
+        int_volume = ostack_connection.block_storage.find_volume(i_volume_id)
+        int_statuses[i_volume_id] = int_volume.status if int_volume else None
+    return int_statuses
 
 
-def wait_for_ostack_volume_status(ostack_connection, volume_name_or_id, volume_status, timeout=300):
+def get_ostack_volume_snapshots_statuses(ostack_connection, volume_snapshot_ids):
+    """ return {id: status} of volume snapshots, many volume snapshots are polled with single list call """
+    if len(volume_snapshot_ids) >= WAIT_BATCH_THRESHOLD:
+        int_statuses = {i_volume_snapshot.id: i_volume_snapshot.status for i_volume_snapshot in ostack_connection.block_storage.snapshots(details=True)
+                        if i_volume_snapshot.id in volume_snapshot_ids}
+    else:
+        int_statuses = {}
+    for i_volume_snapshot_id in set(volume_snapshot_ids) - set(int_statuses):
+        int_volume_snapshot = ostack_connection.block_storage.find_snapshot(i_volume_snapshot_id)
+        int_statuses[i_volume_snapshot_id] = int_volume_snapshot.status if int_volume_snapshot else None
+    return int_statuses
+
+
+def wait_for_ostack_servers_status(ostack_connection, server_ids, server_status, timeout=600, backoff=None):
+    """ wait for VM servers getting expected state, returns {id: status} """
+    return wait_for_ostack_resources_status(lambda ids: get_ostack_servers_statuses(ostack_connection, ids),
+                                            server_ids, server_status, SERVER_ERROR_STATUSES, timeout, backoff)
+
+
+def wait_for_ostack_volumes_status(ostack_connection, volume_ids, volume_status, timeout=300, backoff=None):
+    """ wait for volumes getting expected state, returns {id: status} """
+    return wait_for_ostack_resources_status(lambda ids: get_ostack_volumes_statuses(ostack_connection, ids),
+                                            volume_ids, volume_status, VOLUME_ERROR_STATUSES, timeout, backoff)
+
+
+def wait_for_ostack_volume_snapshots_status(ostack_connection, volume_snapshot_ids, volume_snapshot_status, timeout=300, backoff=None):
+    """ wait for volume snapshots getting expected state, returns {id: status} """
+    return wait_for_ostack_resources_status(lambda ids: get_ostack_volume_snapshots_statuses(ostack_connection, ids),
+                                            volume_snapshot_ids, volume_snapshot_status, VOLUME_SNAPSHOT_ERROR_STATUSES, timeout, backoff)
+
+
+def wait_for_ostack_server_status(ostack_connection, server_name_or_id, server_status, timeout=600, backoff=None):
+    """ wait for VM server getting expected state """
+    int_server = ostack_connection.compute.find_server(server_name_or_id)
+    return wait_for_ostack_servers_status(ostack_connection, [int_server.id], server_status, timeout, backoff)[int_server.id]
+
+
+def wait_for_ostack_volume_status(ostack_connection, volume_name_or_id, volume_status, timeout=300, backoff=None):
     """ wait for volume getting expected state """
-    int_start_timestamp = time.time()
     int_volume = ostack_connection.block_storage.find_volume(volume_name_or_id)
-    int_volume_status = None
-    while True:
-        if time.time() > (int_start_timestamp + timeout):
-            break
-        int_volume_status = ostack_connection.block_storage.find_volume(int_volume.id).status
-        if int_volume_status == volume_status:
-            break
-        time.sleep(10)
-
-    return int_volume_status
+    return wait_for_ostack_volumes_status(ostack_connection, [int_volume.id], volume_status, timeout, backoff)[int_volume.id]
@@ -1,17 +1,32 @@
 """ OpenStack migrator - OpenStack library """
 
+import concurrent.futures
 import copy
 import inspect
 import ipaddress
+import json
 import math
+import os
 import os.path
+import threading
+import urllib.parse
+import xml.etree.ElementTree
 
 import openstack
 import openstack.exceptions
-import xmltodict
 
 import clib
-from lib import log_or_assert, get_dst_resource_name, get_dst_secgroup_name, get_dst_resource_desc, remote_cmd_exec, normalize_table_data, trim_dict, wait_for_ostack_volume_status
+from lib import log_or_assert, get_resource_lock, get_migration_journal_entity, get_volume_snapshot_migration_journal_entity, journal_get, journal_record, journal_record_destination_volume, get_dst_resource_name, get_dst_secgroup_name, get_dst_resource_desc, remote_cmd_exec, remote_cmd_exec_stream, trim_dict, wait_for_ostack_volumes_status, wait_for_ostack_volume_snapshots_status
+
+# source keypairs dump (nova_api.key_pairs) fields needed for keypair migration
+SOURCE_KEYPAIR_FIELDS = ('name', 'user_id', 'public_key', 'type')
+
+# objstore object data are streamed between clouds in chunks [B], never staged on local disk
+OBJSTORE_STREAM_CHUNK_SIZE = 1024 * 1024
+# segments of destination static large objects (SLO) are stored in <container>_segments container
+OBJSTORE_SEGMENTS_CONTAINER_SUFFIX = "_segments"
+# destination object metadata holding source object ETag (destination SLO manifest ETag differs from source one)
+OBJSTORE_SOURCE_ETAG_METADATA = "migrated-source-etag"
 
 
 def get_destination_network(source_network):
@@ -121,80 +136,181 @@ def get_destination_flavor(source_flavor):
     return flavor_mapping[source_flavor]
 
 
+# OpenStack resource types cached on connection, resource type: (proxy name, list method, find method)
+OSTACK_CACHED_RESOURCE_TYPES = {
+    'network': ('network', 'networks', 'find_network'),
+    'subnet': ('network', 'subnets', 'find_subnet'),
+    'router': ('network', 'routers', 'find_router'),
+    'port': ('network', 'ports', 'find_port'),
+    'security_group': ('network', 'security_groups', 'find_security_group'),
+    'flavor': ('compute', 'flavors', 'find_flavor'),
+    'keypair': ('compute', 'keypairs', 'find_keypair'),
+}
+# guards lazy creation of per-connection resource cache locks
+OSTACK_RESOURCE_CACHE_LOCKS_LOCK = threading.Lock()
+
+
+def get_ostack_resource_cache_lock(ostack_connection):
+    """ return lock of the connection guarding its resource cache and port index (shared by server migration threads) """
+    with OSTACK_RESOURCE_CACHE_LOCKS_LOCK:
+        if not hasattr(ostack_connection, 'migrator_resource_cache_lock'):
+            ostack_connection.migrator_resource_cache_lock = threading.RLock()
+        return ostack_connection.migrator_resource_cache_lock
+
+
+def get_ostack_resource_cache(ostack_connection):
+    """ return (per-run) resource cache of the connection, {resource_type: {id: resource}}
+        and resource name index {resource_type: {name: {id: resource}}}, caller holds get_ostack_resource_cache_lock() """
+    if not hasattr(ostack_connection, 'migrator_resource_cache'):
+        ostack_connection.migrator_resource_cache = {i_resource_type: {} for i_resource_type in OSTACK_CACHED_RESOURCE_TYPES}
+        ostack_connection.migrator_resource_name_index = {i_resource_type: {} for i_resource_type in OSTACK_CACHED_RESOURCE_TYPES}
+    return ostack_connection.migrator_resource_cache, ostack_connection.migrator_resource_name_index
+
+
+def get_ostack_port_index(ostack_connection):
+    """ return port index of the connection, ports keyed by MAC address, (network_id, IP address) and device_id,
+        caller holds get_ostack_resource_cache_lock() """
+    if not hasattr(ostack_connection, 'migrator_port_index'):
+        ostack_connection.migrator_port_index = {'project_ids': set(), 'mac_address': {}, 'network_ip': {}, 'device_id': {}}
+    return ostack_connection.migrator_port_index
+
+
+def index_ostack_port(ostack_connection, port):
+    """ add (created / received) port into connection port index """
+    with get_ostack_resource_cache_lock(ostack_connection):
+        int_port_index = get_ostack_port_index(ostack_connection)
+        int_port_index['mac_address'].setdefault(port.mac_address, {})[port.id] = port
+        for i_fixed_ip in port.fixed_ips or []:
+            int_port_index['network_ip'].setdefault((port.network_id, i_fixed_ip.get('ip_address')), {})[port.id] = port
+        if port.device_id:
+            int_port_index['device_id'].setdefault(port.device_id, {})[port.id] = port
+
+
+def cache_ostack_resource(ostack_connection, resource_type, resource):
+    """ store (created / received) resource in connection resource cache, returns the resource """
+    if resource:
+        with get_ostack_resource_cache_lock(ostack_connection):
+            int_resource_cache, int_resource_name_index = get_ostack_resource_cache(ostack_connection)
+            if (int_cached_resource := int_resource_cache[resource_type].get(resource.id)) and int_cached_resource.name != resource.name:
+                int_resource_name_index[resource_type].get(int_cached_resource.name, {}).pop(resource.id, None)
+            int_resource_cache[resource_type][resource.id] = resource
+            int_resource_name_index[resource_type].setdefault(resource.name, {})[resource.id] = resource
+            if resource_type == 'port':
+                index_ostack_port(ostack_connection, resource)
+    return resource
+
+
+def prefetch_ostack_project_resources(ostack_connection, project):
+    """ receive project networks, subnets, routers, ports, security groups, flavors and keypairs once into connection resource cache """
+    for i_resource_type, (i_proxy_name, i_list_method_name, _) in OSTACK_CACHED_RESOURCE_TYPES.items():
+        i_list_args = {'project_id': project.id} if i_proxy_name == 'network' else {}
+        for i_resource in getattr(getattr(ostack_connection, i_proxy_name), i_list_method_name)(**i_list_args):
+            cache_ostack_resource(ostack_connection, i_resource_type, i_resource)
+    with get_ostack_resource_cache_lock(ostack_connection):
+        get_ostack_port_index(ostack_connection)['project_ids'].add(project.id)
+        int_resource_cache, _ = get_ostack_resource_cache(ostack_connection)
+        return {i_resource_type: len(i_resources) for i_resource_type, i_resources in int_resource_cache.items()}
+
+
+def find_ostack_resource(ostack_connection, resource_type, name_or_id, project_id=None):
+    """ find resource by id or (unambiguous) name in connection resource cache, fall back to find_* call and cache the result """
+    with get_ostack_resource_cache_lock(ostack_connection):
+        int_resource_cache, int_resource_name_index = get_ostack_resource_cache(ostack_connection)
+        int_candidate_resources = dict(int_resource_name_index[resource_type].get(name_or_id, {}))
+        if int_resource := int_resource_cache[resource_type].get(name_or_id):
+            int_candidate_resources[int_resource.id] = int_resource
+    int_matching_resources = [i_resource for i_resource in int_candidate_resources.values()
+                              if project_id is None or getattr(i_resource, 'project_id', None) == project_id]
+    if len(int_matching_resources) == 1:
+        return int_matching_resources[0]
+
+    int_proxy_name, _, int_find_method_name = OSTACK_CACHED_RESOURCE_TYPES[resource_type]
+    int_find_args = {'project_id': project_id} if project_id else {}
+    return cache_ostack_resource(ostack_connection, resource_type,
+                                 getattr(getattr(ostack_connection, int_proxy_name), int_find_method_name)(name_or_id, **int_find_args))
+
+
 def create_destination_networking(args, src_ostack_conn, dst_ostack_conn, src_project, dst_project, src_network_name):
     """ Create matching OpenStack networking (network, subnet, router) """
     # read source network details
-    src_network = src_ostack_conn.network.find_network(src_network_name, project_id=src_project.id)
+    src_network = find_ostack_resource(src_ostack_conn, 'network', src_network_name, project_id=src_project.id)
     # read matching subnets details
-    src_subnets = [src_ostack_conn.network.find_subnet(i_src_subnet_id) for i_src_subnet_id in src_network.subnet_ids]
+    src_subnets = [find_ostack_resource(src_ostack_conn, 'subnet', i_src_subnet_id) for i_src_subnet_id in src_network.subnet_ids]
     # read linked routers
     src_network_router_ports = [i_src_router_port for i_src_router_port in src_ostack_conn.list_ports(filters={'network_id': src_network.id}) if
                                 i_src_router_port.device_owner == 'network:router_interface']
-    src_network_routers_subnets = [(src_ostack_conn.network.find_router(router_port.device_id), [rp_fixed_ip['subnet_id'] for rp_fixed_ip in router_port.fixed_ips if 'subnet_id' in rp_fixed_ip]) for
+    src_network_routers_subnets = [(find_ostack_resource(src_ostack_conn, 'router', router_port.device_id), [rp_fixed_ip['subnet_id'] for rp_fixed_ip in router_port.fixed_ips if 'subnet_id' in rp_fixed_ip]) for
                                    router_port in src_network_router_ports]
 
     # read external network
-    dst_ext_network = dst_ostack_conn.network.find_network(args.destination_ipv4_external_network)
+    dst_ext_network = find_ostack_resource(dst_ostack_conn, 'network', args.destination_ipv4_external_network)
 
     # create network
     dst_network_name = get_dst_resource_name(args, src_network_name)
-    dst_network = dst_ostack_conn.network.find_network(dst_network_name,
-                                                       project_id=dst_project.id)
-    if not dst_network:
-        dst_network = dst_ostack_conn.network.create_network(name=dst_network_name,
-                                                             project_id=dst_project.id,
-                                                             mtu=src_network.mtu,
-                                                             description=get_dst_resource_desc(args,
-                                                                                               src_network.description,
-                                                                                               src_network.id),
-                                                             port_security_enabled=src_network.is_port_security_enabled)
-
-    # create subnets
-    dst_subnets = []
-    subnet_mapping = {}
-    for i_src_subnet in src_subnets:
-        i_dst_subnet_name = get_dst_resource_name(args, i_src_subnet.name)
-        i_dst_subnet = dst_ostack_conn.network.find_subnet(i_dst_subnet_name, project_id=dst_project.id)
-        if not i_dst_subnet:
-            i_dst_subnet = dst_ostack_conn.network.create_subnet(network_id=dst_network.id,
-                                                                 name=i_dst_subnet_name,
-                                                                 cidr=i_src_subnet.cidr,
-                                                                 ip_version=i_src_subnet.ip_version,
-                                                                 enable_dhcp=i_src_subnet.is_dhcp_enabled,
+    with get_resource_lock('network', dst_network_name):
+        dst_network = find_ostack_resource(dst_ostack_conn, 'network', dst_network_name,
+                                           project_id=dst_project.id)
+        if not dst_network:
+            dst_network = dst_ostack_conn.network.create_network(name=dst_network_name,
                                                                  project_id=dst_project.id,
-                                                                 allocation_pools=i_src_subnet.allocation_pools,
-                                                                 gateway_ip=i_src_subnet.gateway_ip,
-                                                                 host_routes=i_src_subnet.host_routes,
-                                                                 dns_nameservers=i_src_subnet.dns_nameservers,
+                                                                 mtu=src_network.mtu,
                                                                  description=get_dst_resource_desc(args,
-                                                                                                   i_src_subnet.description,
-                                                                                                   i_src_subnet.id))
-        subnet_mapping[i_src_subnet.id] = i_dst_subnet.id
-        dst_subnets.append(i_dst_subnet)
-
-    # create router(s) and associate with subnet(s) (if needed)
-    dst_network_routers = []
-    for i_src_network_router, i_src_network_router_subnets in src_network_routers_subnets:
-
-        i_dst_network_router_name = get_dst_resource_name(args, i_src_network_router.name)
-        i_dst_network_router = dst_ostack_conn.network.find_router(i_dst_network_router_name,
-                                                                   project_id=dst_project.id)
-        if not i_dst_network_router:
-            i_dst_network_router = dst_ostack_conn.network.create_router(name=i_dst_network_router_name,
-                                                                         description=get_dst_resource_desc(args,
-                                                                                                           i_src_network_router.description,
-                                                                                                           i_src_network_router.id),
-                                                                         project_id=dst_project.id,
-                                                                         external_gateway_info={"network_id": dst_ext_network.id})
-            for i_src_network_router_subnet in i_src_network_router_subnets:
-                # TODO: Principally there may be also foreign subnets, find more general solution
-                if i_src_network_router_subnet in subnet_mapping:
-                    dst_ostack_conn.add_router_interface(i_dst_network_router, subnet_id=subnet_mapping[i_src_network_router_subnet])
-
-        dst_network_routers.append(i_dst_network_router)
-
-    dst_network = dst_ostack_conn.network.find_network(dst_network.id,
-                                                       project_id=dst_project.id)
+                                                                                                   src_network.description,
+                                                                                                   src_network.id),
+                                                                 port_security_enabled=src_network.is_port_security_enabled)
+            cache_ostack_resource(dst_ostack_conn, 'network', dst_network)
+
+        # create subnets
+        dst_subnets = []
+        subnet_mapping = {}
+        for i_src_subnet in src_subnets:
+            i_dst_subnet_name = get_dst_resource_name(args, i_src_subnet.name)
+            i_dst_subnet = find_ostack_resource(dst_ostack_conn, 'subnet', i_dst_subnet_name, project_id=dst_project.id)
+            if not i_dst_subnet:
+                i_dst_subnet = dst_ostack_conn.network.create_subnet(network_id=dst_network.id,
+                                                                     name=i_dst_subnet_name,
+                                                                     cidr=i_src_subnet.cidr,
+                                                                     ip_version=i_src_subnet.ip_version,
+                                                                     enable_dhcp=i_src_subnet.is_dhcp_enabled,
+                                                                     project_id=dst_project.id,
+                                                                     allocation_pools=i_src_subnet.allocation_pools,
+                                                                     gateway_ip=i_src_subnet.gateway_ip,
+                                                                     host_routes=i_src_subnet.host_routes,
+                                                                     dns_nameservers=i_src_subnet.dns_nameservers,
+                                                                     description=get_dst_resource_desc(args,
+                                                                                                       i_src_subnet.description,
+                                                                                                       i_src_subnet.id))
+                cache_ostack_resource(dst_ostack_conn, 'subnet', i_dst_subnet)
+            subnet_mapping[i_src_subnet.id] = i_dst_subnet.id
+            dst_subnets.append(i_dst_subnet)
+
+        # create router(s) and associate with subnet(s) (if needed)
+        dst_network_routers = []
+        for i_src_network_router, i_src_network_router_subnets in src_network_routers_subnets:
+
+            i_dst_network_router_name = get_dst_resource_name(args, i_src_network_router.name)
+            with get_resource_lock('router', i_dst_network_router_name):
+                i_dst_network_router = find_ostack_resource(dst_ostack_conn, 'router', i_dst_network_router_name,
+                                                            project_id=dst_project.id)
+                if not i_dst_network_router:
+                    i_dst_network_router = dst_ostack_conn.network.create_router(name=i_dst_network_router_name,
+                                                                                 description=get_dst_resource_desc(args,
+                                                                                                                   i_src_network_router.description,
+                                                                                                                   i_src_network_router.id),
+                                                                                 project_id=dst_project.id,
+                                                                                 external_gateway_info={"network_id": dst_ext_network.id})
+                    cache_ostack_resource(dst_ostack_conn, 'router', i_dst_network_router)
+                    for i_src_network_router_subnet in i_src_network_router_subnets:
+                        # TODO: Principally there may be also foreign subnets, find more general solution
+                        if i_src_network_router_subnet in subnet_mapping:
+                            dst_ostack_conn.add_router_interface(i_dst_network_router, subnet_id=subnet_mapping[i_src_network_router_subnet])
+
+            dst_network_routers.append(i_dst_network_router)
+
+    # refresh network details (subnets got created), bypass the cache
+    dst_network = cache_ostack_resource(dst_ostack_conn, 'network',
+                                        dst_ostack_conn.network.find_network(dst_network.id,
+                                                                             project_id=dst_project.id))
 
     return dst_network, dst_subnets, dst_network_routers
 
@@ -282,15 +398,15 @@ def get_or_create_dst_server_networking(args,
         if i_dst_server_port_network_name:
             # we got network name mapping, it is likely that destination network exists
             # detect whether we have destination network searching in the destination project
-            i_destination_network = destination_project_conn.network.find_network(i_dst_server_port_network_name,
-                                                                                  project_id=destination_project.id)
+            i_destination_network = find_ostack_resource(destination_project_conn, 'network', i_dst_server_port_network_name,
+                                                         project_id=destination_project.id)
         args.logger.debug(f"Destination network searched in the destination project ({i_destination_network})")
 
         if i_dst_server_port_network_name and not i_destination_network:
             # we got network name mapping, it is likely that destination network exists, but not in the project
             # detect whether we have destination network searching globally
             try:
-                i_destination_network = destination_project_conn.network.find_network(i_dst_server_port_network_name)
+                i_destination_network = find_ostack_resource(destination_project_conn, 'network', i_dst_server_port_network_name)
             except openstack.exceptions.DuplicateResource:
                 pass
         args.logger.debug(f"Destination network searched in the project and then globally ({i_destination_network})")
@@ -313,6 +429,79 @@ def get_or_create_dst_server_networking(args,
     return server_network_addresses
 
 
+def plan_destination_networking(args, src_ostack_conn, dst_ostack_conn, src_project, dst_project, src_network_name):
+    """ plan matching OpenStack networking (network, subnets, routers) as create_destination_networking() would, no cloud modification
+        returns destination network (None when network gets created) and networking plan """
+    src_network = find_ostack_resource(src_ostack_conn, 'network', src_network_name, project_id=src_project.id)
+    src_network_router_ports = [i_src_router_port for i_src_router_port in src_ostack_conn.list_ports(filters={'network_id': src_network.id}) if
+                                i_src_router_port.device_owner == 'network:router_interface']
+
+    dst_network_name = get_dst_resource_name(args, src_network_name)
+    dst_network = find_ostack_resource(dst_ostack_conn, 'network', dst_network_name, project_id=dst_project.id)
+    networking_plan = {'network': {'name': dst_network_name, 'action': 'reuse' if dst_network else 'create'},
+                       'subnets': [],
+                       'routers': []}
+    for i_src_subnet_id in src_network.subnet_ids:
+        i_src_subnet = find_ostack_resource(src_ostack_conn, 'subnet', i_src_subnet_id)
+        i_dst_subnet_name = get_dst_resource_name(args, i_src_subnet.name)
+        i_dst_subnet = find_ostack_resource(dst_ostack_conn, 'subnet', i_dst_subnet_name, project_id=dst_project.id)
+        networking_plan['subnets'].append({'name': i_dst_subnet_name, 'cidr': i_src_subnet.cidr,
+                                           'action': 'reuse' if i_dst_subnet else 'create'})
+    for i_src_router_port in src_network_router_ports:
+        i_src_network_router = find_ostack_resource(src_ostack_conn, 'router', i_src_router_port.device_id)
+        i_dst_network_router_name = get_dst_resource_name(args, i_src_network_router.name)
+        i_dst_network_router = find_ostack_resource(dst_ostack_conn, 'router', i_dst_network_router_name, project_id=dst_project.id)
+        networking_plan['routers'].append({'name': i_dst_network_router_name,
+                                           'external_network': args.destination_ipv4_external_network,
+                                           'action': 'reuse' if i_dst_network_router else 'create'})
+    return dst_network, networking_plan
+
+
+def plan_dst_server_networking(args,
+                               source_project_conn, destination_project_conn,
+                               source_project, destination_project,
+                               source_server):
+    """ plan server networking and ports as get_or_create_dst_server_networking() and create_dst_servers_network_connections() would, no cloud modification """
+    server_networking_plan = []
+    for i_src_server_port_network_name, i_src_server_port_network_addresses in source_server.addresses.items():
+        i_src_server_fixed_addresses = [i_item for i_item in i_src_server_port_network_addresses if i_item['OS-EXT-IPS:type'] == 'fixed']
+        log_or_assert(args, f"F.3 Source server ostack fixed address detected ({i_src_server_port_network_name})",
+                      i_src_server_fixed_addresses)
+        i_src_server_ports = find_ostack_port(source_project_conn, i_src_server_fixed_addresses[0]['OS-EXT-IPS-MAC:mac_addr'],
+                                              i_src_server_fixed_addresses[0]['addr'], device=source_server)
+        log_or_assert(args, "F.3 Source server ostack single (unambiguous) port detected", len(i_src_server_ports) == 1)
+        i_src_server_port = i_src_server_ports[0]
+        i_dst_server_port_network_name = get_destination_network(i_src_server_port_network_name)
+
+        i_destination_network = None
+        if i_dst_server_port_network_name:
+            i_destination_network = find_ostack_resource(destination_project_conn, 'network', i_dst_server_port_network_name,
+                                                         project_id=destination_project.id)
+            if not i_destination_network:
+                try:
+                    i_destination_network = find_ostack_resource(destination_project_conn, 'network', i_dst_server_port_network_name)
+                except openstack.exceptions.DuplicateResource:
+                    pass
+
+        if i_destination_network:
+            i_networking_plan = {'network': {'name': i_destination_network.name, 'action': 'reuse'}, 'subnets': [], 'routers': []}
+        else:
+            i_destination_network, i_networking_plan = plan_destination_networking(args,
+                                                                                   source_project_conn, destination_project_conn,
+                                                                                   source_project, destination_project,
+                                                                                   i_src_server_port_network_name)
+
+        i_src_server_port_ip = i_src_server_port.fixed_ips[0]['ip_address']
+        i_dst_server_ports = find_ostack_port(destination_project_conn, i_src_server_port.mac_address, i_src_server_port_ip,
+                                              description_substr=i_src_server_port.id,
+                                              project=destination_project, network=i_destination_network) if i_destination_network else []
+        i_networking_plan['port'] = {'mac_address': i_src_server_port.mac_address,
+                                     'ip_address': i_src_server_port_ip,
+                                     'action': 'reuse' if len(i_dst_server_ports) == 1 else 'create'}
+        server_networking_plan.append({'source_network': i_src_server_port_network_name} | i_networking_plan)
+    return server_networking_plan
+
+
 def get_dst_server_flavor(args, src_server, dst_ostack_conn):
     """ translate and return destination server flavor object """
     source_server_flavor_name = src_server.flavor.name
@@ -321,7 +510,7 @@ def get_dst_server_flavor(args, src_server, dst_ostack_conn):
     log_or_assert(args,
                   f"F.5 Source to Destination flavor mapping succeeeded ({source_server_flavor_name}->{destination_server_flavor_name})",
                   destination_server_flavor_name)
-    destination_server_flavor = dst_ostack_conn.compute.find_flavor(destination_server_flavor_name)
+    destination_server_flavor = find_ostack_resource(dst_ostack_conn, 'flavor', destination_server_flavor_name)
     log_or_assert(args,
                   "F.6 Destination OpenStack flavor exists",
                   destination_server_flavor)
@@ -337,7 +526,7 @@ def get_dst_server_flavor_name_noassert(args, src_server, dst_ostack_conn):
     if destination_server_flavor_name:
         args.logger.info(f"F.5 Source to Destination flavor mapping succeeeded ({source_server_flavor_name}->{destination_server_flavor_name})")
 
-        destination_server_flavor = dst_ostack_conn.compute.find_flavor(destination_server_flavor_name)
+        destination_server_flavor = find_ostack_resource(dst_ostack_conn, 'flavor', destination_server_flavor_name)
 
         if destination_server_flavor:
             args.logger.info(f"F.6 Destination OpenStack flavor exists in destination project ({destination_server_flavor_name})")
@@ -349,50 +538,117 @@ def get_dst_server_flavor_name_noassert(args, src_server, dst_ostack_conn):
     return destination_server_flavor_name
 
 
-def download_source_keypairs(args):
-    """ download/receive source openstack keypairs from ceph migrator host as xml formatted sql dump """
+def plan_dst_server_flavor(args, src_server, dst_ostack_conn):
+    """ plan destination server flavor mapping, no cloud modification """
+    destination_server_flavor_name = get_dst_server_flavor_name_noassert(args, src_server, dst_ostack_conn)
+    return {'source': src_server.flavor.name,
+            'destination': destination_server_flavor_name,
+            'exists': bool(destination_server_flavor_name and find_ostack_resource(dst_ostack_conn, 'flavor', destination_server_flavor_name))}
+
+
+def get_source_keypairs_dump_stat(args):
+    """ receive source openstack keypairs xml dump modification time and size (ceph migrator host) """
     reply_stdout, _, reply_ecode = remote_cmd_exec(args.ceph_migrator_host,
                                                    args.ceph_migrator_user,
                                                    args.ceph_migrator_sshkeyfile.name,
-                                                   f"cat {args.source_keypair_xml_dump_file}")
-    assert reply_ecode == 0, "Keypairs received"
-    table_dictdata = xmltodict.parse(reply_stdout)
-    table_data_dictdata = table_dictdata['mysqldump']['database']['table_data']['row']
-    return normalize_table_data(table_data_dictdata)
+                                                   f"stat -c '%Y %s' {args.source_keypair_xml_dump_file}",
+                                                   logger=args.logger)
+    assert reply_ecode == 0, "Keypairs dump file stat received"
+    mtime, size = reply_stdout.split()
+    return {'file': args.source_keypair_xml_dump_file, 'mtime': int(mtime), 'size': int(size)}
+
+
+def load_source_keypairs_cache(args, dump_stat):
+    """ load source keypairs from local cache if cached dump file modification time and size match """
+    if not args.source_keypair_cache_file or not os.path.isfile(args.source_keypair_cache_file):
+        return None
+    try:
+        with open(args.source_keypair_cache_file, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return cache['keypairs'] if cache.get('dump') == dump_stat else None
+
+
+def save_source_keypairs_cache(args, dump_stat, keypairs):
+    """ store source keypairs into local cache (atomic replace) """
+    if not args.source_keypair_cache_file:
+        return
+    with open(f"{args.source_keypair_cache_file}.tmp", "w", encoding="utf-8") as file:
+        json.dump({'dump': dump_stat, 'keypairs': keypairs}, file)
+    os.replace(f"{args.source_keypair_cache_file}.tmp", args.source_keypair_cache_file)
+
+
+def index_keypairs(keypairs):
+    """ index keypairs list of dicts by name and user_id ({name: {user_id: [keypair, ...]}}) """
+    keypairs_index = {}
+    for i_keypair in keypairs:
+        keypairs_index.setdefault(i_keypair.get('name', ""), {}).setdefault(i_keypair.get('user_id', ""), []).append(i_keypair)
+    return keypairs_index
 
 
-def filter_keypairs(keypairs, filter_filed_name, filter_field_value):
-    """ filter keypairs list of dicts by value of a field """
-    return [i_keypair for i_keypair in keypairs if i_keypair.get(filter_filed_name, "") == filter_field_value]
+def download_source_keypairs(args):
+    """ download/receive source openstack keypairs from ceph migrator host as xml formatted sql dump,
+        dump is parsed while streamed (only SOURCE_KEYPAIR_FIELDS are kept) and cached locally,
+        download is skipped when remote dump modification time and size match the cache,
+        returns keypairs index ({name: {user_id: [keypair, ...]}}) """
+    dump_stat = get_source_keypairs_dump_stat(args)
+    if (keypairs := load_source_keypairs_cache(args, dump_stat)) is not None:
+        args.logger.info(f"D.04 Source OpenStack cloud keypairs loaded from local cache ({args.source_keypair_cache_file})")
+        return index_keypairs(keypairs)
+
+    keypairs = []
+    parser = xml.etree.ElementTree.XMLPullParser(events=('end',))
+
+    def parse_keypairs_chunk(data):
+        """ parse streamed dump chunk, keep selected fields of completed table rows only """
+        parser.feed(data)
+        for _, i_element in parser.read_events():
+            if i_element.tag == 'row':
+                keypairs.append({i_field.get('name'): i_field.text for i_field in i_element.iter('field')
+                                 if i_field.get('name') in SOURCE_KEYPAIR_FIELDS})
+                i_element.clear()
+
+    _, reply_ecode = remote_cmd_exec_stream(args.ceph_migrator_host,
+                                            args.ceph_migrator_user,
+                                            args.ceph_migrator_sshkeyfile.name,
+                                            f"cat {args.source_keypair_xml_dump_file}",
+                                            parse_keypairs_chunk,
+                                            logger=args.logger)
+    assert reply_ecode == 0, "Keypairs received"
+    parser.close()
+    save_source_keypairs_cache(args, dump_stat, keypairs)
+    return index_keypairs(keypairs)
 
 
 def create_keypair(args, ostack_connection, keypair):
     """ create openstack keypair object """
-    return ostack_connection.compute.create_keypair(name=get_dst_resource_name(args, keypair['name']),
-                                                    public_key=keypair['public_key'], type=keypair['type'])
+    return cache_ostack_resource(ostack_connection, 'keypair',
+                                 ostack_connection.compute.create_keypair(name=get_dst_resource_name(args, keypair['name']),
+                                                                          public_key=keypair['public_key'], type=keypair['type']))
 
 
 def get_src_server_keypair(args, source_keypairs, src_server):
-    """ obtain single keypair from list of all source server keypairs """
+    """ obtain single keypair from index of all source server keypairs """
     # select keypairs based on key_name only
-    source_keypairs_by_name = filter_keypairs(source_keypairs, "name", src_server.key_name)
+    source_keypairs_by_name = source_keypairs.get(src_server.key_name, {})
     log_or_assert(args,
                   f"F.7 Source OpenStack server keypair found ({src_server.key_name}).",
                   source_keypairs_by_name,
                   msg_guidance="Current source OpenStack cloud keypair dump is outdated already and does not contain mentioned keypair. "
                                "Re-dump source OpenStack keypairs to ceph migrator server node and retry migration.")
     # select keypairs based on key_name and user_id
-    source_keypairs_by_name_and_user = filter_keypairs(source_keypairs_by_name, "user_id", src_server.user_id)
+    source_keypairs_by_name_and_user = source_keypairs_by_name.get(src_server.user_id, [])
     log_or_assert(args,
                   f"F.7 Single (unambiguous) Source OpenStack server keypair found ({src_server.key_name}) when searching with key_name only.",
-                  len(source_keypairs_by_name_and_user) > 0 or len(source_keypairs_by_name) < 2,
+                  source_keypairs_by_name_and_user or sum(len(i_keypairs) for i_keypairs in source_keypairs_by_name.values()) < 2,
                   msg_guidance="We encountered situation when we are unable to detect source keypair. Search with (key_name, used_id) returned "
                                "no result and search with key_name only returned multiple results. "
                                "Most likely it is necessary to reimplement olib.get_or_create_dst_server_keypair().")
     if not source_keypairs_by_name_and_user:
         args.logger.warning(f"F.7 No source keypair found when selecting by (key_name={src_server.key_name}, used_id={src_server.user_id}). "
                             "Using selection by key_name only.")
-        return source_keypairs_by_name[0]
+        return next(iter(source_keypairs_by_name.values()))[0]
     if len(source_keypairs_by_name_and_user) > 1:
         args.logger.warning(f"F.7 Multiple source keypairs found when searching with (key_name={src_server.key_name}, used_id={src_server.user_id}). "
                             "Picking the first detected keypair.")
@@ -401,21 +657,20 @@ def get_src_server_keypair(args, source_keypairs, src_server):
 
 def get_or_create_dst_server_keypair(args, source_keypairs, src_server, dst_ostack_conn):
     """ assure destination cloud keypair exists """
-    if destination_server_keypairs := [i_keypair for i_keypair in dst_ostack_conn.list_keypairs()
-                                       if i_keypair.name == get_dst_resource_name(args,
-                                                                                  src_server.key_name)]:
-        destination_server_keypair = destination_server_keypairs[0]
-        log_or_assert(args,
-                      f"F.8 Destination OpenStack server keypair found already ({destination_server_keypair.name})",
-                      destination_server_keypair)
-    else:
-        if str(src_server.key_name) != 'None':
-            destination_server_keypair = create_keypair(args,
-                                                        dst_ostack_conn,
-                                                        get_src_server_keypair(args, source_keypairs, src_server))
-            args.logger.info("F.8 Destination OpenStack server keypair created")
+    with get_resource_lock('keypair', get_dst_resource_name(args, src_server.key_name)):
+        if destination_server_keypair := find_ostack_resource(dst_ostack_conn, 'keypair',
+                                                              get_dst_resource_name(args, src_server.key_name)):
+            log_or_assert(args,
+                          f"F.8 Destination OpenStack server keypair found already ({destination_server_keypair.name})",
+                          destination_server_keypair)
         else:
-            args.logger.info("F.8 Destination OpenStack server keypair not created as source server does not have it")
+            if str(src_server.key_name) != 'None':
+                destination_server_keypair = create_keypair(args,
+                                                            dst_ostack_conn,
+                                                            get_src_server_keypair(args, source_keypairs, src_server))
+                args.logger.info("F.8 Destination OpenStack server keypair created")
+            else:
+                args.logger.info("F.8 Destination OpenStack server keypair not created as source server does not have it")
     if str(src_server.key_name) != 'None':
         log_or_assert(args,
                      f"F.9 Destination OpenStack server keypair exists ({destination_server_keypair.name})",
@@ -426,42 +681,123 @@ def get_or_create_dst_server_keypair(args, source_keypairs, src_server, dst_osta
     return destination_server_keypair
 
 
-def create_security_groups(args, src_ostack_conn, dst_ostack_conn, src_security_group, dst_project, recursion_stack=None):
-    """ create openstack security group[s] """
-    int_recursion_stack = {} if recursion_stack is None else recursion_stack
-    int_sg = dst_ostack_conn.network.create_security_group(name=get_dst_secgroup_name(args, src_security_group.name),
-                                                           description=get_dst_resource_desc(args,
-                                                                                             src_security_group.description,
-                                                                                             src_security_group.id),
-                                                           project_id=dst_project.id)
-    int_recursion_stack[src_security_group.id] = int_sg.id
-
-    for i_rule in src_security_group.security_group_rules:
-        # browse security group rules
-        i_mod_rule = trim_dict(i_rule, denied_keys=['id', 'project_id', 'tenant_id', 'revision_number', 'updated_at', 'created_at', 'tags', 'standard_attr_id', 'normalized_cidr'])
-        i_mod_rule['security_group_id'] = int_sg.id
-        i_mod_rule['project_id'] = dst_project.id
-        i_mod_rule = {i_k: i_mod_rule[i_k] for i_k in i_mod_rule if i_mod_rule[i_k] is not None}
-        if i_mod_rule.get('remote_group_id') is not None:
-            if i_mod_rule['remote_group_id'] in int_recursion_stack:
-                # keep reference to itself or known (already created) SGs
-                i_mod_rule['remote_group_id'] = int_recursion_stack[i_mod_rule['remote_group_id']]
-            # get linked source SG
-            elif _src_sg := src_ostack_conn.network.find_security_group(i_mod_rule['remote_group_id']):
-                if _dst_sg := dst_ostack_conn.network.find_security_group(get_dst_secgroup_name(args, _src_sg.name),
-                                                                          project_id=dst_project.id):
-                    i_mod_rule['remote_group_id'] = _dst_sg.id
-                else:
-                    int_linked_sg = create_security_groups(args, src_ostack_conn, dst_ostack_conn,
-                                                           _src_sg, dst_project,
-                                                           copy.deepcopy(int_recursion_stack))
-                    i_mod_rule['remote_group_id'] = int_linked_sg.id
-        try:
-            dst_ostack_conn.network.create_security_group_rule(**i_mod_rule)
-        except openstack.exceptions.ConflictException:
-            pass
-
-    return int_sg
+def plan_dst_server_keypair(args, source_keypairs, src_server, dst_ostack_conn):
+    """ plan destination cloud keypair (reuse or create), no cloud modification """
+    if str(src_server.key_name) == 'None':
+        return None
+    destination_server_keypair_name = get_dst_resource_name(args, src_server.key_name)
+    if find_ostack_resource(dst_ostack_conn, 'keypair', destination_server_keypair_name):
+        return {'source': src_server.key_name, 'destination': destination_server_keypair_name, 'action': 'reuse'}
+    get_src_server_keypair(args, source_keypairs, src_server)
+    return {'source': src_server.key_name, 'destination': destination_server_keypair_name, 'action': 'create'}
+
+
+# security group rule fields identifying the rule (neutron rejects duplicate rules with equal values of these fields)
+SECURITY_GROUP_RULE_KEY_FIELDS = ('direction', 'ethertype', 'protocol', 'port_range_min', 'port_range_max',
+                                  'remote_ip_prefix', 'remote_group_id', 'remote_address_group_id')
+
+
+def get_security_group_rule_key(rule):
+    """ return hashable security group rule identity """
+    return tuple(rule.get(i_field) for i_field in SECURITY_GROUP_RULE_KEY_FIELDS)
+
+
+def get_security_groups_creation_order(src_ostack_conn, src_security_groups):
+    """ return src_security_groups and security groups they reference (remote_group_id) ordered topologically,
+        referenced security groups precede referencing ones, cycles are broken at first revisited security group """
+    int_security_groups = {i_sg.id: i_sg for i_sg in src_security_groups}
+    int_ordered_security_groups = {}
+    int_visited_ids = set()
+    for i_src_security_group in src_security_groups:
+        # iterative depth-first search, stack of (security group, expanded)
+        int_stack = [(i_src_security_group, False)]
+        while int_stack:
+            j_security_group, j_expanded = int_stack.pop()
+            if j_expanded:
+                int_ordered_security_groups[j_security_group.id] = j_security_group
+                continue
+            if j_security_group.id in int_visited_ids:
+                continue
+            int_visited_ids.add(j_security_group.id)
+            int_stack.append((j_security_group, True))
+            for j_remote_group_id in {j_rule.get('remote_group_id') for j_rule in j_security_group.security_group_rules}:
+                if not j_remote_group_id or j_remote_group_id in int_visited_ids:
+                    continue
+                if j_remote_group_id not in int_security_groups:
+                    int_security_groups[j_remote_group_id] = find_ostack_resource(src_ostack_conn, 'security_group', j_remote_group_id)
+                if int_security_groups[j_remote_group_id]:
+                    int_stack.append((int_security_groups[j_remote_group_id], False))
+    return list(int_ordered_security_groups.values())
+
+
+def reconcile_security_groups(args, src_ostack_conn, dst_ostack_conn, src_security_groups, dst_project):
+    """ create missing destination security groups of src_security_groups (and security groups they reference)
+        and their missing rules, returns {source security group id: destination security group}
+
+        destination security groups are listed once, security groups are created in topological order before any rule,
+        so remote group references (cycles included) are resolvable, missing rules are computed as set difference and
+        created with single bulk request per security group (rule by rule when bulk request conflicts) """
+    int_src_security_groups = get_security_groups_creation_order(src_ostack_conn, src_security_groups)
+    int_dst_security_groups = {}
+    for i_dst_security_group in dst_ostack_conn.network.security_groups(project_id=dst_project.id):
+        int_dst_security_groups.setdefault(i_dst_security_group.name, []).append(i_dst_security_group)
+
+    # create missing security groups, destination security group matches by name and source security group id in description
+    int_security_group_mapping = {}
+    for i_src_security_group in int_src_security_groups:
+        i_dst_security_group_name = get_dst_secgroup_name(args, i_src_security_group.name)
+        i_dst_security_group = next((j_dst_security_group
+                                     for j_dst_security_group in int_dst_security_groups.get(i_dst_security_group_name, [])
+                                     if i_src_security_group.id in (j_dst_security_group.description or '')), None)
+        if not i_dst_security_group:
+            i_dst_security_group = cache_ostack_resource(
+                dst_ostack_conn, 'security_group',
+                dst_ostack_conn.network.create_security_group(name=i_dst_security_group_name,
+                                                              description=get_dst_resource_desc(args,
+                                                                                                i_src_security_group.description,
+                                                                                                i_src_security_group.id),
+                                                              project_id=dst_project.id))
+            int_dst_security_groups.setdefault(i_dst_security_group_name, []).append(i_dst_security_group)
+            args.logger.info(f"E.40 Destination OpenStack security group created ({i_dst_security_group_name})")
+        int_security_group_mapping[i_src_security_group.id] = i_dst_security_group
+
+    # create missing rules
+    for i_src_security_group in int_src_security_groups:
+        i_dst_security_group = int_security_group_mapping[i_src_security_group.id]
+        i_dst_rule_keys = {get_security_group_rule_key(i_rule) for i_rule in i_dst_security_group.security_group_rules or []}
+        i_missing_rules = {}
+        for j_rule in i_src_security_group.security_group_rules:
+            j_mod_rule = trim_dict(j_rule, denied_keys=['id', 'project_id', 'tenant_id', 'revision_number', 'updated_at', 'created_at', 'tags', 'standard_attr_id', 'normalized_cidr'])
+            j_mod_rule['security_group_id'] = i_dst_security_group.id
+            j_mod_rule['project_id'] = dst_project.id
+            j_mod_rule = {j_k: j_mod_rule[j_k] for j_k in j_mod_rule if j_mod_rule[j_k] is not None}
+            if j_mod_rule.get('remote_group_id') is not None:
+                if j_mod_rule['remote_group_id'] not in int_security_group_mapping:
+                    args.logger.warning(f"E.40 Source OpenStack security group {i_src_security_group.name} rule references "
+                                        f"security group {j_mod_rule['remote_group_id']} which was not found, rule is skipped")
+                    continue
+                j_mod_rule['remote_group_id'] = int_security_group_mapping[j_mod_rule['remote_group_id']].id
+            if (j_rule_key := get_security_group_rule_key(j_mod_rule)) not in i_dst_rule_keys:
+                i_missing_rules[j_rule_key] = j_mod_rule
+        if i_missing_rules:
+            try:
+                dst_ostack_conn.network.create_security_group_rules(list(i_missing_rules.values()))
+                i_created_rules_count = len(i_missing_rules)
+            except openstack.exceptions.ConflictException:
+                # some of the rules exist already (created concurrently or listed stale), bulk request is rejected as whole
+                args.logger.warning(f"E.40 Destination OpenStack security group rules bulk creation conflicts ({i_dst_security_group.name}), "
+                                    "creating rules one by one")
+                i_created_rules_count = 0
+                for j_rule in i_missing_rules.values():
+                    try:
+                        dst_ostack_conn.network.create_security_group_rule(**j_rule)
+                        i_created_rules_count += 1
+                    except openstack.exceptions.ConflictException:
+                        pass
+            args.logger.info(f"E.40 Destination OpenStack security group rules created ({i_dst_security_group.name}, "
+                             f"{i_created_rules_count} rules)")
+
+    return int_security_group_mapping
 
 
 def duplicate_ostack_project_security_groups(args, src_ostack_conn, dst_ostack_conn, src_project, dst_project):
@@ -469,16 +805,10 @@ def duplicate_ostack_project_security_groups(args, src_ostack_conn, dst_ostack_c
 
     src_project_security_groups = tuple(src_ostack_conn.network.security_groups(project_id=src_project.id))
 
-    for i_src_security_group in src_project_security_groups:
-        j_dst_security_group_found = False
-        for j_dst_security_group in tuple(dst_ostack_conn.network.security_groups(project_id=dst_project.id)):
-            if get_dst_secgroup_name(args, i_src_security_group.name) == j_dst_security_group.name and \
-                    i_src_security_group.id in j_dst_security_group.description:
-                j_dst_security_group_found = True
-        if not j_dst_security_group_found:
-            create_security_groups(args, src_ostack_conn, dst_ostack_conn, i_src_security_group, dst_project)
+    dst_security_group_mapping = reconcile_security_groups(args, src_ostack_conn, dst_ostack_conn,
+                                                           src_project_security_groups, dst_project)
 
-    return src_project_security_groups, tuple(dst_ostack_conn.network.security_groups(project_id=dst_project.id))
+    return src_project_security_groups, tuple(dst_security_group_mapping.values())
 
 
 def get_or_create_dst_server_security_groups(args, src_ostack_conn, dst_ostack_conn, src_project, dst_project, src_server):
@@ -486,21 +816,24 @@ def get_or_create_dst_server_security_groups(args, src_ostack_conn, dst_ostack_c
     dst_server_security_groups = []
     if src_server.security_groups:
         for i_src_server_security_group_name in {i_sg['name'] for i_sg in src_server.security_groups}:
-            i_src_server_security_group = src_ostack_conn.network.find_security_group(i_src_server_security_group_name,
-                                                                                      project_id=src_project.id)
-            if i_dst_server_security_group := dst_ostack_conn.network.find_security_group(get_dst_secgroup_name(args,
-                                                                                                                i_src_server_security_group.name),
-                                                                                          project_id=dst_project.id):
-                log_or_assert(args,
-                              f"F.10 Destination OpenStack server security group found already ({i_dst_server_security_group.name})",
-                              i_dst_server_security_group)
-            else:
-                args.logger.info("F.10 Destination OpenStack server matching security group not found and gets created.")
-                i_dst_server_security_group = create_security_groups(args, src_ostack_conn, dst_ostack_conn,
-                                                                     i_src_server_security_group, dst_project)
-                log_or_assert(args,
-                              f"F.10 Destination OpenStack server security group created ({i_dst_server_security_group.name})",
-                              i_dst_server_security_group)
+            i_src_server_security_group = find_ostack_resource(src_ostack_conn, 'security_group', i_src_server_security_group_name,
+                                                               project_id=src_project.id)
+            # linked security groups may get created as well, serialize project security group creation
+            with get_resource_lock('security-groups', dst_project.id):
+                if i_dst_server_security_group := find_ostack_resource(dst_ostack_conn, 'security_group',
+                                                                       get_dst_secgroup_name(args, i_src_server_security_group.name),
+                                                                       project_id=dst_project.id):
+                    log_or_assert(args,
+                                  f"F.10 Destination OpenStack server security group found already ({i_dst_server_security_group.name})",
+                                  i_dst_server_security_group)
+                else:
+                    args.logger.info("F.10 Destination OpenStack server matching security group not found and gets created.")
+                    i_dst_server_security_group = reconcile_security_groups(args, src_ostack_conn, dst_ostack_conn,
+                                                                            [i_src_server_security_group],
+                                                                            dst_project)[i_src_server_security_group.id]
+                    log_or_assert(args,
+                                  f"F.10 Destination OpenStack server security group created ({i_dst_server_security_group.name})",
+                                  i_dst_server_security_group)
 
             log_or_assert(args,
                           f"F.11 Destination OpenStack server security group exists ({i_dst_server_security_group.name})",
@@ -515,13 +848,43 @@ def get_or_create_dst_server_security_groups(args, src_ostack_conn, dst_ostack_c
     return dst_server_security_groups
 
 
-def get_server_block_device_mapping(args, server_volume_attachment, server_volume, server_root_device_name):
+def plan_dst_server_security_groups(args, src_ostack_conn, dst_ostack_conn, src_project, dst_project, src_server):
+    """ plan destination cloud security groups (reuse or create), no cloud modification """
+    dst_server_security_groups_plan = []
+    for i_src_server_security_group_name in sorted({i_sg['name'] for i_sg in src_server.security_groups or []}):
+        i_src_server_security_group = find_ostack_resource(src_ostack_conn, 'security_group', i_src_server_security_group_name,
+                                                           project_id=src_project.id)
+        i_dst_server_security_group_name = get_dst_secgroup_name(args, i_src_server_security_group.name)
+        i_dst_server_security_group = find_ostack_resource(dst_ostack_conn, 'security_group', i_dst_server_security_group_name,
+                                                           project_id=dst_project.id)
+        dst_server_security_groups_plan.append({'source': i_src_server_security_group_name,
+                                                'destination': i_dst_server_security_group_name,
+                                                'action': 'reuse' if i_dst_server_security_group else 'create'})
+    return dst_server_security_groups_plan
+
+
+def get_src_volume_snapshots(args, src_ostack_conn, volume_id):
+    """ return available source volume snapshots (oldest first) migrated together with the volume (--migrate-volume-snapshots),
+        cinder RBD driver keeps volume snapshot as RBD image snapshot snapshot-<id> """
+    if not args.migrate_volume_snapshots:
+        return []
+    src_volume_snapshots = sorted(src_ostack_conn.block_storage.snapshots(details=True, volume_id=volume_id),
+                                  key=lambda i_volume_snapshot: i_volume_snapshot.created_at)
+    return [{'id': i_volume_snapshot.id,
+             'name': i_volume_snapshot.name,
+             'description': i_volume_snapshot.description,
+             'rbd_snapshot_name': f"snapshot-{i_volume_snapshot.id}"}
+            for i_volume_snapshot in src_volume_snapshots if i_volume_snapshot.status == 'available']
+
+
+def get_server_block_device_mapping(args, src_ostack_conn, server_volume_attachment, server_volume, server_root_device_name):
     """ return server block device mapping item """
     return {'source': {'block_storage_type': 'openstack-volume-ceph-rbd-image',
                        'volume_attachment_id': server_volume_attachment.id,
                        'volume_id': server_volume.id,
                        'ceph_pool_name': args.source_ceph_cinder_pool_name,
-                       'ceph_rbd_image_name': server_volume.id},
+                       'ceph_rbd_image_name': server_volume.id,
+                       'volume_snapshots': get_src_volume_snapshots(args, src_ostack_conn, server_volume.id)},
             'destination': {'volume_size': server_volume.size,
                             'volume_name': get_dst_resource_name(args, server_volume.name),
                             'volume_description': server_volume.description,
@@ -537,7 +900,8 @@ def create_server_block_device_mappings(args, src_ostack_conn, src_server, sourc
     # schema: [ {}, ... ]
     # where {} is following dict
     # { 'source': {'block_storage_type': 'openstack-volume-ceph-rbd-image', 'volume_attachment_id': <>, 'volume_id': <>,
-    #              'ceph_pool_name': <pool-name>, 'ceph_rbd_image_name': <rbd-image-name>, 'ceph_rbd_image_size': <size-gb>}
+    #              'ceph_pool_name': <pool-name>, 'ceph_rbd_image_name': <rbd-image-name>, 'ceph_rbd_image_size': <size-gb>,
+    #              'volume_snapshots': [{'id': <>, 'name': <>, 'description': <>, 'rbd_snapshot_name': <>}, ...]}
     #             OR
     #             {'block_storage_type': 'ceph-rbd-image', 'ceph_pool_name': <pool-name>, 'ceph_rbd_image_name': <rbd-image-name>, 'ceph_rbd_image_size': <size-gb> } ]
     #   'destination': {'volume_size': <size-gb>, 'volume_id': <vol-id>, 'device_name': <dev-name>, 'volume_bootable': True/False}
@@ -557,7 +921,7 @@ def create_server_block_device_mappings(args, src_ostack_conn, src_server, sourc
         # populate server_block_device_mappings
         for i_source_server_volume_attachment in src_server_volume_attachments:
             i_server_volume = src_ostack_conn.block_storage.find_volume(i_source_server_volume_attachment.volume_id)
-            server_block_device_mappings.append(get_server_block_device_mapping(args, i_source_server_volume_attachment,
+            server_block_device_mappings.append(get_server_block_device_mapping(args, src_ostack_conn, i_source_server_volume_attachment,
                                                                                 i_server_volume, src_server_root_device_name))
     else:
         args.logger.info("F.22 Source OpenStack server - none of attached volumes is attached as the root partition. Seeking for root partition RBD image")
@@ -598,6 +962,7 @@ def create_server_block_device_mappings(args, src_ostack_conn, src_server, sourc
             for i_source_server_volume_attachment in src_server_volume_attachments:
                 i_server_volume = src_ostack_conn.block_storage.find_volume(i_source_server_volume_attachment.volume_id)
                 server_block_device_mappings.append(get_server_block_device_mapping(args,
+                                                                                    src_ostack_conn,
                                                                                     i_source_server_volume_attachment,
                                                                                     i_server_volume,
                                                                                     src_server_root_device_name))
@@ -612,17 +977,67 @@ def create_server_block_device_mappings(args, src_ostack_conn, src_server, sourc
     return server_block_device_mappings
 
 
-def create_dst_server_volumes_update_block_device_mappings(args, server_block_device_mappings, dst_ostack_conn, destination_image):
-    """ create destination cloud volumes and final destination server to block storage mappings """
+def get_journal_dst_volume(args, dst_ostack_conn, journal_entity):
+    """ return available destination volume recorded in migration journal (F.30) or None """
+    if (journal_volume_id := journal_get(args, journal_entity, "F.30")) and \
+            (journal_volume := dst_ostack_conn.block_storage.find_volume(journal_volume_id)) and \
+            journal_volume.status == 'available':
+        return journal_volume
+    return None
+
+
+def get_dst_managed_rbd_image_name(server_block_device_mapping):
+    """ return name of destination RBD image which is migrated first and then managed as destination volume """
+    return f"g1-g2-migration-managed-{server_block_device_mapping['source']['ceph_rbd_image_name']}"
+
+
+def wait_for_dst_volumes_update_block_device_mappings(args, dst_ostack_conn, new_volumes, journal_record_volume):
+    """ wait for new destination volumes {id: (volume, block device mapping, journal entity)} together (F.30),
+        store volume IDs of available ones into block device mappings and record them into migration journal """
+    new_volumes_statuses = wait_for_ostack_volumes_status(dst_ostack_conn, list(new_volumes), 'available')
+    for i_new_volume_id, (i_new_volume, i_dst_server_block_device_mapping, i_journal_entity) in new_volumes.items():
+        if new_volumes_statuses[i_new_volume_id] != 'available':
+            args.logger.error(f"F.30 Destination OpenStack volume not available (name:{i_new_volume.name}, id:{i_new_volume_id}, "
+                              f"status:{new_volumes_statuses[i_new_volume_id]})")
+            continue
+        args.logger.info(f"F.30 Destination OpenStack volume available (name:{i_new_volume.name}, id:{i_new_volume_id})")
+        i_dst_server_block_device_mapping['destination']['volume_id'] = i_new_volume_id
+        journal_record_volume(args, i_journal_entity, "F.30", i_new_volume_id)
+    log_or_assert(args,
+                  f"F.30 Destination OpenStack volumes available ({len(new_volumes)} volumes)",
+                  all(i_status == 'available' for i_status in new_volumes_statuses.values()), locals())
+
+
+def create_dst_server_volumes_update_block_device_mappings(args, server_block_device_mappings, dst_ostack_conn, destination_image,
+                                                           manage_volumes=False):
+    """ create destination cloud volumes and final destination server to block storage mappings,
+        all volumes are created first and then waited for together,
+        manage_volumes defers volume creation after RBD image migration (see manage_dst_server_volumes_update_block_device_mappings()) """
     out_server_block_device_mappings = copy.deepcopy(server_block_device_mappings)
+    new_volumes = {}
     for i_dst_server_block_device_mapping in out_server_block_device_mappings:
+        i_journal_entity = get_migration_journal_entity(i_dst_server_block_device_mapping)
+        if i_journal_volume := get_journal_dst_volume(args, dst_ostack_conn, i_journal_entity):
+            args.logger.info(f"F.30 Destination OpenStack volume reused from migration journal (name:{i_journal_volume.name}, id:{i_journal_volume.id})")
+            i_dst_server_block_device_mapping['destination']['volume_id'] = i_journal_volume.id
+            continue
+
+        if manage_volumes:
+            i_dst_server_block_device_mapping['destination']['ceph_rbd_image_name'] = \
+                get_dst_managed_rbd_image_name(i_dst_server_block_device_mapping)
+            args.logger.info(f"F.29 Destination OpenStack volume gets managed once RBD image is migrated "
+                             f"(name:{i_dst_server_block_device_mapping['destination']['volume_name']}, "
+                             f"rbd image:{i_dst_server_block_device_mapping['destination']['ceph_rbd_image_name']})")
+            continue
+
         i_new_volume_args = {'name': i_dst_server_block_device_mapping['destination']['volume_name'],
                              'size': i_dst_server_block_device_mapping['destination']['volume_size'],
                              'description': get_dst_resource_desc(args,
                                                                   i_dst_server_block_device_mapping['destination']['volume_description'],
                                                                   i_dst_server_block_device_mapping['source']['volume_id'])}
 
-        # TODO: this seems to be the only way how to create bootable volume using openstacksdk, check again
+        # volume created from destination image is bootable and carries image metadata (volume_image_metadata) used
+        # by nova when booting, image data are overwritten by migrated RBD image
         if i_dst_server_block_device_mapping['destination']['volume_bootable']:
             i_new_volume_args['imageRef'] = destination_image.id
 
@@ -630,13 +1045,52 @@ def create_dst_server_volumes_update_block_device_mappings(args, server_block_de
         log_or_assert(args,
                       f"F.29 Destination OpenStack volume created (name:{i_new_volume.name}, id:{i_new_volume.id})",
                       i_new_volume)
-        wait_for_ostack_volume_status(dst_ostack_conn, i_new_volume.id, 'available')
+        new_volumes[i_new_volume.id] = (i_new_volume, i_dst_server_block_device_mapping, i_journal_entity)
+
+    if new_volumes:
+        # new destination volume invalidates recorded destination RBD image migration steps
+        wait_for_dst_volumes_update_block_device_mappings(args, dst_ostack_conn, new_volumes, journal_record_destination_volume)
+
+    if not manage_volumes:
+        for i_dst_server_block_device_mapping in out_server_block_device_mappings:
+            log_or_assert(args,
+                          f"F.31 Destination OpenStack volume IDs properly stored (id:{i_dst_server_block_device_mapping['destination']['volume_id']})",
+                          i_dst_server_block_device_mapping['destination']['volume_id'])
+    return out_server_block_device_mappings
+
+
+def manage_dst_server_volumes_update_block_device_mappings(args, server_block_device_mappings, dst_ostack_conn):
+    """ register migrated destination RBD images as destination cloud volumes (cinder manage-existing, bootable flag set),
+        all volumes are managed first and then waited for together """
+    out_server_block_device_mappings = copy.deepcopy(server_block_device_mappings)
+    new_volumes = {}
+    for i_dst_server_block_device_mapping in out_server_block_device_mappings:
+        if i_dst_server_block_device_mapping['destination']['volume_id']:
+            continue
+        i_journal_entity = get_migration_journal_entity(i_dst_server_block_device_mapping)
+        if i_journal_volume := get_journal_dst_volume(args, dst_ostack_conn, i_journal_entity):
+            args.logger.info(f"F.30 Destination OpenStack volume reused from migration journal (name:{i_journal_volume.name}, id:{i_journal_volume.id})")
+            i_dst_server_block_device_mapping['destination']['volume_id'] = i_journal_volume.id
+            continue
+
+        # cinder RBD driver renames managed RBD image to volume-<id>
+        i_new_volume = dst_ostack_conn.block_storage.manage_volume(
+            host=args.destination_cinder_volume_host,
+            ref={'source-name': i_dst_server_block_device_mapping['destination']['ceph_rbd_image_name']},
+            name=i_dst_server_block_device_mapping['destination']['volume_name'],
+            description=get_dst_resource_desc(args,
+                                              i_dst_server_block_device_mapping['destination']['volume_description'],
+                                              i_dst_server_block_device_mapping['source']['volume_id']),
+            bootable=i_dst_server_block_device_mapping['destination']['volume_bootable'])
         log_or_assert(args,
-                      f"F.30 Destination OpenStack volume available (name:{i_new_volume.name}, id:{i_new_volume.id})",
-                      wait_for_ostack_volume_status(dst_ostack_conn, i_new_volume.id, 'available') == 'available')
+                      f"F.29 Destination OpenStack volume managed (name:{i_new_volume.name}, id:{i_new_volume.id}, "
+                      f"rbd image:{i_dst_server_block_device_mapping['destination']['ceph_rbd_image_name']})",
+                      i_new_volume)
+        new_volumes[i_new_volume.id] = (i_new_volume, i_dst_server_block_device_mapping, i_journal_entity)
 
-        # remember volume ID
-        i_dst_server_block_device_mapping['destination']['volume_id'] = i_new_volume.id
+    if new_volumes:
+        # managed volume holds migrated RBD image, recorded RBD image migration steps stay valid
+        wait_for_dst_volumes_update_block_device_mappings(args, dst_ostack_conn, new_volumes, journal_record)
 
     for i_dst_server_block_device_mapping in out_server_block_device_mappings:
         log_or_assert(args,
@@ -645,9 +1099,108 @@ def create_dst_server_volumes_update_block_device_mappings(args, server_block_de
     return out_server_block_device_mappings
 
 
-def describe_server_network_connection(args, dst_ostack_conn, dst_project, netaddr_dict):
-    """ create ostack server to network connection via network id or fixed-ip
-        retults in single dictionary fed to conn.compute.create_server(...networks=[ <>, ...])
+def manage_dst_volume_snapshots(args, server_block_device_mappings, dst_ostack_conn):
+    """ register destination RBD image snapshots transferred with source volume snapshots as destination volume snapshots
+        (cinder manage-existing), all volume snapshots are managed first and then waited for together """
+    new_volume_snapshots = {}
+    for i_dst_server_block_device_mapping in server_block_device_mappings:
+        for i_src_volume_snapshot in i_dst_server_block_device_mapping['source'].get('volume_snapshots', []):
+            i_journal_entity = get_volume_snapshot_migration_journal_entity(i_src_volume_snapshot)
+            if (i_journal_volume_snapshot_id := journal_get(args, i_journal_entity, "F.44")) and \
+                    (i_journal_volume_snapshot := dst_ostack_conn.block_storage.find_snapshot(i_journal_volume_snapshot_id)) and \
+                    i_journal_volume_snapshot.status == 'available':
+                args.logger.info(f"F.44 Destination OpenStack volume snapshot reused from migration journal "
+                                 f"(name:{i_journal_volume_snapshot.name}, id:{i_journal_volume_snapshot.id})")
+                continue
+
+            # cinder RBD driver renames managed RBD image snapshot to snapshot-<id>
+            i_new_volume_snapshot = dst_ostack_conn.block_storage.manage_snapshot(
+                volume_id=i_dst_server_block_device_mapping['destination']['volume_id'],
+                ref={'source-name': i_src_volume_snapshot['rbd_snapshot_name']},
+                name=get_dst_resource_name(args, i_src_volume_snapshot['name'] or ''),
+                description=get_dst_resource_desc(args, i_src_volume_snapshot['description'], i_src_volume_snapshot['id']))
+            log_or_assert(args,
+                          f"F.43 Destination OpenStack volume snapshot managed (name:{i_new_volume_snapshot.name}, id:{i_new_volume_snapshot.id}, "
+                          f"volume id:{i_dst_server_block_device_mapping['destination']['volume_id']})",
+                          i_new_volume_snapshot)
+            new_volume_snapshots[i_new_volume_snapshot.id] = (i_new_volume_snapshot, i_journal_entity)
+
+    if not new_volume_snapshots:
+        return
+    new_volume_snapshots_statuses = wait_for_ostack_volume_snapshots_status(dst_ostack_conn, list(new_volume_snapshots), 'available')
+    for i_new_volume_snapshot_id, (i_new_volume_snapshot, i_journal_entity) in new_volume_snapshots.items():
+        if new_volume_snapshots_statuses[i_new_volume_snapshot_id] != 'available':
+            args.logger.error(f"F.44 Destination OpenStack volume snapshot not available (name:{i_new_volume_snapshot.name}, "
+                              f"id:{i_new_volume_snapshot_id}, status:{new_volume_snapshots_statuses[i_new_volume_snapshot_id]})")
+            continue
+        args.logger.info(f"F.44 Destination OpenStack volume snapshot available (name:{i_new_volume_snapshot.name}, id:{i_new_volume_snapshot_id})")
+        journal_record(args, i_journal_entity, "F.44", i_new_volume_snapshot_id)
+    log_or_assert(args,
+                  f"F.44 Destination OpenStack volume snapshots available ({len(new_volume_snapshots)} volume snapshots)",
+                  all(i_status == 'available' for i_status in new_volume_snapshots_statuses.values()), locals())
+
+
+def plan_dst_server_volumes(args, server_block_device_mappings, dst_ostack_conn, destination_image, manage_volumes=False):
+    """ plan destination cloud volumes (create, manage or reuse from migration journal), no cloud modification """
+    dst_server_volumes_plan = []
+    for i_server_block_device_mapping in server_block_device_mappings:
+        i_journal_volume = None
+        if i_journal_volume_id := journal_get(args, get_migration_journal_entity(i_server_block_device_mapping), "F.30"):
+            i_journal_volume = dst_ostack_conn.block_storage.find_volume(i_journal_volume_id)
+        i_reused = bool(i_journal_volume and i_journal_volume.status == 'available')
+        i_bootable = i_server_block_device_mapping['destination']['volume_bootable']
+        dst_server_volumes_plan.append({'name': i_server_block_device_mapping['destination']['volume_name'],
+                                        'size': i_server_block_device_mapping['destination']['volume_size'],
+                                        'bootable': i_bootable,
+                                        'image': destination_image.name if i_bootable and not manage_volumes else None,
+                                        'source_volume_id': i_server_block_device_mapping['source']['volume_id'],
+                                        'volume_id': i_journal_volume.id if i_reused else None,
+                                        'action': 'reuse' if i_reused else 'manage' if manage_volumes else 'create'})
+    return dst_server_volumes_plan
+
+
+def get_dst_port_args(args, dst_network, src_port):
+    """ return destination port (same MAC and IPv4 address) creation arguments """
+    src_port_ip = src_port.fixed_ips[0]['ip_address']
+    dst_port_fixed_ip = {"subnet_id": dst_network.subnet_ids[0]}
+    if isinstance(ipaddress.ip_address(src_port_ip), ipaddress.IPv4Address):
+        # do not assign ipv6 public address (different CIDR and SLAAC in place)
+        dst_port_fixed_ip['ip_address'] = src_port_ip
+    return {'name': get_dst_resource_name(args, src_port.name or ''),
+            'description': get_dst_resource_desc(args, src_port.description, src_port.id),
+            'network_id': dst_network.id,
+            'mac_address': src_port.mac_address,
+            'fixed_ips': [dst_port_fixed_ip]}
+
+
+def create_dst_ports(args, dst_ostack_conn, dst_ports_args):
+    """ bulk-create destination ports of single network, ports are created one by one when bulk creation fails
+        (neutron bulk creation is atomic), returns created ports (None when port creation failed) """
+    func_name = inspect.currentframe().f_code.co_name
+    if len(dst_ports_args) > 1:
+        try:
+            args.logger.debug(f"{func_name}() Bulk-creating {len(dst_ports_args)} ostack ports. (network: {dst_ports_args[0]['network_id']})")
+            return [cache_ostack_resource(dst_ostack_conn, 'port', i_dst_port)
+                    for i_dst_port in dst_ostack_conn.network.create_ports(dst_ports_args)]
+        except Exception:
+            args.logger.error(f"{func_name}() throws exception while bulk-creating ostack ports, creating them one by one.",
+                              exc_info=True)
+    dst_ports = []
+    for i_dst_port_args in dst_ports_args:
+        try:
+            args.logger.debug(f"{func_name}() Creating an ostack port. (mac: {i_dst_port_args['mac_address']}, ip: {i_dst_port_args['fixed_ips']}")
+            dst_ports.append(cache_ostack_resource(dst_ostack_conn, 'port', dst_ostack_conn.network.create_port(**i_dst_port_args)))
+        except Exception:
+            args.logger.error(f"{func_name}() throws exception while creating an ostack port.", exc_info=True)
+            dst_ports.append(None)
+    return dst_ports
+
+
+def create_dst_servers_network_connections(args, dst_ostack_conn, dst_project, servers_network_addresses):
+    """ create ostack servers to network connections via existing or created port (same MAC and IP address) or network id,
+        missing ports of all servers are bulk-created per network,
+        servers_network_addresses is {server-id: [netaddr_dict, ...]} as returned by get_or_create_dst_server_networking(),
+        returns {server-id: [<>, ...]} fed to conn.compute.create_server(...networks=[ <>, ...])
     """
     # netaddr_dict{ 'dst-network': Network,
     #               'src-network-addresses': {'network-name': <source-network-name>,
@@ -655,47 +1208,44 @@ def describe_server_network_connection(args, dst_ostack_conn, dst_project, netad
     #                                         'port': <openstack.network.v2.port.Port object>} }
     func_name = inspect.currentframe().f_code.co_name
     msg_suffix = "Carefully check whether migrated VM is accessible and can communicate with outside world."
-    src_port = netaddr_dict['src-network-addresses']['port']
-    src_port_ip = src_port.fixed_ips[0]['ip_address']
-    dst_network = netaddr_dict['dst-network']
-    dst_port = None
-    # detect already existing port
-    dst_port_list = find_ostack_port(dst_ostack_conn, src_port.mac_address, src_port_ip, description_substr=src_port.id,
-                                     project=dst_project, network=dst_network)
-    if dst_port_list and len(dst_port_list) == 1:
-        dst_port = dst_port_list[0]
-        args.logger.debug(f"{func_name}() Reusing already existing ostack port. "
-                          f"(mac: {src_port.mac_address}, ip: {src_port_ip}, desc: ~ {src_port.id}")
-    else:
-        try:
-            args.logger.debug(f"{func_name}() Creating an ostack port. (mac: {src_port.mac_address}, ip: {src_port_ip}")
-            dst_port_fixed_ip = {"subnet_id": dst_network.subnet_ids[0]}
-            if isinstance(ipaddress.ip_address(src_port_ip), ipaddress.IPv4Address):
-                # do not assign ipv6 public address (different CIDR and SLAAC in place)
-                dst_port_fixed_ip['ip_address'] = src_port_ip
-            dst_port = dst_ostack_conn.network.create_port(name=get_dst_resource_name(args, src_port.name or ''),
-                                                           description=get_dst_resource_desc(args,
-                                                                                             src_port.description,
-                                                                                             src_port.id),
-                                                           network_id=dst_network.id,
-                                                           mac_address=src_port.mac_address,
-                                                           fixed_ips=[dst_port_fixed_ip])
-        except Exception:
-            args.logger.error(f"{func_name}() throws exception while creating an ostack port.",
-                              exc_info=True)
-    if dst_port:
-        return {'port': dst_port.id}
-
-    args.logger.warning(f"{func_name}() Creation of dedicated network port failed! "
-                        f"Migrated VM will not have same internal IP address / MAC address. {msg_suffix}")
-    return {'uuid': dst_network.id}
+    servers_network_connections = {}
+    missing_dst_ports = {}
+    for i_server_id, i_server_network_addresses in servers_network_addresses.items():
+        servers_network_connections[i_server_id] = []
+        for i_netaddr in i_server_network_addresses:
+            i_src_port = i_netaddr['src-network-addresses']['port']
+            i_src_port_ip = i_src_port.fixed_ips[0]['ip_address']
+            i_dst_network = i_netaddr['dst-network']
+            # detect already existing port
+            i_dst_port_list = find_ostack_port(dst_ostack_conn, i_src_port.mac_address, i_src_port_ip, description_substr=i_src_port.id,
+                                               project=dst_project, network=i_dst_network)
+            if i_dst_port_list and len(i_dst_port_list) == 1:
+                args.logger.debug(f"{func_name}() Reusing already existing ostack port. "
+                                  f"(mac: {i_src_port.mac_address}, ip: {i_src_port_ip}, desc: ~ {i_src_port.id}")
+                servers_network_connections[i_server_id].append({'port': i_dst_port_list[0].id})
+            else:
+                # network connection gets replaced by created port
+                missing_dst_ports.setdefault(i_dst_network.id, []).append((i_server_id, len(servers_network_connections[i_server_id]),
+                                                                           get_dst_port_args(args, i_dst_network, i_src_port)))
+                servers_network_connections[i_server_id].append({'uuid': i_dst_network.id})
+
+    for i_missing_dst_ports in missing_dst_ports.values():
+        i_dst_ports = create_dst_ports(args, dst_ostack_conn, [i_dst_port_args for _, _, i_dst_port_args in i_missing_dst_ports])
+        for (i_server_id, i_network_index, i_dst_port_args), i_dst_port in zip(i_missing_dst_ports, i_dst_ports):
+            if i_dst_port:
+                servers_network_connections[i_server_id][i_network_index] = {'port': i_dst_port.id}
+            else:
+                args.logger.warning(f"{func_name}() Creation of dedicated network port failed (mac: {i_dst_port_args['mac_address']})! "
+                                    f"Migrated VM will not have same internal IP address / MAC address. {msg_suffix}")
+    return servers_network_connections
 
 
-def create_dst_server(args, src_server, dst_ostack_conn, dst_project, flavor, keypair, block_device_mappings, server_network_addresses):
-    """ create destination server instance """
+def create_dst_server(args, src_server, dst_ostack_conn, flavor_id, keypair_name, block_device_mappings, server_network_connections):
+    """ create destination server instance,
+        server_network_connections are as returned by create_dst_servers_network_connections() """
     # Note: argument network is not valid anymore, use networks
     server_args = {'name': get_dst_resource_name(args, src_server.name),
-                   'flavorRef': flavor.id,
+                   'flavorRef': flavor_id,
                    'block_device_mapping_v2': [{'source_type': 'volume',
                                                 'destination_type': 'volume',
                                                 'uuid': i_block_device_mapping['destination']['volume_id'],
@@ -703,12 +1253,9 @@ def create_dst_server(args, src_server, dst_ostack_conn, dst_project, flavor, ke
                                                 'boot_index': 0 if i_block_device_mapping['destination']['volume_bootable'] else None}
                                                for i_block_device_mapping in block_device_mappings],
                    'boot_volume': block_device_mappings[0]['destination']['volume_id'],
-                   'networks': [describe_server_network_connection(args,
-                                                                   dst_ostack_conn,
-                                                                   dst_project,
-                                                                   i_netaddr) for i_netaddr in server_network_addresses]}
-    if keypair:
-        server_args['key_name'] = keypair["name"]                                                              
+                   'networks': server_network_connections}
+    if keypair_name:
+        server_args['key_name'] = keypair_name
     log_or_assert(args,
                   "F.35 Destination OpenStack server arguments are generated with valid block-device-mapping",
                   server_args['block_device_mapping_v2'], locals())
@@ -732,19 +1279,287 @@ def get_ostack_objstore_containers(ostack_connection):
     return list(ostack_connection.object_store.containers())
 
 
+def get_ostack_objstore_objects(ostack_connection, container_name):
+    """ receive objstore container objects {name: object} (single paginated listing, size and ETag included) """
+    return {i_object.name: i_object for i_object in ostack_connection.object_store.objects(container_name)}
+
+
+def get_objstore_segments_container_name(container_name):
+    """ return name of container holding destination SLO segments of objects in container """
+    return f"{container_name}{OBJSTORE_SEGMENTS_CONTAINER_SUFFIX}"
+
+
+def objstore_object_unchanged(dst_ostack_conn, container_name, src_object, dst_object):
+    """ return True when destination object has the same size and ETag as source one,
+        ETag of destination SLO is compared by its source ETag metadata """
+    if not dst_object or dst_object.content_length != src_object.content_length:
+        return False
+    if dst_object.etag == src_object.etag:
+        return True
+    dst_object_metadata = dst_ostack_conn.object_store.get_object_metadata(dst_object.name, container_name).metadata or {}
+    return dst_object_metadata.get(OBJSTORE_SOURCE_ETAG_METADATA) == src_object.etag
+
+
+def stream_objstore_object(src_ostack_conn, container_name, src_object, byte_range=None):
+    """ return iterator over source object data chunks, byte_range (first, last) streams part of the object """
+    stream_attrs = {'range': f"bytes={byte_range[0]}-{byte_range[1]}"} if byte_range else {}
+    return src_ostack_conn.object_store.stream_object(src_object.name, container_name,
+                                                      chunk_size=OBJSTORE_STREAM_CHUNK_SIZE, **stream_attrs)
+
+
+def transfer_objstore_object(args, src_ostack_conn, dst_ostack_conn, container_name, src_object):
+    """ stream whole source object into destination object of the same name, source ETag is kept in metadata
+        (ETag of source SLO streamed as regular object differs from destination one) """
+    dst_ostack_conn.object_store.upload_object(container=container_name, name=src_object.name,
+                                               data=stream_objstore_object(src_ostack_conn, container_name, src_object),
+                                               generate_checksums=False, content_type=src_object.content_type,
+                                               metadata={OBJSTORE_SOURCE_ETAG_METADATA: src_object.etag})
+    args.logger.debug(f"D.12 Source OpenStack objstore object transferred ({container_name}/{src_object.name}, {src_object.content_length} B)")
+    return src_object.content_length
+
+
+def transfer_objstore_object_segment(args, src_ostack_conn, dst_ostack_conn, container_name, src_object, segment_name, byte_range):
+    """ stream part of source object into destination SLO segment, return SLO manifest segment item """
+    segment_container_name = get_objstore_segments_container_name(container_name)
+    dst_ostack_conn.object_store.upload_object(container=segment_container_name, name=segment_name,
+                                               data=stream_objstore_object(src_ostack_conn, container_name, src_object, byte_range),
+                                               generate_checksums=False)
+    args.logger.debug(f"D.12 Source OpenStack objstore object segment transferred ({segment_container_name}/{segment_name})")
+    return get_objstore_slo_manifest_segment(container_name, segment_name, byte_range)
+
+
+def get_objstore_object_manifest(src_ostack_conn, container_name, src_object):
+    """ inspect source object headers, return (DLO manifest '<container>/<prefix>', SLO segment paths {'<container>/<name>'}),
+        (None, empty set) for regular objects """
+    src_object_metadata = src_ostack_conn.object_store.get_object_metadata(src_object.name, container_name)
+    slo_segment_paths = set()
+    if src_object_metadata.is_static_large_object:
+        response = src_ostack_conn.object_store.get(f"{urllib.parse.quote(container_name)}/{urllib.parse.quote(src_object.name)}",
+                                                    params={'multipart-manifest': 'get'})
+        slo_segment_paths = {i_segment['name'].lstrip('/') for i_segment in response.json()}
+    return src_object_metadata.object_manifest, slo_segment_paths
+
+
+def objstore_dlo_manifest_unchanged(dst_ostack_conn, container_name, dlo_manifest, dst_object):
+    """ return True when destination object is DLO manifest of the same segments prefix """
+    if not dst_object or dst_object.content_length != 0:
+        return False
+    return dst_ostack_conn.object_store.get_object_metadata(dst_object.name, container_name).object_manifest == dlo_manifest
+
+
+def put_objstore_dlo_manifest(args, dst_ostack_conn, container_name, src_object, dlo_manifest):
+    """ create destination dynamic large object (DLO) manifest, segments are migrated as regular objects """
+    dst_ostack_conn.object_store.put(f"{urllib.parse.quote(container_name)}/{urllib.parse.quote(src_object.name)}",
+                                     headers={'Content-Type': src_object.content_type or 'application/octet-stream',
+                                              'X-Object-Manifest': dlo_manifest},
+                                     data=b'')
+    args.logger.debug(f"D.13 Destination OpenStack objstore dynamic large object manifest created ({container_name}/{src_object.name}, "
+                      f"segments:{dlo_manifest})")
+    return 0
+
+
+def get_objstore_slo_manifest_segment(container_name, segment_name, byte_range):
+    """ return SLO manifest segment item (segment ETag is left unchecked, size is validated by objstore) """
+    return {'path': f"/{get_objstore_segments_container_name(container_name)}/{segment_name}",
+            'size_bytes': byte_range[1] - byte_range[0] + 1}
+
+
+def put_objstore_slo_manifest(args, dst_ostack_conn, container_name, src_object, segments):
+    """ create destination static large object (SLO) manifest of transferred segments """
+    dst_ostack_conn.object_store.put(f"{urllib.parse.quote(container_name)}/{urllib.parse.quote(src_object.name)}",
+                                     params={'multipart-manifest': 'put'},
+                                     headers={'Content-Type': src_object.content_type or 'application/octet-stream',
+                                              f"X-Object-Meta-{OBJSTORE_SOURCE_ETAG_METADATA}": src_object.etag},
+                                     data=json.dumps(segments))
+    args.logger.debug(f"D.14 Destination OpenStack objstore large object manifest created ({container_name}/{src_object.name}, "
+                      f"{len(segments)} segments)")
+
+
+def get_objstore_object_segments(args, src_object, dst_segment_objects):
+    """ return [(segment name, byte range, transferred already)] of source object split into --objstore-segment-size-mb
+        segments, segment names include source ETag so segments transferred by interrupted migration are reused """
+    segment_size = args.objstore_segment_size_mb * 1024 * 1024
+    segments = []
+    for i_index, i_offset in enumerate(range(0, src_object.content_length, segment_size)):
+        i_byte_range = (i_offset, min(i_offset + segment_size, src_object.content_length) - 1)
+        i_segment_name = f"{src_object.name}/slo/{src_object.etag}/{src_object.content_length}/{segment_size}/{i_index:08d}"
+        i_dst_segment_object = dst_segment_objects.get(i_segment_name)
+        segments.append((i_segment_name, i_byte_range,
+                         bool(i_dst_segment_object and i_dst_segment_object.content_length == i_byte_range[1] - i_byte_range[0] + 1)))
+    return segments
+
+
+def create_dst_objstore_container(args, dst_ostack_conn, dst_container_names, container_name):
+    """ create destination objstore container unless it exists (dst_container_names) """
+    if container_name in dst_container_names:
+        return
+    dst_ostack_conn.object_store.create_container(name=container_name)
+    dst_container_names.add(container_name)
+    args.logger.info(f"D.11 Destination OpenStack objstore container created ({container_name})")
+
+
+def migrate_ostack_objstore_containers(args, src_ostack_conn, dst_ostack_conn, src_containers):
+    """ migrate objstore containers (steps D.11-D.15), objects are streamed between clouds by bounded pool of concurrent
+        transfers (--objstore-parallelism), large objects are uploaded as SLO with segments transferred in parallel,
+        objects of the same size and ETag in destination are skipped (incremental re-runs)
+
+        source SLO manifests (looked up in containers with <container>_segments sibling) are streamed as whole objects,
+        so their segments are not transferred, other segments are migrated as regular objects,
+        source DLO manifests (zero-length objects with X-Object-Manifest) are copied as manifests of migrated segments
+
+        transfers are submitted through bounded window (twice the parallelism), so pending transfers of containers
+        with many objects are not queued all at once """
+    src_container_names = {i_container.name for i_container in src_containers}
+    dst_container_names = {i_container.name for i_container in get_ostack_objstore_containers(dst_ostack_conn)}
+    segment_size = args.objstore_segment_size_mb * 1024 * 1024
+    stats = {'objects': 0, 'bytes': 0, 'skipped': 0, 'slo_segments': 0, 'failed': 0}
+    parallelism = max(1, args.objstore_parallelism)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+        object_futures, large_objects, pending_futures = {}, [], set()
+
+        # source large object manifests are identified by object headers before any transfer
+        src_objects = {i_container_name: get_ostack_objstore_objects(src_ostack_conn, i_container_name)
+                       for i_container_name in sorted(src_container_names)}
+        manifest_candidates = [(i_container_name, j_src_object) for i_container_name, i_src_objects in src_objects.items()
+                               for j_src_object in i_src_objects.values()
+                               if j_src_object.content_length == 0 or
+                               get_objstore_segments_container_name(i_container_name) in src_container_names]
+        dlo_manifests, slo_segment_paths = {}, set()
+        for (i_container_name, i_src_object), (i_dlo_manifest, i_slo_segment_paths) in \
+                zip(manifest_candidates, executor.map(lambda candidate: get_objstore_object_manifest(src_ostack_conn, *candidate),
+                                                      manifest_candidates)):
+            if i_dlo_manifest:
+                dlo_manifests[(i_container_name, i_src_object.name)] = i_dlo_manifest
+            slo_segment_paths |= i_slo_segment_paths
+        args.logger.info(f"D.11 Source OpenStack objstore large object manifests inspected ({len(manifest_candidates)} objects, "
+                         f"{len(dlo_manifests)} DLO manifests, {len(slo_segment_paths)} SLO segments)")
+
+        def collect_transfers(return_when):
+            """ wait for submitted transfers, account finished object transfers (segments are collected with manifests) """
+            done_futures, _ = concurrent.futures.wait(pending_futures, return_when=return_when)
+            for i_future in done_futures:
+                pending_futures.discard(i_future)
+                if i_future not in object_futures:
+                    continue
+                i_container_name, i_src_object = object_futures.pop(i_future)
+                if i_future.exception():
+                    stats['failed'] += 1
+                    args.logger.error(f"D.12 Source OpenStack objstore object transfer failed ({i_container_name}/{i_src_object.name}): "
+                                      f"{i_future.exception()}")
+                    continue
+                stats['objects'] += 1
+                stats['bytes'] += i_future.result()
+
+        def submit_transfer(func, *attrs):
+            """ submit transfer once window of pending transfers has room """
+            while len(pending_futures) >= 2 * parallelism:
+                collect_transfers(concurrent.futures.FIRST_COMPLETED)
+            future = executor.submit(func, *attrs)
+            pending_futures.add(future)
+            return future
+
+        for i_container_name, i_src_objects in src_objects.items():
+            create_dst_objstore_container(args, dst_ostack_conn, dst_container_names, i_container_name)
+            i_dst_objects = get_ostack_objstore_objects(dst_ostack_conn, i_container_name)
+            i_dst_segment_objects = None
+            for j_src_object in i_src_objects.values():
+                if f"{i_container_name}/{j_src_object.name}" in slo_segment_paths:
+                    # source SLO segments are streamed with their manifests
+                    stats['slo_segments'] += 1
+                    continue
+                j_dlo_manifest = dlo_manifests.get((i_container_name, j_src_object.name))
+                if j_dlo_manifest:
+                    if objstore_dlo_manifest_unchanged(dst_ostack_conn, i_container_name, j_dlo_manifest,
+                                                       i_dst_objects.get(j_src_object.name)):
+                        stats['skipped'] += 1
+                    else:
+                        object_futures[submit_transfer(put_objstore_dlo_manifest, args, dst_ostack_conn, i_container_name,
+                                                       j_src_object, j_dlo_manifest)] = (i_container_name, j_src_object)
+                    continue
+                if objstore_object_unchanged(dst_ostack_conn, i_container_name, j_src_object, i_dst_objects.get(j_src_object.name)):
+                    stats['skipped'] += 1
+                    continue
+                if j_src_object.content_length <= segment_size:
+                    object_futures[submit_transfer(transfer_objstore_object, args, src_ostack_conn, dst_ostack_conn,
+                                                   i_container_name, j_src_object)] = (i_container_name, j_src_object)
+                    continue
+                if i_dst_segment_objects is None:
+                    create_dst_objstore_container(args, dst_ostack_conn, dst_container_names,
+                                                  get_objstore_segments_container_name(i_container_name))
+                    i_dst_segment_objects = get_ostack_objstore_objects(dst_ostack_conn,
+                                                                        get_objstore_segments_container_name(i_container_name))
+                j_segment_futures = []
+                for k_segment_name, k_byte_range, k_transferred in get_objstore_object_segments(args, j_src_object, i_dst_segment_objects):
+                    if k_transferred:
+                        j_segment_futures.append(get_objstore_slo_manifest_segment(i_container_name, k_segment_name, k_byte_range))
+                    else:
+                        j_segment_futures.append(submit_transfer(transfer_objstore_object_segment, args, src_ostack_conn, dst_ostack_conn,
+                                                                 i_container_name, j_src_object, k_segment_name, k_byte_range))
+                large_objects.append((i_container_name, j_src_object, j_segment_futures))
+            args.logger.info(f"D.11 Source OpenStack objstore container objects scheduled ({i_container_name}, "
+                             f"{len(i_src_objects)} objects)")
+
+        collect_transfers(concurrent.futures.ALL_COMPLETED)
+
+    # segments are transferred once the pool is drained, manifests are created in destination
+    for i_container_name, i_src_object, i_segments in large_objects:
+        try:
+            put_objstore_slo_manifest(args, dst_ostack_conn, i_container_name, i_src_object,
+                                      [i_segment.result() if isinstance(i_segment, concurrent.futures.Future) else i_segment
+                                       for i_segment in i_segments])
+        except Exception as ex:
+            stats['failed'] += 1
+            args.logger.error(f"D.14 Source OpenStack objstore large object transfer failed ({i_container_name}/{i_src_object.name}): {ex}")
+            continue
+        stats['objects'] += 1
+        stats['bytes'] += i_src_object.content_length
+
+    args.logger.info(f"D.15 Source OpenStack objstore containers migrated ({len(src_container_names)} containers, "
+                     f"{stats['objects']} objects transferred ({clib.format_size(stats['bytes'])}), "
+                     f"{stats['skipped']} unchanged objects skipped, {stats['slo_segments']} SLO segments streamed with manifests, "
+                     f"{stats['failed']} failed)")
+    log_or_assert(args, "D.15 Source OpenStack objstore objects transferred", stats['failed'] == 0, stats)
+    return stats
+
+
+def ostack_port_matches(port, mac_address, ip_address, description_substr='', project=None, network=None, device=None):
+    """ return True if port matches MAC, IP, port description and optional project, network and device """
+    return port.mac_address == mac_address and \
+        description_substr in port.description and \
+        ip_address in [i_addr.get('ip_address') for i_addr in port.fixed_ips] and \
+        (not project or port.project_id == project.id) and \
+        (not network or port.network_id == network.id) and \
+        (not device or port.device_id == device.id)
+
+
 def find_ostack_port(ostack_connection, mac_address, ip_address, description_substr='', project=None, network=None, device=None):
-    """ find openstack port and narrow down selection with MAC, IP and port description """
-    query_ports_args = {}
+    """ find openstack port and narrow down selection with MAC, IP and port description
+        port index is searched first (when project ports were prefetched), then ports are queried with server-side filters """
+    with get_ostack_resource_cache_lock(ostack_connection):
+        int_port_index = get_ostack_port_index(ostack_connection)
+        if network:
+            int_indexed_ports = list(int_port_index['network_ip'].get((network.id, ip_address), {}).values())
+        elif device:
+            int_indexed_ports = list(int_port_index['device_id'].get(device.id, {}).values())
+        else:
+            int_indexed_ports = list(int_port_index['mac_address'].get(mac_address, {}).values())
+        int_ports_prefetched = bool(int_port_index['project_ids'])
+    if int_ports_prefetched:
+        if int_ports := [i_port for i_port in int_indexed_ports
+                         if ostack_port_matches(i_port, mac_address, ip_address, description_substr, project, network, device)]:
+            return int_ports
+
+    query_ports_args = {'mac_address': mac_address,
+                        'fixed_ips': [f"ip_address={ip_address}"]}
     if network:
         query_ports_args['network_id'] = network.id
     if project:
         query_ports_args['project_id'] = project.id
     if device:
         query_ports_args['device_id'] = device.id
-    project_ports = ostack_connection.network.ports(**query_ports_args)
-    return [i_port for i_port in project_ports if i_port.mac_address == mac_address and
-            description_substr in i_port.description and
-            ip_address in [i_addr.get('ip_address') for i_addr in i_port.fixed_ips]]
+    return [cache_ostack_resource(ostack_connection, 'port', i_port) for i_port in ostack_connection.network.ports(**query_ports_args)
+            if ostack_port_matches(i_port, mac_address, ip_address, description_substr)]
 
 
 def server_detect_floating_address(server):
@@ -876,13 +1691,14 @@ def compare_quota_values(value_1, value_2):
     return 0
 
 
-def restore_source_server_status(args, source_project_conn, source_server_detail, source_server):
-    """ start server in source cloud (if necessary), wait for VM being back in the same state as at the beginning """
-    if source_server_detail.status != source_project_conn.compute.find_server(source_server.id).status and \
+def restore_source_server_status(args, source_project_conn, source_server_detail, source_server, source_server_status):
+    """ start server in source cloud (if necessary), wait for VM being back in the same state (source_server_status)
+        as at the beginning """
+    if source_server_status != source_project_conn.compute.find_server(source_server.id).status and \
             not args.source_servers_left_shutoff:
-        if source_server_detail.status == 'ACTIVE':
+        if source_server_status == 'ACTIVE':
             source_project_conn.compute.start_server(source_server_detail)
             args.logger.info(f"F.34 Source OpenStack VM server (name:{source_server_detail.name}) requested to start")
         else:
             args.logger.warning(f"F.34 Source OpenStack VM server (name:{source_server_detail.name}) is not in expected state, "
-                                f"but migrator does not know how to move to {source_server_detail.status} state")
+                                f"but migrator does not know how to move to {source_server_status} state")
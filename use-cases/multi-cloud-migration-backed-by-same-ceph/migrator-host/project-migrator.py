@@ -7,9 +7,12 @@ Tool expects same block storage connected to both clouds to be able to perform s
 
 Block storage is transferred using external ceph migrator server node using ceph low-level commands.
 Ceph migrator server node is allowed to perform ceph operations
-(ceph storage access is blocked outside OpenStack servers)
-and also provides enough disk space for object storage migration.
-TODO: Object storage migration
+(ceph storage access is blocked outside OpenStack servers).
+
+Object storage containers are migrated (--migrate-objstore-containers) by streaming object data
+between source and destination objstore (no local disk space needed), large objects are transferred
+as static large objects with segments uploaded in parallel, unchanged objects are skipped on re-runs,
+dynamic large object manifests are copied with their segments.
 
 Tool relies on main libraries:
  * openstacksdk for OpenStack management
@@ -26,11 +29,29 @@ Usage example:
    --project-name                  meta-cloud-new-openstack
    --validation-a-source-server-id server-id-xyz
    --ceph-migrator-sshkeyfile      ~/.ssh/id_rsa.g1-g2-ostack-cloud-migration
+ * Migrate campaign of projects listed in campaign.txt (lines "<src-project>-><dst-project> <server-id>"),
+   four projects at a time, per-project results are appended to project-migrator.campaign.jsonl
+ $ ./project-migrator.py
+   --source-openrc                 ~/c/prod-einfra_cz_migrator.sh.inc
+   --destination-openrc            ~/c/g2-prod-brno-einfra_cz_migrator.sh.inc
+   --campaign-file                 campaign.txt
+   --campaign-parallelism          4
+   --ceph-migrator-sshkeyfile      ~/.ssh/id_rsa.g1-g2-ostack-cloud-migration
+ * Migrate in two phases, prepare destination resources (networking, ports, keypairs, security groups, volumes)
+   of all servers ahead of the maintenance window and only stop, copy and boot servers within the window
+ $ ./project-migrator.py ... --migration-phase prepare
+ $ ./project-migrator.py ... --migration-phase cutover
 """
 
 import argparse
+import concurrent.futures
+import json
 import logging
+import os.path
+import re
 import sys
+import threading
+import time
 
 import clib
 import lib
@@ -38,7 +59,15 @@ import olib
 
 
 def main(args):
-    """ main project migration loop """
+    """ main migration, single project or campaign of projects sharing migrator connections """
+    migrator = connect_migrator(args)
+    if args.campaign_file:
+        return migrate_campaign(args, migrator)
+    return migrate_project(args, migrator)
+
+
+def connect_migrator(args):
+    """ connect clouds as migrator user and ceph migrator host, receive source keypairs (shared by migrated projects) """
     # connect to source cloud
     source_migrator_openrc = lib.get_openrc(args.source_openrc)
     source_migrator_conn = lib.get_ostack_connection(source_migrator_openrc)
@@ -49,19 +78,100 @@ def main(args):
     destination_migrator_conn = lib.get_ostack_connection(destination_migrator_openrc)
     args.logger.info("A.02 Destination OpenStack cloud connected as migrator user")
 
+    # connect to migrator node
+    reply_stdout, _, reply_ecode = lib.remote_cmd_exec(args.ceph_migrator_host, args.ceph_migrator_user,
+                                                       args.ceph_migrator_sshkeyfile.name, 'uname -a',
+                                                       logger=args.logger)
+    lib.log_or_assert(args, "D.01 Migrator host is reachable", 'Linux' in reply_stdout and reply_ecode == 0)
+
+    reply_stdout, _, reply_ecode = lib.remote_cmd_exec(args.ceph_migrator_host, args.ceph_migrator_user,
+                                                       args.ceph_migrator_sshkeyfile.name,
+                                                       '/root/migrator/ceph-accessible.sh',
+                                                       logger=args.logger)
+    lib.log_or_assert(args, "D.02 Ceph is available from the migrator host", reply_ecode == 0)
+    if args.ceph_migrator_agent:
+        _, _, reply_ecode = clib.ceph_agent_ping(args)
+        lib.log_or_assert(args, "D.02 Ceph agent is running on the migrator host", reply_ecode == 0)
+
+    source_keypairs = olib.download_source_keypairs(args)
+    lib.log_or_assert(args, "D.04 Source OpenStack cloud keypairs received/downloaded.", source_keypairs)
+
+    return {'source_migrator_openrc': source_migrator_openrc,
+            'source_migrator_conn': source_migrator_conn,
+            'destination_migrator_openrc': destination_migrator_openrc,
+            'destination_migrator_conn': destination_migrator_conn,
+            'source_keypairs': source_keypairs}
+
+
+def get_campaign_project_args(args, campaign_project):
+    """ return arguments of single campaign project migration (own log prefix, migration journal and dump files) """
+    int_args = lib.get_prefixed_args(args, f"[{campaign_project['project_name']}]")
+    int_args.project_name = campaign_project['project_name']
+    int_args.validation_a_source_server_id = campaign_project['validation_a_source_server_id']
+    int_file_suffix = re.sub(r'[^\w.-]+', '_', campaign_project['project_name'])
+    for i_file_arg_name in ('migration_journal_file', 'exception_trace_file', 'dry_run_plan_file'):
+        i_file_name, i_file_ext = os.path.splitext(getattr(args, i_file_arg_name))
+        setattr(int_args, i_file_arg_name, f"{i_file_name}.{int_file_suffix}{i_file_ext}")
+    return int_args
+
+
+def migrate_campaign(args, migrator):
+    """ migrate campaign projects (--campaign-file) concurrently, record per-project results (--campaign-results-file) """
+    campaign_projects = lib.get_campaign_projects(args.campaign_file)
+    lib.log_or_assert(args, f"A.10 Migration campaign loaded ({len(campaign_projects)} projects)", campaign_projects)
+    campaign_results_lock = threading.Lock()
+
+    def migrate_campaign_project(campaign_project):
+        """ migrate single campaign project, failure is recorded and does not stop the campaign """
+        int_args = get_campaign_project_args(args, campaign_project)
+        int_result = {'project_name': campaign_project['project_name'], 'started': time.time()}
+        try:
+            migrate_project(int_args, migrator)
+            int_result |= {'status': 'succeeded', 'error': None}
+        except Exception as ex:
+            int_args.logger.exception(f"A.11 Project migration failed ({campaign_project['project_name']})")
+            int_result |= {'status': 'failed', 'error': f"{type(ex).__name__}: {ex}",
+                           'exception_trace_file': int_args.exception_trace_file}
+        int_result |= {'duration': time.time() - int_result['started'], 'migration_journal_file': int_args.migration_journal_file}
+        with campaign_results_lock:
+            with open(args.campaign_results_file, "a", encoding="utf-8") as file:
+                file.write(json.dumps(int_result) + "\n")
+        args.logger.info(f"A.11 Project migration {int_result['status']} ({campaign_project['project_name']}, "
+                         f"{int_result['duration']:.0f}s)")
+        return int_result
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.campaign_parallelism)) as executor:
+        campaign_results = list(executor.map(migrate_campaign_project, campaign_projects))
+
+    failed_project_names = [i_result['project_name'] for i_result in campaign_results if i_result['status'] != 'succeeded']
+    args.logger.info(f"A.12 Migration campaign finished, {len(campaign_results) - len(failed_project_names)} projects "
+                     f"succeeded, {len(failed_project_names)} failed {failed_project_names}, results in {args.campaign_results_file}")
+    return 1 if failed_project_names else 0
+
+
+def migrate_project(args, migrator):
+    """ main project migration loop """
+    lib.open_migration_journal(args)
+    args.logger.info(f"A.00 Migration journal {'loaded' if args.resume else 'started'} ({args.migration_journal_file})")
+    source_migrator_openrc = migrator['source_migrator_openrc']
+    source_migrator_conn = migrator['source_migrator_conn']
+    destination_migrator_openrc = migrator['destination_migrator_openrc']
+    destination_migrator_conn = migrator['destination_migrator_conn']
+    source_keypairs = migrator['source_keypairs']
+
     # check project exists in source and destination
     source_project_name, destination_project_name = lib.get_ostack_project_names(args.project_name)
-    source_project = lib.get_ostack_project(source_migrator_conn, source_project_name)
+    source_project = lib.get_ostack_project(source_migrator_conn, source_project_name, args.source_domain_id)
     lib.log_or_assert(args, f"B.01 Source OpenStack cloud project (name:{source_project_name}) exists", source_project)
-    source_project_type = lib.get_ostack_project_type(source_migrator_conn, source_project)
+    source_project_type = lib.get_ostack_project_type(source_migrator_conn, source_project, args.source_domain_id)
     lib.log_or_assert(args, "B.02 Source OpenStack cloud project is enabled", source_project.is_enabled)
     lib.log_or_assert(args, f"B.03 Source OpenStack cloud project type is {source_project_type}",
                       source_project_type)
 
-    destination_project = lib.get_ostack_project(destination_migrator_conn, destination_project_name)
+    destination_project = lib.get_ostack_project(destination_migrator_conn, destination_project_name, args.destination_domain_id)
     lib.log_or_assert(args, f"B.10 Destination OpenStack cloud project (name:{destination_project_name}) exists", destination_project)
     lib.log_or_assert(args, "B.11 Destination OpenStack cloud project is enabled", destination_project.is_enabled)
-    destination_project_type = lib.get_ostack_project_type(destination_migrator_conn, destination_project)
+    destination_project_type = lib.get_ostack_project_type(destination_migrator_conn, destination_project, args.destination_domain_id)
     lib.log_or_assert(args, f"B.12 Destination OpenStack cloud project type is {destination_project_type}",
                       destination_project_type)
     lib.log_or_assert(args, "B.13 Source and destination project types match",
@@ -78,29 +188,19 @@ def main(args):
     args.logger.info("C.01 Source and destination project quotas comparison:")
     olib.compare_and_log_projects_quotas(args, "C.01", source_project_conn, source_project.id, destination_project_conn, destination_project.id)
 
-    # connect to migrator node
-    reply_stdout, _, reply_ecode = lib.remote_cmd_exec(args.ceph_migrator_host, args.ceph_migrator_user,
-                                                       args.ceph_migrator_sshkeyfile.name, 'uname -a')
-    lib.log_or_assert(args, "D.01 Migrator host is reachable", 'Linux' in reply_stdout and reply_ecode == 0)
-
-    reply_stdout, _, reply_ecode = lib.remote_cmd_exec(args.ceph_migrator_host, args.ceph_migrator_user,
-                                                       args.ceph_migrator_sshkeyfile.name,
-                                                       '/root/migrator/ceph-accessible.sh')
-    lib.log_or_assert(args, "D.02 Ceph is available from the migrator host", reply_ecode == 0)
-
-    source_rbd_images = {args.source_ceph_ephemeral_pool_name: None,
-                         args.source_ceph_cinder_pool_name: None}
-    for i_pool_name in source_rbd_images:
-        source_rbd_images[i_pool_name] = clib.ceph_rbd_images_list(args, i_pool_name)
-        lib.log_or_assert(args, f"D.03 Source cloud RBD images are received ({i_pool_name}).", source_rbd_images[i_pool_name])
-
-    source_keypairs = olib.download_source_keypairs(args)
-    lib.log_or_assert(args, "D.04 Source OpenStack cloud keypairs received/downloaded.", source_keypairs)
+    source_project_resources_counts = olib.prefetch_ostack_project_resources(source_project_conn, source_project)
+    args.logger.info(f"C.02 Source OpenStack cloud project resources received and cached {source_project_resources_counts}")
+    destination_project_resources_counts = olib.prefetch_ostack_project_resources(destination_project_conn, destination_project)
+    args.logger.info(f"C.03 Destination OpenStack cloud project resources received and cached {destination_project_resources_counts}")
 
     source_objstore_containers = olib.get_ostack_objstore_containers(source_project_conn)
-    if source_objstore_containers:
+    if source_objstore_containers and args.migrate_objstore_containers:
+        args.logger.info("D.10 Source OpenStack cloud project contains some object-store containers, they are migrated "
+                         f"after servers and volumes. Detected containers:{[i_container.name for i_container in source_objstore_containers]}")
+    elif source_objstore_containers:
         args.logger.warning("D.10 Source OpenStack cloud project contains some object-store containers. "
-                            f"Manual objstore data copy is required. Detected containers:{source_objstore_containers}")
+                            "Manual objstore data copy or --migrate-objstore-containers=true is required. "
+                            f"Detected containers:{source_objstore_containers}")
     else:
         args.logger.info("D.10 Source OpenStack cloud project has no object-store containers")
 
@@ -110,172 +210,74 @@ def main(args):
     lib.assert_entity_ownership(source_project_servers, source_project)
     args.logger.info(f"E.02 Source OpenStack cloud project has {len(source_project_servers)} servers.")
 
+    # targeted lookup of source servers' ephemeral RBD images (no full RBD pool listing)
+    source_rbd_images = {args.source_ceph_ephemeral_pool_name:
+                         clib.ceph_rbd_images_exist(args, args.source_ceph_ephemeral_pool_name,
+                                                    [f"{i_server.id}_disk" for i_server in source_project_servers])}
+    args.logger.info(f"D.03 Source cloud RBD images are received ({args.source_ceph_ephemeral_pool_name}), "
+                     f"{len(source_rbd_images[args.source_ceph_ephemeral_pool_name])} servers "
+                     "have ephemeral RBD image.")
+
     destination_project_servers = lib.get_ostack_project_servers(destination_project_conn)
     args.logger.info("E.10 Destination OpenStack cloud servers received")
     lib.assert_entity_ownership(destination_project_servers, destination_project)
     args.logger.info(f"E.11 Destination OpenStack cloud project has {len(destination_project_servers)} servers.")
 
-    lib.log_or_assert(args, "E.20 Source OpenStack VM ID validation succeeded",
-                      args.validation_a_source_server_id in [i_server.id for i_server in source_project_servers])
+    if args.validation_a_source_server_id:
+        lib.log_or_assert(args, "E.20 Source OpenStack VM ID validation succeeded",
+                          args.validation_a_source_server_id in [i_server.id for i_server in source_project_servers])
+    else:
+        args.logger.warning("E.20 Source OpenStack VM ID validation skipped (campaign project without validation server ID)")
 
-    destination_image = destination_project_conn.image.find_image(args.destination_bootable_volume_image_name)
-    lib.log_or_assert(args, "E.30 Destination image found and received", destination_image)
+    if args.destination_volume_creation_mode == DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE:
+        # migrated RBD images are managed as bootable volumes, no destination image is needed
+        destination_image = None
+        args.logger.info(f"E.30 Destination image not needed (--destination-volume-creation-mode={args.destination_volume_creation_mode})")
+    else:
+        destination_image = destination_project_conn.image.find_image(args.destination_bootable_volume_image_name)
+        lib.log_or_assert(args, "E.30 Destination image found and received", destination_image)
 
-    destination_fip_network = destination_project_conn.network.find_network(args.destination_ipv4_external_network)
+    destination_fip_network = olib.find_ostack_resource(destination_project_conn, 'network', args.destination_ipv4_external_network)
     lib.log_or_assert(args, "E.31 Destination cloud FIP network detected", destination_fip_network)
 
     if args.dry_run:
+        write_migration_plan(args, source_project_conn, destination_project_conn, source_project, destination_project,
+                             source_keypairs, source_rbd_images, destination_image, source_project_servers)
         args.logger.info("Exiting before first cloud modification operation as in dry-run mode.")
         if args.debugging:
             import IPython  # on-purpose lazy import
             IPython.embed()
         return
 
-    olib.duplicate_ostack_project_security_groups(args,
-                                                  source_project_conn, destination_project_conn,
-                                                  source_project, destination_project)
-    args.logger.info("E.40 Destination OpenStack project security groups duplicated")
-
-    args.logger.info("F.00 Main looping started")
-    args.logger.info(f"F.00 Source VM servers: {[i_source_server.name for i_source_server in source_project_servers]}")
-    for i_source_server in source_project_servers:
-        i_source_server_detail = source_project_conn.compute.find_server(i_source_server.id)
-        i_source_server_fip_properties = olib.get_server_floating_ip_properties(i_source_server_detail)
-
-        if args.explicit_server_names and i_source_server.name not in args.explicit_server_names:
-            args.logger.info(f"F.01 server migration skipped - name:{i_source_server_detail.name} due to --explicit-server-names={args.explicit_server_names}")
-            continue
-
-        if i_source_server_detail.status != 'ACTIVE' and not args.migrate_inactive_servers:
-            args.logger.info(f"F.01 server migration skipped - name:{i_source_server_detail.name} due to VM status {i_source_server_detail.status}. Use --migrate-inactive-servers=true if necessary.")
-            continue
-        # detect destination VM does not exist
-        i_destination_server_detail = destination_project_conn.compute.find_server(lib.get_dst_resource_name(args, i_source_server_detail.name))
-        if i_destination_server_detail:
-            args.logger.info(f"F.01 server migration skipped - name:{i_source_server_detail.name} as equivalent VM exists in destination cloud (name: {i_destination_server_detail.name})")
-            continue
-
-        args.logger.info(f"F.01 server migration started - name:{i_source_server_detail.name}, id:{i_source_server_detail.id}, "
-                         f"keypair: {i_source_server_detail.key_name}, flavor: {i_source_server_detail.flavor}, "
-                         f"sec-groups:{i_source_server_detail.security_groups}, root_device_name: {i_source_server_detail.root_device_name}, "
-                         f"block_device_mapping: {i_source_server_detail.block_device_mapping}, "
-                         f"attached-volumes: {i_source_server_detail.attached_volumes}"
-                         f"addresses: {i_source_server_detail.addresses}")
-
-        # network/subnet/router detection & creation
-        i_destination_server_network_addresses = \
-            olib.get_or_create_dst_server_networking(args,
-                                                     source_project_conn, destination_project_conn,
-                                                     source_project, destination_project,
-                                                     i_source_server_detail)
-
-        # flavor detection
-        i_destination_server_flavor = olib.get_dst_server_flavor(args,
-                                                                 i_source_server_detail,
-                                                                 destination_project_conn)
-
-        # keypair detection / creation
-        i_destination_server_keypair = olib.get_or_create_dst_server_keypair(args, source_keypairs,
-                                                                             i_source_server_detail,
-                                                                             destination_project_conn)
-
-        # get / create server security groups
-        i_destination_server_security_groups = \
-            olib.get_or_create_dst_server_security_groups(args,
-                                                          source_project_conn, destination_project_conn,
-                                                          source_project, destination_project,
-                                                          i_source_server_detail)
-
-        # volume detection, block device mapping creation
-        i_server_block_device_mappings = \
-            olib.create_server_block_device_mappings(args, source_project_conn,
-                                                     i_source_server_detail, source_rbd_images)
-
-        # volume creation in destination cloud
-        i_server_block_device_mappings = \
-            olib.create_dst_server_volumes_update_block_device_mappings(args,
-                                                                        i_server_block_device_mappings,
-                                                                        destination_project_conn,
-                                                                        destination_image)
-
-        # source VM stop, wait for SHUTOFF
-        if i_source_server_detail.status != 'SHUTOFF':
-            source_project_conn.compute.stop_server(i_source_server_detail)
-            args.logger.info(f"F.33 Source OpenStack VM server (name:{i_source_server_detail.name}) requested to stop")
-            lib.log_or_assert(args, f"F.33 Source OpenStack VM server (name:{i_source_server_detail.name}) stopped (reached SHUTOFF state)",
-                              lib.wait_for_ostack_server_status(source_project_conn, i_source_server.id, 'SHUTOFF') == "SHUTOFF")
-
-        restore_source_server_status_args = {
-            'args': args,
-            'source_project_conn': source_project_conn,
-            'source_server_detail': i_source_server_detail,
-            'source_server': i_source_server
-        }
-
-        post_rbd_snap_callback=None
-        if args.block_storage_volume_migration_mode == BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP:
-            # start server in source cloud (if necessary)
-            post_rbd_snap_callback = {
-                'func': olib.restore_source_server_status,
-                'args': restore_source_server_status_args
-            }
-
-        # volumes migration (browse i_server_block_device_mappings)
-        clib.migrate_rbd_images(args, i_server_block_device_mappings, post_rbd_snap_callback)
-
-        # start server in source cloud (if necessary)
-        olib.restore_source_server_status(**restore_source_server_status_args)
-
-        # start server in destination cloud
-        i_destination_server = olib.create_dst_server(args,
-                                                      i_source_server_detail,
-                                                      destination_project_conn,
-                                                      destination_project,
-                                                      i_destination_server_flavor,
-                                                      i_destination_server_keypair,
-                                                      i_server_block_device_mappings,
-                                                      i_destination_server_network_addresses)
-
-        # add security groups to the destination server (if missing)
-        dst_security_groups = {(i_destination_server_security_group.id, i_destination_server_security_group.name) for i_destination_server_security_group in i_destination_server_security_groups}
-        for i_destination_server_security_group_id, i_destination_server_security_group_name in dst_security_groups:
-            if {'name': i_destination_server_security_group_name} not in i_destination_server.security_groups:
-                destination_project_conn.add_server_security_groups(i_destination_server.id, i_destination_server_security_group_id)
-        if args.migrate_fip_addresses and i_source_server_fip_properties:
-            # add FIP as source VM has it
-            i_destination_server_fip = destination_project_conn.network.create_ip(floating_network_id=destination_fip_network.id)
-            lib.log_or_assert(args,
-                              f"F.39 Destination OpenStack server (name:{i_destination_server.name}) FIP is created ({i_destination_server_fip.floating_ip_address})",
-                              i_destination_server_fip, locals())
-            i_destination_server_ports = olib.find_ostack_port(destination_project_conn,
-                                                               i_source_server_fip_properties['floating/OS-EXT-IPS-MAC:mac_addr'],
-                                                               i_source_server_fip_properties['fixed/addr'],
-                                                               project=destination_project)
-            lib.log_or_assert(args, f"F.40 Destination OpenStack server (name:{i_destination_server.name}) FIP port(s) are detected",
-                              i_destination_server_ports, locals())
-            lib.log_or_assert(args, f"F.40 Destination OpenStack server (name:{i_destination_server.name}) single FIP port is detected",
-                              len(i_destination_server_ports) == 1, locals())
-            i_destination_server_port = i_destination_server_ports[0]
-            destination_project_conn.network.add_ip_to_port(i_destination_server_port, i_destination_server_fip)
-
-        args.logger.info(f"F.41 Source OpenStack server name:{i_source_server_detail.name} migrated into destination one name:{i_destination_server.name} id:{i_destination_server.id}")
-
-        if i_source_server_detail.status != source_project_conn.compute.find_server(i_source_server.id).status and \
-                not args.source_servers_left_shutoff:
-            if i_source_server_detail.status == 'ACTIVE':
-                if lib.wait_for_ostack_server_status(source_project_conn, i_source_server.id, i_source_server_detail.status) != i_source_server_detail.status:
-                    args.logger.warning(f"F.42 Source OpenStack VM server has not become {i_source_server_detail.status} yet, trying again...")
-                    source_project_conn.compute.start_server(i_source_server_detail)
-                    args.logger.info(f"F.42 Source OpenStack VM server (name:{i_source_server_detail.name}) requested to start again")
-                if lib.wait_for_ostack_server_status(source_project_conn, i_source_server.id, i_source_server_detail.status) != i_source_server_detail.status:
-                    args.logger.error(f"F.42 Source OpenStack VM server (name:{i_source_server_detail.name}) has not become "
-                                      f"{i_source_server_detail.status} yet (after second start). "
-                                      f"This situation is no longer asserted but needs manual admin inspection.")
-            else:
-                args.logger.error(f"F.42 Source OpenStack VM server (name:{i_source_server_detail.name}) is not in proper state, "
-                                  f"but migrator does not know how to move to {i_source_server_detail.status} state")
-        else:
-            args.logger.info(f"F.42 Source OpenStack VM server (name:{i_source_server_detail.name}) back in expected state {i_source_server_detail.status}.")
+    if args.migration_phase == MIGRATION_PHASE_CUTOVER:
+        args.logger.info("E.40 Destination OpenStack project security groups duplicated already (--migration-phase=prepare)")
+    else:
+        olib.duplicate_ostack_project_security_groups(args,
+                                                      source_project_conn, destination_project_conn,
+                                                      source_project, destination_project)
+        args.logger.info("E.40 Destination OpenStack project security groups duplicated")
+
+    if args.migration_phase == MIGRATION_PHASE_PREPARE:
+        prepare_servers(args, source_project_conn, destination_project_conn, source_project, destination_project,
+                        source_keypairs, source_rbd_images, destination_image, source_project_servers)
+    else:
+        args.logger.info("F.00 Main looping started")
+        args.logger.info(f"F.00 Source VM servers: {[i_source_server.name for i_source_server in source_project_servers]}")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.server_parallelism)) as executor:
+            futures = [executor.submit(migrate_server,
+                                       lib.get_prefixed_args(args, f"[{i_source_server.name}]"),
+                                       source_project_conn, destination_project_conn,
+                                       source_project, destination_project,
+                                       source_keypairs, source_rbd_images,
+                                       destination_image, destination_fip_network,
+                                       i_source_server) for i_source_server in source_project_servers]
+            for i_future in concurrent.futures.as_completed(futures):
+                if i_future.exception():
+                    # report the first failure, not started server migrations are cancelled,
+                    # running ones are let finish when leaving the executor context
+                    for j_future in futures:
+                        j_future.cancel()
+                    raise i_future.exception()
 
     # EXPLICIT OpenStack volume migration
     # ---------------------------------------------------------------------------------------------
@@ -290,34 +292,454 @@ def main(args):
                                  "Note in-use volumes are being migrated in VM server migration part.")
                 continue
 
-            i_dst_volume = destination_project_conn.block_storage.create_volume(name=lib.get_dst_resource_name(args, i_source_volume.name),
-                                                                                size=i_source_volume.size,
-                                                                                description=lib.get_dst_resource_desc(args,
-                                                                                                                      i_source_volume.description,
-                                                                                                                      i_source_volume.id))
-            lib.log_or_assert(args,
-                              f"H.03 Destination OpenStack volume created (name:{i_dst_volume.name}, id:{i_dst_volume.id})", i_dst_volume)
-            i_dst_volume_status = lib.wait_for_ostack_volume_status(destination_project_conn, i_dst_volume.id, 'available')
-            lib.log_or_assert(args,
-                              f"H.04 Destination OpenStack volume available (name:{i_dst_volume.name}, id:{i_dst_volume.id})",
-                              i_dst_volume_status == 'available')
             i_volume_mapping = {'source': {'ceph_pool_name': args.source_ceph_cinder_pool_name,
-                                           'ceph_rbd_image_name': i_source_volume.id},
+                                           'ceph_rbd_image_name': i_source_volume.id,
+                                           'volume_snapshots': olib.get_src_volume_snapshots(args, source_project_conn, i_source_volume.id)},
                                 'destination': {'ceph_pool_name': args.destination_ceph_cinder_pool_name,
-                                                'volume_id': i_dst_volume.id}}
-            clib.migrate_rbd_images(args, [i_volume_mapping])
+                                                'volume_size': i_source_volume.size,
+                                                'volume_id': None}}
+            i_journal_entity = lib.get_migration_journal_entity(i_volume_mapping)
+            if (i_journal_volume_id := lib.journal_get(args, i_journal_entity, "H.04")) and \
+                    (i_dst_volume := destination_project_conn.block_storage.find_volume(i_journal_volume_id)) and \
+                    i_dst_volume.status == 'available':
+                args.logger.info(f"H.04 Destination OpenStack volume reused from migration journal (name:{i_dst_volume.name}, id:{i_dst_volume.id})")
+            else:
+                i_dst_volume = destination_project_conn.block_storage.create_volume(name=lib.get_dst_resource_name(args, i_source_volume.name),
+                                                                                    size=i_source_volume.size,
+                                                                                    description=lib.get_dst_resource_desc(args,
+                                                                                                                          i_source_volume.description,
+                                                                                                                          i_source_volume.id))
+                lib.log_or_assert(args,
+                                  f"H.03 Destination OpenStack volume created (name:{i_dst_volume.name}, id:{i_dst_volume.id})", i_dst_volume)
+                i_dst_volume_status = lib.wait_for_ostack_volume_status(destination_project_conn, i_dst_volume.id, 'available')
+                lib.log_or_assert(args,
+                                  f"H.04 Destination OpenStack volume available (name:{i_dst_volume.name}, id:{i_dst_volume.id})",
+                                  i_dst_volume_status == 'available')
+                lib.journal_record_destination_volume(args, i_journal_entity, "H.04", i_dst_volume.id)
+            i_volume_mapping['destination']['volume_id'] = i_dst_volume.id
+            if args.migration_phase == MIGRATION_PHASE_PREPARE:
+                continue
+            clib.migrate_rbd_images(args, [i_volume_mapping],
+                                    direct_copy=args.block_storage_volume_migration_mode in BLOCK_STORAGE_VOLUME_MIGRATION_MODES_DIRECT_COPY)
             i_dst_volume_detail = destination_project_conn.block_storage.find_volume(i_dst_volume.id)
             lib.log_or_assert(args,
                               f"H.05 Destination OpenStack volume available (name:{i_dst_volume_detail.name}, id:{i_dst_volume_detail.id})",
                               i_dst_volume_detail.status == 'available')
+            olib.manage_dst_volume_snapshots(args, [i_volume_mapping], destination_project_conn)
+
+    # OpenStack objstore container migration
+    # ---------------------------------------------------------------------------------------------
+    if source_objstore_containers and args.migrate_objstore_containers:
+        # re-runs (i.e. phase prepare and cutover) transfer only new or changed objects
+        olib.migrate_ostack_objstore_containers(args, source_project_conn, destination_project_conn, source_objstore_containers)
+
+
+def get_server_migration_skip_reason(args, destination_project_conn, source_server_detail, source_server_status):
+    """ return reason why source server is not migrated (F.01) or None,
+        source_server_status is status before migration (see lib.get_source_server_status()) """
+    if args.explicit_server_names and source_server_detail.name not in args.explicit_server_names:
+        return f"due to --explicit-server-names={args.explicit_server_names}"
+    if source_server_status != 'ACTIVE' and not args.migrate_inactive_servers:
+        return f"due to VM status {source_server_status}. Use --migrate-inactive-servers=true if necessary."
+    # detect destination VM does not exist
+    if destination_server_detail := destination_project_conn.compute.find_server(lib.get_dst_resource_name(args, source_server_detail.name)):
+        return f"as equivalent VM exists in destination cloud (name: {destination_server_detail.name})"
+    return None
+
+
+def plan_server(args, source_project_conn, destination_project_conn, source_project, destination_project,
+                source_keypairs, source_rbd_images, destination_image, i_source_server):
+    """ plan single source server migration (steps F.01-F.31) without cloud modification """
+    i_source_server_detail = source_project_conn.compute.find_server(i_source_server.id)
+    i_server_plan = {'name': i_source_server_detail.name, 'id': i_source_server_detail.id,
+                     'status': i_source_server_detail.status, 'action': 'migrate'}
+
+    if skip_reason := get_server_migration_skip_reason(args, destination_project_conn, i_source_server_detail,
+                                                       lib.get_source_server_status(args, i_source_server_detail)):
+        args.logger.info(f"F.01 server migration would be skipped - name:{i_source_server_detail.name} {skip_reason}")
+        return i_server_plan | {'action': 'skip', 'skip_reason': skip_reason}
+
+    i_server_plan['networks'] = olib.plan_dst_server_networking(args,
+                                                                source_project_conn, destination_project_conn,
+                                                                source_project, destination_project,
+                                                                i_source_server_detail)
+    i_server_plan['flavor'] = olib.plan_dst_server_flavor(args, i_source_server_detail, destination_project_conn)
+    i_server_plan['keypair'] = olib.plan_dst_server_keypair(args, source_keypairs, i_source_server_detail, destination_project_conn)
+    i_server_plan['security_groups'] = olib.plan_dst_server_security_groups(args,
+                                                                           source_project_conn, destination_project_conn,
+                                                                           source_project, destination_project,
+                                                                           i_source_server_detail)
+    i_server_block_device_mappings = olib.create_server_block_device_mappings(args, source_project_conn,
+                                                                             i_source_server_detail, source_rbd_images)
+    i_server_plan['block_device_mappings'] = [{'source': i_server_block_device_mapping['source'],
+                                               'destination': lib.trim_dict(i_server_block_device_mapping['destination'],
+                                                                            denied_keys=('volume_id',)),
+                                               'rbd_image_size': clib.get_source_rbd_image_size(args, i_server_block_device_mapping)}
+                                              for i_server_block_device_mapping in i_server_block_device_mappings]
+    i_server_plan['volumes'] = olib.plan_dst_server_volumes(args, i_server_block_device_mappings,
+                                                            destination_project_conn, destination_image,
+                                                            manage_volumes=args.destination_volume_creation_mode == DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE)
+    i_server_plan['floating_ip'] = bool(args.migrate_fip_addresses and olib.get_server_floating_ip_properties(i_source_server_detail))
+    args.logger.info(f"F.31 server migration planned - name:{i_source_server_detail.name}, "
+                     f"{len(i_server_plan['volumes'])} destination volumes")
+    return i_server_plan
+
+
+def plan_explicit_volume(args, source_project_conn, i_source_volume_name):
+    """ plan explicit source volume migration (steps H.01-H.05) without cloud modification """
+    i_source_volume = source_project_conn.block_storage.find_volume(i_source_volume_name)
+    if not i_source_volume or i_source_volume.status != 'available':
+        return {'name': i_source_volume_name, 'action': 'skip',
+                'skip_reason': f"volume in state {i_source_volume.status}" if i_source_volume else "volume does not exist"}
+    i_volume_mapping = {'source': {'ceph_pool_name': args.source_ceph_cinder_pool_name,
+                                   'ceph_rbd_image_name': i_source_volume.id}}
+    return {'name': i_source_volume_name, 'id': i_source_volume.id, 'action': 'migrate',
+            'volume': {'name': lib.get_dst_resource_name(args, i_source_volume.name), 'size': i_source_volume.size},
+            'rbd_image_size': clib.get_source_rbd_image_size(args, i_volume_mapping)}
+
+
+def get_rbd_image_copy_seconds(rbd_image_size, volume_size, copy_throughput):
+    """ estimate RBD image copy duration [s] from allocated size, volume (provisioned) size [GiB] when allocated size is unknown """
+    copy_size = rbd_image_size['used_size'] if rbd_image_size else volume_size * 1024 * 1024 * 1024
+    return copy_size / 1024 / 1024 / copy_throughput
+
+
+def estimate_migration_duration(args, migration_plan):
+    """ estimate migration duration from allocated RBD image sizes and copy throughput, (server/rbd) parallelism is respected """
+    copy_throughput, copy_throughput_origin = lib.get_copy_throughput(args)
+    allocated_size, unknown_size_count, servers_seconds, volumes_seconds = 0, 0, [], []
+    for i_server_plan in migration_plan['servers']:
+        if i_server_plan['action'] != 'migrate':
+            continue
+        i_rbd_images_seconds = []
+        for i_block_device_mapping in i_server_plan['block_device_mappings']:
+            allocated_size += (i_block_device_mapping['rbd_image_size'] or {}).get('used_size', 0)
+            unknown_size_count += not i_block_device_mapping['rbd_image_size']
+            i_rbd_images_seconds.append(get_rbd_image_copy_seconds(i_block_device_mapping['rbd_image_size'],
+                                                                   i_block_device_mapping['destination']['volume_size'],
+                                                                   copy_throughput))
+        # RBD images are migrated largest first
+        i_server_plan['estimated_copy_seconds'] = lib.get_parallel_duration(sorted(i_rbd_images_seconds, reverse=True),
+                                                                            args.rbd_parallelism)
+        servers_seconds.append(i_server_plan['estimated_copy_seconds'])
+    for i_volume_plan in migration_plan['volumes']:
+        if i_volume_plan['action'] == 'migrate':
+            allocated_size += (i_volume_plan['rbd_image_size'] or {}).get('used_size', 0)
+            unknown_size_count += not i_volume_plan['rbd_image_size']
+            volumes_seconds.append(get_rbd_image_copy_seconds(i_volume_plan['rbd_image_size'], i_volume_plan['volume']['size'],
+                                                              copy_throughput))
+    return {'copy_throughput_mibs': copy_throughput,
+            'copy_throughput_origin': copy_throughput_origin,
+            'allocated_size': allocated_size,
+            'unknown_size_rbd_images': unknown_size_count,
+            'duration_seconds': lib.get_parallel_duration(servers_seconds, args.server_parallelism) + sum(volumes_seconds)}
+
+
+def write_migration_plan(args, source_project_conn, destination_project_conn, source_project, destination_project,
+                         source_keypairs, source_rbd_images, destination_image, source_project_servers):
+    """ build migration plan of all source servers and explicit volumes (dry-run), write it with duration estimate as JSON """
+    migration_plan = {'source_project': source_project.name, 'destination_project': destination_project.name,
+                      'block_storage_volume_migration_mode': args.block_storage_volume_migration_mode}
+
+    def plan_server_noassert(i_source_server):
+        """ plan single server, planning failure is recorded and does not stop the dry-run """
+        i_args = lib.get_prefixed_args(args, f"[{i_source_server.name}]")
+        try:
+            return plan_server(i_args, source_project_conn, destination_project_conn, source_project, destination_project,
+                               source_keypairs, source_rbd_images, destination_image, i_source_server)
+        except Exception as ex:
+            i_args.logger.error(f"F.01 server migration cannot be planned - name:{i_source_server.name} ({type(ex).__name__}: {ex})")
+            return {'name': i_source_server.name, 'id': i_source_server.id, 'action': 'fail', 'error': f"{type(ex).__name__}: {ex}"}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.server_parallelism)) as executor:
+        migration_plan['servers'] = list(executor.map(plan_server_noassert, source_project_servers))
+    migration_plan['volumes'] = [plan_explicit_volume(args, source_project_conn, i_source_volume_name)
+                                 for i_source_volume_name in args.explicit_volume_names or []]
+    migration_plan['estimate'] = estimate_migration_duration(args, migration_plan)
+
+    with open(args.dry_run_plan_file, "w", encoding="utf-8") as file:
+        json.dump(migration_plan, file, indent=1)
+    servers_actions = [i_server_plan['action'] for i_server_plan in migration_plan['servers']]
+    args.logger.info(f"E.32 Migration plan written ({args.dry_run_plan_file}), servers to migrate: {servers_actions.count('migrate')}, "
+                     f"skipped: {servers_actions.count('skip')}, failed to plan: {servers_actions.count('fail')}, "
+                     f"allocated: {clib.format_size(migration_plan['estimate']['allocated_size'])}, "
+                     f"estimated duration: {migration_plan['estimate']['duration_seconds']:.0f}s "
+                     f"({migration_plan['estimate']['copy_throughput_mibs']:.1f} MiB/s {migration_plan['estimate']['copy_throughput_origin']} "
+                     "copy throughput)")
+    return migration_plan
+
+
+def prepare_server(args, source_project_conn, destination_project_conn, source_project, destination_project,
+                   source_keypairs, source_rbd_images, destination_image, i_source_server_detail):
+    """ get or create destination server resources except network ports (steps F.02-F.31),
+        returns server preparation (JSON serializable) and server network addresses """
+    # network/subnet/router detection & creation
+    i_destination_server_network_addresses = \
+        olib.get_or_create_dst_server_networking(args,
+                                                 source_project_conn, destination_project_conn,
+                                                 source_project, destination_project,
+                                                 i_source_server_detail)
+
+    # flavor detection
+    i_destination_server_flavor = olib.get_dst_server_flavor(args,
+                                                             i_source_server_detail,
+                                                             destination_project_conn)
+
+    # keypair detection / creation
+    i_destination_server_keypair = olib.get_or_create_dst_server_keypair(args, source_keypairs,
+                                                                         i_source_server_detail,
+                                                                         destination_project_conn)
+
+    # get / create server security groups
+    i_destination_server_security_groups = \
+        olib.get_or_create_dst_server_security_groups(args,
+                                                      source_project_conn, destination_project_conn,
+                                                      source_project, destination_project,
+                                                      i_source_server_detail)
+
+    # volume detection, block device mapping creation
+    i_server_block_device_mappings = \
+        olib.create_server_block_device_mappings(args, source_project_conn,
+                                                 i_source_server_detail, source_rbd_images)
+
+    # volume creation in destination cloud
+    i_server_block_device_mappings = \
+        olib.create_dst_server_volumes_update_block_device_mappings(args,
+                                                                    i_server_block_device_mappings,
+                                                                    destination_project_conn,
+                                                                    destination_image,
+                                                                    manage_volumes=args.destination_volume_creation_mode == DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE)
+
+    i_server_preparation = {'flavor_id': i_destination_server_flavor.id,
+                            'keypair_name': i_destination_server_keypair.name if i_destination_server_keypair else None,
+                            'security_groups': sorted({(i_destination_server_security_group.id, i_destination_server_security_group.name)
+                                                       for i_destination_server_security_group in i_destination_server_security_groups}),
+                            'block_device_mappings': i_server_block_device_mappings}
+    return i_server_preparation, i_destination_server_network_addresses
+
+
+def record_server_preparation(args, i_source_server_detail, i_server_preparation, i_server_network_connections):
+    """ complete server preparation with network connections (created ports) and record it into migration journal (F.32) """
+    i_server_preparation['networks'] = i_server_network_connections
+    lib.journal_record(args, lib.get_server_migration_journal_entity(i_source_server_detail), "F.32", i_server_preparation)
+    args.logger.info(f"F.32 Destination OpenStack server resources prepared - name:{i_source_server_detail.name}")
+    return i_server_preparation
+
+
+def get_prepared_server(args, destination_project_conn, i_source_server_detail):
+    """ return server preparation recorded in migration journal (F.32) when its destination volumes are still available """
+    if not (i_server_preparation := lib.journal_get(args, lib.get_server_migration_journal_entity(i_source_server_detail), "F.32")):
+        return None
+    # volumes managed once RBD images are migrated (--destination-volume-creation-mode=copy-manage) do not exist yet
+    i_server_volumes_statuses = lib.get_ostack_volumes_statuses(destination_project_conn,
+                                                                [i_block_device_mapping['destination']['volume_id']
+                                                                 for i_block_device_mapping in i_server_preparation['block_device_mappings']
+                                                                 if i_block_device_mapping['destination']['volume_id']])
+    if any(i_status != 'available' for i_status in i_server_volumes_statuses.values()):
+        args.logger.warning(f"F.32 Destination OpenStack server resources recorded in migration journal are not usable "
+                            f"(volumes: {i_server_volumes_statuses}), server gets prepared again - name:{i_source_server_detail.name}")
+        return None
+    args.logger.info(f"F.32 Destination OpenStack server resources reused from migration journal - name:{i_source_server_detail.name}")
+    return i_server_preparation
+
+
+def prepare_servers(args, source_project_conn, destination_project_conn, source_project, destination_project,
+                    source_keypairs, source_rbd_images, destination_image, source_project_servers):
+    """ prepare migration phase, get or create destination resources of all servers before any downtime (steps F.01-F.32),
+        missing ports of all servers are bulk-created per network """
+
+    def prepare_server_unless_skipped(i_source_server):
+        """ prepare single server unless it is skipped or already prepared """
+        i_args = lib.get_prefixed_args(args, f"[{i_source_server.name}]")
+        i_source_server_detail = source_project_conn.compute.find_server(i_source_server.id)
+        i_source_server_status = lib.get_source_server_status(i_args, i_source_server_detail)
+        if skip_reason := get_server_migration_skip_reason(i_args, destination_project_conn, i_source_server_detail, i_source_server_status):
+            i_args.logger.info(f"F.01 server preparation skipped - name:{i_source_server_detail.name} {skip_reason}")
+            return None
+        lib.journal_record_source_server_status(i_args, i_source_server_detail, i_source_server_status)
+        if get_prepared_server(i_args, destination_project_conn, i_source_server_detail):
+            return None
+        i_args.logger.info(f"F.01 server preparation started - name:{i_source_server_detail.name}, id:{i_source_server_detail.id}")
+        return (i_args, i_source_server_detail,
+                *prepare_server(i_args, source_project_conn, destination_project_conn, source_project, destination_project,
+                                source_keypairs, source_rbd_images, destination_image, i_source_server_detail))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.server_parallelism)) as executor:
+        servers_preparations = [i_server_preparation for i_server_preparation in executor.map(prepare_server_unless_skipped,
+                                                                                                source_project_servers)
+                                if i_server_preparation]
+
+    servers_network_connections = \
+        olib.create_dst_servers_network_connections(args, destination_project_conn, destination_project,
+                                                    {i_source_server_detail.id: i_server_network_addresses
+                                                     for _, i_source_server_detail, _, i_server_network_addresses in servers_preparations})
+    for i_args, i_source_server_detail, i_server_preparation, _ in servers_preparations:
+        record_server_preparation(i_args, i_source_server_detail, i_server_preparation, servers_network_connections[i_source_server_detail.id])
+    args.logger.info(f"F.32 Destination OpenStack resources of {len(servers_preparations)} servers prepared, "
+                     "servers get migrated by --migration-phase=cutover")
+
+
+def migrate_server(args, source_project_conn, destination_project_conn, source_project, destination_project,
+                   source_keypairs, source_rbd_images, destination_image, destination_fip_network, i_source_server):
+    """ migrate single source server (steps F.01-F.44), destination resources prepared already (F.32) are reused """
+
+    i_source_server_detail = source_project_conn.compute.find_server(i_source_server.id)
+    i_source_server_fip_properties = olib.get_server_floating_ip_properties(i_source_server_detail)
+    # status before migration, resumed migration may find source server stopped by the failed one
+    i_source_server_status = lib.get_source_server_status(args, i_source_server_detail)
+
+    if skip_reason := get_server_migration_skip_reason(args, destination_project_conn, i_source_server_detail, i_source_server_status):
+        args.logger.info(f"F.01 server migration skipped - name:{i_source_server_detail.name} {skip_reason}")
+        return
+    lib.journal_record_source_server_status(args, i_source_server_detail, i_source_server_status)
+
+    args.logger.info(f"F.01 server migration started - name:{i_source_server_detail.name}, id:{i_source_server_detail.id}, "
+                     f"keypair: {i_source_server_detail.key_name}, flavor: {i_source_server_detail.flavor}, "
+                     f"sec-groups:{i_source_server_detail.security_groups}, root_device_name: {i_source_server_detail.root_device_name}, "
+                     f"block_device_mapping: {i_source_server_detail.block_device_mapping}, "
+                     f"attached-volumes: {i_source_server_detail.attached_volumes}"
+                     f"addresses: {i_source_server_detail.addresses}, status before migration: {i_source_server_status}")
+
+    # journaled source RBD image snapshots are consistent only when source VM has not been running since, it is SHUTOFF
+    # and it was not restarted after snapshots were taken (it was SHUTOFF before migration or mode does not restart it)
+    i_reuse_source_rbd_image_snapshots = i_source_server_detail.status == 'SHUTOFF' and \
+        (i_source_server_status == 'SHUTOFF' or
+         args.block_storage_volume_migration_mode not in BLOCK_STORAGE_VOLUME_MIGRATION_MODES_VMON_AFTER_SNAP)
+
+    # destination resources (networking, flavor, keypair, security groups, volumes and ports)
+    if not (i_server_preparation := get_prepared_server(args, destination_project_conn, i_source_server_detail)):
+        if args.migration_phase == MIGRATION_PHASE_CUTOVER:
+            args.logger.warning(f"F.32 Destination OpenStack server resources were not prepared (--migration-phase=prepare) "
+                                f"and get prepared now - name:{i_source_server_detail.name}")
+        i_server_preparation, i_destination_server_network_addresses = \
+            prepare_server(args, source_project_conn, destination_project_conn, source_project, destination_project,
+                           source_keypairs, source_rbd_images, destination_image, i_source_server_detail)
+        record_server_preparation(args, i_source_server_detail, i_server_preparation,
+                                  olib.create_dst_servers_network_connections(args, destination_project_conn, destination_project,
+                                                                              {i_source_server_detail.id: i_destination_server_network_addresses})
+                                  [i_source_server_detail.id])
+    i_server_block_device_mappings = i_server_preparation['block_device_mappings']
+
+    # incremental volumes migration, base snapshots are transferred while source VM is running
+    i_block_device_migration_mappings = None
+    if args.block_storage_volume_migration_mode == BLOCK_STORAGE_VOLUME_MIGRATION_MODE_INCREMENTAL:
+        i_block_device_migration_mappings = clib.migrate_rbd_images_base(args, i_server_block_device_mappings,
+                                                                         reuse_source_rbd_image_snapshots=i_reuse_source_rbd_image_snapshots)
+
+    # source VM stop, wait for SHUTOFF
+    if i_source_server_detail.status != 'SHUTOFF':
+        source_project_conn.compute.stop_server(i_source_server_detail)
+        args.logger.info(f"F.33 Source OpenStack VM server (name:{i_source_server_detail.name}) requested to stop")
+        lib.log_or_assert(args, f"F.33 Source OpenStack VM server (name:{i_source_server_detail.name}) stopped (reached SHUTOFF state)",
+                          lib.wait_for_ostack_server_status(source_project_conn, i_source_server.id, 'SHUTOFF') == "SHUTOFF")
+
+    restore_source_server_status_args = {
+        'args': args,
+        'source_project_conn': source_project_conn,
+        'source_server_detail': i_source_server_detail,
+        'source_server': i_source_server,
+        'source_server_status': i_source_server_status
+    }
+
+    post_rbd_snap_callback=None
+    if args.block_storage_volume_migration_mode in BLOCK_STORAGE_VOLUME_MIGRATION_MODES_VMON_AFTER_SNAP:
+        # start server in source cloud (if necessary)
+        post_rbd_snap_callback = {
+            'func': olib.restore_source_server_status,
+            'args': restore_source_server_status_args
+        }
+
+    # volumes migration (browse i_server_block_device_mappings)
+    if i_block_device_migration_mappings is not None:
+        clib.migrate_rbd_images_incremental(args, i_block_device_migration_mappings, post_rbd_snap_callback)
+    else:
+        clib.migrate_rbd_images(args, i_server_block_device_mappings, post_rbd_snap_callback,
+                                direct_copy=args.block_storage_volume_migration_mode in BLOCK_STORAGE_VOLUME_MIGRATION_MODES_DIRECT_COPY,
+                                reuse_source_rbd_image_snapshots=i_reuse_source_rbd_image_snapshots)
+
+    # start server in source cloud (if necessary)
+    olib.restore_source_server_status(**restore_source_server_status_args)
+
+    # register migrated RBD images as destination volumes
+    if args.destination_volume_creation_mode == DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE:
+        i_server_block_device_mappings = olib.manage_dst_server_volumes_update_block_device_mappings(args,
+                                                                                                    i_server_block_device_mappings,
+                                                                                                    destination_project_conn)
+
+    # register migrated volume snapshots (--migrate-volume-snapshots)
+    olib.manage_dst_volume_snapshots(args, i_server_block_device_mappings, destination_project_conn)
+
+    # start server in destination cloud
+    i_destination_server = olib.create_dst_server(args,
+                                                  i_source_server_detail,
+                                                  destination_project_conn,
+                                                  i_server_preparation['flavor_id'],
+                                                  i_server_preparation['keypair_name'],
+                                                  i_server_block_device_mappings,
+                                                  i_server_preparation['networks'])
+
+    # add security groups to the destination server (if missing)
+    for i_destination_server_security_group_id, i_destination_server_security_group_name in i_server_preparation['security_groups']:
+        if {'name': i_destination_server_security_group_name} not in i_destination_server.security_groups:
+            destination_project_conn.add_server_security_groups(i_destination_server.id, i_destination_server_security_group_id)
+    if args.migrate_fip_addresses and i_source_server_fip_properties:
+        # add FIP as source VM has it
+        i_destination_server_fip = destination_project_conn.network.create_ip(floating_network_id=destination_fip_network.id)
+        lib.log_or_assert(args,
+                          f"F.39 Destination OpenStack server (name:{i_destination_server.name}) FIP is created ({i_destination_server_fip.floating_ip_address})",
+                          i_destination_server_fip, locals())
+        i_destination_server_ports = olib.find_ostack_port(destination_project_conn,
+                                                           i_source_server_fip_properties['floating/OS-EXT-IPS-MAC:mac_addr'],
+                                                           i_source_server_fip_properties['fixed/addr'],
+                                                           project=destination_project)
+        lib.log_or_assert(args, f"F.40 Destination OpenStack server (name:{i_destination_server.name}) FIP port(s) are detected",
+                          i_destination_server_ports, locals())
+        lib.log_or_assert(args, f"F.40 Destination OpenStack server (name:{i_destination_server.name}) single FIP port is detected",
+                          len(i_destination_server_ports) == 1, locals())
+        i_destination_server_port = i_destination_server_ports[0]
+        destination_project_conn.network.add_ip_to_port(i_destination_server_port, i_destination_server_fip)
+
+    args.logger.info(f"F.41 Source OpenStack server name:{i_source_server_detail.name} migrated into destination one name:{i_destination_server.name} id:{i_destination_server.id}")
+
+    if i_source_server_status != source_project_conn.compute.find_server(i_source_server.id).status and \
+            not args.source_servers_left_shutoff:
+        if i_source_server_status == 'ACTIVE':
+            if lib.wait_for_ostack_server_status(source_project_conn, i_source_server.id, i_source_server_status) != i_source_server_status:
+                args.logger.warning(f"F.42 Source OpenStack VM server has not become {i_source_server_status} yet, trying again...")
+                source_project_conn.compute.start_server(i_source_server_detail)
+                args.logger.info(f"F.42 Source OpenStack VM server (name:{i_source_server_detail.name}) requested to start again")
+            if lib.wait_for_ostack_server_status(source_project_conn, i_source_server.id, i_source_server_status) != i_source_server_status:
+                args.logger.error(f"F.42 Source OpenStack VM server (name:{i_source_server_detail.name}) has not become "
+                                  f"{i_source_server_status} yet (after second start). "
+                                  f"This situation is no longer asserted but needs manual admin inspection.")
+        else:
+            args.logger.error(f"F.42 Source OpenStack VM server (name:{i_source_server_detail.name}) is not in proper state, "
+                              f"but migrator does not know how to move to {i_source_server_status} state")
+    else:
+        args.logger.info(f"F.42 Source OpenStack VM server (name:{i_source_server_detail.name}) back in expected state {i_source_server_status}.")
 
 
 BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP="vmoff-snap-vmon-clone-flatten-copy-cleanup"
 BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_CLEANUP="vmoff-snap-clone-flatten-copy-cleanup-vmon"
+BLOCK_STORAGE_VOLUME_MIGRATION_MODE_INCREMENTAL="vmon-snap-copy-vmoff-snap-vmon-diff-cleanup"
+BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP_DIRECT_COPY="vmoff-snap-vmon-copy-cleanup"
+BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_CLEANUP_DIRECT_COPY="vmoff-snap-copy-cleanup-vmon"
+BLOCK_STORAGE_VOLUME_MIGRATION_MODES_VMON_AFTER_SNAP=(BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP,
+                                                    BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP_DIRECT_COPY,
+                                                    BLOCK_STORAGE_VOLUME_MIGRATION_MODE_INCREMENTAL)
+BLOCK_STORAGE_VOLUME_MIGRATION_MODES_DIRECT_COPY=(BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP_DIRECT_COPY,
+                                                  BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_CLEANUP_DIRECT_COPY)
 
-# main() call (argument parsing)
-# -------------------------------------------------------------------------------------------------
-if __name__ == "__main__":
+DESTINATION_VOLUME_CREATION_MODE_CREATE_REPLACE="create-replace"
+DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE="copy-manage"
+
+MIGRATION_PHASE_ALL="all"
+MIGRATION_PHASE_PREPARE="prepare"
+MIGRATION_PHASE_CUTOVER="cutover"
+
+
+def get_args(argv=None):
+    """ parse project migrator arguments (command line when argv is None) """
     AP = argparse.ArgumentParser(epilog=globals().get('__doc__'),
                                  formatter_class=argparse.RawDescriptionHelpFormatter)
     AP.add_argument('--source-openrc', default=None, type=argparse.FileType('r'),
@@ -332,6 +754,9 @@ if __name__ == "__main__":
                     help='OpenStack migrator SSH keyfile')
     AP.add_argument('--ceph-migrator-host-base-dir', default='/root/migrator',
                     help='OpenStack ceph migrator base directory for scripts and operations on ceph mogrator host')
+    AP.add_argument('--ceph-migrator-agent', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
+                    help='(Optional) Serve ceph operations by long-lived ceph agent (ceph-agent.py, requires python3-rados '
+                         'and python3-rbd on ceph migrator host) instead of executing script per operation.')
     AP.add_argument('--source-ceph-cinder-pool-name', default='prod-cinder-volumes',
                     help='Source OpenStack/ceph cloud Cinder pool name')
     AP.add_argument('--source-ceph-ephemeral-pool-name', default='prod-ephemeral-vms',
@@ -342,10 +767,24 @@ if __name__ == "__main__":
                     help='Destination OpenStack/ceph cloud "ephemeral on ceph" or "libvirt ephemeral" pool name')
     AP.add_argument('--source-keypair-xml-dump-file', default='/root/migrator/prod-nova_api_key_pairs.dump.xml',
                     help='Source OpenStack cloud keypair SQL/XML dump file name (on ceph-migrator-host)')
+    AP.add_argument('--source-keypair-cache-file', default="project-migrator.keypairs.cache.json",
+                    required=False,
+                    help='(Optional) Local cache of parsed source OpenStack cloud keypairs, revalidated by dump file modification time '
+                         'and size (empty string disables the cache)')
     AP.add_argument('--source-servers-left-shutoff', default=False, required=False, action='store_true',
                     help='Migrated source servers are left SHUTOFF (i.e. not started automatically).')
     AP.add_argument('--destination-bootable-volume-image-name', default='cirros-0-x86_64',
                     help='Destination cloud bootable volumes are made on top of public image. Name of destination cloud image.')
+    AP.add_argument('--destination-volume-creation-mode', default=DESTINATION_VOLUME_CREATION_MODE_CREATE_REPLACE, required=False,
+                    choices=[DESTINATION_VOLUME_CREATION_MODE_CREATE_REPLACE, DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE],
+                    help='(Optional) Mode of destination server volume creation. '
+                         f'Mode {DESTINATION_VOLUME_CREATION_MODE_CREATE_REPLACE} creates volumes (bootable ones from '
+                         '--destination-bootable-volume-image-name image) and replaces their RBD images by migrated ones. '
+                         f'Mode {DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE} migrates RBD images first and registers them '
+                         'as volumes with cinder manage-existing API (no image data written and deleted, no destination image needed).')
+    AP.add_argument('--destination-cinder-volume-host', default=None, required=False,
+                    help='(Optional) Destination cloud cinder volume service host managing destination Cinder pool '
+                         f'(host@backend#pool), required by --destination-volume-creation-mode={DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE}.')
     AP.add_argument('--destination-ipv4-external-network', default='external-ipv4-general-public',
                     help='Destination cloud IPV4 external network.')
     AP.add_argument('--destination-secgroup-name-prefix', default='migrated-',
@@ -355,8 +794,20 @@ if __name__ == "__main__":
     AP.add_argument('--destination-entity-description-suffix', default=', migrated(id:{})',
                     help='Destination cloud entity description suffix.')
 
-    AP.add_argument('--project-name', default=None, required=True,
-                    help='OpenStack project name (identical name in both clouds required)')
+    AP.add_argument('--project-name', default=None, required=False,
+                    help='OpenStack project name (identical name in both clouds required), required unless --campaign-file is used')
+    AP.add_argument('--source-domain-id', default=None, required=False,
+                    help='(Optional) Source OpenStack cloud keystone domain ID scoping project and user name lookups.')
+    AP.add_argument('--destination-domain-id', default=None, required=False,
+                    help='(Optional) Destination OpenStack cloud keystone domain ID scoping project and user name lookups.')
+    AP.add_argument('--campaign-file', default=None, required=False,
+                    help='(Optional) Migration campaign file, one project per line: <project-name>[-><destination-project-name>] '
+                         '[validation-a-source-server-id], projects share migrator connections, keypairs and ceph agent')
+    AP.add_argument('--campaign-parallelism', default=1, type=int, required=False,
+                    help='(Optional) Number of campaign projects migrated concurrently.')
+    AP.add_argument('--campaign-results-file', default="project-migrator.campaign.jsonl", required=False,
+                    help='(Optional) Migration campaign per-project results file (JSONL), every project migration '
+                         'uses own migration journal and exception trace file (suffixed by project name)')
     AP.add_argument('--explicit-server-names', default=None, required=False,
                     help='(Optional) List of explicit server names or IDs to be migrated. Delimiter comma or space.')
     AP.add_argument('--explicit-volume-names', default=None, required=False,
@@ -368,14 +819,63 @@ if __name__ == "__main__":
     AP.add_argument('--migrate-reuse-already-migrated-volumes', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
                     help='(Optional) Reuse matching already migrated volumes whem migration steps failed after volume transfer (step G17).')
     AP.add_argument('--migrate-volume-snapshots', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
-                    help='(Optional) Migrate OpenStack volume snapshots.')
+                    help='(Optional) Migrate OpenStack volume snapshots. RBD image of volume with snapshots is transferred as chain '
+                         'of snapshot differences (oldest first, rbd export-diff/import-diff) and destination volume snapshots are '
+                         'registered with cinder manage-existing API (steps F.43-F.44).')
+    AP.add_argument('--migrate-objstore-containers', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
+                    help='(Optional) Migrate OpenStack objstore containers and objects (steps D.11-D.15). Object data are streamed '
+                         'between clouds, objects of the same size and ETag in destination are skipped.')
+    AP.add_argument('--objstore-parallelism', default=4, type=int, required=False,
+                    help='(Optional) Number of objstore objects (or large object segments) transferred concurrently (steps D.12).')
+    AP.add_argument('--objstore-segment-size-mb', default=1024, type=int, required=False,
+                    help='(Optional) Objstore objects larger than segment size [MiB] are transferred as static large objects '
+                         '(SLO) with segments transferred concurrently (steps D.12-D.14).')
+    AP.add_argument('--server-parallelism', default=1, type=int, required=False,
+                    help='(Optional) Number of servers migrated concurrently (steps F.01-F.42).')
+    AP.add_argument('--rbd-parallelism', default=1, type=int, required=False,
+                    help='(Optional) Number of server block device RBD images migrated concurrently (steps G.06-G.18).')
+    AP.add_argument('--rbd-image-migration-composite', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
+                    help='(Optional) Migrate every snapshotted RBD image with single ceph migrator host command '
+                         '(ceph-rbd-image-migrate.sh, steps G.06-G.17) instead of command per step.')
     AP.add_argument('--block-storage-volume-migration-mode', default=BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP, required=False,
-                    choices=[BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP, BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_CLEANUP],
-                    help='(Optional) Mode which determines order of steps performed during volume migration (steps G.05-G.17, F34).')
-
-    AP.add_argument('--validation-a-source-server-id', default=None, required=True,
-                    help='For validation any server ID from source OpenStack project')
-
+                    choices=[BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP, BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_CLEANUP,
+                             BLOCK_STORAGE_VOLUME_MIGRATION_MODE_INCREMENTAL,
+                             BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_SNAP_DIRECT_COPY,
+                             BLOCK_STORAGE_VOLUME_MIGRATION_MODE_VMON_AFTER_CLEANUP_DIRECT_COPY],
+                    help='(Optional) Mode which determines order of steps performed during volume migration (steps G.05-G.24, F34). '
+                         f'Mode {BLOCK_STORAGE_VOLUME_MIGRATION_MODE_INCREMENTAL} transfers base RBD snapshots while source VM is running '
+                         'and only the snapshot differences (rbd export-diff/import-diff) once it is stopped. '
+                         'Modes without clone-flatten copy RBD image snapshots directly into destination pool.')
+
+    AP.add_argument('--migration-phase', default=MIGRATION_PHASE_ALL, required=False,
+                    choices=[MIGRATION_PHASE_ALL, MIGRATION_PHASE_PREPARE, MIGRATION_PHASE_CUTOVER],
+                    help='(Optional) Migration phase. Phase prepare creates destination resources of all servers (networking, ports, '
+                         'keypairs, security groups and volumes, steps F.01-F.32) and records them in migration journal '
+                         'before any downtime. Phase cutover continues migration journal of phase prepare (implies --resume=true) '
+                         'and only stops, copies and boots servers. Phase all does both per server.')
+
+    AP.add_argument('--wait-initial-interval', default=1, type=float, required=False,
+                    help='(Optional) Initial interval [s] between OpenStack server/volume status polls.')
+    AP.add_argument('--wait-max-interval', default=10, type=float, required=False,
+                    help='(Optional) Maximal interval [s] between OpenStack server/volume status polls (exponential backoff).')
+    AP.add_argument('--wait-backoff-factor', default=2, type=float, required=False,
+                    help='(Optional) Exponential backoff factor of OpenStack server/volume status polls.')
+    AP.add_argument('--wait-jitter', default=0.2, type=float, required=False,
+                    help='(Optional) Relative jitter of OpenStack server/volume status poll intervals.')
+
+    AP.add_argument('--validation-a-source-server-id', default=None, required=False,
+                    help='For validation any server ID from source OpenStack project, required unless --campaign-file is used')
+
+    AP.add_argument('--migration-journal-file', default="project-migrator.journal.jsonl",
+                    required=False,
+                    help='Migration journal file recording completed migration steps (JSONL)')
+    AP.add_argument('--resume', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
+                    help='(Optional) Resume failed migration, skip steps recorded in the migration journal (reuse destination volumes, '
+                         'source RBD snapshots, clones and copies).')
+    AP.add_argument('--timing-report-file', default="project-migrator.timing.json", required=False,
+                    help='(Optional) Step timing report file (JSON, spans and time per step code), empty string disables the report')
+    AP.add_argument('--timing-report-prometheus-file', default=None, required=False,
+                    help='(Optional) Step timing report file in Prometheus textfile collector format (*.prom)')
     AP.add_argument('--exception-trace-file', default="project-migrator.dump",
                     required=False,
                     help='Exception / assert dump state file')
@@ -383,22 +883,66 @@ if __name__ == "__main__":
                     choices=[i_lvl for i_lvl in dir(logging) if i_lvl.isupper() and i_lvl.isalpha()],
                     help='Executio log level (python logging)')
     AP.add_argument('--dry-run', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
-                    help='Migration dry-run mode. Stop before first modification action.')
+                    help='Migration dry-run mode. Stop before first modification action, write migration plan (--dry-run-plan-file).')
+    AP.add_argument('--dry-run-plan-file', default="project-migrator.plan.json", required=False,
+                    help='(Optional) Dry-run migration plan file (JSON, per-server networking, flavor, keypair, security group and '
+                         'volume actions, allocated RBD image sizes and migration duration estimate)')
+    AP.add_argument('--copy-throughput', default=None, type=float, required=False,
+                    help='(Optional) RBD image copy throughput [MiB/s of allocated size] for dry-run migration duration estimate, '
+                         'throughput measured by previous migrations (--copy-throughput-journal-files) is used by default.')
+    AP.add_argument('--copy-throughput-journal-files', default=None, required=False,
+                    help='(Optional) List of migration journal files of previous migrations measuring RBD image copy throughput. '
+                         'Delimiter comma or space. Default is --migration-journal-file.')
     AP.add_argument('--debugging', default=False, required=False, choices=lib.BOOLEAN_CHOICES,
                     help='(Optional) Enter development debugging mode.')
 
-    ARGS = AP.parse_args()
-    ARGS.logger = logging.getLogger("project-migrator")
-    ARGS.explicit_server_names = lib.get_resource_names_ids(ARGS.explicit_server_names)
-    ARGS.explicit_volume_names = lib.get_resource_names_ids(ARGS.explicit_volume_names)
-    ARGS.migrate_fip_addresses = str(ARGS.migrate_fip_addresses).lower() == "true"
-    ARGS.dry_run = str(ARGS.dry_run).lower() == "true"
-    ARGS.debugging = str(ARGS.debugging).lower() == "true"
-    ARGS.migrate_reuse_already_migrated_volumes = str(ARGS.migrate_reuse_already_migrated_volumes).lower() == "true"
-    ARGS.migrate_volume_snapshots = str(ARGS.migrate_volume_snapshots).lower() == "true"
-    ARGS.migrate_inactive_servers = str(ARGS.migrate_inactive_servers).lower() == "true"
+    args = AP.parse_args(argv)
+    if not args.campaign_file and not (args.project_name and args.validation_a_source_server_id):
+        AP.error("--project-name and --validation-a-source-server-id are required unless --campaign-file is used")
+    if args.destination_volume_creation_mode == DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE and not args.destination_cinder_volume_host:
+        AP.error(f"--destination-cinder-volume-host is required by --destination-volume-creation-mode={DESTINATION_VOLUME_CREATION_MODE_COPY_MANAGE}")
+    if args.objstore_segment_size_mb < 1:
+        AP.error("--objstore-segment-size-mb has to be at least 1")
+    args.logger = logging.getLogger("project-migrator")
+    args.explicit_server_names = lib.get_resource_names_ids(args.explicit_server_names)
+    args.explicit_volume_names = lib.get_resource_names_ids(args.explicit_volume_names)
+    args.copy_throughput_journal_files = lib.get_resource_names_ids(args.copy_throughput_journal_files)
+    args.migrate_fip_addresses = str(args.migrate_fip_addresses).lower() == "true"
+    args.dry_run = str(args.dry_run).lower() == "true"
+    args.resume = str(args.resume).lower() == "true" or args.migration_phase == MIGRATION_PHASE_CUTOVER
+    args.debugging = str(args.debugging).lower() == "true"
+    args.migrate_reuse_already_migrated_volumes = str(args.migrate_reuse_already_migrated_volumes).lower() == "true"
+    args.migrate_volume_snapshots = str(args.migrate_volume_snapshots).lower() == "true"
+    args.migrate_objstore_containers = str(args.migrate_objstore_containers).lower() == "true"
+    args.migrate_inactive_servers = str(args.migrate_inactive_servers).lower() == "true"
+    args.ceph_migrator_agent = str(args.ceph_migrator_agent).lower() == "true"
+    args.rbd_image_migration_composite = str(args.rbd_image_migration_composite).lower() == "true"
+    return args
+
+
+# main() call (argument parsing)
+# -------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    ARGS = get_args()
+
+    lib.WAIT_BACKOFF |= {'initial_interval': ARGS.wait_initial_interval,
+                         'max_interval': ARGS.wait_max_interval,
+                         'factor': ARGS.wait_backoff_factor,
+                         'jitter': ARGS.wait_jitter}
 
     logging.basicConfig(level=getattr(logging, ARGS.log_level),
                         format='%(asctime)s %(name)s %(levelname)s %(message)s')
-
-    sys.exit(main(ARGS))
+    # step timing spans are recorded from step coded log messages
+    STEP_TIMING_RECORDER = lib.StepTimingRecorder()
+    ARGS.logger.addHandler(STEP_TIMING_RECORDER)
+
+    try:
+        sys.exit(main(ARGS))
+    finally:
+        # report time spent per step code
+        for i_line in STEP_TIMING_RECORDER.get_step_statistics_table():
+            ARGS.logger.info(f"Step timing: {i_line}")
+        STEP_TIMING_RECORDER.write_report(ARGS.timing_report_file, ARGS.timing_report_prometheus_file)
+        # shutdown ceph agents and pooled SSH connections to ceph migrator host
+        clib.close_ceph_agents()
+        lib.close_ssh_clients()
@@ -0,0 +1,124 @@
+""" OpenStack migrator tests - shared fixtures
+
+Tests run against the benchmark fake clouds (benchmark/fakeostack.py) and fake ceph migrator host
+(benchmark/fakeceph.py executing ceph-migrator-host/*.sh scripts locally on sparse files).
+"""
+
+import importlib.util
+import logging
+import os
+import os.path
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATOR_DIR = os.path.dirname(TESTS_DIR)
+BENCHMARK_DIR = os.path.join(MIGRATOR_DIR, 'benchmark')
+SCRIPTS_DIR = os.path.join(os.path.dirname(MIGRATOR_DIR), 'ceph-migrator-host')
+sys.path[:0] = [MIGRATOR_DIR, BENCHMARK_DIR]
+
+import fakeceph  # pylint: disable=wrong-import-position
+import lib  # pylint: disable=wrong-import-position
+
+RBD_IMAGE_SIZE = 16 * 1024 * 1024
+SOURCE_POOL_NAME = 'prod-ephemeral-vms'
+DESTINATION_POOL_NAME = 'cloud-cinder-volumes-prod-brno'
+DATA_SIZE = 64 * 1024
+
+
+class MigrationInterrupted(Exception):
+    """ injected migration failure """
+
+
+def load_module(name, file_name):
+    """ load python file with dashes in name (project-migrator.py, project-migrator-benchmark.py) as module """
+    spec = importlib.util.spec_from_file_location(name, file_name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def project_migrator():
+    return load_module('project_migrator', os.path.join(MIGRATOR_DIR, 'project-migrator.py'))
+
+
+@pytest.fixture(scope="session")
+def project_migrator_benchmark():
+    return load_module('project_migrator_benchmark', os.path.join(BENCHMARK_DIR, 'project-migrator-benchmark.py'))
+
+
+@pytest.fixture
+def migrator_args(tmp_path, project_migrator):
+    """ migrator arguments with migration journal in test directory, returns function (resume=False, *extra_argv) -> args """
+    for i_cloud_name in ('source', 'destination'):
+        (tmp_path / f"{i_cloud_name}.openrc").write_text(f"export OS_AUTH_URL=fake://{i_cloud_name}\n", encoding="utf-8")
+    (tmp_path / 'sshkey').write_text("fake ssh key\n", encoding="utf-8")
+
+    def get_migrator_args(resume=False, *extra_argv):
+        args = project_migrator.get_args(['--source-openrc', str(tmp_path / 'source.openrc'),
+                                          '--destination-openrc', str(tmp_path / 'destination.openrc'),
+                                          '--project-name', 'test-project', '--validation-a-source-server-id', 'test-server',
+                                          '--ceph-migrator-host', 'fake-ceph-migrator-host',
+                                          '--ceph-migrator-sshkeyfile', str(tmp_path / 'sshkey'),
+                                          '--migration-journal-file', str(tmp_path / 'project-migrator.journal.jsonl'),
+                                          '--exception-trace-file', str(tmp_path / 'project-migrator.dump'),
+                                          '--resume', str(resume).lower(), *extra_argv])
+        args.logger.setLevel(logging.DEBUG)
+        lib.open_migration_journal(args)
+        return args
+    return get_migrator_args
+
+
+@pytest.fixture
+def ceph_host(tmp_path, monkeypatch):
+    """ fake ceph migrator host serving migrator ssh commands """
+    host = fakeceph.FakeCephHost(str(tmp_path / 'ceph'), SCRIPTS_DIR)
+    monkeypatch.setattr(lib, 'get_ssh_client', lambda hostname, username, key_filename: host)
+    return host
+
+
+def write_rbd_image(ceph_state_dir, pool_name, rbd_image_name, data, offset=0):
+    """ create (unless exists) fake RBD image and write data into it """
+    if not os.path.isdir(fakeceph.get_image_dir(ceph_state_dir, pool_name, rbd_image_name)):
+        fakeceph.create_image(ceph_state_dir, pool_name, rbd_image_name, RBD_IMAGE_SIZE)
+    with open(fakeceph.get_data_file(ceph_state_dir, pool_name, rbd_image_name), "r+b") as file:
+        os.pwrite(file.fileno(), data, offset)
+
+
+def read_rbd_image(ceph_state_dir, pool_name, rbd_image_name, size, offset=0, snapshot=None):
+    """ read fake RBD image (snapshot) data """
+    with open(fakeceph.get_data_file(ceph_state_dir, pool_name, rbd_image_name, snapshot), "rb") as file:
+        return os.pread(file.fileno(), size, offset)
+
+
+def list_rbd_image_snapshots(ceph_state_dir, pool_name, rbd_image_name):
+    """ return fake RBD image snapshot names """
+    return set(fakeceph.load_meta(ceph_state_dir, pool_name, rbd_image_name)['snapshots'])
+
+
+def get_server_block_device_mapping(ceph_state_dir, name):
+    """ return block device mapping of source RBD image <name>_disk and destination volume RBD image, both created """
+    write_rbd_image(ceph_state_dir, DESTINATION_POOL_NAME, f"volume-{name}-volume", b'\0')
+    return {'source': {'ceph_pool_name': SOURCE_POOL_NAME, 'ceph_rbd_image_name': f"{name}_disk"},
+            'destination': {'ceph_pool_name': DESTINATION_POOL_NAME, 'volume_id': f"{name}-volume", 'volume_size': 1}}
+
+
+def write_source_data(ceph_state_dir, name, offset=0):
+    """ (re)write source RBD image data, returns written data """
+    data = os.urandom(DATA_SIZE)
+    write_rbd_image(ceph_state_dir, SOURCE_POOL_NAME, f"{name}_disk", data, offset)
+    return data
+
+
+def read_destination_data(ceph_state_dir, name, offset=0):
+    return read_rbd_image(ceph_state_dir, DESTINATION_POOL_NAME, f"volume-{name}-volume", DATA_SIZE, offset)
+
+
+def get_source_server_restart_callback(ceph_state_dir, name, written_data):
+    """ post snapshot callback rewriting source RBD image (source server running again) and interrupting migration """
+    def restart_source_server_and_interrupt():
+        written_data.append(write_source_data(ceph_state_dir, name))
+        raise MigrationInterrupted()
+    return {'func': restart_source_server_and_interrupt, 'args': {}}
@@ -0,0 +1,188 @@
+""" OpenStack migrator tests - ceph agent (ceph-migrator-host/ceph-agent.py) served in-process
+
+Agent librados / librbd calls are served by test doubles operating on fake ceph state (benchmark/fakeceph.py),
+agent data operation scripts are executed with fake rbd command.
+"""
+
+import collections
+import os.path
+import sys
+import types
+
+import pytest
+
+import clib
+import fakeceph
+from conftest import (SCRIPTS_DIR, SOURCE_POOL_NAME, get_server_block_device_mapping, list_rbd_image_snapshots, load_module,
+                      read_destination_data, write_rbd_image, write_source_data)
+
+
+def get_librbd_modules(ceph_state_dir):
+    """ return rados and rbd modules serving librados / librbd calls used by ceph agent from fake ceph state """
+    class Error(Exception):
+        pass
+
+    class ImageNotFound(Error):
+        pass
+
+    def fake_rbd_call(func, *attrs):
+        try:
+            return func(ceph_state_dir, *attrs)
+        except fakeceph.RbdError as ex:
+            raise (ImageNotFound if ex.errno == 2 else Error)(str(ex)) from None
+
+    class Ioctx:
+        def __init__(self, pool_name):
+            self.pool_name = pool_name
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *attrs):
+            pass
+
+    class Rados:
+        def __init__(self, conffile, name, conf):
+            self.name = name
+
+        def connect(self):
+            pass
+
+        def open_ioctx(self, pool_name):
+            return Ioctx(pool_name)
+
+        def shutdown(self):
+            pass
+
+    class Image:
+        def __init__(self, ioctx, name, read_only=False):
+            self.spec = f"{ioctx.pool_name}/{name}"
+            self.meta = fake_rbd_call(lambda state_dir: fakeceph.load_meta(state_dir, ioctx.pool_name, name))
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *attrs):
+            pass
+
+        def list_snaps(self):
+            return [{'name': i_snapshot} for i_snapshot in self.meta['snapshots']]
+
+        def create_snap(self, name):
+            fake_rbd_call(fakeceph.rbd_snap, 'create', f"{self.spec}@{name}")
+
+        def protect_snap(self, name):
+            fake_rbd_call(fakeceph.rbd_snap, 'protect', f"{self.spec}@{name}")
+
+        def unprotect_snap(self, name):
+            fake_rbd_call(fakeceph.rbd_snap, 'unprotect', f"{self.spec}@{name}")
+
+        def remove_snap(self, name):
+            fake_rbd_call(fakeceph.rbd_snap, 'rm', f"{self.spec}@{name}")
+
+        def flatten(self):
+            fake_rbd_call(fakeceph.rbd_flatten, self.spec)
+
+    class RBD:
+        def remove(self, ioctx, name):
+            fake_rbd_call(fakeceph.rbd_rm, f"{ioctx.pool_name}/{name}")
+
+        def create(self, ioctx, name, size, old_format=False):
+            fake_rbd_call(fakeceph.rbd_create, f"{ioctx.pool_name}/{name}", size // 1024 // 1024)
+
+        def clone(self, src_ioctx, src_name, src_snapshot_name, dst_ioctx, dst_name):
+            fake_rbd_call(fakeceph.rbd_clone, f"{src_ioctx.pool_name}/{src_name}@{src_snapshot_name}", f"{dst_ioctx.pool_name}/{dst_name}")
+
+    return (types.SimpleNamespace(Rados=Rados),
+            types.SimpleNamespace(Error=Error, ImageNotFound=ImageNotFound, Image=Image, RBD=RBD))
+
+
+class InProcessCephAgentClient:
+    """ clib.CephAgentClient stand-in, requests are served by in-process ceph agent, served requests are counted """
+    closed = False
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.requests = collections.Counter()
+
+    def call(self, method, progress_callback=None, **params):
+        self.requests[method] += 1
+        try:
+            result, ecode = getattr(self.agent, method)(**params)
+            return result, "", ecode
+        except Exception as ex:
+            return [], f"{type(ex).__name__}: {ex}", 1
+
+    def run_script(self, script_name, script_args, pool_name, dst_pool_name=None, progress_callback=None):
+        self.requests[script_name] += 1
+        stdout, ecode, stderr = self.agent.run_script(self.requests.total(), script_name, script_args, pool_name, dst_pool_name)
+        return stdout, stderr, ecode
+
+
+@pytest.fixture
+def ceph_agent(ceph_host, monkeypatch):
+    """ in-process ceph agent on fake ceph state, data operation scripts use fake rbd command """
+    rados, rbd = get_librbd_modules(ceph_host.state_dir)
+    monkeypatch.setitem(sys.modules, 'rados', rados)
+    monkeypatch.setitem(sys.modules, 'rbd', rbd)
+    for i_name, i_value in ceph_host.env.items():
+        monkeypatch.setenv(i_name, i_value)
+    ceph_agent_module = load_module('ceph_agent', os.path.join(SCRIPTS_DIR, 'ceph-agent.py'))
+    return ceph_agent_module.CephAgent([SOURCE_POOL_NAME])
+
+
+def test_ceph_agent_find_image_is_unambiguous(ceph_agent, ceph_host):
+    for i_name in ('image', 'volume-image', 'volume-other-image'):
+        write_rbd_image(ceph_host.state_dir, SOURCE_POOL_NAME, i_name, b'\0')
+
+    with ceph_agent.open_ioctx(SOURCE_POOL_NAME) as ioctx:
+        assert ceph_agent.find_images(ioctx, 'image') == ['image', 'volume-image']
+        assert ceph_agent.find_image(ioctx, 'other-image') == 'volume-other-image'
+        with pytest.raises(sys.modules['rbd'].ImageNotFound):
+            ceph_agent.find_image(ioctx, 'image')
+    assert ceph_agent.image_exists(SOURCE_POOL_NAME, 'image') == (['image', 'volume-image'], 0)
+    assert ceph_agent.image_exists(SOURCE_POOL_NAME, 'missing-image') == ([], 1)
+
+
+def test_ceph_agent_find_snapshot_matches_whole_name(ceph_agent, ceph_host):
+    write_rbd_image(ceph_host.state_dir, SOURCE_POOL_NAME, 'image', b'\0')
+    for i_snapshot_name in ('migration-snapshot-old', 'snapshot.migration-snapshot'):
+        fakeceph.rbd_snap(ceph_host.state_dir, 'create', f"{SOURCE_POOL_NAME}/image@{i_snapshot_name}")
+
+    assert ceph_agent.snapshot_exists(SOURCE_POOL_NAME, 'image', 'migration-snapshot') == (['snapshot.migration-snapshot'], 0)
+    assert ceph_agent.snapshot_exists(SOURCE_POOL_NAME, 'image', 'migration') == ([], 1)
+
+
+@pytest.mark.parametrize("direct_copy", [False, True])
+def test_migrate_rbd_images_composite_via_ceph_agent(migrator_args, ceph_host, ceph_agent, monkeypatch, direct_copy):
+    ceph_state_dir = ceph_host.state_dir
+    mapping = get_server_block_device_mapping(ceph_state_dir, 'server')
+    source_data = write_source_data(ceph_state_dir, 'server')
+    args = migrator_args(False, '--ceph-migrator-agent', 'true', '--rbd-image-migration-composite', 'true')
+    ceph_agent_client = InProcessCephAgentClient(ceph_agent)
+    monkeypatch.setitem(clib.CEPH_AGENTS, (args.ceph_migrator_host, args.ceph_migrator_user, args.ceph_migrator_sshkeyfile.name),
+                        ceph_agent_client)
+
+    clib.migrate_rbd_images(args, [mapping], direct_copy=direct_copy)
+    assert read_destination_data(ceph_state_dir, 'server') == source_data
+    assert not list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, 'server_disk')
+    assert not os.path.isdir(fakeceph.get_image_dir(ceph_state_dir, SOURCE_POOL_NAME, 'g1-g2-migration-server_disk'))
+    # snapshotted RBD image is migrated by single agent request, steps reported by the script are journaled
+    assert ceph_agent_client.requests['ceph-rbd-image-migrate.sh'] == 1
+    assert not ceph_host.get_round_trips()
+    assert clib.journal_get(migrator_args(True), f"{SOURCE_POOL_NAME}/server_disk", "G.17")
+
+
+@pytest.mark.parametrize("ceph_migrator_agent", [False, True])
+def test_ceph_rbd_images_exist(migrator_args, ceph_host, ceph_agent, monkeypatch, ceph_migrator_agent):
+    for i_name in ('server-a_disk', 'server-b_disk', 'server-c_disk'):
+        write_rbd_image(ceph_host.state_dir, SOURCE_POOL_NAME, i_name, b'\0')
+    args = migrator_args(False, '--ceph-migrator-agent', str(ceph_migrator_agent).lower())
+    monkeypatch.setitem(clib.CEPH_AGENTS, (args.ceph_migrator_host, args.ceph_migrator_user, args.ceph_migrator_sshkeyfile.name),
+                        InProcessCephAgentClient(ceph_agent))
+
+    # RBD images are looked up by name (librbd test double has no pool listing), missing ones are not a failure
+    assert clib.ceph_rbd_images_exist(args, SOURCE_POOL_NAME, ['server-a_disk', 'server-c_disk', 'server-d_disk']) == \
+        {'server-a_disk', 'server-c_disk'}
+    assert clib.ceph_rbd_images_exist(args, 'missing-pool', ['server-a_disk']) == set()
+    assert ceph_host.get_round_trips() == (0 if ceph_migrator_agent else 2)
@@ -0,0 +1,76 @@
+""" OpenStack migrator tests - source keypairs dump parsing, caching and keypair selection """
+
+import fakeostack
+import olib
+import pytest
+
+KEYPAIRS_DUMP_ROWS = (('1', 'key', 'user-a', 'ssh-rsa AAAA-a'),
+                      ('2', 'key', 'user-a', 'ssh-rsa AAAA-a2'),
+                      ('3', 'key', 'user-b', 'ssh-rsa AAAA-b'),
+                      ('4', 'other-key', 'user-b', 'ssh-rsa AAAA-other'))
+
+
+def write_keypairs_dump(file_name, rows):
+    """ write source keypairs (nova_api.key_pairs) mysqldump XML """
+    with open(file_name, "w", encoding="utf-8") as file:
+        file.write('<?xml version="1.0"?>\n<mysqldump xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n'
+                   '<database name="nova_api">\n<table_data name="key_pairs">\n')
+        for i_id, i_name, i_user_id, i_public_key in rows:
+            file.write(f'\t<row>\n\t\t<field name="id">{i_id}</field>\n\t\t<field name="name">{i_name}</field>\n'
+                       f'\t\t<field name="user_id">{i_user_id}</field>\n\t\t<field name="fingerprint">00:{i_id}</field>\n'
+                       f'\t\t<field name="public_key">{i_public_key}</field>\n\t\t<field name="type">ssh</field>\n\t</row>\n')
+        file.write('</table_data>\n</database>\n</mysqldump>\n')
+
+
+def get_keypair(name, user_id, public_key):
+    return {'name': name, 'user_id': user_id, 'public_key': public_key, 'type': 'ssh'}
+
+
+def test_download_source_keypairs(migrator_args, ceph_host, tmp_path):
+    write_keypairs_dump(tmp_path / 'key_pairs.dump.xml', KEYPAIRS_DUMP_ROWS)
+    keypair_argv = ['--source-keypair-xml-dump-file', str(tmp_path / 'key_pairs.dump.xml'),
+                    '--source-keypair-cache-file', str(tmp_path / 'keypairs.cache.json')]
+
+    keypairs = olib.download_source_keypairs(migrator_args(False, *keypair_argv))
+    # only needed fields are kept, keypairs of the same name and user are all indexed
+    assert keypairs == {'key': {'user-a': [get_keypair('key', 'user-a', 'ssh-rsa AAAA-a'),
+                                           get_keypair('key', 'user-a', 'ssh-rsa AAAA-a2')],
+                                'user-b': [get_keypair('key', 'user-b', 'ssh-rsa AAAA-b')]},
+                        'other-key': {'user-b': [get_keypair('other-key', 'user-b', 'ssh-rsa AAAA-other')]}}
+    assert ceph_host.commands['cat'] == 1
+
+    # unchanged dump is loaded from cache, changed one is downloaded again
+    assert olib.download_source_keypairs(migrator_args(False, *keypair_argv)) == keypairs
+    assert ceph_host.commands['cat'] == 1
+    write_keypairs_dump(tmp_path / 'key_pairs.dump.xml', KEYPAIRS_DUMP_ROWS[3:])
+    assert olib.download_source_keypairs(migrator_args(False, *keypair_argv)) == \
+        {'other-key': {'user-b': [get_keypair('other-key', 'user-b', 'ssh-rsa AAAA-other')]}}
+    assert ceph_host.commands['cat'] == 2
+
+
+@pytest.fixture
+def source_keypairs():
+    return olib.index_keypairs([get_keypair(i_name, i_user_id, i_public_key) for _, i_name, i_user_id, i_public_key in KEYPAIRS_DUMP_ROWS])
+
+
+def get_server(key_name, user_id):
+    return fakeostack.FakeResource(name='server', key_name=key_name, user_id=user_id)
+
+
+def test_get_src_server_keypair(migrator_args, source_keypairs, caplog):
+    args = migrator_args()
+    assert olib.get_src_server_keypair(args, source_keypairs, get_server('key', 'user-b'))['public_key'] == 'ssh-rsa AAAA-b'
+    assert "F.7 Multiple source keypairs found" not in caplog.text
+
+    # keypairs of the same name and user, the first one is picked
+    assert olib.get_src_server_keypair(args, source_keypairs, get_server('key', 'user-a'))['public_key'] == 'ssh-rsa AAAA-a'
+    assert "F.7 Multiple source keypairs found when searching with (key_name=key, used_id=user-a)" in caplog.text
+
+    # single keypair of the name is selected by name only
+    assert olib.get_src_server_keypair(args, source_keypairs, get_server('other-key', 'user-c'))['public_key'] == 'ssh-rsa AAAA-other'
+    assert "F.7 No source keypair found when selecting by (key_name=other-key, used_id=user-c)" in caplog.text
+
+
+def test_get_src_server_keypair_ambiguous_name(migrator_args, source_keypairs):
+    with pytest.raises(AssertionError, match="F.7 Single"):
+        olib.get_src_server_keypair(migrator_args(), source_keypairs, get_server('key', 'user-c'))
@@ -0,0 +1,84 @@
+""" OpenStack migrator tests - objstore container migration (objects streamed between fake clouds) """
+
+import json
+import os
+
+import pytest
+
+import fakeostack
+import olib
+
+MIB = 1024 * 1024
+
+
+@pytest.fixture
+def objstore_conns():
+    """ source and destination project connections of fake clouds """
+    conns = []
+    for i_cloud_name in ('source', 'destination'):
+        i_cloud = fakeostack.FakeCloud(i_cloud_name)
+        i_cloud.add('projects', name='test-project', is_enabled=True, domain_id='default')
+        conns.append(i_cloud.connect('test-project'))
+    return conns
+
+
+@pytest.fixture
+def objstore_args(migrator_args):
+    return migrator_args(False, '--migrate-objstore-containers', 'true', '--objstore-segment-size-mb', '1',
+                         '--objstore-parallelism', '3')
+
+
+def add_objects(conn, container_name, objects):
+    """ add source objstore container objects {name: data} """
+    conn.cloud.add_container(conn.project, container_name)
+    for i_name, i_data in objects.items():
+        conn.cloud.add_object(conn.project, container_name, i_name, i_data)
+
+
+def migrate_objstore_containers(args, src_conn, dst_conn):
+    return olib.migrate_ostack_objstore_containers(args, src_conn, dst_conn, olib.get_ostack_objstore_containers(src_conn))
+
+
+def test_migrate_objstore_containers_streams_objects(objstore_args, objstore_conns):
+    src_conn, dst_conn = objstore_conns
+    objects = {f"object-{i_index}": os.urandom(64 * 1024) for i_index in range(5)} | {'large-object': os.urandom(5 * MIB // 2)}
+    add_objects(src_conn, 'data', objects)
+
+    stats = migrate_objstore_containers(objstore_args, src_conn, dst_conn)
+    assert (stats['objects'], stats['bytes'], stats['failed']) == (6, sum(len(i_data) for i_data in objects.values()), 0)
+    for i_name, i_data in objects.items():
+        assert dst_conn.cloud.get_object_data(dst_conn.project, 'data', i_name) == i_data
+    # object larger than --objstore-segment-size-mb is uploaded as SLO of segments streamed by byte ranges
+    assert dst_conn.cloud.get_object(dst_conn.project, 'data', 'large-object').is_static_large_object
+    assert len(dst_conn.cloud.list('objects', container='data_segments')) == 3
+    assert src_conn.cloud.api_calls['objectstore.stream_object'] == 5 + 3
+
+    # re-run transfers nothing, all objects are unchanged
+    stream_object_calls = src_conn.cloud.api_calls['objectstore.stream_object']
+    stats = migrate_objstore_containers(objstore_args, src_conn, dst_conn)
+    assert (stats['objects'], stats['skipped'], stats['failed']) == (0, 6, 0)
+    assert src_conn.cloud.api_calls['objectstore.stream_object'] == stream_object_calls
+
+
+def test_migrate_objstore_containers_large_object_manifests(objstore_args, objstore_conns):
+    src_conn, dst_conn = objstore_conns
+    slo_segments = {f"archive/slo/1700000000/{2 * 64 * 1024}/{64 * 1024}/{i_index:08d}": os.urandom(64 * 1024) for i_index in range(2)}
+    dlo_segments = {f"log/{i_index:03d}": os.urandom(16 * 1024) for i_index in range(3)}
+    add_objects(src_conn, 'backup_segments', slo_segments | dlo_segments | {'readme': b'not a segment'})
+    add_objects(src_conn, 'backup', {})
+    src_conn.object_store.put('backup/archive', params={'multipart-manifest': 'put'},
+                              data=json.dumps([{'path': f"/backup_segments/{i_name}"} for i_name in slo_segments]))
+    src_conn.object_store.put('backup/log', headers={'X-Object-Manifest': 'backup_segments/log/'}, data=b'')
+
+    stats = migrate_objstore_containers(objstore_args, src_conn, dst_conn)
+    assert (stats['objects'], stats['slo_segments'], stats['failed']) == (6, 2, 0)
+    # SLO is streamed as whole object, its source segments are not transferred, other segments container objects are
+    assert dst_conn.cloud.get_object_data(dst_conn.project, 'backup', 'archive') == b''.join(slo_segments.values())
+    assert {i_object.name for i_object in dst_conn.cloud.list('objects', container='backup_segments')} == \
+        set(dlo_segments) | {'readme'}
+    # DLO manifest is copied with its header, segments are migrated as regular objects
+    assert dst_conn.cloud.get_object(dst_conn.project, 'backup', 'log').object_manifest == 'backup_segments/log/'
+    assert dst_conn.cloud.get_object_data(dst_conn.project, 'backup', 'log') == b''.join(dlo_segments.values())
+
+    stats = migrate_objstore_containers(objstore_args, src_conn, dst_conn)
+    assert (stats['objects'], stats['skipped'], stats['slo_segments'], stats['failed']) == (0, 6, 2, 0)
@@ -0,0 +1,167 @@
+""" OpenStack migrator tests - connection resource cache, port index and security group reconciliation """
+
+import concurrent.futures
+
+import openstack.exceptions
+import pytest
+
+import fakeostack
+import olib
+
+
+@pytest.fixture
+def cloud():
+    """ fake cloud with project test-project """
+    cloud = fakeostack.FakeCloud('test')
+    cloud.add('projects', name='test-project', is_enabled=True, domain_id='default')
+    return cloud
+
+
+def add_network(cloud, project, name, cidr_prefix='10.0.0'):
+    """ add network with single subnet """
+    network = cloud.add('networks', name=name, project_id=project.id, subnet_ids=[])
+    network.subnet_ids.append(cloud.add('subnets', name=f"{name}-subnet", network_id=network.id, project_id=project.id,
+                                        cidr=f"{cidr_prefix}.0/24").id)
+    return network
+
+
+def test_find_ostack_resource_hits_cache_by_id_and_name(cloud):
+    conn = cloud.connect('test-project')
+    network = add_network(cloud, conn.project, 'network')
+    olib.prefetch_ostack_project_resources(conn, conn.project)
+
+    api_calls_count = cloud.get_api_calls_count()
+    assert olib.find_ostack_resource(conn, 'network', network.id) is network
+    assert olib.find_ostack_resource(conn, 'network', 'network', project_id=conn.project.id) is network
+    assert olib.find_ostack_resource(conn, 'subnet', 'network-subnet').id == network.subnet_ids[0]
+    assert cloud.get_api_calls_count() == api_calls_count
+
+    # renamed resource is re-indexed by new name only
+    renamed_network = cloud.add('networks', **(vars(network) | {'name': 'renamed-network'}))
+    olib.cache_ostack_resource(conn, 'network', renamed_network)
+    assert olib.find_ostack_resource(conn, 'network', 'renamed-network') is renamed_network
+    assert cloud.get_api_calls_count() == api_calls_count
+    assert olib.find_ostack_resource(conn, 'network', 'network') is None
+    assert cloud.api_calls['network.find_network'] == 1
+
+
+def test_find_ostack_resource_ambiguous_name_falls_back_to_find(cloud):
+    conn = cloud.connect('test-project')
+    other_project = cloud.add('projects', name='other-project', is_enabled=True, domain_id='default')
+    network = add_network(cloud, conn.project, 'network')
+    add_network(cloud, other_project, 'network', '10.0.1')
+    for i_network in cloud.list('networks'):
+        olib.cache_ostack_resource(conn, 'network', i_network)
+
+    # project narrows down cached candidates, otherwise the name is resolved (and rejected) by the cloud
+    assert olib.find_ostack_resource(conn, 'network', 'network', project_id=conn.project.id) is network
+    assert not cloud.api_calls['network.find_network']
+    with pytest.raises(openstack.exceptions.DuplicateResource):
+        olib.find_ostack_resource(conn, 'network', 'network')
+
+
+def test_ostack_resource_cache_concurrent_access(cloud):
+    conn = cloud.connect('test-project')
+    networks = [add_network(cloud, conn.project, f"network-{i_index}", f"10.0.{i_index}") for i_index in range(200)]
+
+    def cache_and_find(network):
+        olib.cache_ostack_resource(conn, 'network', network)
+        return olib.find_ostack_resource(conn, 'network', network.name, project_id=conn.project.id)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(cache_and_find, networks)) == networks
+    assert not cloud.api_calls['network.find_network']
+
+
+def test_find_ostack_port_searches_prefetched_port_index(cloud):
+    conn = cloud.connect('test-project')
+    network = add_network(cloud, conn.project, 'network')
+    server = cloud.add('servers', name='server', project_id=conn.project.id)
+    port = cloud.add_port(network, '10.0.0.10', device_id=server.id, description='port')
+    cloud.add_port(network, '10.0.0.11')
+    olib.prefetch_ostack_project_resources(conn, conn.project)
+
+    api_calls_count = cloud.get_api_calls_count()
+    assert olib.find_ostack_port(conn, port.mac_address, '10.0.0.10') == [port]
+    assert olib.find_ostack_port(conn, port.mac_address, '10.0.0.10', network=network) == [port]
+    assert olib.find_ostack_port(conn, port.mac_address, '10.0.0.10', device=server, description_substr='port') == [port]
+    assert cloud.get_api_calls_count() == api_calls_count
+
+    # port created after prefetch is not indexed, it is queried
+    new_port = cloud.add_port(network, '10.0.0.12')
+    assert olib.find_ostack_port(conn, new_port.mac_address, '10.0.0.12', network=network) == [new_port]
+    assert cloud.api_calls['network.ports'] == 2
+    assert olib.find_ostack_port(conn, port.mac_address, '10.0.0.11') == []
+
+
+def get_security_group_rules(security_group):
+    """ return security group rules identities (remote group referenced by name) """
+    return sorted(((i_rule['direction'], i_rule['ethertype'], i_rule['protocol'], i_rule['port_range_min'],
+                    i_rule['remote_group_id'] and i_rule['remote_group_id'] != security_group.id)
+                   for i_rule in security_group.security_group_rules), key=str)
+
+
+@pytest.fixture
+def security_groups(cloud):
+    """ source project security groups ssh and default, ssh rule references default group, default references itself """
+    src_project = cloud.find('projects', 'test-project')
+    src_default_security_group = cloud.add_security_group(src_project.id, name='default')
+    src_ssh_security_group = cloud.add_security_group(src_project.id, name='ssh')
+    for i_rule in ({'security_group_id': src_default_security_group.id, 'direction': 'ingress', 'ethertype': 'IPv4',
+                    'remote_group_id': src_default_security_group.id},
+                   {'security_group_id': src_ssh_security_group.id, 'direction': 'ingress', 'ethertype': 'IPv4',
+                    'protocol': 'tcp', 'port_range_min': 22, 'port_range_max': 22, 'remote_ip_prefix': '0.0.0.0/0'},
+                   {'security_group_id': src_ssh_security_group.id, 'direction': 'ingress', 'ethertype': 'IPv4',
+                    'protocol': 'icmp', 'remote_group_id': src_default_security_group.id}):
+        cloud.add_security_group_rule(i_rule | {'project_id': src_project.id})
+    return [src_ssh_security_group, src_default_security_group]
+
+
+def reconcile_security_groups(args, cloud, dst_cloud, src_security_groups):
+    src_conn, dst_conn = cloud.connect('test-project'), dst_cloud.connect('test-project')
+    return olib.reconcile_security_groups(args, src_conn, dst_conn, src_security_groups, dst_conn.project)
+
+
+def test_reconcile_security_groups(migrator_args, cloud, security_groups):
+    args = migrator_args()
+    dst_cloud = fakeostack.FakeCloud('destination')
+    dst_project = dst_cloud.add('projects', name='test-project', is_enabled=True, domain_id='default')
+    # destination group of the same name not created by migration is not reused
+    unrelated_security_group = dst_cloud.add_security_group(dst_project.id, name='migrated-ssh', description='manual')
+
+    security_group_mapping = reconcile_security_groups(args, cloud, dst_cloud, [security_groups[0]])
+    assert set(security_group_mapping) == {i_sg.id for i_sg in security_groups}
+    for i_src_security_group in security_groups:
+        i_dst_security_group = security_group_mapping[i_src_security_group.id]
+        assert i_dst_security_group.name == f"migrated-{i_src_security_group.name}"
+        assert i_src_security_group.id in i_dst_security_group.description
+        assert get_security_group_rules(i_dst_security_group) == get_security_group_rules(i_src_security_group)
+    assert security_group_mapping[security_groups[0].id] is not unrelated_security_group
+    assert dst_cloud.api_calls['network.create_security_group_rules'] == 2
+
+    # reconciled security groups are reused, no rule is created
+    assert reconcile_security_groups(migrator_args(), cloud, dst_cloud, security_groups) == security_group_mapping
+    assert dst_cloud.api_calls['network.create_security_group'] == 2
+    assert dst_cloud.api_calls['network.create_security_group_rules'] == 2
+
+
+def test_reconcile_security_groups_rule_conflict(migrator_args, cloud, security_groups, caplog):
+    args = migrator_args()
+    dst_cloud = fakeostack.FakeCloud('destination')
+    dst_cloud.add('projects', name='test-project', is_enabled=True, domain_id='default')
+
+    # first missing rule gets created concurrently, bulk request conflicts
+    create_security_group_rules = fakeostack.FakeNetworkProxy.create_security_group_rules
+    def create_security_group_rules_conflicting(self, data):
+        if not self.cloud.api_calls['network.create_security_group_rules']:
+            self.cloud.add_security_group_rule(data[0])
+        return create_security_group_rules(self, data)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(fakeostack.FakeNetworkProxy, 'create_security_group_rules', create_security_group_rules_conflicting)
+        security_group_mapping = reconcile_security_groups(args, cloud, dst_cloud, security_groups)
+
+    assert "E.40 Destination OpenStack security group rules bulk creation conflicts" in caplog.text
+    assert dst_cloud.api_calls['network.create_security_group_rule'] >= 1
+    for i_src_security_group in security_groups:
+        assert get_security_group_rules(security_group_mapping[i_src_security_group.id]) == \
+            get_security_group_rules(i_src_security_group)
@@ -0,0 +1,140 @@
+""" OpenStack migrator tests - whole project migration of synthetic benchmark projects """
+
+import argparse
+import json
+import logging
+import os.path
+import threading
+
+import pytest
+
+from conftest import MigrationInterrupted
+
+
+def get_benchmark_args(tmp_path, migrator_argv, **attrs):
+    """ benchmark arguments (project-migrator-benchmark.py defaults) with benchmark files in test directory """
+    return argparse.Namespace(**({'projects': 1, 'api_latency': 0.0, 'ssh_latency': 0.0, 'rbd_throughput': 0.0, 'volume_size_gb': 1,
+                                  'image_allocated_kib': 64, 'volume_snapshots': 0, 'explicit_volumes': 0, 'objstore_objects': 0,
+                                  'objstore_object_size_kib': 64, 'keypair_dump_rows': 10, 'two_phase': False,
+                                  'work_dir': str(tmp_path), 'keep_work_dir': False, 'migrator_argv': migrator_argv,
+                                  'logger': logging.getLogger("project-migrator-benchmark")} | attrs))
+
+
+@pytest.mark.parametrize("block_storage_volume_migration_mode", ['vmoff-snap-vmon-clone-flatten-copy-cleanup',
+                                                                 'vmoff-snap-vmon-copy-cleanup'])
+def test_migrate_explicit_volumes_with_snapshots(project_migrator, project_migrator_benchmark, tmp_path,
+                                                 block_storage_volume_migration_mode):
+    args = get_benchmark_args(tmp_path, ['--migrate-volume-snapshots', 'true',
+                                         '--block-storage-volume-migration-mode', block_storage_volume_migration_mode],
+                              explicit_volumes=2, volume_snapshots=2)
+    result = project_migrator_benchmark.run_benchmark(args, project_migrator, 2)
+    assert (result['ecode'], result['error']) == (0, None)
+    assert result['migrated_explicit_volumes'] == 2
+    # server 0 has ephemeral RBD image only, server 1 root volume snapshots are migrated together with explicit volume ones
+    assert result['api_calls_per_method']['destination']['blockstorage.manage_snapshot'] == 3 * 2
+
+
+def test_resumed_migration_restores_source_server_status(project_migrator, project_migrator_benchmark, tmp_path, monkeypatch):
+    args = get_benchmark_args(tmp_path, ['--block-storage-volume-migration-mode', 'vmoff-snap-copy-cleanup-vmon'])
+    migrate_rbd_images, main = project_migrator.clib.migrate_rbd_images, project_migrator.main
+
+    def migrate_rbd_images_interrupted(*migrate_args, **migrate_kwargs):
+        raise MigrationInterrupted("RBD image migration interrupted with source server stopped")
+
+    def main_resumed(migrator_args):
+        # first migration fails during downtime (source server stopped), second one resumes it
+        monkeypatch.setattr(project_migrator.clib, 'migrate_rbd_images', migrate_rbd_images_interrupted)
+        with pytest.raises(MigrationInterrupted):
+            main(migrator_args)
+        monkeypatch.setattr(project_migrator.clib, 'migrate_rbd_images', migrate_rbd_images)
+        migrator_args.resume = True
+        for i_openrc_file in (migrator_args.source_openrc, migrator_args.destination_openrc):
+            i_openrc_file.seek(0)
+        return main(migrator_args)
+
+    monkeypatch.setattr(project_migrator, 'main', main_resumed)
+    result = project_migrator_benchmark.run_benchmark(args, project_migrator, 1)
+    assert (result['ecode'], result['error']) == (0, None)
+    # source server stopped by interrupted migration is migrated (not skipped as inactive) and started again
+    assert result['migrated_servers'] == 1
+    assert result['api_calls_per_method']['source']['compute.stop_server'] == 1
+    assert result['api_calls_per_method']['source']['compute.start_server'] == 1
+
+
+def test_migrate_campaign_projects_concurrently(project_migrator, project_migrator_benchmark, tmp_path, monkeypatch):
+    args = get_benchmark_args(tmp_path, ['--campaign-parallelism', '3'], projects=3, keep_work_dir=True)
+    migrate_project = project_migrator.migrate_project
+    campaign_barrier = threading.Barrier(3, timeout=30)
+
+    def migrate_project_concurrently(project_args, migrator):
+        # every campaign project migration waits for the others, last project migration fails
+        campaign_barrier.wait()
+        if project_args.project_name.endswith('-2'):
+            raise MigrationInterrupted("project migration failed")
+        return migrate_project(project_args, migrator)
+
+    monkeypatch.setattr(project_migrator, 'migrate_project', migrate_project_concurrently)
+    result = project_migrator_benchmark.run_benchmark(args, project_migrator, 2)
+    # failed project does not stop the campaign, it is reported by exit-code and campaign results
+    assert (result['ecode'], result['error']) == (1, None)
+    assert result['migrated_servers'] == 2 * 2
+    with open(os.path.join(result['work_dir'], 'project-migrator.campaign.jsonl'), encoding="utf-8") as file:
+        campaign_results = {i_result['project_name']: i_result for i_result in map(json.loads, file)}
+    assert {i_project_name: i_result['status'] for i_project_name, i_result in campaign_results.items()} == \
+        {'benchmark-2-0': 'succeeded', 'benchmark-2-1': 'succeeded', 'benchmark-2-2': 'failed'}
+    assert campaign_results['benchmark-2-0']['migration_journal_file'] != campaign_results['benchmark-2-1']['migration_journal_file']
+
+
+def get_created_resources_counts(api_calls_per_method):
+    """ return counts of destination resource creation API calls """
+    return {i_method: i_count for i_method, i_count in api_calls_per_method.items() if '.create_' in i_method}
+
+
+def test_migrate_project_prepare_and_cutover(project_migrator, project_migrator_benchmark, tmp_path, monkeypatch):
+    single_phase_result = project_migrator_benchmark.run_benchmark(get_benchmark_args(tmp_path, []), project_migrator, 4)
+    assert (single_phase_result['ecode'], single_phase_result['error']) == (0, None)
+
+    main = project_migrator.main
+    prepared_resources = {}
+
+    def main_recording_prepared_resources(migrator_args):
+        ecode = main(migrator_args)
+        if migrator_args.migration_phase == project_migrator.MIGRATION_PHASE_PREPARE:
+            # source servers keep running, destination resources are created, servers and their data are not migrated
+            src_cloud = project_migrator.lib.get_ostack_connection({'OS_AUTH_URL': 'fake://source'}).cloud
+            dst_cloud = project_migrator.lib.get_ostack_connection({'OS_AUTH_URL': 'fake://destination'}).cloud
+            prepared_resources.update(source_servers_statuses={i_server.status for i_server in src_cloud.list('servers')},
+                                      created_resources_counts=get_created_resources_counts(dst_cloud.api_calls))
+        return ecode
+
+    monkeypatch.setattr(project_migrator, 'main', main_recording_prepared_resources)
+    result = project_migrator_benchmark.run_benchmark(get_benchmark_args(tmp_path, [], two_phase=True), project_migrator, 4)
+    assert (result['ecode'], result['error']) == (0, None)
+    assert set(result['phases_wall_seconds']) == {project_migrator.MIGRATION_PHASE_PREPARE, project_migrator.MIGRATION_PHASE_CUTOVER}
+    assert result['migrated_servers'] == 4
+    assert prepared_resources['source_servers_statuses'] == {'ACTIVE'}
+    assert 'compute.create_server' not in prepared_resources['created_resources_counts']
+    assert prepared_resources['created_resources_counts']['blockstorage.create_volume'] == \
+        single_phase_result['api_calls_per_method']['destination']['blockstorage.create_volume']
+    # ports of all servers are bulk-created per network, cutover reuses prepared destination resources
+    created_resources_counts = get_created_resources_counts(result['api_calls_per_method']['destination'])
+    assert created_resources_counts['network.create_ports'] == 1
+    assert 'network.create_port' not in created_resources_counts
+    single_phase_created_resources_counts = get_created_resources_counts(single_phase_result['api_calls_per_method']['destination'])
+    assert single_phase_created_resources_counts.pop('network.create_port') == 4
+    assert created_resources_counts == single_phase_created_resources_counts | {'network.create_ports': 1}
+
+
+def test_migrate_project_copy_manage_volumes(project_migrator, project_migrator_benchmark, tmp_path):
+    args = get_benchmark_args(tmp_path, ['--destination-volume-creation-mode', 'copy-manage',
+                                         '--destination-cinder-volume-host', 'cinder-volume@ceph#cloud-cinder-volumes-prod-brno',
+                                         '--migrate-volume-snapshots', 'true'], volume_snapshots=1)
+    result = project_migrator_benchmark.run_benchmark(args, project_migrator, 4)
+    assert (result['ecode'], result['error']) == (0, None)
+    assert result['migrated_servers'] == 4
+    # migrated RBD images are managed as destination volumes, no volume is created from destination image
+    destination_api_calls = result['api_calls_per_method']['destination']
+    assert destination_api_calls['blockstorage.manage_volume'] == 5
+    assert 'blockstorage.create_volume' not in destination_api_calls
+    assert 'image.find_image' not in destination_api_calls
+    assert destination_api_calls['blockstorage.manage_snapshot'] == 3
@@ -0,0 +1,103 @@
+""" OpenStack migrator tests - RBD image migration variants (direct snapshot copy, composite command) and scheduling """
+
+import os.path
+import threading
+
+import pytest
+
+import clib
+import fakeceph
+import lib
+from conftest import (DATA_SIZE, DESTINATION_POOL_NAME, SOURCE_POOL_NAME, get_server_block_device_mapping, list_rbd_image_snapshots,
+                      read_destination_data, write_rbd_image, write_source_data)
+
+
+@pytest.mark.parametrize("direct_copy", [False, True])
+def test_migrate_rbd_images_direct_copy(migrator_args, ceph_host, direct_copy):
+    ceph_state_dir = ceph_host.state_dir
+    names = ('server-a', 'server-b')
+    mappings = [get_server_block_device_mapping(ceph_state_dir, i_name) for i_name in names]
+    source_data = {i_name: write_source_data(ceph_state_dir, i_name) for i_name in names}
+
+    clib.migrate_rbd_images(migrator_args(), mappings, direct_copy=direct_copy)
+    for i_name in names:
+        assert read_destination_data(ceph_state_dir, i_name) == source_data[i_name]
+        assert not list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, f"{i_name}_disk")
+        assert not list_rbd_image_snapshots(ceph_state_dir, DESTINATION_POOL_NAME, f"volume-{i_name}-volume")
+    # direct copy transfers source snapshot, no source clone is created, flattened and deleted
+    transfer_commands = {i_command: ceph_host.commands[i_command] for i_command in
+                         ('ceph-rbd-image-snapshot-copy.sh', 'ceph-rbd-image-clone.sh', 'ceph-rbd-image-flatten.sh',
+                          'ceph-rbd-image-copy.sh')}
+    assert transfer_commands == ({'ceph-rbd-image-snapshot-copy.sh': 2, 'ceph-rbd-image-clone.sh': 0, 'ceph-rbd-image-flatten.sh': 0,
+                                  'ceph-rbd-image-copy.sh': 0} if direct_copy else
+                                 {'ceph-rbd-image-snapshot-copy.sh': 0, 'ceph-rbd-image-clone.sh': 2, 'ceph-rbd-image-flatten.sh': 2,
+                                  'ceph-rbd-image-copy.sh': 2})
+
+
+@pytest.mark.parametrize("rbd_parallelism", [1, 3])
+def test_migrate_rbd_images_largest_first(migrator_args, ceph_host, monkeypatch, rbd_parallelism):
+    ceph_state_dir = ceph_host.state_dir
+    names = ('server-a', 'server-b', 'server-c')
+    mappings = [get_server_block_device_mapping(ceph_state_dir, i_name) for i_name in names]
+    for i_index, i_name in enumerate(names):
+        for j_offset in range(i_index + 1):
+            write_source_data(ceph_state_dir, i_name, offset=j_offset * 2 * DATA_SIZE)
+
+    # snapshot sizes are received concurrently (rbd du waits for all RBD image migration workers)
+    ceph_rbd_image_du = clib.ceph_rbd_image_du
+    du_barrier = threading.Barrier(rbd_parallelism, timeout=10)
+    def concurrent_du(*attrs, **kwattrs):
+        du_barrier.wait()
+        return ceph_rbd_image_du(*attrs, **kwattrs)
+    monkeypatch.setattr(clib, 'ceph_rbd_image_du', concurrent_du)
+    migrate_rbd_image = clib.migrate_rbd_image
+    migrated_rbd_images = []
+    def record_migrate_rbd_image(args, block_device_migration_mapping, *attrs, **kwattrs):
+        migrated_rbd_images.append(block_device_migration_mapping['source_server_rbd_image'])
+        return migrate_rbd_image(args, block_device_migration_mapping, *attrs, **kwattrs)
+    monkeypatch.setattr(clib, 'migrate_rbd_image', record_migrate_rbd_image)
+
+    clib.migrate_rbd_images(migrator_args(False, '--rbd-parallelism', str(rbd_parallelism)), mappings,
+                            {'func': lambda: migrated_rbd_images.append('post_rbd_snap_callback'), 'args': {}})
+    # snapshot sizes are received after the callback (source server may be started), the most allocated image is migrated first
+    assert migrated_rbd_images[0] == 'post_rbd_snap_callback'
+    if rbd_parallelism == 1:
+        assert migrated_rbd_images[1:] == ['server-c_disk', 'server-b_disk', 'server-a_disk']
+    else:
+        assert sorted(migrated_rbd_images[1:]) == ['server-a_disk', 'server-b_disk', 'server-c_disk']
+
+
+@pytest.mark.parametrize("direct_copy", [False, True])
+def test_migrate_rbd_images_composite(migrator_args, ceph_host, direct_copy):
+    ceph_state_dir = ceph_host.state_dir
+    names = ('server-a', 'server-b')
+    mappings = [get_server_block_device_mapping(ceph_state_dir, i_name) for i_name in names]
+    source_data = {i_name: write_source_data(ceph_state_dir, i_name) for i_name in names}
+    args = migrator_args(False, '--rbd-image-migration-composite', 'true')
+
+    clib.migrate_rbd_images(args, mappings, direct_copy=direct_copy)
+    for i_name in names:
+        assert read_destination_data(ceph_state_dir, i_name) == source_data[i_name]
+        assert not list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, f"{i_name}_disk")
+        assert lib.journal_get(migrator_args(True), f"{SOURCE_POOL_NAME}/{i_name}_disk", "G.17")
+    # every snapshotted RBD image is migrated by single ceph migrator host command
+    assert ceph_host.commands['ceph-rbd-image-migrate.sh'] == len(names)
+    assert not any(ceph_host.commands[i_command] for i_command in ('ceph-rbd-image-clone.sh', 'ceph-rbd-image-flatten.sh',
+                                                                   'ceph-rbd-image-copy.sh', 'ceph-rbd-image-snapshot-copy.sh',
+                                                                   'ceph-rbd-image-delete.sh'))
+
+
+def test_migrate_rbd_images_composite_failure(migrator_args, ceph_host):
+    ceph_state_dir = ceph_host.state_dir
+    mapping = get_server_block_device_mapping(ceph_state_dir, 'server')
+    write_source_data(ceph_state_dir, 'server')
+    # leftover clone makes clone step (G.08) fail
+    write_rbd_image(ceph_state_dir, SOURCE_POOL_NAME, 'g1-g2-migration-server_disk', b'\0')
+
+    with pytest.raises(AssertionError, match="G.08"):
+        clib.migrate_rbd_images(migrator_args(False, '--rbd-image-migration-composite', 'true'), [mapping])
+    # completed steps are journaled, replaced destination RBD image is not left behind
+    resumed_args = migrator_args(True)
+    assert lib.journal_get(resumed_args, f"{SOURCE_POOL_NAME}/server_disk", "G.07")
+    assert not lib.journal_get(resumed_args, f"{SOURCE_POOL_NAME}/server_disk", "G.12")
+    assert not os.path.isdir(fakeceph.get_image_dir(ceph_state_dir, DESTINATION_POOL_NAME, 'volume-server-volume'))
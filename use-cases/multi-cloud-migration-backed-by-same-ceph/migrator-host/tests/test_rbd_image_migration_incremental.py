@@ -0,0 +1,110 @@
+""" OpenStack migrator tests - incremental RBD image migration (export-diff / import-diff), resume and failure cleanup """
+
+import pytest
+
+import clib
+from conftest import (DATA_SIZE, DESTINATION_POOL_NAME, SOURCE_POOL_NAME, MigrationInterrupted, get_server_block_device_mapping,
+                      get_source_server_restart_callback, list_rbd_image_snapshots, read_destination_data, write_source_data)
+
+
+def migrate_rbd_images_incremental(args, mappings, post_rbd_snap_callback=None, reuse_source_rbd_image_snapshots=True):
+    clib.migrate_rbd_images_incremental(args,
+                                        clib.migrate_rbd_images_base(args, mappings,
+                                                                     reuse_source_rbd_image_snapshots=reuse_source_rbd_image_snapshots),
+                                        post_rbd_snap_callback)
+
+
+def assert_rbd_images_migrated(ceph_state_dir, names, source_data):
+    for i_name in names:
+        assert read_destination_data(ceph_state_dir, i_name) == source_data[i_name]
+        assert not list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, f"{i_name}_disk")
+        assert not list_rbd_image_snapshots(ceph_state_dir, DESTINATION_POOL_NAME, f"volume-{i_name}-volume")
+
+
+def test_migrate_rbd_images_incremental_resume_after_base_failure(migrator_args, ceph_host, monkeypatch):
+    ceph_state_dir = ceph_host.state_dir
+    names = ('server-a', 'server-b')
+    mappings = [get_server_block_device_mapping(ceph_state_dir, i_name) for i_name in names]
+    source_data = {i_name: write_source_data(ceph_state_dir, i_name) for i_name in names}
+
+    ceph_rbd_image_diff_copy = clib.ceph_rbd_image_diff_copy
+    def fail_server_b_transfer(args, src_pool_name, src_rbd_image_name, *attrs, **kwattrs):
+        if src_rbd_image_name == 'server-b_disk':
+            return None, "injected failure", 1
+        return ceph_rbd_image_diff_copy(args, src_pool_name, src_rbd_image_name, *attrs, **kwattrs)
+    monkeypatch.setattr(clib, 'ceph_rbd_image_diff_copy', fail_server_b_transfer)
+    with pytest.raises(AssertionError):
+        migrate_rbd_images_incremental(migrator_args(), mappings)
+    # failed image base snapshot is removed, transferred one is kept for resumed migration
+    assert not list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, 'server-b_disk')
+    assert list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, 'server-a_disk') == {'g1-g2-migration-base-server-a_disk'}
+
+    monkeypatch.setattr(clib, 'ceph_rbd_image_diff_copy', ceph_rbd_image_diff_copy)
+    source_data['server-a'] = write_source_data(ceph_state_dir, 'server-a')
+    migrate_rbd_images_incremental(migrator_args(True), mappings)
+    assert_rbd_images_migrated(ceph_state_dir, names, source_data)
+
+
+@pytest.mark.parametrize("reuse_source_rbd_image_snapshots", [True, False])
+def test_migrate_rbd_images_incremental_resume_after_difference_failure(migrator_args, ceph_host, monkeypatch,
+                                                                        reuse_source_rbd_image_snapshots):
+    ceph_state_dir = ceph_host.state_dir
+    mappings = [get_server_block_device_mapping(ceph_state_dir, 'server')]
+    write_source_data(ceph_state_dir, 'server')
+
+    ceph_rbd_image_diff_copy = clib.ceph_rbd_image_diff_copy
+    def fail_difference_transfer(*attrs, **kwattrs):
+        if attrs[6]:
+            return None, "injected failure", 1
+        return ceph_rbd_image_diff_copy(*attrs, **kwattrs)
+    monkeypatch.setattr(clib, 'ceph_rbd_image_diff_copy', fail_difference_transfer)
+    with pytest.raises(AssertionError):
+        migrate_rbd_images_incremental(migrator_args(), mappings)
+    # stale final snapshot is removed, base snapshot is kept for resumed migration
+    assert list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, 'server_disk') == {'g1-g2-migration-base-server_disk'}
+
+    monkeypatch.setattr(clib, 'ceph_rbd_image_diff_copy', ceph_rbd_image_diff_copy)
+    source_data = {'server': write_source_data(ceph_state_dir, 'server')}
+    migrate_rbd_images_incremental(migrator_args(True), mappings, reuse_source_rbd_image_snapshots=reuse_source_rbd_image_snapshots)
+    assert_rbd_images_migrated(ceph_state_dir, ['server'], source_data)
+
+
+def test_migrate_rbd_images_incremental_resume_stale_snapshot(migrator_args, ceph_host):
+    ceph_state_dir = ceph_host.state_dir
+    mappings = [get_server_block_device_mapping(ceph_state_dir, 'server')]
+    write_source_data(ceph_state_dir, 'server')
+    restarted_data = []
+
+    with pytest.raises(MigrationInterrupted):
+        migrate_rbd_images_incremental(migrator_args(), mappings,
+                                       get_source_server_restart_callback(ceph_state_dir, 'server', restarted_data))
+    assert len(list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, 'server_disk')) == 2
+
+    migrate_rbd_images_incremental(migrator_args(True), mappings, reuse_source_rbd_image_snapshots=False)
+    assert_rbd_images_migrated(ceph_state_dir, ['server'], {'server': restarted_data[0]})
+
+
+def test_migrate_rbd_images_incremental_transfers_difference(migrator_args, ceph_host, monkeypatch):
+    ceph_state_dir = ceph_host.state_dir
+    mappings = [get_server_block_device_mapping(ceph_state_dir, 'server')]
+    base_data = write_source_data(ceph_state_dir, 'server')
+
+    ceph_rbd_image_diff_copy = clib.ceph_rbd_image_diff_copy
+    transfers = []
+    def record_transfer(*attrs, **kwattrs):
+        transfers.append((attrs[3], attrs[6]))
+        return ceph_rbd_image_diff_copy(*attrs, **kwattrs)
+    monkeypatch.setattr(clib, 'ceph_rbd_image_diff_copy', record_transfer)
+
+    args = migrator_args()
+    base_mappings = clib.migrate_rbd_images_base(args, mappings)
+    # source server keeps running after base transfer, rewritten region is transferred as snapshot difference
+    source_data = {'server': write_source_data(ceph_state_dir, 'server', offset=DATA_SIZE)}
+    clib.migrate_rbd_images_incremental(args, base_mappings)
+
+    assert transfers == [('g1-g2-migration-base-server_disk', None),
+                         ('g1-g2-migration-server_disk', 'g1-g2-migration-base-server_disk')]
+    assert read_destination_data(ceph_state_dir, 'server') == base_data
+    assert read_destination_data(ceph_state_dir, 'server', offset=DATA_SIZE) == source_data['server']
+    assert not list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, 'server_disk')
+    assert not list_rbd_image_snapshots(ceph_state_dir, DESTINATION_POOL_NAME, 'volume-server-volume')
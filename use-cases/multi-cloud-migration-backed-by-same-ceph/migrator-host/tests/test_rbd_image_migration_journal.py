@@ -0,0 +1,58 @@
+""" OpenStack migrator tests - RBD image migration journal replay (--resume) and snapshot reuse """
+
+import pytest
+
+import clib
+import lib
+from conftest import (SOURCE_POOL_NAME, MigrationInterrupted, get_server_block_device_mapping, get_source_server_restart_callback,
+                      list_rbd_image_snapshots, read_destination_data, write_source_data)
+
+
+def test_journal_replay_marks_undone_steps(migrator_args):
+    args = migrator_args()
+    lib.journal_record(args, "pool/image", "G.05", "snapshot")
+    lib.journal_record(args, "pool/image", "G.12")
+    lib.journal_record(args, "pool/image", "G.05", None)
+
+    resumed_args = migrator_args(True)
+    assert lib.journal_get(resumed_args, "pool/image", "G.05") is None
+    assert lib.journal_get(resumed_args, "pool/image", "G.12") is True
+    assert lib.journal_get(migrator_args(False), "pool/image", "G.12") is None
+
+
+def test_journal_destination_volume_invalidates_rbd_image_steps(migrator_args):
+    args = migrator_args()
+    for i_step in ("G.02", "G.07", "G.12", "G.17", "G.22", "G.23"):
+        lib.journal_record(args, "pool/image", i_step)
+    lib.journal_record_destination_volume(args, "pool/image", "F.25", "volume-id")
+
+    resumed_args = migrator_args(True)
+    assert lib.journal_get(resumed_args, "pool/image", "F.25") == "volume-id"
+    assert not any(lib.journal_get(resumed_args, "pool/image", i_step) for i_step in ("G.02", "G.07", "G.12", "G.17", "G.22", "G.23"))
+
+
+@pytest.mark.parametrize("direct_copy", [False, True])
+@pytest.mark.parametrize("reuse_source_rbd_image_snapshots", [True, False])
+def test_migrate_rbd_images_resume(migrator_args, ceph_host, direct_copy, reuse_source_rbd_image_snapshots):
+    ceph_state_dir = ceph_host.state_dir
+    mapping = get_server_block_device_mapping(ceph_state_dir, 'server')
+    snapshot_data = write_source_data(ceph_state_dir, 'server')
+    restarted_data = []
+
+    with pytest.raises(MigrationInterrupted):
+        clib.migrate_rbd_images(migrator_args(), [mapping],
+                                get_source_server_restart_callback(ceph_state_dir, 'server', restarted_data), direct_copy=direct_copy)
+    assert list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, 'server_disk')
+
+    clib.migrate_rbd_images(migrator_args(True), [mapping], direct_copy=direct_copy,
+                            reuse_source_rbd_image_snapshots=reuse_source_rbd_image_snapshots)
+    # snapshot taken before source server was running again is reused only when the server has not been running since
+    assert read_destination_data(ceph_state_dir, 'server') == (snapshot_data if reuse_source_rbd_image_snapshots else restarted_data[0])
+    assert not list_rbd_image_snapshots(ceph_state_dir, SOURCE_POOL_NAME, 'server_disk')
+
+    # migrated RBD image is skipped
+    resumed_args = migrator_args(True)
+    assert lib.journal_get(resumed_args, f"{SOURCE_POOL_NAME}/server_disk", "G.17")
+    ceph_commands_count = ceph_host.get_round_trips()
+    clib.migrate_rbd_images(resumed_args, [mapping], direct_copy=direct_copy)
+    assert ceph_host.get_round_trips() == ceph_commands_count
@@ -0,0 +1,28 @@
+""" OpenStack migrator tests - remote command execution on ceph migrator host """
+
+import logging
+
+import lib
+
+
+def test_remote_cmd_exec(ceph_host):
+    assert lib.remote_cmd_exec('fake-ceph-migrator-host', 'root', 'sshkey', "echo out; echo err >&2; exit 3") == ("out", "err", 3)
+    progress = []
+    assert lib.remote_cmd_exec('fake-ceph-migrator-host', 'root', 'sshkey', "echo 50% >&2; echo done",
+                               stderr_callback=progress.append) == ("done", "50%", 0)
+    assert progress == ["50%"]
+
+
+def test_remote_cmd_exec_failure_is_logged(monkeypatch, caplog):
+    def get_unreachable_ssh_client(hostname, username, key_filename):
+        raise OSError(f"{hostname} is unreachable")
+    monkeypatch.setattr(lib, 'get_ssh_client', get_unreachable_ssh_client)
+    logger = logging.getLogger("project-migrator")
+
+    assert lib.remote_cmd_exec('fake-ceph-migrator-host', 'root', 'sshkey', "uname -a", logger=logger) == \
+        ("", "fake-ceph-migrator-host is unreachable", lib.REMOTE_CMD_FAILURE_ECODE)
+    assert lib.remote_cmd_exec_stream('fake-ceph-migrator-host', 'root', 'sshkey', "cat dump", print, logger=logger) == \
+        ("fake-ceph-migrator-host is unreachable", lib.REMOTE_CMD_FAILURE_ECODE)
+    assert [(i_record.name, i_record.levelno, i_record.getMessage()) for i_record in caplog.records] == \
+        [("project-migrator", logging.ERROR, "Remote command failed (uname -a): fake-ceph-migrator-host is unreachable"),
+         ("project-migrator", logging.ERROR, "Remote command failed (cat dump): fake-ceph-migrator-host is unreachable")]